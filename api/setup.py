@@ -116,6 +116,7 @@ INSTALL_REQUIRES = [
     'urwid==1.3.1',
     'jsonschema>=3.0.2,<4',
     'aionotify==0.2.0',
+    'msgpack>=1.0.0,<2',
 ]
 
 
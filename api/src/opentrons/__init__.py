@@ -3,21 +3,28 @@ import sys
 import json
 HERE = os.path.abspath(os.path.dirname(__file__))
 from opentrons import config  # noqa(E402)
-from opentrons.data_storage import database_migration  # noqa(E402)
 
-if os.environ.get('OT_UPDATE_SERVER') != 'true':
-    database_migration.check_version_and_perform_full_migration()
-
-
-from .legacy_api.api import (robot,   # noqa(E402)
-                             reset,
-                             instruments,
-                             containers,
-                             labware,
-                             modules)
+# The APIv1 names are only built the first time they're used, since building
+# the robot singleton (and migrating the labware database it needs) is most
+# of the cost of importing opentrons and most users of the package don't
+# need it
 names_list = [
     'containers', 'instruments', 'robot', 'reset', 'modules', 'labware']
 
+
+def __getattr__(name):
+    if name in names_list:
+        from .legacy_api import api
+        value = getattr(api, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__():
+    return sorted(set(globals()) | set(names_list))
+
+
 try:
     with open(os.path.join(HERE, 'package.json')) as pkg:
         package_json = json.load(pkg)
@@ -0,0 +1,111 @@
+""" opentrons.api.command_log: a bounded log of the commands of a run
+
+Long protocols, and protocols that loop, can handle tens of thousands of
+commands in a run. :py:class:`CommandLog` keeps only the most recent of
+them so that neither the robot's memory nor the session sent to clients
+grows with the length of the run; clients page through it with
+:py:meth:`CommandLog.page`.
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+#: How many commands a run keeps the handling times of by default
+DEFAULT_MAX_ENTRIES = 10000
+
+#: How many commands a page holds by default
+DEFAULT_PAGE_SIZE = 100
+
+
+class CommandLog(dict):
+    """ The times at which the commands of a run were handled.
+
+    This is a dict of command id to handling time in milliseconds, so it is
+    sent to clients just like the plain dict it replaces, but it only holds
+    the ``max_entries`` most recent commands. Command ids keep counting up
+    when older commands are dropped.
+
+    :param max_entries: How many commands to keep. If 0, every command is
+                        kept.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        super().__init__()
+        self._max_entries = max_entries
+        self._first_id = 0
+        self._next_id = 0
+
+    @property
+    def max_entries(self) -> int:
+        return self._max_entries
+
+    @property
+    def total(self) -> int:
+        """ How many commands have been logged, including dropped ones """
+        return self._next_id
+
+    @property
+    def first_id(self) -> int:
+        """ The id of the oldest command still in the log """
+        return self._first_id
+
+    def append(self, timestamp: int) -> int:
+        """ Log the next command, returning its id """
+        command_id = self._next_id
+        self[command_id] = timestamp
+        self._next_id += 1
+        if self._max_entries:
+            while len(self) > self._max_entries:
+                del self[self._first_id]
+                self._first_id += 1
+        return command_id
+
+    def last(self) -> Optional[Tuple[int, int]]:
+        """ The id and handling time of the latest command, if any """
+        if not self._next_id > self._first_id:
+            return None
+        last_id = self._next_id - 1
+        return last_id, self[last_id]
+
+    def clear(self):
+        super().clear()
+        self._first_id = 0
+        self._next_id = 0
+
+    def page(self,
+             start: int = None,
+             count: int = DEFAULT_PAGE_SIZE,
+             descriptions: Sequence[Dict[str, Any]] = None
+             ) -> Dict[str, Any]:
+        """ Get a range of the log.
+
+        :param start: The id of the first command to get. If not specified,
+                      the page ends with the latest command.
+        :param count: The maximum number of commands to get
+        :param descriptions: The commands of the protocol, as simulated,
+                             in command id order. If specified, entries
+                             include their command's description and
+                             nesting level.
+        :returns: A dict with the entries (``id``, ``handledAt`` and, with
+                  ``descriptions``, ``description`` and ``level``), the
+                  first id still available and the total logged, so that
+                  clients can tell what they missed.
+        """
+        count = max(count, 0)
+        if start is None:
+            start = max(self._next_id - count, self._first_id)
+        start = max(start, self._first_id)
+        end = min(start + count, self._next_id)
+        entries: List[Dict[str, Any]] = []
+        for command_id in range(start, end):
+            entry = {'id': command_id, 'handledAt': self[command_id]}
+            if descriptions is not None\
+                    and command_id < len(descriptions):
+                entry['description']\
+                    = descriptions[command_id].get('description')
+                entry['level'] = descriptions[command_id].get('level')
+            entries.append(entry)
+        return {
+            'entries': entries,
+            'firstAvailable': self._first_id,
+            'total': self._next_id,
+            'maxEntries': self._max_entries
+        }
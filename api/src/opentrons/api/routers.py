@@ -1,10 +1,12 @@
 from opentrons.broker import Notifications, Broker
 from .session import SessionManager, Session
 from .calibration import CalibrationManager
+from .command_log import DEFAULT_MAX_ENTRIES
 
 
 class MainRouter:
-    def __init__(self, hardware=None, loop=None, lock=None):
+    def __init__(self, hardware=None, loop=None, lock=None,
+                 command_log_size=DEFAULT_MAX_ENTRIES):
         topics = [Session.TOPIC, CalibrationManager.TOPIC]
         self._broker = Broker()
         self._notifications = Notifications(topics, self._broker, loop=loop)
@@ -16,7 +18,8 @@ class MainRouter:
             hardware=checked_hw,
             loop=loop,
             broker=self._broker,
-            lock=lock)
+            lock=lock,
+            command_log_size=command_log_size)
         self.calibration_manager = CalibrationManager(hardware=checked_hw,
                                                       loop=loop,
                                                       broker=self._broker,
@@ -4,7 +4,7 @@ from copy import copy
 from functools import reduce, wraps
 import logging
 from time import time, sleep
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from uuid import uuid4
 from opentrons.drivers.smoothie_drivers.driver_3_0 import SmoothieAlarm
 from opentrons import robot
@@ -20,6 +20,9 @@ from opentrons.protocol_api.execute import run_protocol
 from opentrons.hardware_control import (API, ThreadManager,
                                         ExecutionCancelledError)
 from .models import Container, Instrument, Module
+from .simulation_cache import (
+    SimulationCache, SimulationResult, describe, key_for, restore)
+from .command_log import CommandLog, DEFAULT_MAX_ENTRIES, DEFAULT_PAGE_SIZE
 
 from opentrons.legacy_api.containers.placeable import (
     Module as ModulePlaceable, Placeable)
@@ -28,6 +31,10 @@ from opentrons.legacy_api.containers import get_container, location_to_list
 
 log = logging.getLogger(__name__)
 
+#: The instruments, containers, modules and (instrument, container)
+#: interactions of a simulated protocol
+_Loaded = Tuple[List[Any], List[Any], List[Any], List[Tuple[Any, Any]]]
+
 VALID_STATES = {'loaded', 'running', 'finished', 'stopped', 'paused', 'error'}
 
 
@@ -47,7 +54,8 @@ def _motion_lock(func):
 
 class SessionManager(object):
     def __init__(
-            self, hardware, loop=None, broker=None, lock=None):
+            self, hardware, loop=None, broker=None, lock=None,
+            simulation_cache=None, command_log_size=DEFAULT_MAX_ENTRIES):
         self._broker = broker or Broker()
         self._loop = loop or asyncio.get_event_loop()
         self.session = None
@@ -57,6 +65,10 @@ class SessionManager(object):
             'opentrons.server.command_logger')
         self._broker.set_logger(self._command_logger)
         self._motion_lock = lock
+        if simulation_cache is None:
+            simulation_cache = SimulationCache()
+        self._simulation_cache = simulation_cache
+        self._command_log_size = command_log_size
 
     def create(
             self,
@@ -109,7 +121,9 @@ class SessionManager(object):
                 loop=self._loop,
                 broker=self._broker,
                 motion_lock=self._motion_lock,
-                extra_labware=[])
+                extra_labware=[],
+                simulation_cache=self._simulation_cache,
+                command_log_size=self._command_log_size)
             return self.session
         finally:
             self._session_lock = False
@@ -144,7 +158,9 @@ class SessionManager(object):
                 loop=self._loop,
                 broker=self._broker,
                 motion_lock=self._motion_lock,
-                extra_labware=[])
+                extra_labware=[],
+                simulation_cache=self._simulation_cache,
+                command_log_size=self._command_log_size)
             return self.session
         finally:
             self._session_lock = False
@@ -186,7 +202,9 @@ class SessionManager(object):
                 loop=self._loop,
                 broker=self._broker,
                 motion_lock=self._motion_lock,
-                extra_labware=extra_labware)
+                extra_labware=extra_labware,
+                simulation_cache=self._simulation_cache,
+                command_log_size=self._command_log_size)
             return self.session
         finally:
             self._session_lock = False
@@ -204,22 +222,44 @@ class SessionManager(object):
     def get_session(self):
         return self.session
 
+    def get_command_log(
+            self, start: int = None,
+            count: int = DEFAULT_PAGE_SIZE) -> Optional[Dict[str, Any]]:
+        """ Get a page of the command log of the current session, if there
+        is one. See :py:meth:`.CommandLog.page`. """
+        if not self.session:
+            return None
+        return self.session.get_command_log(start, count)
+
+    def simulation_cache_metrics(self) -> Dict[str, int]:
+        """ Get the hit, miss and size counters of the simulation cache
+
+        .. note::
+
+            This function is mostly (only) intended to be called via rpc.
+        """
+        return self._simulation_cache.metrics()
+
 
 class Session(object):
     TOPIC = 'session'
 
     @classmethod
     def build_and_prep(
-        cls, name, contents, hardware, loop, broker, motion_lock, extra_labware
+        cls, name, contents, hardware, loop, broker, motion_lock,
+        extra_labware, simulation_cache=None,
+        command_log_size=DEFAULT_MAX_ENTRIES
     ):
         protocol = parse(contents, filename=name,
                          extra_labware={labware.uri_from_definition(defn): defn
                                         for defn in extra_labware})
-        sess = cls(name, protocol, hardware, loop, broker, motion_lock)
+        sess = cls(name, protocol, hardware, loop, broker, motion_lock,
+                   simulation_cache, command_log_size)
         sess.prepare()
         return sess
 
-    def __init__(self, name, protocol, hardware, loop, broker, motion_lock):
+    def __init__(self, name, protocol, hardware, loop, broker, motion_lock,
+                 simulation_cache=None, command_log_size=DEFAULT_MAX_ENTRIES):
         self._broker = broker
         self._default_logger = self._broker.logger
         self._sim_logger = self._broker.logger.getChild('sim')
@@ -242,7 +282,9 @@ class Session(object):
 
         self.state = None
         self.commands = []
-        self.command_log = {}
+        # the simulated commands, in command id order
+        self._command_list: List[Dict[str, Any]] = []
+        self.command_log = CommandLog(command_log_size)
         self.errors = []
 
         self._containers = []
@@ -257,6 +299,9 @@ class Session(object):
 
         self.startTime = None
         self._motion_lock = motion_lock
+        # Only protocol api v2 simulations are cached: v1 simulations leave
+        # their results in the global robot, which is reset between sessions
+        self._simulation_cache = simulation_cache if self._use_v2 else None
 
     def _hw_iface(self):
         if self._use_v2:
@@ -342,32 +387,14 @@ class Session(object):
                 stack.pop()
         unsubscribe = self._broker.subscribe(command_types.COMMAND, on_command)
         old_robot_connect = robot.connect
+        cache_key: Optional[str] = None
+        restored: Optional[_Loaded] = None
 
         try:
             # ensure actual pipettes are cached before driver is disconnected
             self._hardware.cache_instruments()
             if self._use_v2:
-                instrs = {}
-                for mount, pip in self._hardware.attached_instruments.items():
-                    if pip:
-                        instrs[mount] = {'model': pip['model'],
-                                         'id': pip.get('pipette_id', '')}
-                sync_sim = ThreadManager(
-                        API.build_hardware_simulator,
-                        instrs,
-                        [mod.name()
-                            for mod in self._hardware.attached_modules],
-                        strict_attached_instruments=False
-                        ).sync
-                sync_sim.home()
-                self._simulating_ctx = ProtocolContext.build_using(
-                    self._protocol,
-                    loop=self._loop,
-                    hardware=sync_sim,
-                    broker=self._broker,
-                    extra_labware=getattr(self._protocol, 'extra_labware', {}))
-                run_protocol(self._protocol,
-                             context=self._simulating_ctx)
+                cache_key, restored = self._simulate_v2_cached(res)
             else:
                 robot.broker = self._broker
                 # we don't rely on being connected anymore so make sure we are
@@ -392,19 +419,7 @@ class Session(object):
                 robot.connect()
 
             unsubscribe()
-
-            instruments, containers, modules, interactions = _accumulate(
-                [_get_labware(command) for command in commands])
-
-            self._containers.extend(_dedupe(containers))
-            self._instruments.extend(_dedupe(
-                instruments
-                + list(self._simulating_ctx.loaded_instruments.values())))
-            self._modules.extend(_dedupe(
-                modules
-                + [m._geometry
-                   for m in self._simulating_ctx.loaded_modules.values()]))
-            self._interactions.extend(_dedupe(interactions))
+            self._add_loaded(restored or self._loaded_by(commands))
 
             # Labware calibration happens after simulation and before run, so
             # we have to clear the tips if they are left on after simulation
@@ -413,8 +428,84 @@ class Session(object):
             if not self._use_v2:
                 robot.clear_tips()
 
+        if cache_key and not restored:
+            self._cache_simulation(cache_key, res)
+
         return res
 
+    def _simulate_v2_cached(
+            self, res: List[Dict[str, Any]])\
+            -> Tuple[Optional[str], Optional[_Loaded]]:
+        """ Simulate a v2 protocol in a new simulating context, or replay an
+        earlier simulation of it with the same hardware from the cache.
+
+        :param res: The command list, filled in if the simulation is replayed
+        :returns: The cache key of the simulation, if it can be cached, and
+                  the instruments, containers, modules and interactions if
+                  they were restored from the cache
+        """
+        instrs = {}
+        for mount, pip in self._hardware.attached_instruments.items():
+            if pip:
+                instrs[mount] = {'model': pip['model'],
+                                 'id': pip.get('pipette_id', '')}
+        cache_key: Optional[str] = None
+        cached: Optional[SimulationResult] = None
+        if self._simulation_cache is not None:
+            cache_key = key_for(
+                self._protocol, instrs,
+                [mod.model() for mod in self._hardware.attached_modules])
+            cached = self._simulation_cache.get(cache_key)
+        sync_sim = ThreadManager(
+                API.build_hardware_simulator,
+                instrs,
+                [mod.name() for mod in self._hardware.attached_modules],
+                strict_attached_instruments=False
+                ).sync
+        sync_sim.home()
+        self._simulating_ctx = ProtocolContext.build_using(
+            self._protocol,
+            loop=self._loop,
+            hardware=sync_sim,
+            broker=self._broker,
+            extra_labware=getattr(self._protocol, 'extra_labware', {}))
+        if cached:
+            res[:] = [dict(command) for command in cached.commands]
+            return cache_key, restore(cached, self._simulating_ctx)
+        run_protocol(self._protocol, context=self._simulating_ctx)
+        return cache_key, None
+
+    def _loaded_by(self, commands: List[Dict[str, Any]]) -> _Loaded:
+        """ The instruments, containers, modules and interactions used by
+        the simulated commands """
+        instruments, containers, modules, interactions = _accumulate(
+            [_get_labware(command) for command in commands])
+        return (
+            _dedupe(
+                instruments
+                + list(self._simulating_ctx.loaded_instruments.values())),
+            _dedupe(containers),
+            _dedupe(
+                modules
+                + [m._geometry
+                   for m in self._simulating_ctx.loaded_modules.values()]),
+            _dedupe(interactions))
+
+    def _add_loaded(self, loaded: _Loaded):
+        instruments, containers, modules, interactions = loaded
+        self._containers.extend(containers)
+        self._instruments.extend(instruments)
+        self._modules.extend(modules)
+        self._interactions.extend(interactions)
+
+    def _cache_simulation(self, cache_key: str, res: List[Dict[str, Any]]):
+        result = describe(res, self._simulating_ctx, self._instruments,
+                          self._containers, self._modules,
+                          self._interactions)
+        if result:
+            self._simulation_cache.put(  # type: ignore
+                cache_key, result)
+
     def refresh(self):
         self._reset()
 
@@ -427,6 +518,7 @@ class Session(object):
             self._broker.set_logger(self._default_logger)
 
         self.commands = tree.from_list(commands)
+        self._command_list = commands
 
         self.containers = self.get_containers()
         self.instruments = self.get_instruments()
@@ -555,10 +647,18 @@ class Session(object):
         self._on_state_changed()
 
     def log_append(self):
-        self.command_log.update({
-            len(self.command_log): now()})
+        self.command_log.append(now())
         self._on_state_changed()
 
+    def get_command_log(self, start=None, count=DEFAULT_PAGE_SIZE):
+        """ Get a page of the command log of the current run.
+
+        :param start: The id of the first command to get. If not specified,
+                      get the latest commands.
+        :param count: The maximum number of commands to get
+        """
+        return self.command_log.page(start, count, self._command_list)
+
     def error_append(self, error):
         self.errors.append(
             {
@@ -575,9 +675,9 @@ class Session(object):
         if self.state == 'loaded':
             payload: Any = copy(self)
         else:
-            if self.command_log.keys():
-                idx = sorted(self.command_log.keys())[-1]
-                timestamp = self.command_log[idx]
+            latest = self.command_log.last()
+            if latest:
+                idx, timestamp = latest
                 last_command: Optional[Dict[str, Any]]\
                     = {'id': idx, 'handledAt': timestamp}
             else:
@@ -0,0 +1,294 @@
+""" opentrons.api.simulation_cache: reuse of session simulation results
+
+Uploading or refreshing a protocol through the RPC session re-simulates it
+from scratch, which takes seconds for large protocols on the robot. Most of
+the time nothing that could change the result has changed: the protocol,
+its labware, the attached hardware and the robot configuration are all the
+same as last time. This module keys simulation results by a hash of all of
+those inputs so that :py:class:`.Session` can skip the simulation.
+
+Every session needs its own protocol context, labware and instruments,
+because calibration and runs change them. So rather than those live
+objects, a :py:class:`SimulationResult` holds the command list and a
+description of what the protocol loaded and where, and a hit loads the same
+things into a new context with :py:func:`restore`. That is much quicker
+than running the protocol again.
+"""
+import hashlib
+import json
+import logging
+import os
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from opentrons.config import CONFIG
+from opentrons.protocol_api import labware, module_geometry
+from opentrons.protocols.types import Protocol
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 4
+
+#: Configuration whose contents can change the result of a simulation
+CONFIG_DEPENDENCIES = (
+    'labware_calibration_offsets_dir_v2',
+    'labware_user_definitions_dir_v2',
+    'feature_flags_file',
+    'robot_settings_file',
+    'deck_calibration_file',
+    'pipette_config_overrides_dir',
+)
+
+
+class LoadedModule(NamedTuple):
+    model: str
+    slot: str
+
+
+class LoadedLabware(NamedTuple):
+    definition: Dict[str, Any]
+    slot: str
+    #: The index of the module it is on, in the loaded modules, if any
+    module: Optional[int]
+    label: Optional[str]
+
+
+class LoadedInstrument(NamedTuple):
+    requested_as: str
+    mount: str
+    #: The indices of its tip racks in the loaded labware
+    tip_racks: List[int]
+
+
+class SimulationResult(NamedTuple):
+    commands: List[Dict[str, Any]]
+    loaded_modules: List[LoadedModule]
+    loaded_labware: List[LoadedLabware]
+    loaded_instruments: List[LoadedInstrument]
+    #: The instruments, containers and modules a session shows, as indices
+    #: into what was loaded
+    instruments: List[int]
+    containers: List[int]
+    modules: List[int]
+    interactions: List[Tuple[int, int]]
+
+
+class _NotLoaded(KeyError):
+    pass
+
+
+def _index_of(objects: List[Any], obj: Any) -> int:
+    for idx, candidate in enumerate(objects):
+        if candidate is obj:
+            return idx
+    raise _NotLoaded(obj)
+
+
+def describe(commands: List[Dict[str, Any]],
+             context: Any,
+             instruments: List[Any],
+             containers: List[Any],
+             modules: List[Any],
+             interactions: List[Tuple[Any, Any]]) \
+        -> Optional[SimulationResult]:
+    """ Describe what a simulation loaded, so it can be loaded again with
+    :py:func:`restore`.
+
+    :param commands: The simulated command list
+    :param context: The protocol context the protocol was simulated in
+    :param instruments: The instruments of the session
+    :param containers: The labware of the session
+    :param modules: The module geometries of the session
+    :param interactions: The pairs of instrument and labware the session
+                         shows
+    :returns: The description, or ``None`` if the session refers to
+              something the context did not load
+    """
+    module_objs: List[Any] = []
+    loaded_modules: List[LoadedModule] = []
+    labware_objs: List[Any] = []
+    loaded_labware: List[LoadedLabware] = []
+    for slot, item in context.deck.items():
+        if isinstance(item, module_geometry.ModuleGeometry):
+            module_objs.append(item)
+            loaded_modules.append(LoadedModule(item.model.value, str(slot)))
+            lw = item.labware
+            module: Optional[int] = len(module_objs) - 1
+        else:
+            lw = item
+            module = None
+        if isinstance(lw, labware.Labware):
+            labware_objs.append(lw)
+            load_name = lw._parameters['loadName']
+            loaded_labware.append(LoadedLabware(
+                lw._definition, str(slot), module,
+                lw.name if lw.name != load_name else None))
+
+    instrument_objs = list(context.loaded_instruments.values())
+    try:
+        loaded_instruments = [
+            LoadedInstrument(
+                instr.requested_as, instr.mount,
+                [_index_of(labware_objs, rack) for rack in instr.tip_racks])
+            for instr in instrument_objs]
+        return SimulationResult(
+            commands=[dict(command) for command in commands],
+            loaded_modules=loaded_modules,
+            loaded_labware=loaded_labware,
+            loaded_instruments=loaded_instruments,
+            instruments=[_index_of(instrument_objs, instr)
+                         for instr in instruments],
+            containers=[_index_of(labware_objs, lw) for lw in containers],
+            modules=[_index_of(module_objs, mod) for mod in modules],
+            interactions=[(_index_of(instrument_objs, instr),
+                           _index_of(labware_objs, lw))
+                          for instr, lw in interactions])
+    except _NotLoaded as e:
+        log.debug(f'not caching simulation that refers to {e}')
+        return None
+
+
+def restore(result: SimulationResult, context: Any) \
+        -> Tuple[List[Any], List[Any], List[Any], List[Tuple[Any, Any]]]:
+    """ Load what a simulation loaded into a new protocol context.
+
+    :returns: The instruments, containers, modules and interactions of the
+              session, in the context
+    """
+    module_ctxs = [context.load_module(mod.model, mod.slot)
+                   for mod in result.loaded_modules]
+    labware_objs = []
+    for lw in result.loaded_labware:
+        if lw.module is None:
+            # The fixed trash is already there
+            existing = context.deck[lw.slot]
+            labware_objs.append(
+                existing if existing is not None
+                else context.load_labware_from_definition(
+                    lw.definition, lw.slot, lw.label))
+        else:
+            labware_objs.append(
+                module_ctxs[lw.module].load_labware_from_definition(
+                    lw.definition, lw.label))
+    instrument_objs = [
+        context.load_instrument(
+            instr.requested_as, instr.mount,
+            tip_racks=[labware_objs[idx] for idx in instr.tip_racks])
+        for instr in result.loaded_instruments]
+    return ([instrument_objs[idx] for idx in result.instruments],
+            [labware_objs[idx] for idx in result.containers],
+            [module_ctxs[idx].geometry for idx in result.modules],
+            [(instrument_objs[instr], labware_objs[lw])
+             for instr, lw in result.interactions])
+
+
+def _walk_stats(path: str) -> Iterator[Tuple[str, int, int]]:
+    try:
+        entries = list(os.scandir(path))
+    except NotADirectoryError:
+        stat = os.stat(path)
+        yield (path, stat.st_mtime_ns, stat.st_size)
+        return
+    except FileNotFoundError:
+        return
+    for entry in sorted(entries, key=lambda e: e.name):
+        if entry.is_dir():
+            yield from _walk_stats(entry.path)
+        else:
+            stat = entry.stat()
+            yield (entry.path, stat.st_mtime_ns, stat.st_size)
+
+
+def config_fingerprint() -> str:
+    """ Fingerprint the robot configuration that simulation depends on.
+
+    This only stats files, so it is cheap enough to compute on every upload.
+    """
+    hasher = hashlib.sha256()
+    for name in CONFIG_DEPENDENCIES:
+        for entry in _walk_stats(str(CONFIG[name])):
+            hasher.update(repr(entry).encode())
+    return hasher.hexdigest()
+
+
+def _hash_json(hasher, obj: Any):
+    hasher.update(json.dumps(obj, sort_keys=True).encode())
+
+
+def key_for(protocol: Protocol,
+            instruments: Dict[Any, Dict[str, str]],
+            modules: List[str],
+            fingerprint: str = None) -> str:
+    """ Build the cache key for simulating a protocol.
+
+    :param protocol: The parsed protocol
+    :param instruments: The instruments the simulator will have attached, as
+                        a dict of mount to model and id
+    :param modules: The models of the modules the simulator will have
+                    attached
+    :param fingerprint: The configuration fingerprint to use. If not
+                        specified, it is computed with
+                        :py:meth:`config_fingerprint`.
+    """
+    hasher = hashlib.sha256()
+    hasher.update(type(protocol).__name__.encode())
+    hasher.update(str(protocol.filename).encode())
+    hasher.update(protocol.text.encode())
+    hasher.update(str(getattr(protocol, 'api_level', '')).encode())
+    for attr in ('bundled_labware', 'extra_labware', 'bundled_python'):
+        _hash_json(hasher, getattr(protocol, attr, None))
+    bundled_data = getattr(protocol, 'bundled_data', None) or {}
+    for name in sorted(bundled_data):
+        hasher.update(name.encode())
+        hasher.update(hashlib.sha256(bundled_data[name]).digest())
+    _hash_json(hasher, {str(mount): instr
+                        for mount, instr in instruments.items()})
+    _hash_json(hasher, sorted(modules))
+    hasher.update((fingerprint or config_fingerprint()).encode())
+    return hasher.hexdigest()
+
+
+class SimulationCache:
+    """ A size-bounded LRU of :py:class:`SimulationResult` """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self._max_entries = max_entries
+        self._entries: 'OrderedDict[str, SimulationResult]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[SimulationResult]:
+        result = self._entries.get(key)
+        if result is None:
+            self.misses += 1
+            log.debug(f'simulation cache miss for {key}')
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        log.debug(f'simulation cache hit for {key}')
+        return result
+
+    def put(self, key: str, result: SimulationResult):
+        if self._max_entries <= 0:
+            return
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def metrics(self) -> Dict[str, int]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'maxEntries': self._max_entries
+        }
@@ -2,10 +2,26 @@ import asyncio
 import logging
 
 from asyncio import Queue
+from collections import OrderedDict
 from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from opentrons.util import metrics
 
 MODULE_LOG = logging.getLogger(__name__)
 
+PUBLISHES = metrics.histogram(
+    'opentrons_broker_publish_seconds',
+    'How long publishing a message to the subscribers of a topic takes, '
+    'in seconds',
+    ['topic'])
+
+#: Default time, in seconds, over which notifications are coalesced
+DEFAULT_COALESCE_WINDOW = 0.1
+
+#: States after which no further updates are expected
+TERMINAL_STATES = frozenset(('finished', 'stopped', 'error'))
+
 
 class Notifications(object):
     def __init__(self, topics, broker, loop=None):
@@ -35,6 +51,164 @@ class Notifications(object):
         return self
 
 
+def _state_of(message) -> Any:
+    payload = message.get('payload')
+    if isinstance(payload, dict):
+        return payload.get('state')
+    return getattr(payload, 'state', None)
+
+
+def _handled_commands(message) -> List[Any]:
+    payload = message.get('payload')
+    if not isinstance(payload, dict):
+        return []
+    if 'handledCommands' in payload:
+        return payload['handledCommands']
+    last = payload.get('lastCommand')
+    return [last] if last else []
+
+
+def _merge_handled(held, message):
+    """ Carry the commands that a held session update reported as handled
+    into the update that supersedes it, under ``handledCommands`` """
+    payload = message.get('payload')
+    if not isinstance(payload, dict) or 'lastCommand' not in payload:
+        return message
+    handled = list(_handled_commands(held))
+    if not handled:
+        return message
+    for command in _handled_commands(message):
+        if handled[-1]['id'] != command['id']:
+            handled.append(command)
+    return dict(message, payload=dict(payload, handledCommands=handled))
+
+
+class NotificationCoalescer:
+    """ Rate-limits notifications on their way to the RPC clients.
+
+    Notifications that carry a ``topic`` (the session and calibration
+    snapshots) are full snapshots of the state of their topic, so when
+    several arrive for the same topic within ``window`` seconds only the
+    latest one needs to be sent. The first notification after a quiet
+    period is sent immediately, and so is any notification that changes
+    the ``state`` of its topic or reports a terminal state. Anything
+    without a topic is passed straight through.
+
+    The light updates a session sends while it runs only carry the
+    ``lastCommand`` handled, so when one supersedes another that was held,
+    it is sent with ``handledCommands``: every command handled since the
+    last update that was sent, oldest first, ending with ``lastCommand``.
+
+    This must be used from the thread running ``loop``.
+
+    :param deliver: Called with each notification that should be sent
+    :param window: The minimum time, in seconds, between two notifications
+                   for the same topic. If 0, nothing is coalesced.
+    """
+
+    def __init__(self,
+                 deliver: Callable[[Any], None],
+                 window: float = DEFAULT_COALESCE_WINDOW,
+                 loop: asyncio.AbstractEventLoop = None) -> None:
+        self.window = window
+        self._deliver = deliver
+        self._loop = loop or asyncio.get_event_loop()
+        # per topic: the notification waiting to be sent, when the next one
+        # can be sent, and the last state that was sent
+        self._pending: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self._next_send: Dict[Hashable, float] = {}
+        self._last_state: Dict[Hashable, Any] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.received = 0
+        self.delivered = 0
+        self.coalesced = 0
+        self.immediate = 0
+
+    @staticmethod
+    def _topic(message) -> Optional[Hashable]:
+        if isinstance(message, dict):
+            return message.get('topic')
+        return None
+
+    def metrics(self) -> Dict[str, float]:
+        return {
+            'received': self.received,
+            'delivered': self.delivered,
+            'coalesced': self.coalesced,
+            'immediate': self.immediate,
+            'pending': len(self._pending),
+            'window': self.window
+        }
+
+    def _send(self, message):
+        self.delivered += 1
+        self._deliver(message)
+
+    def submit(self, message):
+        """ Send a notification now, or hold it until its topic's window
+        has passed """
+        self.received += 1
+        topic = self._topic(message)
+        if topic is None or self.window <= 0:
+            self._send(message)
+            return
+
+        now = self._loop.time()
+        state = _state_of(message)
+        urgent = state in TERMINAL_STATES\
+            or state != self._last_state.get(topic, state)
+        self._last_state[topic] = state
+        if topic in self._pending:
+            # Superseded by this one
+            self.coalesced += 1
+            message = _merge_handled(self._pending[topic], message)
+            if not urgent:
+                self._pending[topic] = message
+                return
+            del self._pending[topic]
+        elif not urgent and self._next_send.get(topic, now) > now:
+            self._pending[topic] = message
+            self._schedule()
+            return
+        if urgent:
+            self.immediate += 1
+        self._next_send[topic] = now + self.window
+        self._send(message)
+
+    def _schedule(self):
+        if self._timer or not self._pending:
+            return
+        due = min(self._next_send[topic] for topic in self._pending)
+        self._timer = self._loop.call_at(due, self._flush_due)
+
+    def _flush_due(self):
+        self._timer = None
+        now = self._loop.time()
+        for topic in [t for t in self._pending
+                      if self._next_send[t] <= now]:
+            self._next_send[topic] = now + self.window
+            self._send(self._pending.pop(topic))
+        self._schedule()
+
+    def flush(self):
+        """ Send everything that is being held """
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            _, message = self._pending.popitem(last=False)
+            self._send(message)
+
+    def clear(self):
+        """ Drop everything that is being held """
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        self._pending.clear()
+        self._next_send.clear()
+        self._last_state.clear()
+
+
 class Broker:
 
     def __init__(self):
@@ -52,7 +226,11 @@ class Broker:
         return unsubscribe
 
     def publish(self, topic, message):
-        [handler(message) for handler in self.subscriptions.get(topic, [])]
+        if not metrics.is_enabled():
+            [handler(message) for handler in self.subscriptions.get(topic, [])]
+            return
+        with metrics.Timer(PUBLISHES.labels(str(topic))):
+            [handler(message) for handler in self.subscriptions.get(topic, [])]
 
     def set_logger(self, logger):
         self.logger = logger
@@ -3,21 +3,28 @@ from opentrons.broker import Broker
 
 import functools
 import inspect
-from typing import Union, Sequence, List, Any
-
-from opentrons.legacy_api.containers import (Well as OldWell,
-                                             Container as OldContainer,
-                                             Slot as OldSlot,
-                                             location_to_list)
-from opentrons.protocol_api.labware import Well, Labware
-from opentrons.protocol_api.module_geometry import ModuleGeometry
+from typing import TYPE_CHECKING, Union, Sequence, List, Any
+
 from opentrons.types import Location
 from opentrons.drivers import utils
 
+# Both labware modules publish commands, so they import this module and it
+# can only import them when it needs them
+if TYPE_CHECKING:
+    from opentrons.legacy_api.containers import (  # noqa(F401)
+        Well as OldWell, Container as OldContainer, Slot as OldSlot)
+    from opentrons.protocol_api.labware import Well  # noqa(F401)
+
+
+def location_to_list(loc):
+    from opentrons.legacy_api.containers import location_to_list
+    return location_to_list(loc)
 
-def is_new_loc(location: Union[Location, Well, None,
-                               OldWell, OldContainer,
-                               OldSlot, Sequence]) -> bool:
+
+def is_new_loc(location: Union[Location, 'Well', None,
+                               'OldWell', 'OldContainer',
+                               'OldSlot', Sequence]) -> bool:
+    from opentrons.protocol_api.labware import Well
     return isinstance(listify(location)[0], (Location, Well))
 
 
@@ -44,7 +51,9 @@ class CommandPublisher:
         self._broker = broker
 
 
-def _stringify_new_loc(loc: Union[Location, Well]) -> str:
+def _stringify_new_loc(loc: Union[Location, 'Well']) -> str:
+    from opentrons.protocol_api.labware import Well, Labware
+    from opentrons.protocol_api.module_geometry import ModuleGeometry
     if isinstance(loc, Location):
         if isinstance(loc.labware, str):
             return loc.labware
@@ -58,8 +67,12 @@ def _stringify_new_loc(loc: Union[Location, Well]) -> str:
         raise TypeError(loc)
 
 
-def _stringify_legacy_loc(loc: Union[OldWell, OldContainer,
-                                     OldSlot, None]) -> str:
+def _stringify_legacy_loc(loc: Union['OldWell', 'OldContainer',
+                                     'OldSlot', None]) -> str:
+    from opentrons.legacy_api.containers import (Well as OldWell,
+                                                 Container as OldContainer,
+                                                 Slot as OldSlot)
+
     def get_slot(location):
         trace = location.get_trace()
         for item in trace:
@@ -92,8 +105,8 @@ def _stringify_legacy_loc(loc: Union[OldWell, OldContainer,
 
 
 def stringify_location(location: Union[Location, None,
-                                       OldWell, OldContainer,
-                                       OldSlot, Sequence]) -> str:
+                                       'OldWell', 'OldContainer',
+                                       'OldSlot', Sequence]) -> str:
     if is_new_loc(location):
         loc_str_list = [_stringify_new_loc(loc)
                         for loc in listify(location)]
@@ -96,6 +96,22 @@ class DisableLogIntegrationSettingDefinition(SettingDefinition):
         await super().on_change(value)
 
 
+class EnableMetricsSettingDefinition(SettingDefinition):
+    def __init__(self):
+        super().__init__(
+            _id='enableMetrics',
+            title='Collect performance metrics',
+            description='Time motion, pipetting, and serial communication'
+                        ' and serve the results at /metrics. This is an'
+                        ' internal setting for Opentrons engineers.')
+
+    async def on_change(self, value: Optional[bool]):
+        """ Start or stop collecting straight away """
+        from opentrons.util import metrics
+        metrics.enable(bool(value))
+        await super().on_change(value)
+
+
 class Setting(NamedTuple):
     value: Optional[bool]
     definition: SettingDefinition
@@ -153,6 +169,14 @@ settings = [
                     'do not enable this setting or you will break your OT-2.',
         restart_required=True
     ),
+    SettingDefinition(
+        _id='useCameraCaptureWorker',
+        title='Keep the camera running',
+        description='Keep capturing from the camera for a minute after a'
+                    ' picture is taken, so that further pictures are taken'
+                    ' instantly rather than after a second or more.'
+    ),
+    EnableMetricsSettingDefinition(),
 ]
 
 if ARCHITECTURE == SystemArchitecture.BUILDROOT:
@@ -165,23 +189,74 @@ settings_by_old_id: Dict[str, SettingDefinition] = \
     {s.old_id: s for s in settings if s.old_id}
 
 
-# TODO: LRU cache?
-def get_adv_setting(setting: str) -> Optional[Setting]:
-    setting = _clean_id(setting)
-    s = get_all_adv_settings()
-    return s.get(setting, None)
+FileStamp = Optional[Tuple[int, int, int]]
 
 
-def get_all_adv_settings() -> Dict[str, Setting]:
-    """Get all the advanced setting values and definitions"""
-    settings_file = CONFIG['feature_flags_file']
+class _CachedSettings(NamedTuple):
+    settings_file: 'Path'
+    stamp: FileStamp
+    settings: Dict[str, Setting]
+    #: Whether each setting is on, for get_setting_with_env_overload
+    enabled: Dict[str, bool]
+
+
+_cache: Optional[_CachedSettings] = None
+# The settings as of the last time the settings file was read or written.
+# Settings are looked up far more often than they change (every pipette
+# load, several times in some requests) so rather than parsing the file
+# every time it is only read again when its modification time, size or
+# inode change, or when CONFIG['feature_flags_file'] points somewhere else.
+
+
+def _file_stamp(path: 'Path') -> FileStamp:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
 
-    values, _ = _read_settings_file(settings_file)
 
-    return {
+def _cache_settings(settings_file: 'Path', stamp: FileStamp,
+                    values: SettingsMap) -> _CachedSettings:
+    global _cache
+    settings = {
         key: Setting(value=value, definition=settings_by_id[key])
         for key, value in values.items() if key in settings_by_id
     }
+    _cache = _CachedSettings(
+        settings_file=settings_file, stamp=stamp, settings=settings,
+        enabled={key: s.value is True for key, s in settings.items()})
+    return _cache
+
+
+def _get_cached_settings() -> _CachedSettings:
+    settings_file = CONFIG['feature_flags_file']
+    # Stamped before reading, so that a change while reading is caught
+    # by the next lookup
+    stamp = _file_stamp(settings_file)
+    cached = _cache
+    if cached is not None and cached.stamp == stamp\
+            and cached.settings_file == settings_file:
+        return cached
+    values, _ = _read_settings_file(settings_file)
+    return _cache_settings(settings_file, stamp, values)
+
+
+def invalidate_cache():
+    """ Read the settings file again on the next lookup, even if it does not
+    look like it has changed """
+    global _cache
+    _cache = None
+
+
+def get_adv_setting(setting: str) -> Optional[Setting]:
+    setting = _clean_id(setting)
+    return _get_cached_settings().settings.get(setting, None)
+
+
+def get_all_adv_settings() -> Dict[str, Setting]:
+    """Get all the advanced setting values and definitions"""
+    return dict(_get_cached_settings().settings)
 
 
 async def set_adv_setting(_id: str, value: Optional[bool]):
@@ -197,6 +272,8 @@ async def set_adv_setting(_id: str, value: Optional[bool]):
     _write_settings_file(setting_data.settings_map,
                          setting_data.version,
                          settings_file)
+    _cache_settings(settings_file, _file_stamp(settings_file),
+                    setting_data.settings_map)
 
 
 def _clean_id(_id: str) -> str:
@@ -296,7 +373,28 @@ def _migrate2to3(previous: SettingsMap) -> SettingsMap:
     return newmap
 
 
-_MIGRATIONS = [_migrate0to1, _migrate1to2, _migrate2to3]
+def _migrate3to4(previous: SettingsMap) -> SettingsMap:
+    """
+    Migration to version 4 of the feature flags file. Adds the
+    useCameraCaptureWorker config element.
+    """
+    newmap = {k: v for k, v in previous.items()}
+    newmap['useCameraCaptureWorker'] = None
+    return newmap
+
+
+def _migrate4to5(previous: SettingsMap) -> SettingsMap:
+    """
+    Migration to version 5 of the feature flags file. Adds the
+    enableMetrics config element.
+    """
+    newmap = {k: v for k, v in previous.items()}
+    newmap['enableMetrics'] = None
+    return newmap
+
+
+_MIGRATIONS = [_migrate0to1, _migrate1to2, _migrate2to3, _migrate3to4,
+               _migrate4to5]
 """
 List of all migrations to apply, indexed by (version - 1). See _migrate below
 for how the migration functions are applied. Each migration function should
@@ -343,8 +441,8 @@ def get_setting_with_env_overload(setting_name):
     if env_name in os.environ:
         return os.environ[env_name].lower() in {'1', 'true', 'on'}
     else:
-        s = get_adv_setting(setting_name)
-        return s.value is True if s is not None else False
+        return _get_cached_settings().enabled.get(
+            _clean_id(setting_name), False)
 
 
 _SETTINGS_RESTART_REQUIRED = False
@@ -27,3 +27,11 @@ def use_old_aspiration_functions():
 
 def use_fast_api() -> bool:
     return advs.get_setting_with_env_overload('useFastApi')
+
+
+def use_camera_capture_worker() -> bool:
+    return advs.get_setting_with_env_overload('useCameraCaptureWorker')
+
+
+def enable_metrics() -> bool:
+    return advs.get_setting_with_env_overload('enableMetrics')
@@ -1,9 +1,14 @@
-import copy
+import bisect
+import functools
 import logging
 import json
 import numbers
 from collections import namedtuple
-from typing import Any, Dict, List, Union, Tuple, Sequence, Optional
+from types import MappingProxyType
+from typing import (Any, Dict, List, Mapping, Union, Tuple, Sequence,
+                    Optional)
+
+import numpy as np  # type: ignore
 
 from opentrons.config import feature_flags as ff, CONFIG
 from opentrons.system.shared_data import load_shared_data
@@ -69,29 +74,66 @@ Z_OFFSET_P300 = 0
 Z_OFFSET_P1000 = 20  # shortest single-channel pipette
 
 
-def model_config() -> Dict[str, Any]:
-    """ Load the per-pipette-model config file from within the wheel """
-    return json.loads(
+def _freeze(obj):
+    """ Make a read-only version of parsed json to share """
+    if isinstance(obj, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in obj.items()})
+    if isinstance(obj, list):
+        return tuple(_freeze(v) for v in obj)
+    return obj
+
+
+def _thaw(obj):
+    """ Make a private, mutable copy of something :py:meth:`_freeze` made """
+    if isinstance(obj, Mapping):
+        return {k: _thaw(v) for k, v in obj.items()}
+    if isinstance(obj, tuple):
+        return [_thaw(v) for v in obj]
+    return obj
+
+
+@functools.lru_cache(maxsize=None)
+def model_config() -> Mapping[str, Any]:
+    """ Load the per-pipette-model config file from within the wheel
+
+    The file is only parsed once; the result is read-only.
+    """
+    return _freeze(json.loads(
         load_shared_data('pipette/definitions/pipetteModelSpecs.json')
-        or '{}')
+        or '{}'))
+
 
+@functools.lru_cache(maxsize=None)
+def name_config() -> Mapping[str, Any]:
+    """ Load the per-pipette-name config file from within the wheel
 
-def name_config() -> Dict[str, Any]:
-    """ Load the per-pipette-name config file from within the wheel """
-    return json.loads(
+    The file is only parsed once; the result is read-only.
+    """
+    return _freeze(json.loads(
         load_shared_data('pipette/definitions/pipetteNameSpecs.json')
-        or '{}')
+        or '{}'))
 
 
 config_models = list(model_config()['config'].keys())
 config_names = list(name_config().keys())
 configs = model_config()['config']
 #: A list of pipette model names for which we have config entries
-MUTABLE_CONFIGS = model_config()['mutableConfigs']
+MUTABLE_CONFIGS = _thaw(model_config()['mutableConfigs'])
 #: A list of mutable configs for pipettes
-VALID_QUIRKS = model_config()['validQuirks']
+VALID_QUIRKS = _thaw(model_config()['validQuirks'])
 #: A list of valid quirks for pipettes
 
+_LoadKey = Tuple[str, Optional[str], str, bool]
+#: Configs built by :py:meth:`load`, by model, id, overrides dir and whether
+#: the old aspiration functions were used
+_loaded: Dict[_LoadKey, pipette_config] = {}
+
+
+def _forget_loaded(pipette_id: str):
+    """ Drop the configs loaded for a pipette, whose overrides changed """
+    for key in [key for key in _loaded if key[1] == pipette_id]:
+        del _loaded[key]
+
 
 def name_for_model(pipette_model: str) -> str:
     return configs[pipette_model]['name']
@@ -109,8 +151,11 @@ def load(pipette_model: str, pipette_id: str = None) -> pipette_config:
     - any config overrides found in
       ``opentrons.config.CONFIG['pipette_config_overrides_dir']``
 
-    This function reads from disk each time, so changes to the overrides
-    will be picked up in subsequent calls.
+    The result is built once per model and id, and rebuilt only when
+    :py:meth:`save_overrides` (or :py:meth:`override`) changes the overrides
+    for the id; changes made to the override files by anything else are not
+    picked up. The result is shared between callers, so use ``_replace``
+    rather than changing it in place.
 
     :param str pipette_model: The pipette model name (i.e. "p10_single_v1.3")
                               for which to load configuration
@@ -128,9 +173,19 @@ def load(pipette_model: str, pipette_id: str = None) -> pipette_config:
     :returns pipette_config: The configuration, loaded and checked
     """
 
+    use_old_functions = ff.use_old_aspiration_functions()
+    key = (pipette_model,
+           pipette_id or None,
+           str(CONFIG['pipette_config_overrides_dir']) if pipette_id else '',
+           bool(use_old_functions))
+    try:
+        return _loaded[key]
+    except KeyError:
+        pass
+
     # Load the model config and update with the name config
-    cfg = copy.deepcopy(configs[pipette_model])
-    cfg.update(copy.deepcopy(name_config()[cfg['name']]))
+    cfg = _thaw(configs[pipette_model])
+    cfg.update(_thaw(name_config()[cfg['name']]))
     # Load overrides if we have a pipette id
     if pipette_id:
         try:
@@ -154,7 +209,7 @@ def load(pipette_model: str, pipette_id: str = None) -> pipette_config:
     # and last elements are the same, which is fine). If we add more in the
     # future, we’ll have to change this code to select items more
     # intelligently
-    if ff.use_old_aspiration_functions():
+    if use_old_functions:
         log.debug("Using old aspiration functions")
         ul_per_mm = cfg['ulPerMm'][0]
     else:
@@ -202,6 +257,7 @@ def load(pipette_model: str, pipette_id: str = None) -> pipette_config:
         steps_per_mm=smoothie_configs['stepsPerMM']
     )
 
+    _loaded[key] = res
     return res
 
 
@@ -221,11 +277,62 @@ def piecewise_volume_conversion(
     """
     # pick the first item from the seq for which the target is less than
     # the bracketing element
-    i = list(filter(lambda x: ul <= x[0], sequence))[0]
+    i = next(x for x in sequence if ul <= x[0])
     # use that element to calculate the movement distance in mm
     return i[1]*ul + i[2]
 
 
+class VolumeConversion:
+    """
+    A piecewise ul/mm function, as taken by
+    :py:meth:`piecewise_volume_conversion`, compiled into a table of
+    breakpoints so that looking up a volume is a bisection rather than a
+    scan, and so that whole arrays of volumes can be converted at once.
+
+    :param sequence: The pieces of the function, as ``[max volume, slope,
+                     y-intercept]``, sorted by max volume
+    """
+
+    def __init__(self, sequence: Sequence[Sequence[float]]) -> None:
+        self._max_volumes = [float(piece[0]) for piece in sequence]
+        self._slopes = [float(piece[1]) for piece in sequence]
+        self._intercepts = [float(piece[2]) for piece in sequence]
+        if self._max_volumes != sorted(self._max_volumes):
+            raise ValueError('ul/mm pieces must be sorted by volume')
+        self._max_volume_array = np.array(self._max_volumes)
+        self._slope_array = np.array(self._slopes)
+        self._intercept_array = np.array(self._intercepts)
+
+    def ul_per_mm(self, ul: float) -> float:
+        """ The same as :py:meth:`piecewise_volume_conversion`
+
+        :raises IndexError: If the volume is beyond the last piece
+        """
+        i = bisect.bisect_left(self._max_volumes, ul)
+        if i == len(self._max_volumes):
+            raise IndexError(f'{ul}ul is beyond the ul/mm function')
+        return self._slopes[i]*ul + self._intercepts[i]
+
+    def ul_per_mm_array(self, ul: Union[Sequence[float], np.ndarray]
+                        ) -> np.ndarray:
+        """ :py:meth:`ul_per_mm` for each of an array of volumes
+
+        :raises IndexError: If any volume is beyond the last piece
+        """
+        ul = np.asarray(ul, dtype=float)
+        i = np.searchsorted(self._max_volume_array, ul, side='left')
+        if np.any(i == len(self._max_volumes)):
+            raise IndexError(
+                f'{ul.max()}ul is beyond the ul/mm function')
+        return self._slope_array[i]*ul + self._intercept_array[i]
+
+    def travel_mm(self, ul: Union[Sequence[float], np.ndarray]
+                  ) -> np.ndarray:
+        """ How far the plunger moves to move each of an array of volumes """
+        ul = np.asarray(ul, dtype=float)
+        return ul / self.ul_per_mm_array(ul)
+
+
 TypeOverrides = Dict[str, Union[float, bool, None]]
 
 
@@ -282,7 +389,7 @@ def save_overrides(pipette_id: str,
     :return: None
     """
     override_dir = CONFIG['pipette_config_overrides_dir']
-    model_configs = configs[model]
+    model_configs = _thaw(configs[model])
     model_configs_quirks = {key: True for key in model_configs['quirks']}
     try:
         existing = load_overrides(pipette_id)
@@ -309,6 +416,7 @@ def save_overrides(pipette_id: str,
     assert model in config_models
     existing['model'] = model
     json.dump(existing, (override_dir/f'{pipette_id}.json').open('w'))
+    _forget_loaded(pipette_id)
 
 
 def change_quirks(override_quirks, existing, model_configs):
@@ -393,8 +501,8 @@ def load_config_dict(pipette_id: str) -> Dict:
     """
     override = load_overrides(pipette_id)
     model = override['model']
-    config = copy.deepcopy(model_config()['config'][model])
-    config.update(copy.deepcopy(name_config()[config['name']]))
+    config = _thaw(configs[model])
+    config.update(_thaw(name_config()[config['name']]))
 
     if 'quirks' not in override.keys():
         override['quirks'] = {key: True for key in config['quirks']}
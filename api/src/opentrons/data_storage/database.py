@@ -1,7 +1,9 @@
 # pylama:ignore=E252
+import contextlib
 import sqlite3
+import threading
 # import warnings
-from typing import List
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from opentrons.legacy_api.containers.placeable\
     import Container, Well, Module, Placeable
 from opentrons.data_storage import database_queries as db_queries
@@ -14,9 +16,84 @@ SUPPORTED_MODULES = ['magdeck', 'tempdeck']
 
 log = logging.getLogger(__file__)
 
+#: The connection shared by everything in this module, and the database
+#: file it is connected to
+_connection: Optional[sqlite3.Connection] = None
+_connection_path: Optional[str] = None
+#: Held while using _connection, which is shared between threads
+_connection_lock = threading.RLock()
+#: Whether the database has been migrated since the process started
+_migrated = False
+
+#: A container as loaded from the database: its type, its coordinates and
+#: the properties, location and coordinates of each of its wells
+ContainerTemplate = Tuple[
+    str, List[float], List[Tuple[Dict[str, Any], str, Tuple[float, ...]]]]
+#: Containers loaded so far, by database file and name
+_container_templates: Dict[Tuple[str, str], ContainerTemplate] = {}
+
 # ======================== Private Functions ======================== #
 
 
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, check_same_thread=False)
+    # Readers don't block the writer (or each other) with a write-ahead log,
+    # and it only needs syncing at checkpoints
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    return conn
+
+
+def _close_connection():
+    global _connection, _connection_path
+    with _connection_lock:
+        if _connection:
+            # Closing the last connection checkpoints the log into the
+            # database file
+            _connection.close()
+        _connection = None
+        _connection_path = None
+
+
+@contextlib.contextmanager
+def _db() -> Iterator[sqlite3.Connection]:
+    """ Use the shared connection to the labware database, connecting if
+    there is none or if the database file has changed """
+    global _connection, _connection_path
+    path = str(CONFIG['labware_database_file'])
+    with _connection_lock:
+        if _connection is None or _connection_path != path:
+            _close_connection()
+            _connection = _connect(path)
+            _connection_path = path
+        if not _migrated:
+            _migrate()
+        yield _connection
+
+
+def _migrate():
+    """ Bring the database up to date. This happens the first time the
+    database is used rather than when opentrons is imported, so processes
+    that never use the labware database never pay for it """
+    global _migrated
+    _migrated = True
+    if os.environ.get('OT_UPDATE_SERVER') == 'true':
+        return
+    # Imported here because database_migration uses this module
+    from opentrons.data_storage import database_migration
+    try:
+        database_migration.check_version_and_perform_full_migration()
+    except Exception:
+        _migrated = False
+        raise
+
+
+def _forget_container(container_name: str):
+    for key in [key for key in _container_templates
+                if key[1] == container_name]:
+        del _container_templates[key]
+
+
 def _parse_container_obj(container: Container):
     # Note: in the new labware system, container coordinates are always (0,0,0)
     return dict(zip('xyz', container._coordinates))
@@ -42,14 +119,19 @@ def _parse_well_obj(well: Well):
 
 
 def _create_container_obj_in_db(db, container: Container, container_name: str):
-    db_queries.create_container(
-        db, container_name, **_parse_container_obj(container)
-    )
+    well_columns = ('location', 'x', 'y', 'z', 'depth', 'volume',
+                    'diameter', 'length', 'width')
+    wells = []
     for well in iter(container):
-        _create_well_obj_in_db(db, container_name, well)
+        well_data = _parse_well_obj(well)
+        wells.append(tuple(well_data[column] for column in well_columns))
+    db_queries.create_container_with_wells(
+        db, container_name, wells=wells, **_parse_container_obj(container)
+    )
 
 
-def _load_container_object_from_db(db, container_name: str):
+def _load_container_template_from_db(db, container_name: str
+                                     ) -> ContainerTemplate:
     db_data = db_queries.get_container_by_name(db, container_name)
     if not db_data:
         raise ValueError(
@@ -64,7 +146,13 @@ def _load_container_object_from_db(db, container_name: str):
             "No wells for container {} found in ContainerWells database"
             .format(container_name)
         )
+    return (container_type, rel_coords,
+            [_load_well_template_from_db(well) for well in wells])
+
 
+def _container_from_template(container_name: str,
+                             template: ContainerTemplate):
+    container_type, rel_coords, wells = template
     if container_name in SUPPORTED_MODULES:
         container: Placeable = Module()
     else:
@@ -73,11 +161,18 @@ def _load_container_object_from_db(db, container_name: str):
     container.properties['type'] = container_type
     container._coordinates = Vector(rel_coords)
     log.debug("Loading {} with coords {}".format(rel_coords, container_type))
-    for well in wells:
-        container.add(*_load_well_object_from_db(db, well))
+    for properties, location, coordinates in wells:
+        container.add(Well(properties=dict(properties)),
+                      location, coordinates)
     return container
 
 
+def _load_container_object_from_db(db, container_name: str):
+    return _container_from_template(
+        container_name,
+        _load_container_template_from_db(db, container_name))
+
+
 def _update_container_object_in_db(db, container: Container):
     coords = _parse_container_obj(container)
     log.debug("Updating {} with coordinates {}".format(
@@ -101,6 +196,12 @@ def _create_well_obj_in_db(db, container_name: str, well: Well):
     )
 
 
+def _load_well_template_from_db(well_data):
+    well, location, well_coordinates = _load_well_object_from_db(
+        None, well_data)
+    return (well.properties, location, well_coordinates)
+
+
 def _load_well_object_from_db(db, well_data):
     container_name, location, x, y, z, \
         depth, volume, diameter, length, width = well_data
@@ -145,64 +246,94 @@ def _get_db_version(db):
 
 # ======================== Public Functions ======================== #
 def save_new_container(container: Container, container_name: str) -> bool:
-    db_conn = sqlite3.connect(str(CONFIG['labware_database_file']))
-    _create_container_obj_in_db(db_conn, container, container_name)
+    with _db() as db_conn:
+        _create_container_obj_in_db(db_conn, container, container_name)
     res = True  # old create fn does not return anything
     return res
 
 
 def load_container(container_name: str) -> Container:
-    db_conn = sqlite3.connect(str(CONFIG['labware_database_file']))
-    res = _load_container_object_from_db(db_conn, container_name)
-    return res
+    """ Load a container from the database.
+
+    What is in the database is only read once per container; after that, the
+    container is built from memory until it is overwritten or deleted. Each
+    call returns a new container.
+    """
+    key = (str(CONFIG['labware_database_file']), container_name)
+    template = _container_templates.get(key)
+    if template is None:
+        with _db() as db_conn:
+            template = _load_container_template_from_db(
+                db_conn, container_name)
+        _container_templates[key] = template
+    return _container_from_template(container_name, template)
 
 
 def overwrite_container(container: Container) -> bool:
     log.debug("Overwriting container definition: {}".format(
         container.get_type()))
-    db_conn = sqlite3.connect(str(CONFIG['labware_database_file']))
-    _update_container_object_in_db(db_conn, container)
+    with _db() as db_conn:
+        _update_container_object_in_db(db_conn, container)
+    _forget_container(container.get_type())
     res = True  # old overwrite fn does not return anything
     return res
 
 
 def delete_container(container_name) -> bool:
-    db_conn = sqlite3.connect(str(CONFIG['labware_database_file']))
-    _delete_container_object_in_db(db_conn, container_name)
+    with _db() as db_conn:
+        _delete_container_object_in_db(db_conn, container_name)
+    _forget_container(container_name)
     res = True  # old delete fn does not return anything
     return res
 
 
 def list_all_containers() -> List[str]:
-    db_conn = sqlite3.connect(str(CONFIG['labware_database_file']))
-    res = _list_all_containers_by_name(db_conn)
+    with _db() as db_conn:
+        res = _list_all_containers_by_name(db_conn)
     return res
 
 
 def load_module(module_name: str) -> Container:
-    db_conn = sqlite3.connect(str(CONFIG['labware_database_file']))
-    res = _load_module_dict_from_db(db_conn, module_name)
+    with _db() as db_conn:
+        res = _load_module_dict_from_db(db_conn, module_name)
     return res
 
 
 def get_version():
     '''Get the Opentrons-defined database version'''
-    db_conn = sqlite3.connect(str(CONFIG['labware_database_file']))
-    return _get_db_version(db_conn)
+    with _db() as db_conn:
+        return _get_db_version(db_conn)
 
 
 def set_version(version):
-    db_conn = sqlite3.connect(str(CONFIG['labware_database_file']))
-    db_queries.set_user_version(db_conn, version)
+    with _db() as db_conn:
+        db_queries.set_user_version(db_conn, version)
+
+
+def connection() -> sqlite3.Connection:
+    """ The shared connection to the database, for migrations. Only use it
+    from one thread at a time. """
+    with _db() as db_conn:
+        return db_conn
+
+
+def checkpoint():
+    """ Write everything in the write-ahead log to the database file itself,
+    so that the file is complete on its own (for instance to be copied) """
+    with _db() as db_conn:
+        db_conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
 
 
 def reset():
     """ Unmount and remove the sqlite database (used in robot reset) """
+    _close_connection()
+    _container_templates.clear()
     if os.path.exists(str(CONFIG['labware_database_file'])):
         os.remove(str(CONFIG['labware_database_file']))
-    # Not an os.path.join because it is a suffix to the full filename
-    journal_path = str(CONFIG['labware_database_file']) + '-journal'
-    if os.path.exists(journal_path):
-        os.remove(journal_path)
+    # Not an os.path.join because these are suffixes to the full filename
+    for suffix in ('-journal', '-wal', '-shm'):
+        journal_path = str(CONFIG['labware_database_file']) + suffix
+        if os.path.exists(journal_path):
+            os.remove(journal_path)
 
 # ======================== END Public Functions ======================== #
@@ -5,7 +5,6 @@ from opentrons.data_storage.old_container_loading import \
     load_all_containers_from_disk, \
     list_container_names, \
     get_persisted_container
-from opentrons.config import CONFIG
 from opentrons.data_storage.schema_changes import \
     create_table_ContainerWells, create_table_Containers
 from opentrons.util.vector import Vector
@@ -111,8 +110,7 @@ def execute_schema_change(conn, sql_command):
 
 
 def _do_schema_changes():
-    db_path = str(CONFIG['labware_database_file'])
-    conn = sqlite3.connect(db_path)
+    conn = database.connection()
     db_version = database.get_version()
     if db_version == 0:
         log.info("doing database schema migration")
@@ -140,6 +138,7 @@ def check_version_and_perform_full_migration():
     log.info("full database migration requested")
     _do_schema_changes()
     _ensure_containers_and_wells()
+    database.checkpoint()
 
 
 def check_version_and_perform_minimal_migrations():
@@ -151,3 +150,4 @@ def check_version_and_perform_minimal_migrations():
     log.info("minimal database migration requested")
     _do_schema_changes()
     _ensure_trash()
+    database.checkpoint()
@@ -88,6 +88,20 @@ def insert_well_into_db(db_conn, container_name, location, x, y, z,
         )
 
 
+def create_container_with_wells(db_conn, container_name, x, y, z, wells):
+    """ Insert a container and all its wells in one transaction. ``wells``
+    are tuples of the ContainerWells columns after the container name. """
+    with db_conn:
+        db_conn.execute(
+            'INSERT INTO Containers VALUES (?, ?, ?, ?)',
+            (container_name, x, y, z,)
+        )
+        db_conn.executemany(
+            'INSERT INTO ContainerWells VALUES (?,?,?,?,?,?,?,?,?,?)',
+            ((container_name, *well) for well in wells)
+        )
+
+
 def get_wells_by_container_name(db_conn, container_name):
     with db_conn:
         cursor = db_conn.cursor()
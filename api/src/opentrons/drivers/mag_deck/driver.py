@@ -5,7 +5,7 @@ from time import sleep
 from typing import Dict, Optional, Mapping, Tuple
 from serial.serialutil import SerialException  # type: ignore
 
-from opentrons.drivers import serial_communication
+from opentrons.drivers import serial_communication, utils
 from opentrons.drivers.serial_communication import SerialNoResponse
 
 '''
@@ -360,6 +360,7 @@ class MagDeck:
                 timeout,
                 tag=tag)
         except SerialNoResponse as e:
+            utils.MODULE_RETRIES.labels('magdeck').inc()
             retries -= 1
             if retries <= 0:
                 raise e
@@ -381,7 +382,7 @@ class MagDeck:
     def _send_command(self, command, timeout=DEFAULT_MAG_DECK_TIMEOUT):
         command_line = command + ' ' + MAG_DECK_COMMAND_TERMINATOR
         assert self._lock, 'need a lock'
-        with self._lock:
+        with self._lock, utils.time_module_command('magdeck', command):
             ret_code = self._recursive_write_and_return(
                 command_line, timeout, DEFAULT_COMMAND_RETRIES)
 
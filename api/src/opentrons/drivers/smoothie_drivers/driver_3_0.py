@@ -2,7 +2,7 @@ import asyncio
 import contextlib
 from os import environ
 import logging
-from time import sleep
+from time import sleep, perf_counter
 from threading import Event, RLock
 from typing import Any, Dict, Optional, Union, List, Tuple
 
@@ -12,8 +12,11 @@ from serial.serialutil import SerialException  # type: ignore
 from opentrons.drivers import serial_communication
 from opentrons.drivers.types import MoveSplits
 from opentrons.drivers.rpi_drivers import gpio
+from opentrons.drivers.smoothie_drivers.telemetry import (
+    MotionEvent, MotionTelemetry)
 from opentrons.drivers.utils import AxisMoveTimestamp
 from opentrons.system import smoothie_update
+from opentrons.util import metrics
 '''
 - Driver is responsible for providing an interface for motion control
 - Driver is the only system component that knows about GCODES or how smoothie
@@ -25,6 +28,17 @@ from opentrons.system import smoothie_update
 
 log = logging.getLogger(__name__)
 
+COMMANDS = metrics.histogram(
+    'opentrons_smoothie_command_seconds',
+    'How long smoothie commands take, in seconds, by gcode: the "ack" phase '
+    'is until the smoothie acknowledges the command, and the "wait" phase '
+    'is until the M400 after it returns, which is when any motion is done',
+    ['command', 'phase'])
+RETRIES = metrics.counter(
+    'opentrons_smoothie_retries_total',
+    'How many times a command was sent to the smoothie again because it '
+    'did not respond')
+
 ERROR_KEYWORD = 'error'
 ALARM_KEYWORD = 'alarm'
 
@@ -390,6 +404,10 @@ class SmoothieDriver_3_0_0:
         self._move_split_config: MoveSplits = {}
         #: Cache of currently configured splits from callers
         self._axes_moved_at = AxisMoveTimestamp(AXES)
+        #: Timestamped records of the moves and homes sent to the smoothie
+        self.telemetry = MotionTelemetry()
+        #: When the smoothie last acknowledged a command
+        self._acked_at: Optional[float] = None
 
     @property
     def homed_position(self):
@@ -1038,20 +1056,41 @@ class SmoothieDriver_3_0_0:
                                      command: str,
                                      ack_timeout: float,
                                      execute_timeout: float):
+        start = perf_counter()
         cmd_ret = self._write_with_retries(
             command + SMOOTHIE_COMMAND_TERMINATOR,
             ack_timeout, DEFAULT_COMMAND_RETRIES)
+        acked = self._acked_at = perf_counter()
         cmd_ret = self._remove_unwanted_characters(command, cmd_ret)
         self._handle_return(cmd_ret)
         wait_ret = serial_communication.write_and_return(
             GCODES['WAIT'] + SMOOTHIE_COMMAND_TERMINATOR,
             SMOOTHIE_ACK, self._connection, timeout=execute_timeout,
             tag='smoothie')
+        if metrics.is_enabled():
+            gcode = command.strip().split(' ', 1)[0]
+            COMMANDS.labels(gcode, 'ack').observe(acked - start)
+            COMMANDS.labels(gcode, 'wait').observe(perf_counter() - acked)
         wait_ret = self._remove_unwanted_characters(
             GCODES['WAIT'], wait_ret)
         self._handle_return(wait_ret)
         return cmd_ret.strip()
 
+    def _send_motion_command(self, event: MotionEvent, command: str,
+                             target: Dict[str, float],
+                             speed: Optional[float] = None,
+                             current: Optional[Dict[str, float]] = None,
+                             **kwargs):
+        """ Send a command with :py:meth:`_send_command` and record it in
+        :py:attr:`telemetry`. The current defaults to the current settings
+        of each axis, and any other keyword arguments are passed on. """
+        self._acked_at = None
+        start = perf_counter()
+        self._send_command(command, **kwargs)
+        end = perf_counter()
+        self.telemetry.record(event, start, self._acked_at or end, end,
+                              target, speed, current or self.current)
+
     def _handle_return(self, ret_code: str):
         """ Check the return string from smoothie for an error condition.
 
@@ -1122,6 +1161,7 @@ class SmoothieDriver_3_0_0:
                         f"required {attempt} retries for {cmd.strip()}")
                 return ret
             except serial_communication.SerialNoResponse:
+                RETRIES.inc()
                 if not self.simulating:
                     sleep(DEFAULT_STABILIZE_DELAY)
                 if self._connection:
@@ -1163,8 +1203,9 @@ class SmoothieDriver_3_0_0:
             # home commands are acked after execution rather than queueing, so
             # we want a long ack timeout and a short execution timeout
             home_timeout = (HOMED_POSITION['X'] / XY_HOMING_SPEED) * 2
-            self._send_command(command, ack_timeout=home_timeout,
-                               timeout=5)
+            self._send_motion_command(
+                MotionEvent.HOME, command, {'X': self._homed_position['X']},
+                XY_HOMING_SPEED, ack_timeout=home_timeout, timeout=5)
             self.update_homed_flags(flags={'X': True})
         finally:
             self.pop_axis_max_speed()
@@ -1185,8 +1226,9 @@ class SmoothieDriver_3_0_0:
         )
         fast_home_timeout = (HOMED_POSITION['Y'] / XY_HOMING_SPEED) * 2
         # home commands are executed before ack, set a long ack timeout
-        self._send_command(command, ack_timeout=fast_home_timeout,
-                           timeout=5)
+        self._send_motion_command(
+            MotionEvent.HOME, command, {'Y': self._homed_position['Y']},
+            XY_HOMING_SPEED, ack_timeout=fast_home_timeout, timeout=5)
 
         # slow the maximum allowed speed on Y axis
         self.set_axis_max_speed({'Y': Y_RETRACT_SPEED})
@@ -1202,9 +1244,10 @@ class SmoothieDriver_3_0_0:
             self._send_command(relative_retract_command)
             # home commands are executed before ack, use a long ack timeout
             slow_timeout = (Y_RETRACT_DISTANCE / Y_RETRACT_SPEED) * 2
-            self._send_command(
-                GCODES['HOME'] + 'Y', ack_timeout=slow_timeout,
-                timeout=5)
+            self._send_motion_command(
+                MotionEvent.HOME, GCODES['HOME'] + 'Y',
+                {'Y': self._homed_position['Y']}, Y_RETRACT_SPEED,
+                ack_timeout=slow_timeout, timeout=5)
             self.update_homed_flags(flags={'Y': True})
             self._send_command(
                 relative_retract_command)
@@ -1485,6 +1528,9 @@ class SmoothieDriver_3_0_0:
 
             split_postfix = step_postfix.strip()
             split_command = GCODES['MOVE'] + split_command_string
+            split_current = {**self.current,
+                             **{ax: self._move_split_config[ax].split_current
+                                for ax in split_target.keys()}}
         else:
             split_prefix = ''
             split_command = ''
@@ -1510,8 +1556,12 @@ class SmoothieDriver_3_0_0:
 
         def _do_split():
             try:
-                for sc in (c for c in (split_prefix, split_command) if c):
-                    self._send_command(sc)
+                if split_prefix:
+                    self._send_command(split_prefix)
+                if split_command:
+                    self._send_motion_command(
+                        MotionEvent.SPLIT, split_command, split_target,
+                        split_speed, split_current)
             finally:
                 if split_postfix:
                     self._send_command(split_postfix)
@@ -1520,7 +1570,9 @@ class SmoothieDriver_3_0_0:
             # TODO (hmg) a movement's timeout should be calculated by
             # how long the movement is expected to take.
             _do_split()
-            self._send_command(command, timeout=DEFAULT_EXECUTE_TIMEOUT)
+            self._send_motion_command(
+                MotionEvent.MOVE, command, moving_target, checked_speed,
+                timeout=DEFAULT_EXECUTE_TIMEOUT)
         finally:
             # dwell pipette motors because they get hot
             plunger_axis_moved = ''.join(set('BC') & set(target.keys()))
@@ -1586,8 +1638,10 @@ class SmoothieDriver_3_0_0:
                 try:
                     # home commands are executed before ack, use a long ack
                     # timeout and short execute timeout
-                    self._send_command(
-                        command, ack_timeout=DEFAULT_EXECUTE_TIMEOUT,
+                    self._send_motion_command(
+                        MotionEvent.HOME, command,
+                        {ax: self._homed_position[ax] for ax in axes},
+                        ack_timeout=DEFAULT_EXECUTE_TIMEOUT,
                         timeout=DEFAULT_ACK_TIMEOUT)
                     self.update_homed_flags(flags={ax: True for ax in axes})
                 finally:
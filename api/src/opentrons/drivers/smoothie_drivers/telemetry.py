@@ -0,0 +1,170 @@
+""" A ring buffer of timestamped motion events.
+
+The smoothie driver records an event for every gcode that moves or homes the
+gantry: the targets it commanded, the speed and axis currents it moved at,
+and when the command was sent, acknowledged and finished (after its M400).
+That is enough to see where the time in a protocol goes - the dwell between
+moves, the time spent in split moves and the time spent waiting for motion
+to complete - without turning on debug logging.
+
+The buffer is a preallocated bytearray of packed records, so recording an
+event is one :py:meth:`struct.Struct.pack_into` under a lock and never
+allocates a new buffer.
+Once it is full, the oldest events are overwritten. Every event gets a
+sequence number, so readers can ask for the events since the last ones they
+saw and can tell when they fell far enough behind to miss some.
+
+Records are laid out as :py:data:`RECORD_DTYPE` (equivalently,
+:py:data:`RECORD_FORMAT` for :py:mod:`struct`), and
+:py:meth:`MotionTelemetry.dump` returns them packed back to back in that
+layout. Times are in seconds on the :py:func:`time.perf_counter` clock;
+axes that a command does not move, and values that do not apply, are NaN.
+"""
+import asyncio
+import enum
+import struct
+import threading
+from typing import AsyncIterator, Dict, Optional
+
+import numpy as np  # type: ignore
+
+AXES = 'XYZABC'
+
+DEFAULT_CAPACITY = 4096
+
+#: How often :py:func:`stream` checks for new events, in seconds
+DEFAULT_STREAM_INTERVAL = 0.1
+
+
+class MotionEvent(enum.IntEnum):
+    #: A move to the target
+    MOVE = 1
+    #: A short move at split speed and current before a move, to unstick
+    #: an axis that has been still for a while
+    SPLIT = 2
+    #: A home of the axes in the target
+    HOME = 3
+
+
+#: The layout of a record: little-endian and packed, with the sequence
+#: number, the :py:class:`MotionEvent`, the times the command was sent,
+#: acknowledged and done, the speed in mm/s, and the target (mm) and
+#: current (A) of each of the axes XYZABC
+RECORD_DTYPE = np.dtype([('sequence', '<u8'),
+                         ('event', 'u1'),
+                         ('start', '<f8'),
+                         ('acked', '<f8'),
+                         ('end', '<f8'),
+                         ('speed', '<f4'),
+                         ('target', '<f4', (len(AXES),)),
+                         ('current', '<f4', (len(AXES),))])
+
+#: :py:data:`RECORD_DTYPE` as a :py:mod:`struct` format string
+RECORD_FORMAT = '<QBdddf6f6f'
+
+_RECORD = struct.Struct(RECORD_FORMAT)
+_NAN = float('nan')
+_NANS = (_NAN,) * len(AXES)
+_NO_VALUES: Dict[str, float] = {}
+
+
+class MotionTelemetry:
+    """ The most recent motion events, up to ``capacity`` of them.
+
+    Events can be recorded from any thread and read from any other.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        if capacity < 1:
+            raise ValueError(f'capacity must be positive, not {capacity}')
+        self._capacity = capacity
+        self._buffer = bytearray(capacity * _RECORD.size)
+        self._next = 0
+        #: The sequence number of the oldest event not cleared
+        self._first = 0
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def sequence(self) -> int:
+        """ The sequence number the next event will get, which is also how
+        many events have been recorded in total """
+        return self._next
+
+    def record(self, event: MotionEvent,
+               start: float, acked: float, end: float,
+               target: Dict[str, float],
+               speed: Optional[float] = None,
+               current: Optional[Dict[str, float]] = None):
+        """ Record an event.
+
+        :param event: What kind of command this was
+        :param start: When the command was sent
+        :param acked: When the smoothie acknowledged the command
+        :param end: When the command finished
+        :param target: The position commanded for each axis that moved
+        :param speed: The speed of the move, if it was set
+        :param current: The current of each axis during the move, if known
+        """
+        current = current or _NO_VALUES
+        with self._lock:
+            sequence = self._next
+            _RECORD.pack_into(
+                self._buffer, (sequence % self._capacity) * _RECORD.size,
+                sequence, event, start, acked, end,
+                _NAN if speed is None else speed,
+                *map(target.get, AXES, _NANS),
+                *map(current.get, AXES, _NANS))
+            self._next = sequence + 1
+
+    def dump(self, since: int = 0) -> bytes:
+        """ The events with sequence numbers of at least ``since`` that are
+        still in the buffer, oldest first, packed back to back """
+        size = _RECORD.size
+        with self._lock:
+            end = self._next
+            first = max(since, end - self._capacity, self._first)
+            if first >= end:
+                return b''
+            first_offset = (first % self._capacity) * size
+            end_offset = (end % self._capacity) * size
+            if first_offset < end_offset:
+                return bytes(self._buffer[first_offset:end_offset])
+            return bytes(self._buffer[first_offset:]
+                         + self._buffer[:end_offset])
+
+    def records(self, since: int = 0) -> np.ndarray:
+        """ The events from :py:meth:`dump`, as an array of
+        :py:data:`RECORD_DTYPE` """
+        return np.frombuffer(self.dump(since), dtype=RECORD_DTYPE)
+
+    def clear(self):
+        """ Drop every event. Sequence numbers keep counting up. """
+        with self._lock:
+            self._first = self._next
+
+    def __repr__(self):
+        held = self._next - max(self._first, self._next - self._capacity)
+        return '<{}: {} of {} events>'.format(
+            self.__class__.__name__, held, self._capacity)
+
+
+async def stream(telemetry: MotionTelemetry,
+                 since: Optional[int] = None,
+                 interval: float = DEFAULT_STREAM_INTERVAL)\
+        -> AsyncIterator[bytes]:
+    """ Yield the events recorded from now on (or from ``since``, if
+    specified) as they come, packed as in :py:meth:`MotionTelemetry.dump`.
+    Events are checked for every ``interval`` seconds, and the events found
+    are yielded together. """
+    sequence = telemetry.sequence if since is None else since
+    while True:
+        packed = telemetry.dump(sequence)
+        if packed:
+            last, *_ = _RECORD.unpack_from(packed, len(packed) - _RECORD.size)
+            sequence = last + 1
+            yield packed
+        await asyncio.sleep(interval)
@@ -8,6 +8,8 @@ from serial.serialutil import SerialException  # type: ignore
 
 from opentrons.drivers import serial_communication, utils
 from opentrons.drivers.serial_communication import SerialNoResponse
+from opentrons.drivers.thermal_model import (
+    TEMP_DECK_PROFILES, ThermalModel, ThermalProfile, VirtualClock)
 
 '''
 - Driver is responsible for providing an interface for the temp-deck
@@ -54,28 +56,54 @@ class TempDeckError(Exception):
 
 
 class SimulatingDriver:
-    def __init__(self, sim_model: str = None):
-        self._target_temp = 0.0
-        self._active = False
+    """ A temperature module that heats and cools according to a
+    :py:class:`.ThermalModel` of its plate, on a virtual clock.
+
+    :py:meth:`set_temperature` and :py:meth:`await_temperature` move the
+    clock to when what they wait for happens rather than waiting, so
+    :py:attr:`clock` tells how long the commands sent so far would have
+    taken on a real module.
+
+    :param sim_model: The model to simulate, which picks the profile from
+                      :py:data:`.TEMP_DECK_PROFILES`
+    :param profile: The thermal behavior of the plate, if not the one for
+                    the model
+    :param clock: The clock to run on, if it should be shared
+    """
+    def __init__(self, sim_model: str = None,
+                 profile: ThermalProfile = None,
+                 clock: VirtualClock = None):
         self._port: Optional[str] = None
         self._model = TEMP_DECK_MODELS[sim_model] if sim_model\
             else 'temp_deck_v1.1'
+        self.clock = clock or VirtualClock()
+        self._plate = ThermalModel(
+            profile or TEMP_DECK_PROFILES[self._model], self.clock)
 
     async def set_temperature(self, celsius: float):
-        self._target_temp = celsius
-        self._active = True
+        self.start_set_temperature(celsius)
+        self.clock.advance(self._plate.time_to_target())
+        await asyncio.sleep(0)
 
     def start_set_temperature(self, celsius):
-        self._target_temp = celsius
-        self._active = True
+        self._plate.set_target(
+            round(float(celsius), utils.TEMPDECK_GCODE_ROUNDING_PRECISION))
 
     def legacy_set_temperature(self, celsius: float):
-        self._target_temp = celsius
-        self._active = True
+        self.start_set_temperature(celsius)
+
+    async def await_temperature(self, celsius: float):
+        """ Move the clock to when the plate reaches ``celsius`` on the way
+        to its target, or to when it reaches the target if ``celsius`` is
+        past it """
+        wait = self._plate.time_to_reach(celsius)
+        if wait is None:
+            wait = self._plate.time_to_target()
+        self.clock.advance(wait)
+        await asyncio.sleep(0)
 
     def deactivate(self):
-        self._target_temp = 0
-        self._active = False
+        self._plate.deactivate()
 
     def update_temperature(self):
         pass
@@ -94,15 +122,15 @@ class SimulatingDriver:
 
     @property
     def temperature(self) -> float:
-        return self._target_temp
+        return self._plate.temperature
 
     @property
     def target(self) -> Optional[float]:
-        return self._target_temp if self._active else None
+        return self._plate.target
 
     @property
     def status(self) -> str:
-        return 'holding at target' if self._active else 'idle'
+        return self._plate.status
 
     def get_device_info(self) -> Mapping[str, str]:
         return {'serial': 'dummySerialTD',
@@ -313,7 +341,7 @@ class TempDeck:
 
         """
         assert self._lock, 'not connected'
-        with self._lock:
+        with self._lock, utils.time_module_command('tempdeck', command):
             command_line = command + ' ' + TEMP_DECK_COMMAND_TERMINATOR
             ret_code = self._recursive_write_and_return(
                 command_line, timeout, DEFAULT_COMMAND_RETRIES)
@@ -337,6 +365,7 @@ class TempDeck:
                 timeout,
                 tag=tag)
         except SerialNoResponse as e:
+            utils.MODULE_RETRIES.labels('tempdeck').inc()
             retries -= 1
             if retries <= 0:
                 raise e
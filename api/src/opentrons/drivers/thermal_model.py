@@ -0,0 +1,237 @@
+""" A thermal model for simulated temperature modules and thermocyclers.
+
+Each heated or cooled part of a simulated module - a temperature module's
+plate, a thermocycler's block and its lid - is a :py:class:`ThermalModel`.
+It approaches its target as a first-order system with a time constant, and
+heats and cools no faster than the ramp rates of its
+:py:class:`ThermalProfile`. Once it is within the profile's tolerance of
+the target it holds there, like the controller of the real part would.
+
+The models run on a :py:class:`VirtualClock`, which only moves when told to,
+so the simulating drivers can skip straight to the moment a target is
+reached or a hold ends. Waiting for a 30 cycle profile takes microseconds,
+and afterwards the clock says how long the real module would have taken.
+
+The profiles for each model and revision are in :py:data:`TEMP_DECK_PROFILES`
+and :py:data:`THERMOCYCLER_PROFILES`. Their values are approximations from
+the published specifications of the modules, not measurements.
+"""
+import math
+from typing import Dict, NamedTuple, Optional
+
+#: The temperature of the room, in C
+AMBIENT_TEMPERATURE = 25.0
+
+
+class VirtualClock:
+    """ Simulated time, in seconds, that only passes when told to """
+
+    def __init__(self, start: float = 0.0) -> None:
+        self._now = start
+
+    def time(self) -> float:
+        return self._now
+
+    def advance(self, seconds: float):
+        """ Let some time pass. Negative amounts are ignored. """
+        if seconds > 0:
+            self._now += seconds
+
+
+class ThermalProfile(NamedTuple):
+    """ How quickly a heated or cooled part changes temperature """
+    #: The fastest it heats up when active, in C/s
+    heating_rate: float
+    #: The fastest it cools down when active, in C/s
+    cooling_rate: float
+    #: The time constant of the final approach to the target, in seconds
+    time_constant: float
+    #: How much longer the time constant gets per uL of sample held, in
+    #: seconds
+    time_constant_per_ul: float = 0.0
+    #: The time constant with which it drifts to ambient when inactive,
+    #: in seconds
+    passive_time_constant: float = 600.0
+    #: How close to the target it must be to hold at the target, in C
+    tolerance: float = 0.5
+
+
+#: The profiles of each revision of the temperature module
+TEMP_DECK_PROFILES: Dict[str, ThermalProfile] = {
+    'temp_deck_v1': ThermalProfile(
+        heating_rate=0.05, cooling_rate=0.03, time_constant=30.0,
+        time_constant_per_ul=0.05),
+    'temp_deck_v20': ThermalProfile(
+        heating_rate=0.1, cooling_rate=0.05, time_constant=20.0,
+        time_constant_per_ul=0.05),
+}
+TEMP_DECK_PROFILES['temp_deck_v1.1'] = TEMP_DECK_PROFILES['temp_deck_v1']
+TEMP_DECK_PROFILES['temp_deck_v2'] = TEMP_DECK_PROFILES['temp_deck_v1']
+
+
+class ThermocyclerProfile(NamedTuple):
+    block: ThermalProfile
+    lid: ThermalProfile
+
+
+#: The profiles of each model of the thermocycler
+THERMOCYCLER_PROFILES: Dict[str, ThermocyclerProfile] = {
+    'thermocyclerModuleV1': ThermocyclerProfile(
+        block=ThermalProfile(
+            heating_rate=4.0, cooling_rate=2.0, time_constant=2.0,
+            time_constant_per_ul=0.03, passive_time_constant=300.0),
+        lid=ThermalProfile(
+            heating_rate=0.3, cooling_rate=0.1, time_constant=20.0,
+            passive_time_constant=900.0, tolerance=1.0)),
+}
+
+
+class ThermalModel:
+    """ The temperature of one heated or cooled part over time.
+
+    :param profile: How the part changes temperature
+    :param clock: The clock to run on
+    :param temperature: The temperature to start at, in C
+    """
+
+    def __init__(self, profile: ThermalProfile, clock: VirtualClock,
+                 temperature: float = AMBIENT_TEMPERATURE) -> None:
+        self._profile = profile
+        self._clock = clock
+        self._target: Optional[float] = None
+        # The temperature approached from _start_temp as of _start_time, at
+        # no more than _rate C/s and then with time constant _tau
+        self._goal = temperature
+        self._start_temp = temperature
+        self._start_time = clock.time()
+        self._rate = math.inf
+        self._tau = profile.passive_time_constant
+
+    @property
+    def profile(self) -> ThermalProfile:
+        return self._profile
+
+    @property
+    def target(self) -> Optional[float]:
+        return self._target
+
+    def _restart(self, goal: float, rate: float, tau: float):
+        self._start_temp = self.temperature
+        self._start_time = self._clock.time()
+        self._goal = goal
+        self._rate = rate
+        self._tau = tau
+
+    def set_target(self, target: float, ramp_rate: float = None,
+                   volume: float = None):
+        """ Start heating or cooling to a target.
+
+        :param target: The temperature to approach, in C
+        :param ramp_rate: The fastest to change temperature, in C/s, if
+                          slower than the profile allows
+        :param volume: The volume of the samples being held, in uL
+        """
+        profile = self._profile
+        rate = profile.heating_rate if target >= self.temperature\
+            else profile.cooling_rate
+        if ramp_rate:
+            rate = min(rate, ramp_rate)
+        tau = profile.time_constant\
+            + profile.time_constant_per_ul * (volume or 0)
+        self._restart(target, rate, tau)
+        self._target = target
+
+    def deactivate(self):
+        """ Stop heating or cooling and drift towards ambient """
+        self._restart(AMBIENT_TEMPERATURE, math.inf,
+                      self._profile.passive_time_constant)
+        self._target = None
+
+    def _error_after(self, elapsed: float) -> float:
+        """ How far from the goal the part is ``elapsed`` seconds after the
+        last change """
+        error = abs(self._start_temp - self._goal)
+        # The ramp rate limits the change until the error is small enough
+        # that the first-order approach is slower than the ramp
+        knee = self._rate * self._tau
+        if error > knee:
+            ramp_time = (error - knee) / self._rate
+            if elapsed <= ramp_time:
+                return error - self._rate * elapsed
+            error, elapsed = knee, elapsed - ramp_time
+        if self._tau <= 0:
+            return 0.0
+        return error * math.exp(-elapsed / self._tau)
+
+    def _time_to_error(self, error: float) -> float:
+        """ How long after the last change the part is ``error`` from the
+        goal, which must be no further than it started """
+        start = abs(self._start_temp - self._goal)
+        if start <= error:
+            return 0.0
+        knee = self._rate * self._tau
+        elapsed = 0.0
+        if start > knee:
+            if error >= knee:
+                return (start - error) / self._rate
+            elapsed = (start - knee) / self._rate
+            start = knee
+        if error <= 0:
+            return math.inf
+        return elapsed + self._tau * math.log(start / error)
+
+    @property
+    def at_target(self) -> bool:
+        # Allow for rounding in the time it takes to get within tolerance
+        return self._target is not None\
+            and abs(self._raw_temperature() - self._target)\
+            <= self._profile.tolerance + 1e-9
+
+    def _raw_temperature(self) -> float:
+        error = self._error_after(self._clock.time() - self._start_time)
+        return self._goal + math.copysign(error,
+                                          self._start_temp - self._goal)
+
+    @property
+    def temperature(self) -> float:
+        """ The temperature now, in C. While holding, this is the target. """
+        if self.at_target:
+            return self._target  # type: ignore
+        return self._raw_temperature()
+
+    @property
+    def status(self) -> str:
+        """ The status in the terms the module firmware uses """
+        if self._target is None:
+            return 'idle'
+        if self.at_target:
+            return 'holding at target'
+        return 'heating' if self._raw_temperature() < self._target\
+            else 'cooling'
+
+    def time_to_target(self) -> float:
+        """ How long until the part is holding at its target, in seconds,
+        or 0 if it is inactive """
+        if self._target is None:
+            return 0.0
+        return self._time_until(self._time_to_error(self._profile.tolerance))
+
+    def time_to_reach(self, temperature: float) -> Optional[float]:
+        """ How long until the part reaches a temperature on its way to the
+        target, in seconds, or None if it will not """
+        if self._target is None:
+            return None
+        now = self._raw_temperature()
+        if (now - temperature) * (self._goal - temperature) >= 0\
+                and abs(now - self._goal) <= abs(temperature - self._goal):
+            # Already there or past it
+            return 0.0
+        if (self._start_temp - temperature) * (self._goal - temperature) > 0:
+            # On the far side of the target
+            return None
+        error = max(abs(temperature - self._goal), self._profile.tolerance)
+        return self._time_until(self._time_to_error(error))
+
+    def _time_until(self, since_start: float) -> float:
+        return max(0.0,
+                   since_start - (self._clock.time() - self._start_time))
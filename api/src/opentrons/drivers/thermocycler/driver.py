@@ -13,6 +13,8 @@ from typing import Callable, Optional, Mapping, Tuple, TYPE_CHECKING
 from serial.serialutil import SerialException  # type: ignore
 from opentrons.drivers import serial_communication, utils
 from opentrons.drivers.serial_communication import SerialNoResponse
+from opentrons.drivers.thermal_model import (
+    THERMOCYCLER_PROFILES, ThermalModel, ThermocyclerProfile, VirtualClock)
 
 if TYPE_CHECKING:
     # avoid an issue where Queue doesn't support generics at runtime
@@ -44,6 +46,7 @@ LID_TARGET_MAX = 110
 BLOCK_TARGET_MIN = 0
 BLOCK_TARGET_MAX = 99
 TEMP_UPDATE_RETRIES = 15
+DEFAULT_SIM_MODEL = 'thermocyclerModuleV1'
 
 
 def _build_temp_code(temp: float,
@@ -82,15 +85,37 @@ class ThermocyclerError(Exception):
 
 
 class SimulatingDriver:
-    def __init__(self, sim_model: str = None):
-        self._target_temp: Optional[float] = None
+    """ A thermocycler that heats and cools according to a
+    :py:class:`.ThermalModel` of its block and lid, on a virtual clock.
+
+    The ``wait_for_`` methods move the clock to when what they wait for
+    happens rather than waiting, so :py:attr:`clock` tells how long the
+    commands sent so far would have taken on a real thermocycler.
+
+    :param sim_model: The model to simulate, which picks the profile from
+                      :py:data:`.THERMOCYCLER_PROFILES`
+    :param profile: The thermal behavior of the block and lid, if not the
+                    one for the model
+    :param clock: The clock to run on, if it should be shared
+    """
+    def __init__(self, sim_model: str = None,
+                 profile: ThermocyclerProfile = None,
+                 clock: VirtualClock = None):
+        if profile is None:
+            checked_profile = THERMOCYCLER_PROFILES.get(
+                sim_model or DEFAULT_SIM_MODEL,
+                THERMOCYCLER_PROFILES[DEFAULT_SIM_MODEL])
+        else:
+            checked_profile = profile
+        self.clock = clock or VirtualClock()
+        self._block = ThermalModel(checked_profile.block, self.clock)
+        self._lid = ThermalModel(checked_profile.lid, self.clock)
         self._ramp_rate: Optional[float] = None
         self._hold_time: Optional[float] = None
-        self._active = False
+        # When the hold will be over, on the clock
+        self._hold_end = 0.0
         self._port = None
         self._lid_status = 'open'
-        self._lid_target: Optional[float] = None
-        self._lid_heating_active = False
 
     async def open(self):
         self._lid_status = 'open'
@@ -102,7 +127,7 @@ class SimulatingDriver:
 
     @property
     def status(self):
-        return 'holding at target' if self._active else 'idle'
+        return self._block.status
 
     @property
     def lid_status(self):
@@ -114,28 +139,34 @@ class SimulatingDriver:
 
     @property
     def hold_time(self):
-        # Simulating driver acts as if cycles end immediately
-        return 0
+        """ The hold time left, which counts down once the block reaches
+        its target """
+        if not self._hold_time:
+            return 0
+        return max(0.0, min(self._hold_time,
+                            self._hold_end - self.clock.time()))
 
     @property
     def temperature(self):
-        return self._target_temp
+        return self._block.temperature
 
     @property
     def target(self):
-        return self._target_temp
+        return self._block.target
 
     @property
     def lid_target(self):
-        return self._lid_target
+        return self._lid.target
 
     @property
     def lid_temp_status(self):
-        return 'holding at target' if self._lid_heating_active else 'idle'
+        status = self._lid.status
+        # The lid can't actively cool
+        return 'idle' if status == 'cooling' else status
 
     @property
     def lid_temp(self):
-        return self._lid_target
+        return self._lid.temperature
 
     async def connect(self, port):
         self._port = port
@@ -148,33 +179,46 @@ class SimulatingDriver:
                               hold_time: float = None,
                               ramp_rate: float = None,
                               volume: float = None) -> None:
-        self._target_temp = temp
+        _, temp = _build_temp_code(temp, hold_time, volume)
+        self._block.set_target(temp, ramp_rate, volume)
         self._hold_time = hold_time
+        self._hold_end = self.clock.time() + self._block.time_to_target()\
+            + (hold_time or 0)
         self._ramp_rate = ramp_rate
-        self._active = True
 
     async def set_lid_temperature(self, temp: Optional[float]):
         """ Set the lid temperature in deg Celsius """
-        self._lid_heating_active = True
-        self._lid_target = temp
+        if temp is None:
+            temp = LID_TARGET_DEFAULT
+        self._lid.set_target(min(max(temp, LID_TARGET_MIN), LID_TARGET_MAX))
 
     async def deactivate_lid(self):
-        self._lid_heating_active = False
-        self._lid_target = None
+        self._lid.deactivate()
 
     async def deactivate_block(self):
-        self._target_temp = None
+        self._block.deactivate()
         self._ramp_rate = None
         self._hold_time = None
-        self._active = False
 
     async def deactivate_all(self):
-        self._target_temp = None
-        self._ramp_rate = None
-        self._hold_time = None
-        self._active = False
-        self._lid_heating_active = False
-        self._lid_target = None
+        await self.deactivate_block()
+        await self.deactivate_lid()
+
+    async def wait_for_temp(self):
+        """ Move the clock to when the block reaches its target """
+        self.clock.advance(self._block.time_to_target())
+        await asyncio.sleep(0)
+
+    async def wait_for_hold(self):
+        """ Move the clock to when the hold is over, if there is one """
+        if self._hold_time:
+            self.clock.advance(self._hold_end - self.clock.time())
+        await asyncio.sleep(0)
+
+    async def wait_for_lid_temp(self):
+        """ Move the clock to when the lid reaches its target """
+        self.clock.advance(self._lid.time_to_target())
+        await asyncio.sleep(0)
 
     async def get_device_info(self):
         return {'serial': 'dummySerialTC',
@@ -286,8 +330,9 @@ class TCPoller(threading.Thread):
 
     def _send_command(self, command, timeout=DEFAULT_TC_TIMEOUT):
         command_line = command + ' ' + TC_COMMAND_TERMINATOR
-        ret_code = self._recursive_write_and_return(
-            command_line, timeout, DEFAULT_COMMAND_RETRIES)
+        with utils.time_module_command('thermocycler', command):
+            ret_code = self._recursive_write_and_return(
+                command_line, timeout, DEFAULT_COMMAND_RETRIES)
         if ERROR_KEYWORD in ret_code.lower():
             log.error('Received error message from Thermocycler: {}'.format(
                 ret_code))
@@ -300,6 +345,7 @@ class TCPoller(threading.Thread):
                 cmd, TC_ACK, self._connection, timeout,
                 tag=f'thermocycler {id(self)}')
         except SerialNoResponse as e:
+            utils.MODULE_RETRIES.labels('thermocycler').inc()
             retries -= 1
             if retries <= 0:
                 raise e
@@ -1,9 +1,22 @@
+import contextlib
 import logging
 import time
-from typing import Dict, Optional, Mapping, Iterable, Sequence
+from typing import ContextManager, Dict, Optional, Mapping, Iterable, Sequence
+
+from opentrons.util import metrics
 
 log = logging.getLogger(__name__)
 
+MODULE_COMMANDS = metrics.histogram(
+    'opentrons_module_command_seconds',
+    'How long module serial commands take, in seconds, by module and gcode',
+    ['module', 'command'])
+MODULE_RETRIES = metrics.counter(
+    'opentrons_module_retries_total',
+    'How many times a command was sent to a module again because it did '
+    'not respond',
+    ['module'])
+
 # Number of digits after the decimal point for temperatures being sent
 # to/from Temp-Deck
 TEMPDECK_GCODE_ROUNDING_PRECISION = 0
@@ -14,6 +27,16 @@ class ParseError(Exception):
     pass
 
 
+def time_module_command(module: str, command: str) -> ContextManager:
+    """ Time a module serial command into :py:data:`MODULE_COMMANDS`, if
+    metrics are enabled """
+    if not metrics.is_enabled():
+        return contextlib.nullcontext()
+    words = command.split()
+    return metrics.Timer(
+        MODULE_COMMANDS.labels(module, words[0] if words else ''))
+
+
 def parse_string_value_from_substring(substring) -> str:
     '''
     Returns the ascii value in the expected string "N:aa11bb22", where "N" is
@@ -10,6 +10,7 @@ import argparse
 import logging
 import os
 import sys
+import time
 from typing import Any, Callable, Dict, List, Optional, TextIO, Union
 
 import opentrons
@@ -21,7 +22,8 @@ from opentrons import commands
 from opentrons.protocols.parse import parse, version_from_string
 from opentrons.protocols.types import APIVersion, PythonProtocol
 from opentrons.hardware_control import API, ThreadManager
-from .util.entrypoint_util import labware_from_paths, datafiles_from_paths
+from .util.entrypoint_util import (labware_from_paths, datafiles_from_paths,
+                                   runlog_entry_to_ndjson)
 
 _THREAD_MANAGED_HW: Optional[ThreadManager] = None
 #: The background global cache that all protocol contexts created by
@@ -292,7 +294,44 @@ def execute(protocol_file: TextIO,
             context.cleanup()
 
 
-def make_runlog_cb():
+def _make_ndjson_runlog_cb() -> Callable[[Dict[str, Any]], None]:
+    stack: List[Dict[str, Any]] = []
+    next_id = 0
+    start_time = time.monotonic()
+
+    def _print_runlog(command: Dict[str, Any]):
+        nonlocal next_id
+        if command['$'] == 'before':
+            stack.append({'id': next_id,
+                          'level': len(stack),
+                          'name': command.get('name'),
+                          'payload': command['payload'],
+                          'start': time.monotonic() - start_time})
+            next_id += 1
+        elif stack:
+            entry = stack.pop()
+            entry['duration']\
+                = time.monotonic() - start_time - entry['start']
+            print(runlog_entry_to_ndjson(entry), flush=True)
+
+    return _print_runlog
+
+
+def make_runlog_cb(ndjson: bool = False) -> Callable[[Dict[str, Any]], None]:
+    """ Build a callback for :py:meth:`execute` that prints the run log
+
+    :param ndjson: If ``False`` (the default), print each command's text,
+                   indented by its nesting level, when it starts. If
+                   ``True``, print each command as a line of JSON when it
+                   finishes, with its nesting level, start time and
+                   duration (see
+                   :py:meth:`.entrypoint_util.runlog_entry_to_ndjson`).
+                   Either way, only the currently executing commands are
+                   held in memory.
+    """
+    if ndjson:
+        return _make_ndjson_runlog_cb()
+
     level = 0
     last_dollar = None
 
@@ -334,8 +373,15 @@ def main() -> int:
     parser.add_argument(
         '-n', '--no-print-runlog', action='store_true',
         help='Do not print the commands as they are executed')
+    parser.add_argument(
+        '--runlog-format', choices=['text', 'ndjson'], default='text',
+        help='How to print the commands as they are executed. text prints '
+             'each command, indented by its nesting level, when it starts. '
+             'ndjson prints each command as a line of JSON, with its '
+             'nesting level and timing, when it finishes')
     args = parser.parse_args()
-    printer = None if args.no_print_runlog else make_runlog_cb()
+    printer = None if args.no_print_runlog\
+        else make_runlog_cb(args.runlog_format == 'ndjson')
     if args.log_level != 'none':
         stack_logger = logging.getLogger('opentrons')
         stack_logger.addHandler(logging.StreamHandler(sys.stdout))
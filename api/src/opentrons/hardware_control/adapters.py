@@ -2,14 +2,33 @@
 """
 import asyncio
 import functools
-from typing import TYPE_CHECKING
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Awaitable, List
 
+from opentrons.util import metrics
 from .types import HardwareAPILike
 
 if TYPE_CHECKING:
     from .dev_types import HasLoop # noqa (F501)
 
 
+HOPS = metrics.histogram(
+    'opentrons_thread_manager_hop_seconds',
+    'The cost of calling into the hardware thread, in seconds: how long a '
+    'call takes less how long its coroutine runs, by whether the caller '
+    'waited synchronously or awaited',
+    ['caller'])
+
+
+async def time_coroutine(coro: Awaitable, ran: List[float]) -> Any:
+    """ Await ``coro`` and append how long it took to ``ran`` """
+    start = perf_counter()
+    try:
+        return await coro
+    finally:
+        ran.append(perf_counter() - start)
+
+
 # TODO: BC 2020-02-25 instead of overwriting __get_attribute__ in this class
 # use inspect.getmembers to iterate over appropriate members of adapted
 # instance and setattr on the outer instance with the proper async resolution
@@ -52,8 +71,18 @@ class SynchronousAdapter(HardwareAPILike):
 
     @staticmethod
     def call_coroutine_sync(loop, to_call, *args, **kwargs):
-        fut = asyncio.run_coroutine_threadsafe(to_call(*args, **kwargs), loop)
-        return fut.result()
+        if not metrics.is_enabled():
+            fut = asyncio.run_coroutine_threadsafe(
+                to_call(*args, **kwargs), loop)
+            return fut.result()
+        ran: List[float] = []
+        start = perf_counter()
+        try:
+            fut = asyncio.run_coroutine_threadsafe(
+                time_coroutine(to_call(*args, **kwargs), ran), loop)
+            return fut.result()
+        finally:
+            HOPS.labels('sync').observe(perf_counter() - start - sum(ran))
 
     def __getattribute__(self, attr_name):
         """ Retrieve attributes from our API and wrap coroutines """
@@ -2,11 +2,12 @@ import asyncio
 import contextlib
 import logging
 from collections import OrderedDict
-from typing import Dict, Union, List, Optional
+from typing import Dict, Union, List, Optional, Sequence
 from opentrons import types as top_types
-from opentrons.util import linal
+from opentrons.util import linal, metrics
 from opentrons.config import robot_configs, pipette_config
 from opentrons.drivers.types import MoveSplit
+from opentrons.drivers.smoothie_drivers.telemetry import MotionTelemetry
 
 from .util import use_or_initialize_loop
 from .pipette import Pipette
@@ -23,6 +24,10 @@ from . import modules
 
 mod_log = logging.getLogger(__name__)
 
+CALLS = metrics.histogram(
+    'opentrons_hardware_call_seconds',
+    'How long calls into the hardware controller take, in seconds',
+    ['call'])
 
 InstrumentsByMount = Dict[top_types.Mount, Optional[Pipette]]
 
@@ -652,6 +657,7 @@ class API(HardwareAPILike):
                                y=cur_pos[Axis.Y],
                                z=cur_pos[Axis.by_mount(mount)])
 
+    @metrics.timed(CALLS, 'move_to')
     async def move_to(
             self, mount: top_types.Mount, abs_position: top_types.Point,
             speed: float = None,
@@ -766,6 +772,7 @@ class API(HardwareAPILike):
         await self._move(all_axes_pos, speed, False,
                          acquire_lock=acquire_lock)
 
+    @metrics.timed(CALLS, '_move')
     async def _move(self, target_position: 'OrderedDict[Axis, float]',
                     speed: float = None, home_flagged_axes: bool = True,
                     max_speeds: Dict[Axis, float] = None,
@@ -857,6 +864,12 @@ class API(HardwareAPILike):
     def engaged_axes(self):
         return self.get_engaged_axes()
 
+    @property
+    def telemetry(self) -> MotionTelemetry:
+        """ The most recent moves and homes sent to the motion controller,
+        with their targets, speeds, currents and timing. """
+        return self._backend.telemetry
+
     async def disengage_axes(self, which: List[Axis]):
         self._backend.disengage_axes([ax.name for ax in which])
 
@@ -957,6 +970,7 @@ class API(HardwareAPILike):
                 speed=(speed*rate))
         this_pipette.ready_to_aspirate = True
 
+    @metrics.timed(CALLS, 'aspirate')
     async def aspirate(self, mount: top_types.Mount, volume: float = None,
                        rate: float = 1.0):
         """
@@ -1024,6 +1038,7 @@ class API(HardwareAPILike):
         else:
             this_pipette.add_current_volume(asp_vol)
 
+    @metrics.timed(CALLS, 'dispense')
     async def dispense(self, mount: top_types.Mount, volume: float = None,
                        rate: float = 1.0):
         """
@@ -1084,6 +1099,23 @@ class API(HardwareAPILike):
         position = mm + instr.config.bottom
         return round(position, 6)
 
+    def plunger_positions(self, mount: top_types.Mount,
+                          volumes: Sequence[float],
+                          action: str) -> List[float]:
+        """ The plunger positions for each of a list of volumes, computed
+        all at once (as for estimating a whole protocol's plunger moves).
+        Each is what aspirating or dispensing that volume from the bottom
+        would move to.
+
+        :param mount: The mount of the pipette
+        :param volumes: The volumes, in ul
+        :param action: 'aspirate' or 'dispense'
+        """
+        instr = self._attached_instruments[mount]
+        assert instr, f'No pipette attached to {mount.name} mount'
+        positions = instr.plunger_travel(volumes, action) + instr.config.bottom
+        return [round(float(position), 6) for position in positions]
+
     def _plunger_speed(
             self, instr: Pipette, ul_per_s: float, action: str) -> float:
         mm_per_s = ul_per_s / instr.ul_per_mm(instr.config.max_volume, action)
@@ -1119,6 +1151,7 @@ class API(HardwareAPILike):
             this_pipette.set_current_volume(0)
             this_pipette.ready_to_aspirate = False
 
+    @metrics.timed(CALLS, 'pick_up_tip')
     async def pick_up_tip(self,
                           mount,
                           tip_length: float,
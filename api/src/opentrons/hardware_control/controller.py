@@ -8,6 +8,7 @@ except OSError:
     aionotify = None  # type: ignore
 
 from opentrons.drivers.smoothie_drivers import driver_3_0
+from opentrons.drivers.smoothie_drivers.telemetry import MotionTelemetry
 from opentrons.drivers.rpi_drivers import gpio
 import opentrons.config
 from opentrons.types import Mount
@@ -194,6 +195,10 @@ class Controller:
     def fw_version(self) -> Optional[str]:
         return self._cached_fw_version
 
+    @property
+    def telemetry(self) -> MotionTelemetry:
+        return self._smoothie_driver.telemetry
+
     async def update_fw_version(self):
         self._cached_fw_version = self._smoothie_driver.get_fw_version()
 
@@ -42,14 +42,19 @@ class Poller(Thread):
         self._driver_ref = driver
         self._stop_event = Event()
         super().__init__(target=self._poll_temperature,
-                         name='Temperature poller for tempdeck')
+                         name='Temperature poller for tempdeck',
+                         daemon=True)
 
     def _poll_temperature(self):
         while not self._stop_event.wait(TEMP_POLL_INTERVAL_SECS):
             self._driver_ref.update_temperature()
 
-    def join(self):
+    def stop(self):
+        """ Stop polling without waiting for the thread to finish """
         self._stop_event.set()
+
+    def join(self):
+        self.stop()
         super().join()
 
 
@@ -152,15 +157,19 @@ class TempDeck(mod_abc.AbstractModule):
         await self.wait_for_is_running()
 
         async def _await_temperature(awaiting_temperature: float):
+            if isinstance(self._driver, SimulatingDriver):
+                return await self._driver.await_temperature(
+                    awaiting_temperature)
+
             status = self.status
 
             if status == 'heating':
                 while self.temperature < awaiting_temperature:
-                    asyncio.sleep(0.2)
+                    await asyncio.sleep(0.2)
 
             elif status == 'cooling':
                 while self.temperature > awaiting_temperature:
-                    asyncio.sleep(0.2)
+                    await asyncio.sleep(0.2)
 
         t = self._loop.create_task(_await_temperature(awaiting_temperature))
         await self.make_cancellable(t)
@@ -231,8 +240,10 @@ class TempDeck(mod_abc.AbstractModule):
         self._poller.start()
 
     def __del__(self):
+        # Joining here could wait forever if this is collected while the
+        # interpreter shuts down, when the poller can no longer run
         if hasattr(self, '_poller') and self._poller:
-            self._poller.join()
+            self._poller.stop()
 
     async def prep_for_update(self) -> str:
         model = self._device_info and self._device_info.get('model')
@@ -189,6 +189,8 @@ class Thermocycler(mod_abc.AbstractModule):
 
         Subject to change without a version bump.
         """
+        if isinstance(self._driver, SimulatingDriver):
+            return await self._driver.wait_for_lid_temp()
         while self._driver.lid_temp_status != 'holding at target':
             await asyncio.sleep(0.1)
 
@@ -198,6 +200,8 @@ class Thermocycler(mod_abc.AbstractModule):
 
         Subject to change without a version bump.
         """
+        if isinstance(self._driver, SimulatingDriver):
+            return await self._driver.wait_for_temp()
         while self.status != 'holding at target':
             await asyncio.sleep(0.1)
 
@@ -205,6 +209,8 @@ class Thermocycler(mod_abc.AbstractModule):
         """
         This method returns only when hold time has elapsed
         """
+        if isinstance(self._driver, SimulatingDriver):
+            return await self._driver.wait_for_hold()
         while self.hold_time != 0:
             await asyncio.sleep(0.1)
 
@@ -1,7 +1,9 @@
 """ Classes and functions for pipette state tracking
 """
 import logging
-from typing import Any, Dict, Optional, Tuple, Union
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np  # type: ignore
 
 from opentrons.types import Point
 from opentrons.config import pipette_config
@@ -28,6 +30,7 @@ class Pipette:
         self._name = pipette_config.name_for_model(model)
         self._model = model
         self._model_offset = self._config.model_offset
+        self._volume_conversions = self._compile_ul_per_mm()
         self._current_volume = 0.0
         self._working_volume = self._config.max_volume
         self._current_tip_length = 0.0
@@ -60,6 +63,13 @@ class Pipette:
     def update_config_item(self, elem_name: str, elem_val: Any):
         self._log.info("updated config: {}={}".format(elem_name, elem_val))
         self._config = self._config._replace(**{elem_name: elem_val})
+        if elem_name == 'ul_per_mm':
+            self._volume_conversions = self._compile_ul_per_mm()
+
+    def _compile_ul_per_mm(
+            self) -> Dict[str, pipette_config.VolumeConversion]:
+        return {action: pipette_config.VolumeConversion(sequence)
+                for action, sequence in self._config.ul_per_mm.items()}
 
     @property
     def name(self) -> str:
@@ -199,8 +209,13 @@ class Pipette:
         return self._has_tip
 
     def ul_per_mm(self, ul: float, action: str) -> float:
-        sequence = self._config.ul_per_mm[action]
-        return pipette_config.piecewise_volume_conversion(ul, sequence)
+        return self._volume_conversions[action].ul_per_mm(ul)
+
+    def plunger_travel(self, volumes: Union[Sequence[float], np.ndarray],
+                       action: str) -> np.ndarray:
+        """ How far the plunger moves (in mm) to aspirate or dispense each
+        of an array of volumes, as for planning a whole transfer at once """
+        return self._volume_conversions[action].travel_mm(volumes)
 
     def __str__(self) -> str:
         return '{} current volume {}ul critical point: {} at {}'\
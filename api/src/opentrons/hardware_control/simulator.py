@@ -2,6 +2,7 @@ import asyncio
 import copy
 import logging
 from threading import Event
+from time import perf_counter
 from typing import Dict, Optional, List, Tuple, TYPE_CHECKING
 from contextlib import contextmanager
 from opentrons import types
@@ -9,6 +10,8 @@ from opentrons.config.pipette_config import (config_models,
                                              config_names,
                                              configs)
 from opentrons.drivers.smoothie_drivers import SimulatingDriver
+from opentrons.drivers.smoothie_drivers.telemetry import (
+    MotionEvent, MotionTelemetry)
 from . import modules
 from .execution_manager import ExecutionManager
 if TYPE_CHECKING:
@@ -101,6 +104,7 @@ class Simulator:
         self._run_flag.set()
         self._log = MODULE_LOG.getChild(repr(self))
         self._strict_attached = bool(strict_attached_instruments)
+        self._telemetry = MotionTelemetry()
 
     def update_position(self) -> Dict[str, float]:
         return self._position
@@ -108,6 +112,9 @@ class Simulator:
     def move(self, target_position: Dict[str, float],
              home_flagged_axes: bool = True, speed: float = None,
              axis_max_speeds: Dict[str, float] = None):
+        now = perf_counter()
+        self._telemetry.record(
+            MotionEvent.MOVE, now, now, now, target_position, speed)
         self._position.update(target_position)
         self._engaged_axes.update({ax: True
                                    for ax in target_position})
@@ -115,6 +122,10 @@ class Simulator:
     def home(self, axes: List[str] = None) -> Dict[str, float]:
         # driver_3_0-> HOMED_POSITION
         checked_axes = axes or 'XYZABC'
+        now = perf_counter()
+        self._telemetry.record(
+            MotionEvent.HOME, now, now, now,
+            {ax: _HOME_POSITION[ax] for ax in checked_axes})
         self._position.update({ax: _HOME_POSITION[ax]
                                for ax in checked_axes})
         self._engaged_axes.update({ax: True
@@ -122,6 +133,9 @@ class Simulator:
         return self._position
 
     def fast_home(self, axis: str, margin: float) -> Dict[str, float]:
+        now = perf_counter()
+        self._telemetry.record(
+            MotionEvent.HOME, now, now, now, {axis: _HOME_POSITION[axis]})
         self._position[axis] = _HOME_POSITION[axis]
         self._engaged_axes[axis] = True
         return self._position
@@ -231,6 +245,10 @@ class Simulator:
         return {ax: (0, pos + 0.5) for ax, pos in _HOME_POSITION.items()
                 if ax not in 'BC'}
 
+    @property
+    def telemetry(self) -> MotionTelemetry:
+        return self._telemetry
+
     @property
     def fw_version(self) -> Optional[str]:
         return 'Virtual Smoothie'
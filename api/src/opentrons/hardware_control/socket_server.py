@@ -3,12 +3,14 @@ to a hardware controller.
 """
 
 import asyncio
-from collections import namedtuple
+from collections import deque, namedtuple
 import functools
 import inspect
 import json
 import logging
-from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+import re
+from typing import (Any, Awaitable, Callable, Deque, Dict, List,
+                    NamedTuple, Optional, Set, Tuple, cast)
 
 import jsonrpcserver  # type: ignore
 
@@ -19,6 +21,12 @@ from . import API, types, pipette
 
 LOG = logging.getLogger(__name__)
 
+#: The largest message accepted, in bytes
+MAX_MESSAGE_SIZE = 16 * 1024 * 1024
+
+#: How much to read from a stream at once
+READ_SIZE = 64 * 1024
+
 
 SerDes = namedtuple('SerDes', ('serializer', 'deserializer'))
 
@@ -77,7 +85,34 @@ _SERDES = {
 }
 
 
-def _build_serializable_method(method_name, method):  # noqa(C901)
+class _SerDesPlan(NamedTuple):
+    #: Deserializers for the arguments that need them
+    deserializers: Dict[str, Callable[[Any], Any]]
+    #: Default values of the arguments with deserializers
+    defaults: Dict[str, Any]
+    serializer: Optional[Callable[[Any], Any]]
+
+
+@functools.lru_cache(maxsize=None)
+def _serdes_plan(func: Callable) -> _SerDesPlan:
+    """ Work out which serializers a function's signature needs, once per
+    function rather than on every call """
+    signature = inspect.signature(func)
+    deserializers = {}
+    defaults = {}
+    for argname, param in signature.parameters.items():
+        if param.annotation in _SERDES:
+            deserializers[argname] = _SERDES[param.annotation].deserializer
+            if param.default != param.empty:
+                defaults[argname] = param.default
+    if signature.return_annotation in _SERDES:
+        serializer = _SERDES[signature.return_annotation].serializer
+    else:
+        serializer = None
+    return _SerDesPlan(deserializers, defaults, serializer)
+
+
+def _build_serializable_method(method_name, method):
     """ Build the method to actually server over jsonrpc.
 
     To serve over jsonrpc, we need to have an interface that is fully
@@ -87,9 +122,6 @@ def _build_serializable_method(method_name, method):  # noqa(C901)
     typing for the python-python interface. Instead, we'll build adapters here
     that transform things to and from json.
     """
-    # Complexity lint check disabled because most of the complexity is in the
-    # wrapper functions
-    signature = inspect.signature(method)
     if inspect.iscoroutinefunction(method):
         async_wrapper = method
     else:
@@ -97,33 +129,25 @@ def _build_serializable_method(method_name, method):  # noqa(C901)
         async def async_wrapper(*args, **kwargs):
             return method(*args, **kwargs)
 
-    transformers = {}
-    defaults = {}
-    for argname, param in signature.parameters.items():
-        if param.annotation in _SERDES:
-            transformers[argname] = _SERDES[param.annotation].deserializer
-        else:
-            transformers[argname] = lambda arg: arg
-        if param.default != param.empty:
-            defaults[argname] = param.default
-
-    if signature.return_annotation in _SERDES:
-        return_transformer = _SERDES[signature.return_annotation].serializer
-    else:
-        return_transformer = lambda ret: ret  # noqa(E371)
+    # Planned for the function rather than the bound method, so that the
+    # plan is shared between instances
+    deserializers, defaults, serializer\
+        = _serdes_plan(getattr(method, '__func__', method))
 
     @functools.wraps(async_wrapper)
     async def wrapper(**kwargs):
-        transformed = {}
-        for argname, val in kwargs.items():
-            if argname in defaults and defaults[argname] == val:
+        for argname, deserializer in deserializers.items():
+            if argname not in kwargs:
+                continue
+            if argname in defaults and defaults[argname] == kwargs[argname]:
                 # This is an arg with its default value; let's ignore it and
                 # the actual function will fill in its default and we don't
                 # need to have our serdes handle defaults
-                continue
-            transformed[argname] = transformers[argname](val)
-        ret = await async_wrapper(**transformed)
-        return return_transformer(ret)
+                del kwargs[argname]
+            else:
+                kwargs[argname] = deserializer(kwargs[argname])
+        ret = await async_wrapper(**kwargs)
+        return serializer(ret) if serializer else ret
 
     return wrapper
 
@@ -149,22 +173,168 @@ def build_jrpc_methods(api: API) -> jsonrpcserver.methods.Methods:
     return methods
 
 
+class FramingError(Exception):
+    pass
+
+
+class MessageFramer:
+    """ Splits the bytes received on a connection into JSON-RPC messages.
+
+    Messages can be framed either of two ways, and the two can be mixed on
+    one connection:
+
+    - Raw JSON: a JSON object (a request) or array (a batch of requests).
+      Anything between messages that can't start one, like whitespace or
+      newlines, is skipped.
+    - Length-prefixed: the length of the message in bytes in decimal, then
+      a ``:``, then the message, like ``15:{"hi": "there"}``.
+
+    Raw messages are found by tracking the nesting of brackets outside of
+    strings as data comes in, so every byte is looked at once no matter how
+    the message is split up.
+
+    :param max_size: The largest message to accept, in bytes
+    """
+
+    _START = re.compile(rb'[{\[]|(\d{1,10}):')
+    _STRUCTURE = re.compile(rb'[{}\[\]"]')
+    _STRING = re.compile(rb'["\\]')
+    _TRAILING_DIGITS = re.compile(rb'\d{0,10}$')
+
+    def __init__(self, max_size: int = MAX_MESSAGE_SIZE) -> None:
+        self._max_size = max_size
+        self._buf = bytearray()
+        # Where to scan from next
+        self._pos = 0
+        # Where the message being received starts, if one is
+        self._start: Optional[int] = None
+        # The length of the message being received, if it is prefixed
+        self._length: Optional[int] = None
+        self._depth = 0
+        self._in_string = False
+
+    def _find_start(self) -> bool:
+        match = self._START.search(self._buf, self._pos)
+        if not match:
+            # Keep what might be the start of a length prefix
+            prefix = self._TRAILING_DIGITS.search(self._buf)
+            del self._buf[:prefix.start()]  # type: ignore
+            self._pos = 0
+            return False
+        if match.group(1):
+            self._length = int(match.group(1))
+            if self._length > self._max_size:
+                raise FramingError(
+                    f'Message of {self._length} bytes is too large')
+            self._start = self._pos = match.end()
+        else:
+            self._length = None
+            self._start = match.start()
+            self._pos = match.end()
+            self._depth = 1
+            self._in_string = False
+        return True
+
+    def _scan_string(self) -> bool:
+        """ Scan the inside of a string, returning whether to go on """
+        match = self._STRING.search(self._buf, self._pos)
+        if not match:
+            self._pos = len(self._buf)
+            return False
+        if match.group() == b'"':
+            self._in_string = False
+            self._pos = match.end()
+        elif match.end() < len(self._buf):
+            # Skip whatever is escaped
+            self._pos = match.end() + 1
+        else:
+            # Look at the backslash again once there is more
+            self._pos = match.start()
+            return False
+        return True
+
+    def _scan_structure(self) -> bool:
+        """ Scan outside of strings, returning whether to go on """
+        match = self._STRUCTURE.search(self._buf, self._pos)
+        if not match:
+            self._pos = len(self._buf)
+            return False
+        self._pos = match.end()
+        char = match.group()
+        if char == b'"':
+            self._in_string = True
+        elif char in (b'{', b'['):
+            self._depth += 1
+        else:
+            self._depth -= 1
+        return bool(self._depth)
+
+    def _raw_end(self, start: int) -> Optional[int]:
+        """ Scan a raw message, returning where it ends if it is complete """
+        while self._scan_string() if self._in_string\
+                else self._scan_structure():
+            pass
+        if not self._depth:
+            return self._pos
+        if len(self._buf) - start > self._max_size:
+            raise FramingError(
+                f'Message of over {self._max_size} bytes is too large')
+        return None
+
+    def _prefixed_end(self, start: int) -> Optional[int]:
+        """ Where a length-prefixed message ends, if it is complete """
+        end = start + cast(int, self._length)
+        return end if len(self._buf) >= end else None
+
+    def feed(self, data: bytes) -> List[Tuple[bytes, bool]]:
+        """ Add received data
+
+        :returns: The messages completed by the data, each with whether it
+                  was length-prefixed
+        :raises FramingError: If a message is too large
+        """
+        self._buf += data
+        messages: List[Tuple[bytes, bool]] = []
+        while True:
+            if self._start is None and not self._find_start():
+                return messages
+            start = cast(int, self._start)
+            prefixed = self._length is not None
+            end = self._prefixed_end(start) if prefixed\
+                else self._raw_end(start)
+            if end is None:
+                return messages
+            messages.append((bytes(self._buf[start:end]), prefixed))
+            del self._buf[:end]
+            self._pos = 0
+            self._start = None
+
+
+def frame_message(message: bytes, prefixed: bool) -> bytes:
+    """ Frame a message to send. Length-prefixed messages are sent as such;
+    raw ones end with a newline. """
+    if prefixed:
+        return b'%d:%s' % (len(message), message)
+    return message + b'\n'
+
+
 class JsonStreamDecoder:
+    """ Reads JSON messages, framed as :py:class:`MessageFramer` expects,
+    from a stream """
+
     def __init__(self, reader: asyncio.StreamReader):
         self._reader = reader
-        self._buf = b''
-        self._decoder = json.JSONDecoder()
+        self._framer = MessageFramer()
+        self._messages: Deque[bytes] = deque()
 
     async def read_object(self) -> Any:
-        while True:
-            self._buf += await self._reader.read(1)
-            try:
-                decoded, offset = self._decoder.raw_decode(self._buf.decode())
-            except json.JSONDecodeError:
-                pass
-            else:
-                self._buf = self._buf[offset:]
-                return decoded
+        while not self._messages:
+            data = await self._reader.read(READ_SIZE)
+            if not data:
+                raise asyncio.IncompleteReadError(b'', None)
+            self._messages.extend(
+                message for message, _ in self._framer.feed(data))
+        return json.loads(self._messages.popleft())
 
 
 class Server:
@@ -189,9 +359,28 @@ class Server:
             LOG.warning('protocol not present on unregister - double call?')
 
     async def _dispatch(self, call_str: str) -> str:
-        result = await jsonrpcserver.async_dispatcher.dispatch(
-            call_str, self._methods, debug=True)
-        return str(result)
+        try:
+            batch = json.loads(call_str)
+        except json.JSONDecodeError:
+            batch = None
+        if not isinstance(batch, list) or not batch:
+            result = await jsonrpcserver.async_dispatcher.dispatch(
+                call_str, self._methods, debug=True)
+            return str(result)
+        # jsonrpcserver runs the requests of a batch concurrently, but a
+        # batch of hardware calls (move here, then aspirate) only makes
+        # sense in order
+        responses = []
+        for request in batch:
+            result = await jsonrpcserver.async_dispatcher.dispatch(
+                json.dumps(request), self._methods, debug=True)
+            response = str(result)
+            if response:
+                responses.append(response)
+        if not responses:
+            # Only notifications
+            return ''
+        return '[' + ', '.join(responses) + ']'
 
     async def start(self, sock_path: str):
         assert not self.server, 'Server already running'
@@ -221,8 +410,7 @@ class JsonRpcProtocol(asyncio.Protocol):
         self._api = api
         self._loop = loop
         self._log = LOG.getChild('jsonrpc')
-        self._decoder = json.JSONDecoder()
-        self._buffer = ''
+        self._framer = MessageFramer()
         self._transport: Optional[asyncio.Transport] = None
         self._inflight: Set[asyncio.Future] = set()
         self._onclose = on_close
@@ -245,61 +433,59 @@ class JsonRpcProtocol(asyncio.Protocol):
     def resume_writing(self):
         self._log.debug('resume writing')
 
-    def data_received(self, data: bytes):  # noqa(C901)
+    def data_received(self, data: bytes):
         self._log.debug(f'data received: {data!r}')
-        self._buffer += data.decode()  # hope this isn't incomplete
         try:
-            _, pos = self._decoder.raw_decode(self._buffer)
-        except json.JSONDecodeError:
-            # If someone sends us garbage that isn't valid json, we need to
-            # not get stuck in a bad state. If we're always accumulating data
-            # until we no longer get an error, then consider if the first thing
-            # we saw was "aaaaaaaa" - this would always be invalid because it's
-            # impossible to make it valid json just by adding more data.
-            # Since we are only accepting jsonrpc, every message should be an
-            # object and therefore should start with {.
-            if self._buffer[0] != '{':
-                obj_start = self._buffer.find('{')
-                if obj_start == -1:
-                    # There is no '{' character in the buffer, wait for more
-                    # data
-                    return
-                else:
-                    # Recurse now that we've made the buffer safe
-                    self._buffer = self._buffer[obj_start:]
-                    return self.data_received(b'')
-            else:
-                # This is an incomplete json object, we can't dispatch anything
-                # and should wait for more data
-                return
-        to_dispatch = self._buffer[:pos]
-        self._buffer = self._buffer[pos:]
+            messages = self._framer.feed(data)
+        except FramingError as e:
+            self._log.error(f'Closing connection: {e}')
+            if self._transport:
+                self._transport.write(frame_message(
+                    _build_jrpc_error(str(e), e).encode(), False))
+                self._transport.close()
+            return
+        for message, prefixed in messages:
+            self._dispatch_message(message, prefixed)
+
+    def _dispatch_message(self, message: bytes, prefixed: bool):
+        try:
+            to_dispatch = message.decode()
+        except UnicodeDecodeError as e:
+            self._write(_build_jrpc_error('message is not utf-8', e),
+                        prefixed)
+            return
         task = self._loop.create_task(self._dispatch(to_dispatch))
         self._inflight.add(task)
+        task.add_done_callback(
+            functools.partial(self._dispatch_done, prefixed=prefixed))
 
-        def done_callback(fut):
-            if not self._transport:  # closed under us
-                return
-            try:
-                res = fut.result()
-            except asyncio.InvalidStateError:
-                self._log.exception("Invalid state in jrpc dispatch")
-                pass
-            except asyncio.CancelledError as e:
-                self._log.error("jsonrpc invocation cancelled")
-                self._transport.write(
-                    _build_jrpc_error('execution cancelled', e).encode())
-            except Exception as e:
-                self._log.exception('Uncaught exception in jsonrpc dispatch')
-                self._transport.write(
-                    _build_jrpc_error('uncaught exception in dispatch',
-                                      e).encode())
-            else:
-                self._transport.write(res.encode())
-            finally:
-                self._inflight.remove(task)
-
-        task.add_done_callback(done_callback)
+    def _dispatch_done(self, task: asyncio.Task, prefixed: bool):
+        if not self._transport:  # closed under us
+            return
+        try:
+            res = task.result()
+        except asyncio.InvalidStateError:
+            self._log.exception("Invalid state in jrpc dispatch")
+            pass
+        except asyncio.CancelledError as e:
+            self._log.error("jsonrpc invocation cancelled")
+            self._write(
+                _build_jrpc_error('execution cancelled', e), prefixed)
+        except Exception as e:
+            self._log.exception('Uncaught exception in jsonrpc dispatch')
+            self._write(
+                _build_jrpc_error('uncaught exception in dispatch', e),
+                prefixed)
+        else:
+            if res:
+                # Notifications get no response
+                self._write(res, prefixed)
+        finally:
+            self._inflight.remove(task)
+
+    def _write(self, response: str, prefixed: bool):
+        if self._transport:
+            self._transport.write(frame_message(response.encode(), prefixed))
 
     def eof_received(self):
         self._log.info(f'eof received')
@@ -4,8 +4,10 @@ import threading
 import logging
 import asyncio
 import functools
-from typing import Generic, TypeVar, Any
-from .adapters import SynchronousAdapter
+from time import perf_counter
+from typing import Generic, TypeVar, Any, List
+from opentrons.util import metrics
+from .adapters import SynchronousAdapter, HOPS, time_coroutine
 from .modules.mod_abc import AbstractModule
 
 MODULE_LOG = logging.getLogger(__name__)
@@ -18,9 +20,18 @@ class ThreadManagerException(Exception):
 async def call_coroutine_threadsafe(
         loop: asyncio.AbstractEventLoop,
         coro, *args, **kwargs) -> asyncio.Future:
-    fut = asyncio.run_coroutine_threadsafe(coro(*args, **kwargs), loop)
-    wrapped = asyncio.wrap_future(fut)
-    return await wrapped
+    if not metrics.is_enabled():
+        fut = asyncio.run_coroutine_threadsafe(coro(*args, **kwargs), loop)
+        wrapped = asyncio.wrap_future(fut)
+        return await wrapped
+    ran: List[float] = []
+    start = perf_counter()
+    try:
+        fut = asyncio.run_coroutine_threadsafe(
+            time_coroutine(coro(*args, **kwargs), ran), loop)
+        return await asyncio.wrap_future(fut)
+    finally:
+        HOPS.labels('async').observe(perf_counter() - start - sum(ran))
 
 
 WrappedObj = TypeVar('WrappedObj')
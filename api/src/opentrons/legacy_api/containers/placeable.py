@@ -11,6 +11,18 @@ from opentrons.util.vector import Vector
 
 SUPPORTED_MODULES = ['magdeck', 'tempdeck']
 
+# Letter+Number well names, see Container.get_grid
+GRID_NAME_PATTERN = re.compile(r'^([A-Za-z]+)([0-9]+)$')
+
+# Bumped whenever any placeable moves, which makes every cached result of
+# Placeable.coordinates stale
+_coordinates_token = 0
+
+
+def _invalidate_coordinates():
+    global _coordinates_token
+    _coordinates_token += 1
+
 
 def unpack_location(location):
     """
@@ -107,6 +119,8 @@ class Placeable(object):
         # A special stash for original names because the children won't
         # have them
         self.child_original_names_by_reference = OrderedDict()
+        self._coordinates_cache = {}
+        self._coordinates_cache_token = None
         self._coordinates = Vector(0, 0, 0)
 
         self.parent = parent
@@ -251,12 +265,35 @@ class Placeable(object):
             raise Exception(
                 'Reference {} is not in Ancestry'.format(reference))
 
+    @property
+    def _coordinates(self):
+        """
+        The coordinates of the :Placeable: relative to its parent
+        """
+        return self._relative_coordinates
+
+    @_coordinates.setter
+    def _coordinates(self, value):
+        self._relative_coordinates = value
+        _invalidate_coordinates()
+
     def coordinates(self, reference=None):
         """
         Returns the coordinates of a :Placeable: relative to :reference:
+
+        Results are cached until any placeable moves or changes parent
         """
+        if self._coordinates_cache_token != _coordinates_token:
+            self._coordinates_cache = {}
+            self._coordinates_cache_token = _coordinates_token
+        try:
+            return self._coordinates_cache[reference]
+        except KeyError:
+            pass
         coordinates = [i._coordinates for i in self.get_trace(reference)]
-        return functools.reduce(lambda a, b: a + b, coordinates)
+        res = functools.reduce(lambda a, b: a + b, coordinates)
+        self._coordinates_cache[reference] = res
+        return res
 
     def add(self, child, name=None, coordinates=None, original_name=None):
         """
@@ -279,6 +316,7 @@ class Placeable(object):
         if coordinates:
             child._coordinates = Vector(coordinates)
         child.parent = self
+        _invalidate_coordinates()
         self.children_by_name[name] = child
         self.children_by_reference[child] = name
         self.child_original_names_by_reference[child] = original_name
@@ -634,6 +672,17 @@ class Container(Placeable):
         self.grid = None
         self.grid_transposed = None
         self.ordering = None
+        # column -> row -> (row, column) for every child with a grid name,
+        # kept up to date by add
+        self._grid_index = OrderedDict()
+
+    def add(self, child, name=None, coordinates=None, original_name=None):
+        super(Container, self).add(child, name, coordinates, original_name)
+        match = GRID_NAME_PATTERN.match(child.get_name())
+        if match:
+            row, col = match.groups(0)
+            self._grid_index.setdefault(col, OrderedDict())[row] = (row, col)
+        self.invalidate_grid()
 
     def invalidate_grid(self):
         """
@@ -659,18 +708,8 @@ class Container(Placeable):
         Calculates the grid inferring row/column structure
         from indexes. Currently only Letter+Number names are supported
         """
-        columns = OrderedDict()
-
-        index_pattern = r'^([A-Za-z]+)([0-9]+)$'
-        for name in self.children_by_name:
-            match = re.match(index_pattern, name)
-            if match:
-                row, col = match.groups(0)
-                if col not in columns:
-                    columns[col] = OrderedDict()
-                columns[col][row] = (row, col)
-
-        return columns
+        return OrderedDict(
+            (col, rows.copy()) for col, rows in self._grid_index.items())
 
     def transpose(self, rows):
         """
@@ -857,6 +896,14 @@ class WellSeries(Container):
         """
         self.offset = offset
 
+    def coordinates(self, reference=None):
+        # Not cached here, since which well this mimics can change
+        return self.values[self.offset].coordinates(reference)
+
+    def get_grid(self):
+        # The well this mimics has no children to lay out in a grid
+        return OrderedDict()
+
     def __repr__(self):
         """
         Return full path to the :Placeable: for debugging
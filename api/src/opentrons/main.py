@@ -1,9 +1,10 @@
+import functools
 import os
 from pathlib import Path
 import logging
 import asyncio
 import re
-from typing import List, Optional
+from typing import Awaitable, Callable, List, Optional
 from opentrons import HERE
 from opentrons import server
 from opentrons.hardware_control import API, ThreadManager
@@ -12,8 +13,9 @@ from argparse import ArgumentParser
 from opentrons import __version__
 from opentrons.config import (feature_flags as ff, name,
                               robot_configs, IS_ROBOT, ROBOT_FIRMWARE_DIR)
-from opentrons.util import logging_config
+from opentrons.util import logging_config, metrics
 from opentrons.drivers.smoothie_drivers.driver_3_0 import SmoothieDriver_3_0_0
+from opentrons.system.boot import BootStatus
 
 try:
     from opentrons.hardware_control.socket_server\
@@ -27,6 +29,12 @@ log = logging.getLogger(__name__)
 
 SMOOTHIE_HEX_RE = re.compile('smoothie-(.*).hex')
 
+#: The phases of booting, roughly in order. The firmware check and the
+#: labware warmup run at the same time; everything that touches the motor
+#: controller runs after the firmware check.
+BOOT_PHASES = ['config', 'labware', 'firmware', 'hardware', 'home',
+               'hardware_server']
+
 
 def _find_smoothie_file():
 
@@ -92,12 +100,10 @@ async def _do_fw_update(driver, new_fw_path, new_fw_ver):
         os.environ['ENABLE_VIRTUAL_SMOOTHIE'] = 'true'
 
 
-async def check_for_smoothie_update():
-    driver = SmoothieDriver_3_0_0(robot_configs.load())
-
+def _read_fw_version(driver: SmoothieDriver_3_0_0) -> Optional[str]:
     try:
         driver.connect()
-        fw_version: Optional[str] = driver.get_fw_version()
+        return driver.get_fw_version()
     except Exception as e:
         # The most common reason for this exception (aside from hardware
         # failures such as a disconnected smoothie) is that the smoothie
@@ -105,7 +111,17 @@ async def check_for_smoothie_update():
         # it (so it can boot again), but we don’t have to do the GPIO
         # manipulations that _put_ it in programming mode
         log.exception("Error while connecting to motor driver: {}".format(e))
-        fw_version = None
+        return None
+
+
+async def check_for_smoothie_update(
+        config: robot_configs.robot_config = None):
+    driver = SmoothieDriver_3_0_0(config or robot_configs.load())
+
+    # Talking to the smoothie blocks, and other phases of the boot can go on
+    # in the meantime
+    fw_version = await asyncio.get_event_loop().run_in_executor(
+        None, _read_fw_version, driver)
 
     log.info(f"Smoothie FW version: {fw_version}")
     packed_smoothie_fw_file, packed_smoothie_fw_ver = _find_smoothie_file()
@@ -118,25 +134,97 @@ async def check_for_smoothie_update():
         log.info(f"FW version OK: {packed_smoothie_fw_ver}")
 
 
-async def initialize_robot() -> ThreadManager:
-    if os.environ.get("ENABLE_VIRTUAL_SMOOTHIE"):
-        log.info("Initialized robot using virtual Smoothie")
-        return ThreadManager(API.build_hardware_simulator)
+def _load_labware():
+    """ Load what the first protocol would otherwise wait on: the index of
+    labware definitions, and the APIv1 labware database, which is migrated
+    the first time it is opened """
+    from opentrons.protocol_api import labware
+    from opentrons.data_storage import database
+    try:
+        labware.get_all_labware_definitions()
+        database.list_all_containers()
+    except Exception:
+        # Protocols will find out for themselves, this shouldn't stop boot
+        log.exception("Error while loading labware")
+
+
+async def _warm_labware(boot: BootStatus):
+    with boot.phase('labware'):
+        await asyncio.get_event_loop().run_in_executor(None, _load_labware)
+
+
+async def initialize_robot(
+        boot: BootStatus = None,
+        config: robot_configs.robot_config = None) -> ThreadManager:
+    boot = boot or BootStatus(BOOT_PHASES)
+    loop = asyncio.get_event_loop()
+    labware = loop.create_task(_warm_labware(boot))
+    try:
+        if os.environ.get("ENABLE_VIRTUAL_SMOOTHIE"):
+            boot.skip('firmware')
+            boot.skip('home')
+            with boot.phase('hardware'):
+                hardware = await loop.run_in_executor(
+                    None, ThreadManager, API.build_hardware_simulator)
+            log.info("Initialized robot using virtual Smoothie")
+            return hardware
+
+        with boot.phase('firmware'):
+            await check_for_smoothie_update(config)
+
+        with boot.phase('hardware'):
+            # The thread manager blocks while the controller is built in its
+            # own thread
+            hardware = await loop.run_in_executor(
+                None, ThreadManager, API.build_hardware_controller)
+
+        if not ff.disable_home_on_boot():
+            with boot.phase('home'):
+                log.info("Homing Z axes")
+                await hardware.home_z()
+        else:
+            boot.skip('home')
+
+        return hardware
+    finally:
+        await labware
+
 
-    await check_for_smoothie_update()
+def _init_config(boot: BootStatus) -> robot_configs.robot_config:
+    with boot.phase('config'):
+        robot_conf = robot_configs.load()
+        logging_config.log_init(robot_conf.log_level)
+        metrics.enable(ff.enable_metrics())
 
-    hardware = ThreadManager(API.build_hardware_controller)
+    log.info(f"API server version:  {__version__}")
+    log.info(f"Robot Name: {name()}")
+    return robot_conf
 
-    if not ff.disable_home_on_boot():
-        log.info("Homing Z axes")
-        await hardware.home_z()
 
+async def _boot(boot: BootStatus,
+                robot_conf: robot_configs.robot_config,
+                hardware_server: bool,
+                hardware_server_socket: str) -> ThreadManager:
+    try:
+        hardware = await initialize_robot(boot, robot_conf)
+
+        if hardware_server:
+            with boot.phase('hardware_server'):
+                #  TODO: BC 2020-02-25 adapt hardware socket server to
+                #  ThreadManager
+                await install_hardware_server(hardware_server_socket,
+                                              hardware)  # type: ignore
+        else:
+            boot.skip('hardware_server')
+    finally:
+        boot.finish()
     return hardware
 
 
 def initialize(
         hardware_server: bool = False,
-        hardware_server_socket: str = None) \
+        hardware_server_socket: str = None,
+        boot: BootStatus = None) \
         -> ThreadManager:
     """
     Initialize the Opentrons hardware returning a hardware instance.
@@ -145,25 +233,16 @@ def initialize(
      controller. Only works on buildroot because extra dependencies are
      required.
     :param hardware_server_socket: Override for the hardware server socket
+    :param boot: Where to record the phases of the boot
     """
     checked_socket = hardware_server_socket\
         or "/var/run/opentrons-hardware.sock"
-    robot_conf = robot_configs.load()
-    logging_config.log_init(robot_conf.log_level)
-
-    log.info(f"API server version:  {__version__}")
-    log.info(f"Robot Name: {name()}")
+    boot = boot or BootStatus(BOOT_PHASES)
+    robot_conf = _init_config(boot)
 
     loop = asyncio.get_event_loop()
-    hardware = loop.run_until_complete(initialize_robot())
-
-    if hardware_server:
-        #  TODO: BC 2020-02-25 adapt hardware socket server to ThreadManager
-        loop.run_until_complete(
-                install_hardware_server(checked_socket,
-                                        hardware))  # type: ignore
-
-    return hardware
+    return loop.run_until_complete(
+        _boot(boot, robot_conf, hardware_server, checked_socket))
 
 
 def run(**kwargs):  # noqa(C901)
@@ -174,13 +253,23 @@ def run(**kwargs):  # noqa(C901)
     an additional argument of 'patch_old_init'. kwargs are hence used to allow
     the use of different length args
     """
-    hardware = initialize(bool(kwargs.get('hardware_server', False)),
-                          kwargs.get('hardware_server_socket'))
-
-    server.run(hardware,
+    boot = BootStatus(BOOT_PHASES)
+    robot_conf = _init_config(boot)
+    build_hardware: Callable[[], Awaitable[ThreadManager]] = \
+        functools.partial(
+            _boot, boot, robot_conf,
+            bool(kwargs.get('hardware_server', False)),
+            kwargs.get('hardware_server_socket')
+            or "/var/run/opentrons-hardware.sock")
+
+    # The server starts answering health checks and reporting the boot
+    # while the hardware comes up
+    server.run(None,
                kwargs.get('hostname'),
                kwargs.get('port'),
-               kwargs.get('path'))
+               kwargs.get('path'),
+               boot=boot,
+               build_hardware=build_hardware)
 
 
 def main():
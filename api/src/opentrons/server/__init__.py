@@ -12,6 +12,7 @@ from aiohttp.web_urldispatcher import UrlDispatcher
 
 from opentrons.config import CONFIG
 from opentrons.hardware_control.threaded_async_lock import ThreadedAsyncLock
+from opentrons.system.boot import BootStatus
 
 from .rpc import RPCServer
 from .http import HTTPServer, CalibrationRoutes
@@ -28,6 +29,18 @@ from .endpoints.calibration.models import (
 
 log = logging.getLogger(__name__)
 
+#: The routes that need the hardware, which answer 503 until the robot has
+#: booted: the RPC server at ``/``, and everything under these prefixes
+HARDWARE_ROUTES = ('/robot', '/motors', '/modules', '/pipettes',
+                   '/calibration', '/identify', '/session',
+                   '/settings/robot', '/settings/log_level/local')
+
+
+def _needs_hardware(path: str) -> bool:
+    return path == '/' or any(
+        path == prefix or path.startswith(prefix + '/')
+        for prefix in HARDWARE_ROUTES)
+
 
 def _format_links(
         session: 'CheckCalibrationSession',
@@ -147,6 +160,23 @@ async def error_middleware(
     return response
 
 
+@web.middleware
+async def boot_middleware(
+        request: web.Request, handler: typing.Callable) -> web.Response:
+    """
+    Turn away requests that need the hardware until the robot has booted
+    """
+    boot = request.app['com.opentrons.boot']
+    if boot.ready or not _needs_hardware(request.path):
+        return await handler(request)
+    if boot.failed:
+        message = 'The robot failed to boot'
+    else:
+        message = 'The robot is still booting'
+    return web.json_response(
+        {'message': message, 'boot': boot.as_dict()}, status=503)
+
+
 @web.middleware
 async def session_middleware(
         request: web.Request, handler: typing.Callable) -> web.Response:
@@ -181,10 +211,64 @@ async def session_middleware(
         return status_response(session, request, response)
 
 
+async def _dispose_response_file_tempdir(app):
+    temppath = app.get('com.opentrons.response_file_tempdir')
+    if temppath:
+        try:
+            shutil.rmtree(temppath)
+        except Exception:
+            log.exception(f"failed to remove app temp path {temppath}")
+
+
+async def _shutdown_hardware(app):
+    if app['com.opentrons.hardware']:
+        app['com.opentrons.hardware'].clean_up()
+
+
+def _boot_on_startup(
+        app: web.Application,
+        build_hardware: typing.Callable[[], typing.Awaitable[ThreadManager]],
+        loop: typing.Optional[asyncio.AbstractEventLoop],
+        exit_on_boot_failure: bool):
+    """
+    Build the hardware once ``app`` has started and attach it to the app,
+    cancelling the boot if the app shuts down first. See :py:func:`init`.
+    """
+    async def attach_hardware(app):
+        try:
+            hardware = await build_hardware()
+        except Exception:
+            log.exception('The robot failed to boot')
+            app['com.opentrons.boot_failed'] = True
+            if exit_on_boot_failure:
+                app.loop.stop()
+            return
+        app['com.opentrons.hardware'] = hardware
+        app['com.opentrons.rpc'].root = MainRouter(
+            hardware, lock=app['com.opentrons.motion_lock'], loop=loop)
+
+    async def start_boot(app):
+        app['com.opentrons.boot_task'] = app.loop.create_task(
+            attach_hardware(app))
+
+    async def cancel_boot(app):
+        boot_task = app.get('com.opentrons.boot_task')
+        if boot_task and not boot_task.done():
+            boot_task.cancel()
+
+    app.on_startup.append(start_boot)
+    # Before the hardware is cleaned up
+    app.on_shutdown.append(cancel_boot)
+
+
 # Support for running using aiohttp CLI.
 # See: https://docs.aiohttp.org/en/stable/web.html#command-line-interface-cli
 def init(hardware: ThreadManager = None,
-         loop: asyncio.AbstractEventLoop = None):
+         loop: asyncio.AbstractEventLoop = None,
+         boot: BootStatus = None,
+         build_hardware: typing.Callable[
+             [], typing.Awaitable[ThreadManager]] = None,
+         exit_on_boot_failure: bool = False):
     """
     Builds an application and sets up RPC and HTTP servers with it.
 
@@ -193,8 +277,22 @@ def init(hardware: ThreadManager = None,
     :param hardware: The hardware manager or hardware adapter to connect to.
                      If not specified, the server will use
                      :py:attr:`opentrons.hardware`
+    :param boot: The status of the robot's boot. Until it is ready,
+                 :py:data:`HARDWARE_ROUTES` answer 503.
+    :param build_hardware: If specified, the server starts without
+                           ``hardware`` and awaits this once it has
+                           started to get it
+    :param exit_on_boot_failure: If ``build_hardware`` fails, stop the event
+                                 loop so that the server exits (and can be
+                                 restarted) rather than answering 503 for
+                                 good
     """
-    app = web.Application(middlewares=[error_middleware])
+    boot = boot or BootStatus()
+    if hardware or not build_hardware:
+        # Nothing to wait for
+        boot.finish()
+    app = web.Application(middlewares=[error_middleware, boot_middleware])
+    app['com.opentrons.boot'] = boot
     app['com.opentrons.http'] = HTTPServer(app, CONFIG['log_dir'])
     app['com.opentrons.hardware'] = hardware
     app['com.opentrons.motion_lock'] = ThreadedAsyncLock()
@@ -209,31 +307,29 @@ def init(hardware: ThreadManager = None,
 
     app['calibration'] = calibration_app
 
-    async def dispose_response_file_tempdir(app):
-        temppath = app.get('com.opentrons.response_file_tempdir')
-        if temppath:
-            try:
-                shutil.rmtree(temppath)
-            except Exception:
-                log.exception(f"failed to remove app temp path {temppath}")
-
-    async def shutdown_hardware(app):
-        if app['com.opentrons.hardware']:
-            app['com.opentrons.hardware'].clean_up()
-
-    app.on_shutdown.append(dispose_response_file_tempdir)
-    app.on_shutdown.append(shutdown_hardware)
+    if build_hardware and not hardware:
+        _boot_on_startup(app, build_hardware, loop, exit_on_boot_failure)
+    app.on_shutdown.append(_dispose_response_file_tempdir)
+    app.on_shutdown.append(_shutdown_hardware)
     app.on_shutdown.freeze()
     return app
 
 
-def run(hardware: ThreadManager,
+def run(hardware: typing.Optional[ThreadManager],
         hostname=None,
         port=None,
-        path=None):
+        path=None,
+        boot: BootStatus = None,
+        build_hardware: typing.Callable[
+            [], typing.Awaitable[ThreadManager]] = None):
     """
     The arguments are not all optional. Either a path or hostname+port should
     be specified; you have to specify one.
+
+    To start serving before the hardware is ready, pass ``None`` for
+    ``hardware`` and a ``build_hardware`` coroutine function, and the
+    ``boot`` it reports its progress to; see :py:func:`init`. If building
+    the hardware fails, this raises :py:exc:`SystemExit`.
     """
     if path:
         log.debug("Starting Opentrons server application on {}".format(
@@ -244,4 +340,9 @@ def run(hardware: ThreadManager,
             hostname, port))
         path = None
 
-    web.run_app(init(hardware=hardware), host=hostname, port=port, path=path)
+    app = init(hardware=hardware, boot=boot,
+               build_hardware=build_hardware, exit_on_boot_failure=True)
+    web.run_app(app, host=hostname, port=port, path=path)
+    if app.get('com.opentrons.boot_failed'):
+        # Exit with an error so that the service is restarted
+        raise SystemExit('The robot failed to boot')
@@ -3,15 +3,17 @@ import logging
 import pkgutil
 from aiohttp import web
 from opentrons import __version__, config, protocol_api
+from opentrons.util import metrics
 
 log = logging.getLogger(__name__)
 
 
 async def health(request: web.Request) -> web.Response:
+    hardware = request.app['com.opentrons.hardware']
     res = {
         'name': config.name(),
         'api_version': __version__,
-        'fw_version': request.app['com.opentrons.hardware'].fw_version,
+        'fw_version': hardware.fw_version if hardware else None,
         'logs': ['/logs/serial.log', '/logs/api.log'],
         'system_version': config.OT_SYSTEM_VERSION,
         'protocol_api_version': list(protocol_api.MAX_SUPPORTED_VERSION),
@@ -21,9 +23,22 @@ async def health(request: web.Request) -> web.Response:
             'apiSpec': '/openapi'
         }
     }
+    # Until the hardware is up, the robot is not healthy yet
     return web.json_response(
         headers={'Access-Control-Allow-Origin': '*'},
-        body=json.dumps(res))
+        body=json.dumps(res),
+        status=200 if hardware else 503)
+
+
+async def boot_status(request: web.Request) -> web.Response:
+    """ How far along booting is, and how long each phase took """
+    return web.json_response(request.app['com.opentrons.boot'].as_dict())
+
+
+async def get_metrics(request: web.Request) -> web.Response:
+    """ The hot path metrics, in the Prometheus text format """
+    return web.Response(body=metrics.render().encode(),
+                        headers={'Content-Type': metrics.CONTENT_TYPE})
 
 
 async def get_openapi_spec(request: web.Request) -> web.Response:
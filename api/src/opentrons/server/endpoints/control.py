@@ -13,6 +13,7 @@ except ImportError:
 from opentrons.config import pipette_config
 from opentrons.trackers import pose_tracker
 from opentrons.config import feature_flags as ff
+from opentrons.drivers.smoothie_drivers import telemetry
 from opentrons.types import Mount, Point
 from opentrons.hardware_control.types import Axis, CriticalPoint
 from opentrons.system import camera
@@ -489,6 +490,16 @@ async def set_rail_lights(request):
 
 
 async def take_picture(request):
+    worker = camera.get_capture_worker()
+    if ff.use_camera_capture_worker() or worker.running:
+        # The camera is (or will be kept) running, so the picture is just
+        # its latest frame
+        try:
+            frame = await worker.picture()
+        except camera.CameraException as e:
+            return web.json_response({'message': str(e)}, status=500)
+        return web.Response(body=frame, content_type='image/jpeg')
+
     filename = Path(request.app['com.opentrons.response_file_tempdir'])
     filename = filename.joinpath('picture.jpg')
 
@@ -498,3 +509,109 @@ async def take_picture(request):
         return web.json_response({'message': str(e)}, status=500)
 
     return web.FileResponse(filename)
+
+
+async def stream_camera(request):
+    """
+    GET /camera/stream?fps=10 -> 200 OK, an MJPEG stream from the camera
+
+    The camera runs for as long as anyone is streaming from it. ``fps`` is
+    the most frames to send per second.
+    """
+    try:
+        fps = float(request.query.get('fps', camera.DEFAULT_STREAM_FPS))
+    except ValueError:
+        fps = 0
+    if not 0 < fps <= camera.CAPTURE_FPS:
+        return web.json_response(
+            {'message': f'fps must be more than 0 and at most '
+                        f'{camera.CAPTURE_FPS}'},
+            status=400)
+
+    frames = camera.get_capture_worker().stream(fps)
+    try:
+        # Wait for the camera to start before committing to a response
+        frame = await frames.__anext__()
+    except camera.CameraException as e:
+        await frames.aclose()
+        return web.json_response({'message': str(e)}, status=500)
+
+    response = web.StreamResponse(
+        headers={'Content-Type': camera.MJPEG_CONTENT_TYPE})
+    await response.prepare(request)
+    try:
+        await response.write(camera.mjpeg_part(frame))
+        async for frame in frames:
+            await response.write(camera.mjpeg_part(frame))
+    except camera.CameraException as e:
+        log.warning(f'Camera stream ended: {e}')
+    finally:
+        await frames.aclose()
+    await response.write_eof()
+    return response
+
+
+def _telemetry_headers(hw) -> dict:
+    return {'X-Telemetry-Format': telemetry.RECORD_FORMAT,
+            'X-Telemetry-Sequence': str(hw.telemetry.sequence)}
+
+
+async def get_motion_telemetry(request):
+    """
+    GET /robot/telemetry?since=0 -> 200 OK, the most recent motion events
+
+    The events are the moves and homes sent to the motion controller, oldest
+    first, as packed binary records in the struct format given by the
+    ``X-Telemetry-Format`` header (see
+    :py:mod:`opentrons.drivers.smoothie_drivers.telemetry`). Only events with
+    sequence numbers of at least ``since`` are included. The
+    ``X-Telemetry-Sequence`` header is the sequence number of the next
+    event, for use as ``since`` in the next request.
+    """
+    try:
+        since = int(request.query.get('since', 0))
+    except ValueError:
+        return web.json_response(
+            {'message': 'since must be an integer'}, status=400)
+    hw = hw_from_req(request)
+    headers = _telemetry_headers(hw)
+    return web.Response(body=hw.telemetry.dump(since),
+                        content_type='application/octet-stream',
+                        headers=headers)
+
+
+async def stream_motion_telemetry(request):
+    """
+    GET /robot/telemetry/stream -> a websocket of motion events
+
+    Once connected, each binary message holds the motion events recorded
+    since the last one, packed as in ``GET /robot/telemetry``. The stream
+    starts with the events after the one the socket connected at, or with
+    the events from the ``since`` query parameter if specified.
+    """
+    try:
+        since = request.query.get('since')
+        start = None if since is None else int(since)
+    except ValueError:
+        return web.json_response(
+            {'message': 'since must be an integer'}, status=400)
+    hw = hw_from_req(request)
+    socket = web.WebSocketResponse()
+    socket.headers.update(_telemetry_headers(hw))
+    await socket.prepare(request)
+
+    async def _send():
+        try:
+            async for packed in telemetry.stream(hw.telemetry, start):
+                await socket.send_bytes(packed)
+        except (ConnectionResetError, RuntimeError):
+            log.debug('Telemetry stream closed while sending')
+
+    sender = request.loop.create_task(_send())
+    try:
+        # Nothing is expected from the client; this returns once it closes
+        async for _ in socket:
+            pass
+    finally:
+        sender.cancel()
+    return socket
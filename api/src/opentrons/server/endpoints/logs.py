@@ -19,7 +19,9 @@ def _get_options(params: Mapping[str, str],
     """
     response = {
         'format': 'text',
-        'records': default_length
+        'records': default_length,
+        'after_cursor': params.get('after_cursor') or None,
+        'follow': params.get('follow', '').lower() in ('1', 'true')
     }
 
     print({k: v for k, v in params.items()})
@@ -42,19 +44,31 @@ def _get_options(params: Mapping[str, str],
     return response
 
 
-async def _get_log_response(syslog_selector: str, record_count: int,
-                            record_format: str) -> web.Response:
+async def _get_log_response(request: web.Request,
+                            syslog_selector: str,
+                            opts: Dict[str, Any]) -> web.StreamResponse:
     modes = {
         'json': 'json',
         'text': 'short'
     }
-    output = await log_control.get_records_dumb(syslog_selector,
-                                                record_count,
-                                                modes[record_format])
-    return web.Response(text=output.decode('utf-8'))
+    response = web.StreamResponse(
+        headers={'Content-Type': 'text/plain; charset=utf-8'})
+    # gzip (or deflate) if the client accepts it
+    response.enable_compression()
+    await response.prepare(request)
+    records = log_control.stream_records(
+        syslog_selector, opts['records'], modes[opts['format']],
+        after_cursor=opts['after_cursor'], follow=opts['follow'])
+    try:
+        async for chunk in records:
+            await response.write(chunk)
+    finally:
+        await records.aclose()
+    await response.write_eof()
+    return response
 
 
-async def get_logs_by_id(request: web.Request) -> web.Response:
+async def get_logs_by_id(request: web.Request) -> web.StreamResponse:
     """ Get logs from the robot.
 
     GET /logs/:syslog_identifier -> 200 OK, log contents in body
@@ -63,6 +77,15 @@ async def get_logs_by_id(request: web.Request) -> web.Response:
     - ``format``: ``json`` or ``text`` (default: text). Controls log format.
     - ``records``: int. Count of records to limit the dump to. Default: 500000.
       Limit: 1000000
+    - ``after_cursor``: A journald cursor. Only records after the one with
+      this cursor are sent. In ``json`` format every record has its cursor
+      in ``__CURSOR``; in ``text`` format the cursor of the last record is
+      sent on the last line, after ``-- cursor:``.
+    - ``follow``: ``true`` to keep sending new records as they are logged
+      until the client disconnects.
+
+    The logs are streamed as journalctl prints them, and compressed if the
+    client accepts it.
 
     The syslog identifier is an a string that something has logged to as the
     syslog id. It may not be blank (i.e. GET /logs/ is not allowed). The
@@ -83,8 +106,7 @@ async def get_logs_by_id(request: web.Request) -> web.Response:
     elif ident == 'serial.log':
         ident = 'opentrons-api-serial'
     opts = _get_options(request.query, 500000)
-    return await _get_log_response(
-        ident, opts['records'], opts['format'])
+    return await _get_log_response(request, ident, opts)
 
 
 async def set_syslog_level(request: web.Request) -> web.Response:
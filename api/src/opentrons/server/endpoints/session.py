@@ -0,0 +1,46 @@
+from aiohttp import web
+
+from opentrons.api.command_log import DEFAULT_PAGE_SIZE
+
+
+async def get_command_log(request: web.Request) -> web.Response:
+    """
+    GET /session/commands -> 200 OK
+
+    Get a page of the command log of the protocol session loaded over RPC.
+    Use the ``start`` query parameter to pick the id of the first command
+    to get (if not specified, the page ends with the latest command) and
+    ``count`` for how many commands to get at most. For instance:
+
+    ```
+    {
+      "entries": [
+        {"id": 0, "handledAt": 1583428815046,
+         "description": "Picking up tip from A1 of Opentrons 96 Tip Rack",
+         "level": 0}
+      ],
+      "firstAvailable": 0,
+      "total": 1,
+      "maxEntries": 10000
+    }
+    ```
+
+    Commands older than ``firstAvailable`` have been dropped from the log.
+    """
+    try:
+        start = request.query.get('start')
+        count = int(request.query.get('count', DEFAULT_PAGE_SIZE))
+        page_start = None if start is None else int(start)
+    except ValueError:
+        return web.json_response(
+            {'message': 'start and count must be integers'}, status=400)
+
+    root = request.app['com.opentrons.rpc'].root
+    session_manager = getattr(root, 'session_manager', None)
+    page = None
+    if session_manager:
+        page = session_manager.get_command_log(page_start, count)
+    if page is None:
+        return web.json_response(
+            {'message': 'No protocol session'}, status=404)
+    return web.json_response(page, status=200)
@@ -3,7 +3,7 @@ import logging
 from . import endpoints as endp
 from opentrons import config
 from .endpoints import (networking, control, settings, update,
-                        deck_calibration)
+                        deck_calibration, session)
 from .endpoints.calibration import check
 
 
@@ -18,6 +18,10 @@ class HTTPServer(object):
             '/openapi', endp.get_openapi_spec)
         self.app.router.add_get(
             '/health', endp.health)
+        self.app.router.add_get(
+            '/server/boot', endp.boot_status)
+        self.app.router.add_get(
+            '/metrics', endp.get_metrics)
         self.app.router.add_get(
             '/networking/status', networking.status)
         # TODO(mc, 2018-10-12): s/wifi/networking
@@ -48,6 +52,10 @@ class HTTPServer(object):
                 '/modules/{serial}/update', update.cannot_update_firmware)
         self.app.router.add_post(
             '/camera/picture', control.take_picture)
+        self.app.router.add_get(
+            '/camera/stream', control.stream_camera)
+        self.app.router.add_get(
+            '/session/commands', session.get_command_log)
 
         if config.ARCHITECTURE == config.SystemArchitecture.BUILDROOT:
             from .endpoints import logs
@@ -73,6 +81,10 @@ class HTTPServer(object):
             '/robot/move', control.move)
         self.app.router.add_post(
             '/robot/home', control.home)
+        self.app.router.add_get(
+            '/robot/telemetry', control.get_motion_telemetry)
+        self.app.router.add_get(
+            '/robot/telemetry/stream', control.stream_motion_telemetry)
         self.app.router.add_get(
             '/robot/lights', control.get_rail_lights)
         self.app.router.add_post(
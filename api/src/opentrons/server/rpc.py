@@ -1,14 +1,15 @@
 import asyncio
 import aiohttp
 import functools
-import json
 import logging
 import traceback
 
 from aiohttp import web
 from aiohttp import WSCloseCode
 from asyncio import Queue
-from opentrons.server import serialize
+from opentrons.server import encoding, serialize
+from opentrons.broker import (
+    DEFAULT_COALESCE_WINDOW, NotificationCoalescer)
 from opentrons.protocol_api.execute import ExceptionInProtocolError
 from concurrent.futures import ThreadPoolExecutor
 
@@ -28,12 +29,15 @@ PONG_MESSAGE = 5
 
 
 class RPCServer(object):
-    def __init__(self, app, root=None):
+    def __init__(self, app, root=None,
+                 notification_window=DEFAULT_COALESCE_WINDOW):
         self.monitor_events_task = None
         self.app = app
         self.loop = app.loop or asyncio.get_event_loop()
         self.objects = {}
         self.system = SystemCalls(self.objects)
+        self.notification_coalescer = NotificationCoalescer(
+            self.send_notification, notification_window, self.loop)
 
         self.root = root
 
@@ -65,8 +69,9 @@ class RPCServer(object):
         web.run_app(self.app, host=host, port=port)
 
     def shutdown(self):
-        [task.cancel() for task, _ in self.clients.values()]
+        [task.cancel() for task, _, _ in self.clients.values()]
         self.monitor_events_task.cancel()
+        self.notification_coalescer.clear()
 
     async def on_shutdown(self, app):
         """
@@ -79,8 +84,17 @@ class RPCServer(object):
                            message='Server shutdown')
         self.shutdown()
 
-    def send_worker(self, socket):
+    def send_worker(self, socket, deltas=False, encoder=None):
+        """ Start the task that sends queued messages to a client.
+
+        If ``deltas`` is set, objects the client has already been sent and
+        that have not changed since are sent as light references (see
+        :py:meth:`.serialize.prune_tree`). Messages are encoded with
+        ``encoder`` if specified, and as JSON otherwise.
+        """
         _id = id(socket)
+        encoder = encoder or encoding.MessageEncoder()
+        sent = {} if deltas else None
 
         def task_done(future):
             try:
@@ -90,36 +104,43 @@ class RPCServer(object):
 
         async def send_task(socket, queue):
             while True:
-                payload = await queue.get()
+                payload, digests = await queue.get()
+                if sent is not None and digests is not None:
+                    payload = serialize.prune_tree(payload, digests, sent)
                 if socket.closed:
                     log.debug('Websocket {0} closed'.format(id(_id)))
                     break
 
                 # see: http://aiohttp.readthedocs.io/en/stable/web_reference.html#aiohttp.web.StreamResponse.drain # NOQA
                 await socket.drain()
-                await socket.send_json(payload)
+                await send_encoded(socket, encoder, payload)
 
         queue = Queue(loop=self.loop)
         task = self.loop.create_task(send_task(socket, queue))
         task.add_done_callback(task_done)
         log.debug('Send task for {0} started'.format(_id))
 
-        return (task, queue)
+        return (task, queue, sent)
 
     async def monitor_events(self, instance):
+        # Updates held back for the previous root are not relevant anymore
+        self.notification_coalescer.clear()
         async for event in instance.notifications:
-            try:
-                # Apply notification_max_depth to control object tree depth
-                # during serialization to avoid flooding comms
-                data = self.call_and_serialize(
-                    lambda: event)
-                self.send(
-                    {
-                        '$': {'type': NOTIFICATION_MESSAGE},
-                        'data': data
-                    })
-            except Exception:
-                log.exception('While processing event {0}:'.format(event))
+            self.notification_coalescer.submit(event)
+
+    def send_notification(self, event):
+        try:
+            # Apply notification_max_depth to control object tree depth
+            # during serialization to avoid flooding comms
+            data = self.call_and_serialize(
+                lambda: event)
+            self.send(
+                {
+                    '$': {'type': NOTIFICATION_MESSAGE},
+                    'data': data
+                })
+        except Exception:
+            log.exception('While processing event {0}:'.format(event))
 
     async def handler(self, request):
         """
@@ -138,23 +159,24 @@ class RPCServer(object):
 
         client = web.WebSocketResponse(max_msg_size=0)
         client_id = id(client)
+        deltas = request.query.get(
+            'objectDeltas', '').lower() in ('1', 'true')
+        encoder = encoding.MessageEncoder.from_query(request.query)
 
         # upgrade to Websockets
         await client.prepare(request)
 
         log.info('Opening Websocket {0}'.format(id(client)))
 
+        writer = self.send_worker(client, deltas, encoder)
         try:
-            await client.send_json({
-                '$': {'type': CONTROL_MESSAGE, 'monitor': True},
-                'root': self.call_and_serialize(lambda: self.root),
-                'type': self.call_and_serialize(lambda: type(self.root))
-            })
+            control = self._control_message(encoder, writer[2])
+            await send_encoded(client, encoder, control)
         except Exception:
             log.exception('While sending root info to {0}'.format(client_id))
 
         try:
-            self.clients[client] = self.send_worker(client)
+            self.clients[client] = writer
             # Async receive client data until websocket is closed
             async for msg in client:
                 task = self.loop.create_task(self.process(msg))
@@ -169,6 +191,22 @@ class RPCServer(object):
 
         return client
 
+    def _control_message(self, encoder, sent):
+        """ The first message sent to a client: the root object, and the
+        encoding and object deltas negotiated for the connection """
+        control = {
+            '$': {'type': CONTROL_MESSAGE, 'monitor': True},
+            'root': self.call_and_serialize(lambda: self.root),
+            'type': self.call_and_serialize(lambda: type(self.root))
+        }
+        if encoder.requested:
+            control['$'].update(encoder.describe())
+        if sent is not None:
+            control['$']['objectDeltas'] = True
+            control = serialize.prune_tree(
+                control, serialize.digest_tree(control, self.objects), sent)
+        return control
+
     def build_call(self, _id, name, args):
         if _id not in self.objects:
             raise ValueError(
@@ -218,8 +256,9 @@ class RPCServer(object):
 
     async def process(self, message):
         try:
-            if message.type == aiohttp.WSMsgType.TEXT:
-                data = json.loads(message.data)
+            if message.type in (aiohttp.WSMsgType.TEXT,
+                                aiohttp.WSMsgType.BINARY):
+                data = encoding.decode_request(message.data)
                 meta = data.get('$', {})
                 token = meta.get('token')
                 _id = data.get('id')
@@ -325,9 +364,21 @@ class RPCServer(object):
         })
 
     def send(self, payload):
+        digests = None
+        if any(sent is not None for _, _, sent in self.clients.values()):
+            digests = serialize.digest_tree(payload, self.objects)
         for socket, value in self.clients.items():
-            task, queue = value
-            asyncio.run_coroutine_threadsafe(queue.put(payload), self.loop)
+            task, queue, _ = value
+            asyncio.run_coroutine_threadsafe(
+                queue.put((payload, digests)), self.loop)
+
+
+async def send_encoded(socket, encoder, message):
+    data = encoder.encode(message)
+    if encoder.binary:
+        await socket.send_bytes(data)
+    else:
+        await socket.send_str(data)
 
 
 class SystemCalls(object):
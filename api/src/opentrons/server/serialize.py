@@ -1,65 +1,204 @@
-import functools
+import hashlib
+from typing import Any, Dict, NamedTuple
 
+# How an object of a given type is serialized
+PRIMITIVE = 0
+SEQUENCE = 1
+MAPPING = 2
+OBJECT = 3
+OPAQUE = 4
 
-def _get_object_tree(max_depth, path, refs, depth, obj):  # noqa C901
 
-    def object_container(value):
+class TypePlan(NamedTuple):
+    kind: int
+    # whether instances have a __dict__, and so are tracked by reference
+    tracked: bool
+    iterable: bool
+
+
+# Per-type serialization plans. These are computed the first time a type is
+# seen rather than re-deriving them from every instance.
+_plans: Dict[type, TypePlan] = {}
+
+
+def _plan_for(obj) -> TypePlan:
+    t = type(obj)
+    plan = _plans.get(t)
+    if plan is None:
+        # TODO: what's the better way to detect primitive types?
+        if isinstance(obj, (str, int, bool, float, complex)) or obj is None:
+            kind = PRIMITIVE
+        elif isinstance(obj, (list, tuple)):
+            kind = SEQUENCE
+        elif isinstance(obj, dict):
+            kind = MAPPING
+        elif hasattr(obj, '__dict__'):
+            kind = OBJECT
+        else:
+            kind = OPAQUE
+        # If Type is iterable we will iterate generating numeric keys and
+        # and merge with the output
+        iterable = hasattr(t, '__iter__') or hasattr(t, '__getitem__')
+        plan = TypePlan(kind, hasattr(obj, '__dict__'), iterable)
+        _plans[t] = plan
+    return plan
+
+
+class _TreeBuilder:
+    def __init__(self, max_depth, refs):
+        self._max_depth = max_depth
+        self._refs = refs
+        # ids of every object that has been visited so far. Any object seen
+        # a second time (a circular or just a shared reference) is sent as
+        # a light reference: a valid id with a value of None
+        self._visited = set()
+
+    def _container(self, obj, value):
         # Save id of instance of object's type as a reference too
         # We will need it to keep track of types the same we are
         # tracking objects
         t = type(obj)
-        refs[id(t)] = t
+        self._refs[id(t)] = t
         return {'i': id(obj), 't': id(t), 'v': value}
 
-    # TODO: what's the better way to detect primitive types?
-    if isinstance(obj, (str, int, bool, float, complex)) or obj is None:
-        return obj
+    def build(self, obj, depth):  # noqa C901
+        plan = _plan_for(obj)
+        if plan.kind == PRIMITIVE:
+            return obj
 
-    # If we have ourself in path, it's a circular reference
-    # we are terminating it with a valid id but a value of None
-    if hasattr(obj, '__dict__') and id(obj) in path:
-        return object_container(None)
+        if plan.tracked and id(obj) in self._visited:
+            return self._container(obj, None)
 
-    # Shorthand for calling ourselves recursively
-    object_tree = functools.partial(
-        _get_object_tree, max_depth, path, refs, depth + 1)
+        self._visited.add(id(obj))
 
-    path += [id(obj)]
+        # Cut-off at max_depth
+        # If max_depth == 0 (evaluates to False) — keep going
+        if self._max_depth and (depth >= self._max_depth):
+            return {}
 
-    # Cut-off at max_depth
-    # If max_depth == 0 (evaluates to False) — keep going
-    if max_depth and (depth >= max_depth):
-        return {}
+        if plan.kind == SEQUENCE:
+            return [self.build(o, depth + 1) for o in obj]
 
-    if isinstance(obj, (list, tuple)):
-        return [object_tree(o) for o in obj]
+        if plan.kind == MAPPING:
+            return self._container(obj, {
+                str(k): self.build(v, depth + 1) for k, v in obj.items()})
+        elif plan.kind == OBJECT:
+            self._refs[id(obj)] = obj
+            items = []
+            if plan.iterable:
+                try:
+                    items = [self.build(o, depth + 1) for o in obj]
+                except TypeError:
+                    pass
+            tail = {i: v for i, v in enumerate(items)}
 
-    def iterate(kv):
-        return {str(k): object_tree(v) for k, v in kv.items()}
-
-    if isinstance(obj, dict):
-        return object_container(iterate(obj))
-    elif hasattr(obj, '__dict__'):
-        refs[id(obj)] = obj
-        items = []
-        # If Type is iterable we will iterate generating numeric keys and
-        # and merge with the output
-        try:
-            items = [object_tree(o) for o in obj]
-        except TypeError:
-            pass
-        tail = {i: v for i, v in enumerate(items)}
-
-        # Filter out private attributes
-        attributes = {
-            k: v for k, v in obj.__dict__.items()
-            if not k.startswith('_')}
-        return object_container({**iterate(attributes), **tail})
-    else:
-        return object_container({})
+            # Filter out private attributes
+            attributes = {
+                k: self.build(v, depth + 1)
+                for k, v in obj.__dict__.items()
+                if not k.startswith('_')}
+            return self._container(obj, {**attributes, **tail})
+        else:
+            return self._container(obj, {})
 
 
 def get_object_tree(obj, max_depth=0):
-    refs = {}
-    tree = _get_object_tree(max_depth, [], refs, 0, obj)
+    refs: Dict[int, Any] = {}
+    tree = _TreeBuilder(max_depth, refs).build(obj, 0)
     return (tree, refs)
+
+
+def _is_container(node) -> bool:
+    return isinstance(node, dict) and len(node) == 3\
+        and 'i' in node and 't' in node and 'v' in node
+
+
+class _TreeDigester:
+    def __init__(self, objects: Dict[int, Any]):
+        self._objects = objects
+        self.digests: Dict[int, bytes] = {}
+
+    def _update_items(self, hasher, items):
+        for key, child in items:
+            hasher.update(repr(key).encode())
+            hasher.update(self.digest(child))
+
+    def _container(self, node) -> bytes:
+        hasher = hashlib.blake2b(digest_size=16)
+        hasher.update(b'c%d:%d' % (node['i'], node['t']))
+        value = node['v']
+        if isinstance(value, dict):
+            self._update_items(hasher, value.items())
+        else:
+            hasher.update(repr(value).encode())
+        result = hasher.digest()
+        if value is not None and node['i'] in self._objects:
+            self.digests[node['i']] = result
+        return result
+
+    def digest(self, node) -> bytes:
+        if _is_container(node):
+            return self._container(node)
+        hasher = hashlib.blake2b(digest_size=16)
+        if isinstance(node, list):
+            hasher.update(b'l')
+            for child in node:
+                hasher.update(self.digest(child))
+        elif isinstance(node, dict):
+            hasher.update(b'd')
+            self._update_items(hasher, node.items())
+        else:
+            hasher.update(repr(node).encode())
+        return hasher.digest()
+
+
+def digest_tree(tree, objects: Dict[int, Any]) -> Dict[int, bytes]:
+    """ Fingerprint every object in a serialized tree.
+
+    Each fingerprint covers the object's type, its attributes and,
+    recursively, everything it refers to, so two fingerprints of the same
+    object are equal exactly when sending it again would not tell a client
+    anything new.
+
+    :param tree: The output of :py:meth:`get_object_tree`
+    :param objects: The references of the tree (or a superset of them).
+                    Only containers whose id is in here are fingerprinted;
+                    plain dicts are not, since their ids are not stable.
+    :returns: A dict of object id to fingerprint
+    """
+    digester = _TreeDigester(objects)
+    digester.digest(tree)
+    return digester.digests
+
+
+def prune_tree(tree, digests: Dict[int, bytes], sent: Dict[int, bytes]):
+    """ Build the delta of a serialized tree for one client.
+
+    Objects whose fingerprint matches the one last sent to the client are
+    replaced by light references, which the client resolves from what it
+    already has; ``sent`` is updated with everything else. The input tree
+    is not modified, so it can be shared between clients.
+
+    :param tree: The output of :py:meth:`get_object_tree`, or any JSON-like
+                 structure containing such output
+    :param digests: The output of :py:meth:`digest_tree` for ``tree``
+    :param sent: The fingerprints of what has been sent to this client,
+                 keyed by object id
+    """
+    if _is_container(tree):
+        _id = tree['i']
+        value = tree['v']
+        digest = digests.get(_id)
+        if digest is not None:
+            if sent.get(_id) == digest:
+                return {'i': _id, 't': tree['t'], 'v': None}
+            sent[_id] = digest
+        if isinstance(value, dict):
+            value = {k: prune_tree(v, digests, sent)
+                     for k, v in value.items()}
+        return {'i': _id, 't': tree['t'], 'v': value}
+    elif isinstance(tree, list):
+        return [prune_tree(v, digests, sent) for v in tree]
+    elif isinstance(tree, dict):
+        return {k: prune_tree(v, digests, sent) for k, v in tree.items()}
+    return tree
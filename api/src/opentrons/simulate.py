@@ -5,14 +5,21 @@ a protocol from the command line.
 """
 
 import argparse
-
+import asyncio
+from concurrent import futures
+import functools
+import json
+import signal
 import sys
 import logging
 import os
 import pathlib
 import queue
-from typing import (Any, Dict, List, Mapping, TextIO, Tuple, BinaryIO,
-                    Optional, Union)
+import time
+import traceback
+import threading
+from typing import (Any, Callable, Dict, List, Mapping, TextIO, Tuple,
+                    BinaryIO, Optional, Union, Iterator)
 
 
 import opentrons
@@ -24,7 +31,8 @@ from opentrons.protocols import parse, bundle
 from opentrons.protocols.types import (
     PythonProtocol, BundleContents, APIVersion)
 from opentrons.protocol_api import execute, MAX_SUPPORTED_VERSION
-from .util.entrypoint_util import labware_from_paths, datafiles_from_paths
+from .util.entrypoint_util import (labware_from_paths, datafiles_from_paths,
+                                   runlog_entry_to_ndjson)
 
 
 class AccumulatingHandler(logging.Handler):
@@ -51,17 +59,28 @@ class CommandScraper:
     The :py:attr:`commands` property contains the list of commands
     and log messages integrated together. Each element of the list is
     a dict following the pattern in the docs of :py:meth:`simulate`.
+
+    If ``emit`` is specified, it is called with each of those dicts as soon
+    as its command finishes. If ``keep_commands`` is ``False``, the commands
+    are only passed to ``emit`` and never accumulated, so the memory the
+    scraper uses depends only on how deeply commands are nested rather than
+    on how long the protocol is.
     """
 
     def __init__(self,
                  logger: logging.Logger,
                  level: str,
-                 broker: opentrons.broker.Broker) -> None:
+                 broker: opentrons.broker.Broker,
+                 emit: Callable[[Mapping[str, Any]], None] = None,
+                 keep_commands: bool = True) -> None:
         """ Build the scraper.
 
         :param logger: The :py:class:`logging.logger` to scrape
         :param level: The log level to scrape
         :param broker: Which broker to subscribe to
+        :param emit: A callback for each command as it finishes
+        :param keep_commands: Whether to accumulate the commands in
+                              :py:attr:`commands`
         """
         self._logger = logger
         self._broker = broker
@@ -75,7 +94,11 @@ class CommandScraper:
             logger.addHandler(self._handler)
         else:
             self._handler = None
-        self._depth = 0
+        self._emit = emit
+        self._keep_commands = keep_commands
+        self._start_time = time.monotonic()
+        self._next_id = 0
+        self._stack: List[Dict[str, Any]] = []
         self._commands: List[Mapping[str, Any]] = []
         self._unsub = self._broker.subscribe(
             opentrons.commands.command_types.COMMAND,
@@ -86,27 +109,48 @@ class CommandScraper:
         """ The list of commands. See :py:meth:`simulate` """
         return self._commands
 
-    def __del__(self):
+    def detach(self):
+        """ Stop scraping the logger and the broker.
+
+        The broker holds a reference to the scraper until this is called,
+        so it should be called once the commands of interest have run.
+        """
         if getattr(self, '_handler', None):
             try:
                 self._logger.removeHandler(self._handler)  # type: ignore
             except Exception:
                 pass
-        if hasattr(self, '_unsub'):
+            self._handler = None
+        if getattr(self, '_unsub', None):
             self._unsub()
+            self._unsub = None
+
+    def __del__(self):
+        self.detach()
 
     def _command_callback(self, message):
         """ The callback subscribed to the broker """
         payload = message['payload']
         if message['$'] == 'before':
-            self._commands.append({'level': self._depth,
-                                   'payload': payload,
-                                   'logs': []})
-            self._depth += 1
-        else:
+            entry = {'level': len(self._stack),
+                     'payload': payload,
+                     'logs': [],
+                     'id': self._next_id,
+                     'name': message.get('name'),
+                     'start': time.monotonic() - self._start_time,
+                     'duration': None}
+            self._next_id += 1
+            if self._keep_commands:
+                self._commands.append(entry)
+            self._stack.append(entry)
+        elif self._stack:
+            entry = self._stack.pop()
             while not self._queue.empty():
-                self._commands[-1]['logs'].append(self._queue.get())
-            self._depth = max(self._depth - 1, 0)
+                entry['logs'].append(self._queue.get())
+            entry['duration'] = time.monotonic() - self._start_time\
+                - entry['start']
+            if self._emit:
+                self._emit(entry)
 
 
 def get_protocol_api(
@@ -215,8 +259,10 @@ def simulate(protocol_file: TextIO,
              custom_labware_paths: List[str] = None,
              custom_data_paths: List[str] = None,
              propagate_logs: bool = False,
-             log_level: str = 'warning') -> Tuple[List[Mapping[str, Any]],
-                                                  Optional[BundleContents]]:
+             log_level: str = 'warning',
+             emit_runlog: Callable[[Mapping[str, Any]], None] = None,
+             keep_runlog: bool = True)\
+        -> Tuple[List[Mapping[str, Any]], Optional[BundleContents]]:
     """
     Simulate the protocol itself.
 
@@ -247,6 +293,12 @@ def simulate(protocol_file: TextIO,
                        a payload do ``payload['text'].format(**payload)``.
         - ``logs``: Any log messages that occurred during execution of this
                     command, as a logging.LogRecord
+        - ``id``: The index of this command in the run log
+        - ``name``: The name of the command (see
+                    :py:mod:`opentrons.commands.types`)
+        - ``start``: When the command started, in seconds since the start
+                     of the simulation
+        - ``duration``: How long the command took to simulate, in seconds
 
     :param file-like protocol_file: The protocol file to simulate.
     :param str file_name: The name of the file
@@ -273,6 +325,17 @@ def simulate(protocol_file: TextIO,
     :param log_level: The level of logs to capture in the runlog. Default:
                       ``'warning'``
     :type log_level: 'debug', 'info', 'warning', or 'error'
+    :param emit_runlog: A callback for streaming the run log. If specified,
+                        this is called with each run log entry as soon as its
+                        command finishes. Since a command finishes after the
+                        commands nested inside it, entries are passed in
+                        order of completion rather than in run log order;
+                        their ``id`` gives the run log order.
+    :param keep_runlog: Whether to accumulate and return the run log. If
+                        you are consuming the run log with ``emit_runlog``,
+                        set this to ``False`` so that memory use does not
+                        grow with the length of the protocol. Default:
+                        ``True``
     :returns: A tuple of a run log for user output, and possibly the required
               data to write to a bundle to bundle this protocol. The bundle is
               only emitted if bundling is allowed (see
@@ -299,15 +362,15 @@ def simulate(protocol_file: TextIO,
     bundle_contents:  Optional[BundleContents] = None
 
     if getattr(protocol, 'api_level', APIVersion(2, 0)) < APIVersion(2, 0):
-        def _simulate_v1():
-            opentrons.robot.disconnect()
-            opentrons.robot.reset()
-            scraper = CommandScraper(stack_logger, log_level,
-                                     opentrons.robot.broker)
+        opentrons.robot.disconnect()
+        opentrons.robot.reset()
+        scraper = CommandScraper(stack_logger, log_level,
+                                 opentrons.robot.broker,
+                                 emit_runlog, keep_runlog)
+        try:
             exec(protocol.contents, {})  # type: ignore
-            return scraper
-
-        scraper = _simulate_v1()
+        finally:
+            scraper.detach()
     else:
         # we want a None literal rather than empty dict so get_protocol_api
         # will look for custom labware if this is a robot
@@ -317,7 +380,8 @@ def simulate(protocol_file: TextIO,
             bundled_labware=getattr(protocol, 'bundled_labware', None),
             bundled_data=getattr(protocol, 'bundled_data', None),
             extra_labware=gpa_extras)
-        scraper = CommandScraper(stack_logger, log_level, context.broker)
+        scraper = CommandScraper(stack_logger, log_level, context.broker,
+                                 emit_runlog, keep_runlog)
         try:
             execute.run_protocol(protocol, context)
             if isinstance(protocol, PythonProtocol)\
@@ -327,11 +391,89 @@ def simulate(protocol_file: TextIO,
                 bundle_contents = bundle_from_sim(
                     protocol, context)
         finally:
+            scraper.detach()
             context.cleanup()
 
     return scraper.commands, bundle_contents
 
 
+_ITER_DONE = object()
+
+
+def simulate_iter(protocol_file: TextIO,
+                  file_name: str = None,
+                  custom_labware_paths: List[str] = None,
+                  custom_data_paths: List[str] = None,
+                  propagate_logs: bool = False,
+                  log_level: str = 'warning',
+                  max_pending: int = 1000) -> Iterator[Mapping[str, Any]]:
+    """
+    Simulate a protocol, yielding run log entries as their commands finish.
+
+    This takes the same arguments as :py:meth:`simulate` and yields the same
+    run log entries in the order described for its ``emit_runlog``
+    argument. The simulation runs in a worker thread that is paused
+    whenever ``max_pending`` entries are waiting to be consumed, so memory
+    use does not grow with the length of the protocol. If the simulation
+    raises an exception, it is re-raised from the generator after the
+    entries that were emitted before it.
+    """
+    entries: 'queue.Queue[Any]' = queue.Queue(maxsize=max_pending)
+    failure: List[BaseException] = []
+    abandoned = threading.Event()
+    emit = _queue_emitter(entries, abandoned)
+
+    worker = threading.Thread(
+        target=_simulate_in_thread, name='simulate_iter', daemon=True,
+        args=(functools.partial(
+            simulate, protocol_file, file_name, custom_labware_paths,
+            custom_data_paths, propagate_logs, log_level), emit, failure))
+    worker.start()
+    try:
+        while True:
+            entry = entries.get()
+            if entry is _ITER_DONE:
+                break
+            yield entry
+    finally:
+        abandoned.set()
+    worker.join()
+    if failure:
+        raise failure[0]
+
+
+def _queue_emitter(entries: 'queue.Queue[Any]',
+                   abandoned: threading.Event) -> Callable[[Any], None]:
+    """ Build an ``emit_runlog`` for :py:meth:`simulate_iter` that puts
+    entries on a queue, blocking while it is full """
+    def _emit(entry):
+        # if the consumer stops iterating, let the simulation run on
+        # without blocking on a queue nobody will drain
+        while not abandoned.is_set():
+            try:
+                entries.put(entry, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+    return _emit
+
+
+def _simulate_in_thread(run: Callable[..., Any],
+                        emit: Callable[[Any], None],
+                        failure: List[BaseException]):
+    """ The worker thread of :py:meth:`simulate_iter`, which emits
+    ``_ITER_DONE`` once the simulation is over and records its failure """
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        run(emit_runlog=emit, keep_runlog=False)
+    except BaseException as e:
+        failure.append(e)
+    finally:
+        loop.close()
+        emit(_ITER_DONE)
+
+
 def format_runlog(runlog: List[Mapping[str, Any]]) -> str:
     """
     Format a run log (return value of :py:meth:`simulate``) into a
@@ -353,6 +495,208 @@ def format_runlog(runlog: List[Mapping[str, Any]]) -> str:
     return '\n'.join(to_ret)
 
 
+BATCH_PROTOCOL_SUFFIXES = ('.py', '.json', '.zip')
+
+
+class SimulationTimeout(BaseException):
+    """ Raised in a batch worker when a protocol overruns its time limit.
+
+    This is a :py:class:`BaseException` so that neither the protocol itself
+    nor the protocol executor's error wrapping will swallow it.
+    """
+    pass
+
+
+def _is_labware_definition(path: pathlib.Path) -> bool:
+    try:
+        opentrons.protocol_api.labware.verify_definition(path.read_bytes())
+    except Exception:
+        return False
+    else:
+        return True
+
+
+def find_batch_protocols(directory: str) -> List[pathlib.Path]:
+    """ Find the protocols to simulate in a batch directory.
+
+    Python, JSON and zipped bundle protocols anywhere under ``directory`` are
+    returned in a stable (sorted) order. JSON files that are labware
+    definitions rather than protocols are skipped; they are instead made
+    available to every protocol in the batch as custom labware.
+
+    :param directory: The directory to search
+    :returns: The paths of the protocol files
+    """
+    root = pathlib.Path(directory)
+    if not root.is_dir():
+        raise RuntimeError(f'{root} is not a directory')
+    found = []
+    for path in sorted(root.rglob('*')):
+        if not path.is_file() or path.suffix not in BATCH_PROTOCOL_SUFFIXES:
+            continue
+        if path.suffix == '.json' and _is_labware_definition(path):
+            continue
+        found.append(path)
+    return found
+
+
+def _error_line(exc: BaseException, proto_name: str) -> Optional[int]:
+    line = getattr(exc, 'line', None)
+    if line:
+        return line
+    if isinstance(exc, SyntaxError):
+        return exc.lineno
+    for frame in reversed(traceback.extract_tb(exc.__traceback__)):
+        if frame.filename == proto_name:
+            return frame.lineno
+    return None
+
+
+def _raise_timeout(signum, frame):
+    raise SimulationTimeout()
+
+
+def _batch_worker_init() -> None:
+    """ Warm a batch worker process before it is handed any protocols.
+
+    Importing the stack, parsing the pipette configs and building (and
+    discarding) a protocol context are the per-process costs that make
+    running ``opentrons_simulate`` once per protocol slow, so every worker
+    pays them exactly once here.
+    """
+    logging.getLogger('opentrons').propagate = False
+    from opentrons.config import pipette_config
+    for model in pipette_config.config_models:
+        pipette_config.load(model)
+    context = _build_protocol_context(MAX_SUPPORTED_VERSION)
+    context.cleanup()
+
+
+def simulate_one(path: str,
+                 custom_labware_paths: List[str] = None,
+                 custom_data_paths: List[str] = None,
+                 log_level: str = 'warning',
+                 timeout: float = None) -> Dict[str, Any]:
+    """ Simulate a single protocol file and summarize the result.
+
+    This is the unit of work of :py:meth:`simulate_batch`. Unlike
+    :py:meth:`simulate`, it never raises for errors in the protocol; they
+    are recorded in the returned report instead.
+
+    :param path: The path of the protocol file
+    :param custom_labware_paths: As in :py:meth:`simulate`
+    :param custom_data_paths: As in :py:meth:`simulate`
+    :param log_level: As in :py:meth:`simulate`
+    :param timeout: If specified, the maximum time in seconds the simulation
+                    may take. This is only enforced on platforms with
+                    ``SIGALRM``.
+    :returns: A dict with the keys ``protocol`` (the path), ``status``
+              (``'pass'``, ``'fail'`` or ``'timeout'``), ``error`` (the error
+              message or ``None``), ``errorLine`` (the line in the protocol
+              that caused the error, if known), ``commandCount`` and
+              ``duration`` (wall time in seconds).
+    """
+    report: Dict[str, Any] = {
+        'protocol': path, 'status': 'pass', 'error': None,
+        'errorLine': None, 'commandCount': 0, 'duration': None}
+    use_alarm = bool(timeout) and hasattr(signal, 'setitimer')
+    if use_alarm:
+        old_handler = signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)  # type: ignore
+    start = time.monotonic()
+    try:
+        with open(path, 'rb') as proto:
+            runlog, _ = simulate(
+                proto, os.path.basename(path),  # type: ignore
+                custom_labware_paths, custom_data_paths,
+                log_level=log_level)
+        report['commandCount'] = len(runlog)
+    except SimulationTimeout:
+        report['status'] = 'timeout'
+        report['error'] = f'Simulation took longer than {timeout}s'
+    except Exception as e:
+        report['status'] = 'fail'
+        report['error'] = str(e)
+        report['errorLine'] = _error_line(e, os.path.basename(path))
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, old_handler)
+        report['duration'] = time.monotonic() - start
+    return report
+
+
+def simulate_batch(
+        directory: str,
+        custom_labware_paths: List[str] = None,
+        custom_data_paths: List[str] = None,
+        log_level: str = 'warning',
+        jobs: int = None,
+        timeout: float = None) -> Iterator[Dict[str, Any]]:
+    """
+    Simulate every protocol in a directory using a pool of warm worker
+    processes.
+
+    Each worker imports the opentrons stack and loads its labware and
+    pipette configuration once, and then simulates protocols one after
+    another, so the startup cost of the package is paid once per worker
+    rather than once per protocol. Labware definitions found in
+    ``directory`` are available to all of the protocols in it.
+
+    :param directory: The directory to search for protocols (see
+                      :py:meth:`find_batch_protocols`)
+    :param custom_labware_paths: As in :py:meth:`simulate`
+    :param custom_data_paths: As in :py:meth:`simulate`
+    :param log_level: As in :py:meth:`simulate`
+    :param jobs: How many protocols to simulate at once. Default: the
+                 number of CPUs
+    :param timeout: The maximum time in seconds any one protocol may take
+                    to simulate, or ``None`` for no limit
+    :returns: An iterator of reports (see :py:meth:`simulate_one`), in the
+              order the protocols finish
+    """
+    protocols = find_batch_protocols(directory)
+    labware_paths = list(custom_labware_paths or []) + [directory]
+    with futures.ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=_batch_worker_init) as executor:
+        pending = [
+            executor.submit(simulate_one, str(path), labware_paths,
+                            custom_data_paths, log_level, timeout)
+            for path in protocols]
+        for fut in futures.as_completed(pending):
+            yield fut.result()
+
+
+def _report_name(report: Dict[str, Any], root: str) -> str:
+    rel = pathlib.Path(report['protocol']).relative_to(root)
+    return str(rel).replace(os.sep, '__') + '.report.json'
+
+
+def _run_batch(args: argparse.Namespace) -> int:
+    report_dir = getattr(args, 'batch_report_dir', None)
+    if report_dir:
+        os.makedirs(report_dir, exist_ok=True)
+    failed = 0
+    for report in simulate_batch(
+            args.batch,
+            getattr(args, 'custom_labware_path', []),
+            getattr(args, 'custom_data_path', [])
+            + getattr(args, 'custom_data_file', []),
+            log_level=args.log_level,
+            jobs=args.jobs,
+            timeout=args.timeout):
+        if report['status'] != 'pass':
+            failed += 1
+        if report_dir:
+            dest = os.path.join(report_dir, _report_name(report, args.batch))
+            with open(dest, 'w') as rf:
+                json.dump(report, rf, indent=2)
+        if args.output != 'nothing':
+            print(json.dumps(report), flush=True)
+    return 1 if failed else 0
+
+
 def _get_bundle_args(
         parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
     parser.add_argument(
@@ -437,20 +781,44 @@ def get_arguments(
     if allow_bundle():
         parser = _get_bundle_args(parser)
 
-    parser.add_argument(
-        'protocol', metavar='PROTOCOL',
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument(
+        'protocol', metavar='PROTOCOL', nargs='?',
         type=argparse.FileType('rb'),
         help='The protocol file to simulate. If you pass \'-\', you can pipe '
         'the protocol via stdin; this could be useful if you want to use this '
         'utility as part of an automated workflow.')
+    source.add_argument(
+        '--batch', metavar='DIR', action='store', default=None,
+        help='Simulate every Python, JSON and zipped protocol in DIR (and its '
+             'subdirectories) in a pool of worker processes instead of a '
+             'single PROTOCOL, and print a JSON report for each one. Labware '
+             'definitions in DIR are available to all the protocols. The '
+             'exit code is nonzero if any protocol fails.')
+    parser.add_argument(
+        '-j', '--jobs', type=int, default=None,
+        help='With --batch, how many protocols to simulate at once. '
+             'Default: the number of CPUs')
+    parser.add_argument(
+        '--timeout', type=float, default=None,
+        help='With --batch, the maximum time in seconds to spend simulating '
+             'any one protocol before reporting it as timed out')
+    parser.add_argument(
+        '--batch-report-dir', metavar='REPORT_DIR', default=None,
+        help='With --batch, also write each protocol\'s report as a JSON '
+             'file in REPORT_DIR')
     parser.add_argument(
         '-v', '--version', action='version',
         version=f'%(prog)s {opentrons.__version__}',
         help='Print the opentrons package version and exit')
     parser.add_argument(
         '-o', '--output', action='store',
-        help='What to output during simulations',
-        choices=['runlog', 'nothing'],
+        help='What to output during simulations. runlog prints the whole '
+             'run log when the simulation finishes; ndjson prints each '
+             'command as a line of JSON (with its nesting level and timing) '
+             'as soon as it finishes, without holding the run log in memory. '
+             'With --batch, either prints the per-protocol reports',
+        choices=['runlog', 'ndjson', 'nothing'],
         default='runlog')
     return parser
 
@@ -476,6 +844,10 @@ def _get_bundle_dest(
         return None
 
 
+def _emit_ndjson(entry: Mapping[str, Any]):
+    print(runlog_entry_to_ndjson(entry), flush=True)
+
+
 # Note - this script is also set up as a setuptools entrypoint and thus does
 # an absolute minimum of work since setuptools does something odd generating
 # the scripts
@@ -488,13 +860,22 @@ def main() -> int:
     args = parser.parse_args()
     # Try to migrate api v1 containers if needed
 
+    if args.batch:
+        return _run_batch(args)
+
+    emit_runlog: Optional[Callable[[Mapping[str, Any]], None]] = None
+    if args.output == 'ndjson':
+        emit_runlog = _emit_ndjson
+
     runlog, maybe_bundle = simulate(
         args.protocol,
         args.protocol.name,
         getattr(args, 'custom_labware_path', []),
         getattr(args, 'custom_data_path', [])
         + getattr(args, 'custom_data_file', []),
-        log_level=args.log_level)
+        log_level=args.log_level,
+        emit_runlog=emit_runlog,
+        keep_runlog=args.output == 'runlog')
 
     if maybe_bundle:
         bundle_name = getattr(args, 'bundle', None)
@@ -0,0 +1,125 @@
+""" Keeping track of how far along booting the robot server is.
+
+Booting is split into named phases, some of which run at the same time.
+Each phase records when it started and how long it took, so that clients
+can tell what a booting robot is waiting on and boot time can be tracked
+across robots.
+"""
+import contextlib
+import enum
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence
+
+log = logging.getLogger(__name__)
+
+
+class PhaseState(enum.Enum):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    SKIPPED = 'skipped'
+
+
+class BootPhase:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.state = PhaseState.PENDING
+        #: When the phase started, in seconds since boot started
+        self.start: Optional[float] = None
+        #: How long the phase took, in seconds, once it is over
+        self.duration: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {'name': self.name,
+                'state': self.state.value,
+                'start': self.start,
+                'duration': self.duration,
+                'error': self.error}
+
+
+class BootStatus:
+    """ The phases of a boot and how they went.
+
+    Phases are run with :py:meth:`phase`, which works around both blocking
+    and awaited code, so phases that run concurrently on the event loop can
+    each be timed.
+
+    :param phases: The names of the phases expected, so that clients can see
+                   what is still to come. Phases not listed here can still
+                   be run, and are added as they start.
+    :param clock: Where to get the time; :py:func:`time.monotonic` by
+                  default
+    """
+
+    def __init__(self, phases: Sequence[str] = (),
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._started = clock()
+        self._finished: Optional[float] = None
+        self._phases: Dict[str, BootPhase] = OrderedDict(
+            (name, BootPhase(name)) for name in phases)
+
+    def _get_phase(self, name: str) -> BootPhase:
+        if name not in self._phases:
+            self._phases[name] = BootPhase(name)
+        return self._phases[name]
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[BootPhase]:
+        """ Time a phase of the boot. If the body raises, the phase is
+        marked as failed and the exception is passed on. """
+        phase = self._get_phase(name)
+        phase.state = PhaseState.RUNNING
+        phase.start = self._clock() - self._started
+        try:
+            yield phase
+        except BaseException as e:
+            phase.state = PhaseState.FAILED
+            phase.error = str(e) or e.__class__.__name__
+            raise
+        else:
+            phase.state = PhaseState.DONE
+        finally:
+            phase.duration = self._clock() - self._started - phase.start
+            log.info(f'Boot phase {name} {phase.state.value} '
+                     f'in {phase.duration:.3f}s')
+
+    def skip(self, name: str):
+        """ Record that a phase is not needed for this boot """
+        self._get_phase(name).state = PhaseState.SKIPPED
+
+    def finish(self):
+        """ Record that the boot is over """
+        self._finished = self._clock()
+        log.info(f'Boot finished in {self.duration:.3f}s')
+
+    @property
+    def finished(self) -> bool:
+        return self._finished is not None
+
+    @property
+    def failed(self) -> bool:
+        return any(phase.state == PhaseState.FAILED
+                   for phase in self._phases.values())
+
+    @property
+    def ready(self) -> bool:
+        """ Whether the boot is over and went well """
+        return self.finished and not self.failed
+
+    @property
+    def duration(self) -> float:
+        """ How long the boot took, or has taken so far, in seconds """
+        end = self._finished if self._finished is not None else self._clock()
+        return end - self._started
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {'ready': self.ready,
+                'failed': self.failed,
+                'duration': self.duration,
+                'phases': [phase.as_dict()
+                           for phase in self._phases.values()]}
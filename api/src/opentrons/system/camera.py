@@ -1,8 +1,58 @@
 import asyncio
+import logging
 import os
+import subprocess
 from pathlib import Path
+from typing import (AsyncGenerator, List, Optional, Sequence, Tuple,
+                    Union)
+
 from opentrons.config import IS_OSX
 
+log = logging.getLogger(__name__)
+
+#: The frame rate the capture worker asks the camera for
+CAPTURE_FPS = 15
+
+#: The default frame rate of MJPEG streams
+DEFAULT_STREAM_FPS = 10
+
+#: How long the capture worker keeps the camera running after its last
+#: client, so that pictures taken one after another are instant
+CAPTURE_IDLE_TIMEOUT = 60.0
+
+#: How long to wait for a frame from the camera
+FRAME_TIMEOUT = 5.0
+
+#: How long after the camera starts its frames are skipped, while its
+#: exposure settles
+CAMERA_SETTLE_TIME = 1.0
+
+#: An ffmpeg command that prints an MJPEG stream from the camera to stdout
+MJPEG_COMMAND = [
+    'ffmpeg', '-loglevel', 'error',
+    '-f', 'video4linux2', '-s', '640x480', '-r', str(CAPTURE_FPS),
+    '-i', '/dev/video0',
+    '-f', 'mjpeg', '-q:v', '5', 'pipe:1']
+
+# Purely for development on macos
+MJPEG_COMMAND_OSX = [
+    'ffmpeg', '-loglevel', 'error',
+    '-f', 'avfoundation', '-s', '640x480', '-framerate', str(CAPTURE_FPS),
+    '-i', '0',
+    '-f', 'mjpeg', '-q:v', '5', 'pipe:1']
+
+MJPEG_BOUNDARY = 'frame'
+MJPEG_CONTENT_TYPE = f'multipart/x-mixed-replace; boundary={MJPEG_BOUNDARY}'
+
+# JPEG start and end of image markers. The compressed data is byte-stuffed
+# (0xff is always followed by 0x00 there) so they can't appear in it, but
+# they could appear inside a marker segment such as an embedded thumbnail.
+# ffmpeg's MJPEG frames have none of those, so splitting on them is enough.
+_SOI = b'\xff\xd8'
+_EOI = b'\xff\xd9'
+
+_READ_SIZE = 64 * 1024
+
 
 class CameraException(Exception):
     pass
@@ -42,3 +92,282 @@ async def take_picture(filename: Path,
         raise CameraException(res)
     if not filename.exists():
         raise CameraException('picture not saved')
+
+
+def split_frames(data: bytes) -> Tuple[List[bytes], bytes]:
+    """ Split the complete JPEG frames out of the start of an MJPEG stream.
+
+    :param data: The stream read so far
+    :returns: The complete frames and the rest of the data, which should be
+              prepended to whatever is read next
+    """
+    frames: List[bytes] = []
+    start = data.find(_SOI)
+    while start >= 0:
+        end = data.find(_EOI, start + len(_SOI))
+        if end < 0:
+            return frames, data[start:]
+        end += len(_EOI)
+        frames.append(data[start:end])
+        start = data.find(_SOI, end)
+    # Keep a trailing half of a start of image marker
+    return frames, data[-1:] if data.endswith(_SOI[:1]) else b''
+
+
+def mjpeg_part(frame: bytes) -> bytes:
+    """ Wrap a frame in a part of a multipart/x-mixed-replace response """
+    return b'--%s\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n'\
+        % (MJPEG_BOUNDARY.encode(), len(frame)) + frame + b'\r\n'
+
+
+class PipeFrameSource:
+    """ Frames from a command that prints an MJPEG stream (which is just
+    JPEGs one after another) to stdout.
+
+    :param command: The command and its arguments
+    """
+
+    def __init__(self, command: Sequence[str]) -> None:
+        self._command = list(command)
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__}: {" ".join(self._command)}>'
+
+    async def frames(self) -> AsyncGenerator[bytes, None]:
+        proc = await asyncio.create_subprocess_exec(
+            *self._command,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        try:
+            rest = b''
+            while True:
+                chunk = await proc.stdout.read(_READ_SIZE)  # type: ignore
+                if not chunk:
+                    break
+                frames, rest = split_frames(rest + chunk)
+                for frame in frames:
+                    yield frame
+            await proc.wait()
+            err = await proc.stderr.read()  # type: ignore
+            raise CameraException(
+                err.decode().strip()
+                or f'{self._command[0]} exited with {proc.returncode}')
+        finally:
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+
+
+class FileFrameSource:
+    """ Frames played back from a file of JPEGs one after another, such as
+    a saved MJPEG stream. This stands in for the camera in tests and in
+    development.
+
+    :param path: The file to read
+    :param fps: The rate to play the frames back at
+    :param repeat: Whether to start over at the end of the file
+    """
+
+    def __init__(self, path: Union[str, Path],
+                 fps: float = CAPTURE_FPS,
+                 repeat: bool = True) -> None:
+        self._path = Path(path)
+        self._interval = 1 / fps
+        self._repeat = repeat
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__}: {self._path}>'
+
+    async def frames(self) -> AsyncGenerator[bytes, None]:
+        frames, _ = split_frames(self._path.read_bytes())
+        if not frames:
+            raise CameraException(f'No frames in {self._path}')
+        while True:
+            for frame in frames:
+                yield frame
+                await asyncio.sleep(self._interval)
+            if not self._repeat:
+                return
+
+
+FrameSource = Union[PipeFrameSource, FileFrameSource]
+
+
+class CaptureWorker:
+    """ Keeps the camera running while anyone is looking.
+
+    Starting ffmpeg and waiting for the camera to settle takes over a
+    second, so rather than doing that for every picture the worker reads
+    frames continuously from a :py:class:`PipeFrameSource` (or anything else
+    with a ``frames`` async generator) and keeps the latest one. It starts
+    when a client first asks for a frame and stops ``idle_timeout`` seconds
+    after the last client is done, which releases the camera. The frames
+    from the first ``settle_time`` seconds after it starts are skipped, so
+    that they are not too dark.
+
+    :param source: Where to get frames from
+    :param idle_timeout: How long to keep running without clients. If 0,
+                         stop as soon as the last client is done.
+    :param settle_time: How long to skip frames for after starting
+    :param loop: The event loop to run in
+    """
+
+    def __init__(self, source: FrameSource,
+                 idle_timeout: float = CAPTURE_IDLE_TIMEOUT,
+                 settle_time: float = CAMERA_SETTLE_TIME,
+                 loop: asyncio.AbstractEventLoop = None) -> None:
+        self._source = source
+        self._idle_timeout = idle_timeout
+        self._settle_time = settle_time
+        self._loop = loop
+        self._task: Optional[asyncio.Task] = None
+        self._frame: Optional[bytes] = None
+        self._next_frame: Optional[asyncio.Future] = None
+        self._clients = 0
+        self._idle_handle: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def latest_frame(self) -> Optional[bytes]:
+        """ The last frame read, if the worker is running """
+        return self._frame
+
+    @property
+    def clients(self) -> int:
+        return self._clients
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        return self._loop or asyncio.get_event_loop()
+
+    def _start(self):
+        if self._idle_handle:
+            self._idle_handle.cancel()
+            self._idle_handle = None
+        if not self.running:
+            log.info(f'Starting camera capture from {self._source}')
+            self._task = self._get_loop().create_task(self._capture())
+
+    async def _capture(self):
+        error = CameraException('The camera stopped')
+        loop = self._get_loop()
+        settled_at = loop.time() + self._settle_time
+        try:
+            async for frame in self._source.frames():
+                if loop.time() < settled_at:
+                    continue
+                self._frame = frame
+                waiter, self._next_frame = self._next_frame, None
+                if waiter and not waiter.done():
+                    waiter.set_result(frame)
+        except asyncio.CancelledError:
+            raise
+        except CameraException as e:
+            log.warning(f'Camera capture failed: {e}')
+            error = e
+        except Exception as e:
+            log.exception('Camera capture failed')
+            error = CameraException(str(e))
+        finally:
+            self._frame = None
+            waiter, self._next_frame = self._next_frame, None
+            if waiter and not waiter.done():
+                waiter.set_exception(error)
+
+    async def _wait_for_frame(self, timeout: float) -> bytes:
+        self._start()
+        if self._next_frame is None:
+            self._next_frame = self._get_loop().create_future()
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(self._next_frame), timeout)
+        except asyncio.TimeoutError:
+            raise CameraException('Timed out waiting for the camera')
+
+    def _release(self):
+        self._clients -= 1
+        if self._clients or not self.running:
+            return
+        if self._idle_handle:
+            self._idle_handle.cancel()
+        if self._idle_timeout:
+            self._idle_handle = self._get_loop().call_later(
+                self._idle_timeout, self._stop_if_idle)
+        else:
+            self._stop_if_idle()
+
+    def _stop_if_idle(self):
+        self._idle_handle = None
+        if not self._clients and self._task:
+            log.info('Stopping camera capture')
+            self._task.cancel()
+
+    async def picture(self, timeout: float = FRAME_TIMEOUT) -> bytes:
+        """ Get the latest frame, starting the camera if it is not running
+
+        :raises: CameraException
+        """
+        self._clients += 1
+        try:
+            if self.running and self._frame is not None:
+                self._start()
+                return self._frame
+            return await self._wait_for_frame(timeout)
+        finally:
+            self._release()
+
+    async def stream(self, max_fps: float = DEFAULT_STREAM_FPS,
+                     timeout: float = FRAME_TIMEOUT
+                     ) -> AsyncGenerator[bytes, None]:
+        """ Get frames as the camera captures them, for as long as the
+        iteration goes on or until the camera stops.
+
+        :param max_fps: The most frames to get per second. Frames that come
+                        in faster are skipped.
+        :raises: CameraException
+        """
+        self._clients += 1
+        interval = 1 / max_fps
+        loop = self._get_loop()
+        last_sent: Optional[float] = None
+        try:
+            while True:
+                if last_sent is not None and not self.running:
+                    # Rather than starting it again
+                    raise CameraException('The camera stopped')
+                frame = await self._wait_for_frame(timeout)
+                if last_sent is not None:
+                    wait = last_sent + interval - loop.time()
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+                        frame = self._frame or frame
+                last_sent = loop.time()
+                yield frame
+        finally:
+            self._release()
+
+    async def stop(self):
+        """ Stop the camera now, whether or not anyone is looking """
+        if self._idle_handle:
+            self._idle_handle.cancel()
+            self._idle_handle = None
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+_capture_worker: Optional[CaptureWorker] = None
+
+
+def get_capture_worker() -> CaptureWorker:
+    """ Get the capture worker for the robot's camera """
+    global _capture_worker
+    if _capture_worker is None:
+        _capture_worker = CaptureWorker(PipeFrameSource(
+            MJPEG_COMMAND_OSX if IS_OSX else MJPEG_COMMAND))
+    return _capture_worker
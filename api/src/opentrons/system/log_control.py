@@ -7,7 +7,7 @@ This is the implementation of the endpoints in
 import asyncio
 import logging
 import subprocess
-from typing import Tuple
+from typing import AsyncGenerator, List, Optional, Tuple
 
 
 LOG = logging.getLogger(__name__)
@@ -15,24 +15,67 @@ LOG = logging.getLogger(__name__)
 MAX_RECORDS = 100000
 DEFAULT_RECORDS = 50000
 
+#: The most log output to read from journalctl before passing it on
+STREAM_CHUNK_SIZE = 64 * 1024
 
-async def get_records_dumb(selector: str, records: int,
-                           mode: str) -> bytes:
-    """ Dump the log files.
+
+def _journalctl_args(selector: str,
+                     records: Optional[int],
+                     mode: str,
+                     after_cursor: Optional[str],
+                     follow: bool) -> List[str]:
+    args = ['journalctl', '--no-pager', '-t', selector, '-o', mode, '-a']
+    if records:
+        args += ['-n', str(records)]
+    if mode == 'short':
+        # Print the cursor of the last record at the end, so that the next
+        # request can pick up from there. json records always include their
+        # cursor as __CURSOR.
+        args.append('--show-cursor')
+    if after_cursor:
+        args += ['--after-cursor', after_cursor]
+    if follow:
+        args.append('--follow')
+    return args
+
+
+async def stream_records(selector: str,
+                         records: Optional[int] = DEFAULT_RECORDS,
+                         mode: str = 'short',
+                         after_cursor: str = None,
+                         follow: bool = False,
+                         chunk_size: int = STREAM_CHUNK_SIZE
+                         ) -> AsyncGenerator[bytes, None]:
+    """ Stream log records as journalctl prints them.
+
+    This never holds more than ``chunk_size`` bytes of the logs at once.
+    journalctl is stopped if the iteration is stopped early (for instance
+    because the client that asked for the logs went away), which is the
+    only way a ``follow`` stream ends.
 
     :param selector: The syslog selector to limit responses to
-    :param records: The maximum number of records to print
+    :param records: The maximum number of records to print. If ``None``,
+                    print all of them.
     :param mode: A journalctl dump mode. Should be either "short" or "json".
+    :param after_cursor: If specified, only print the records after the one
+                         with this journald cursor
+    :param follow: Whether to keep printing new records as they are logged
+    :param chunk_size: The most output to read at once
     """
     proc = await asyncio.create_subprocess_exec(
-        'journalctl', '--no-pager',
-        '-t', selector,
-        '-n', str(records),
-        '-o', mode,
-        '-a',
+        *_journalctl_args(selector, records, mode, after_cursor, follow),
         stdout=subprocess.PIPE)
-    stdout, _ = await proc.communicate()
-    return stdout
+    try:
+        while True:
+            chunk = await proc.stdout.read(chunk_size)  # type: ignore
+            if not chunk:
+                break
+            yield chunk
+        await proc.wait()
+    finally:
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
 
 
 async def set_syslog_level(level: str) -> Tuple[int, str, str]:
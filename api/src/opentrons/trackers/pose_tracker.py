@@ -1,7 +1,7 @@
-import functools
-import itertools
-from collections import namedtuple, UserDict
-from typing import Dict, List
+from collections import namedtuple
+from collections.abc import Mapping
+from typing import (
+    Any, Callable, Dict, Iterator, List, Optional, Tuple, Union)
 
 import numpy as np  # type: ignore
 from numpy.linalg import inv  # type: ignore
@@ -58,74 +58,294 @@ class Node(namedtuple('Node', 'parent children transform')):
             (transform1 == transform2).all()
 
 
+_MISSING = object()
+
+
+class _Store:
+    """ The nodes of one version of a pose tree, and what has been worked
+    out about them """
+
+    def __init__(self, nodes: Dict[object, Node]) -> None:
+        self.nodes = nodes
+        # obj -> (up, up inverse, down, down inverse), see _frames
+        self.frames: Dict[object, Tuple[np.ndarray, ...]] = {}
+        self.max_z: Dict[object, float] = {}
+
+
+class PoseTree(Mapping):
+    """ The state of the pose tracker: a mapping of tracked objects to their
+    :py:class:`Node`.
+
+    The functions in this module never change a tree they are given; they
+    return a new version of it. All the versions of a tree share one store
+    of nodes, which holds the version that was used last. Every other
+    version keeps the changes that turn the next version towards the store
+    into it, so changing the latest version only costs as much as the
+    change, and using an older version again rolls the store back to it.
+
+    On top of the nodes the store keeps what has been worked out so far
+    about them, so repeated queries are cheap:
+
+    - the transforms from each node to the root of the tree and back, which
+      are only worked out again for the subtree of a node that changes;
+    - the highest point below a node (see :py:func:`max_z`), which is kept
+      up to date as objects are added and dropped when something below the
+      node moves.
+    """
+
+    def __init__(self, nodes: Mapping = None) -> None:
+        self._store = _Store(dict(nodes or {}))
+        # If this version is not in the store: the next version towards the
+        # store, and the changes that turn that version into this one
+        self._diff: Optional[Tuple['PoseTree', List[Tuple[object, Any]]]]\
+            = None
+
+    def _reroot(self) -> _Store:
+        """ Make the store hold this version """
+        path = []
+        version = self
+        while version._diff is not None:
+            path.append(version)
+            version = version._diff[0]
+        for version in reversed(path):
+            newer, changes = version._diff  # type: ignore
+            newer._diff = (version, _apply(self._store.nodes, changes))
+            version._diff = None
+            _forget_changes(version, [key for key, _ in changes])
+        return self._store
+
+    def __getitem__(self, obj) -> Node:
+        return self._reroot().nodes[obj]
+
+    def __contains__(self, obj) -> bool:
+        return obj in self._reroot().nodes
+
+    def __iter__(self) -> Iterator:
+        return iter(self._reroot().nodes)
+
+    def __len__(self) -> int:
+        return len(self._reroot().nodes)
+
+    def add(self, obj, parent=ROOT, point=Point(0, 0, 0),
+            transform=np.identity(4)) -> 'PoseTree':
+        """ Syntax sugar for chaining :py:func:`add` """
+        return add(self, obj, parent, point, transform)
+
+
+def _apply(nodes: Dict[object, Node],
+           changes: List[Tuple[object, Any]]) -> List[Tuple[object, Any]]:
+    """ Set (or with ``_MISSING``, remove) nodes, last change first
+
+    :returns: The changes that undo these
+    """
+    undo = []
+    for obj, node in reversed(changes):
+        undo.append((obj, nodes.get(obj, _MISSING)))
+        if node is _MISSING:
+            del nodes[obj]
+        else:
+            nodes[obj] = node
+    return undo
+
+
+def _tree(state) -> PoseTree:
+    if isinstance(state, PoseTree):
+        return state
+    return PoseTree(state)
+
+
+def _edit(state) -> Tuple[PoseTree, Callable[[object, Any], None]]:
+    """ Start a new version of ``state``.
+
+    :returns: The new version, and a function to set (or with ``_MISSING``,
+              remove) one of its nodes
+    """
+    state = _tree(state)
+    store = state._reroot()
+    tree = PoseTree.__new__(PoseTree)
+    tree._store = store
+    tree._diff = None
+    undo: List[Tuple[object, Any]] = []
+    state._diff = (tree, undo)
+
+    def set_node(obj, node):
+        undo.append((obj, store.nodes.get(obj, _MISSING)))
+        if node is _MISSING:
+            del store.nodes[obj]
+        else:
+            store.nodes[obj] = node
+    return tree, set_node
+
+
+def _invert(matrix) -> np.ndarray:
+    """ Invert a transform, exactly if it is just a translation """
+    if (matrix[:3, :3] == _IDENTITY3).all() and \
+            (matrix[3] == _BOTTOM_ROW).all():
+        res = np.identity(4)
+        res[:3, 3] = -matrix[:3, 3]
+        return res
+    return inv(matrix)
+
+
+_IDENTITY3 = np.identity(3)
+_BOTTOM_ROW = np.array([0.0, 0.0, 0.0, 1.0])
+
+
+def _frames(state: PoseTree, obj) -> Tuple[np.ndarray, ...]:
+    """ The transforms between ``obj`` and the root of the tree.
+
+    ``up`` is the product of the transforms of ``obj`` and its ancestors
+    below the root, starting with ``obj``; ``down`` is the same product the
+    other way around, starting below the root. Both are identities for the
+    root. Each is worked out from the parent's, which is cached in turn.
+    """
+    store = state._reroot()
+    frames = store.frames.get(obj)
+    if frames is not None:
+        return frames
+    # Find the closest ancestor with cached frames and work back down
+    missing = []
+    node = obj
+    while node not in store.frames:
+        parent = store.nodes[node].parent
+        if parent is None:
+            identity = np.identity(4)
+            store.frames[node] = (identity, identity, identity, identity)
+            break
+        missing.append(node)
+        node = parent
+    for node in reversed(missing):
+        up, up_inv, down, down_inv = store.frames[store.nodes[node].parent]
+        transform = store.nodes[node].transform
+        transform_inv = _invert(transform)
+        store.frames[node] = (
+            transform.dot(up),
+            up_inv.dot(transform_inv),
+            down.dot(transform),
+            transform_inv.dot(down_inv))
+    return store.frames[obj]
+
+
+def _forget(state: PoseTree, obj):
+    """ Drop what the store knows about the subtree at ``obj`` moving """
+    store = state._reroot()
+    store.frames.pop(obj, None)
+    for child, _ in descendants(state, obj):
+        store.frames.pop(child, None)
+    for ancestor in ascend(state, obj)[1:]:
+        store.max_z.pop(ancestor, None)
+
+
+def _forget_changes(state: PoseTree, changed: List[object]):
+    """ Drop what the store knows about nodes that were changed, added or
+    removed """
+    store = state._reroot()
+    for obj in changed:
+        store.frames.pop(obj, None)
+        store.max_z.pop(obj, None)
+        if obj in store.nodes:
+            _forget(state, obj)
+
+
 def init():
-    return add({}, ROOT, parent=None)
+    return add(PoseTree(), ROOT, parent=None)
 
 
 def add(
-        state: Dict[object, Node],
+        state: Union[PoseTree, Dict[object, Node]],
         obj,
         parent=ROOT,
         point=Point(0, 0, 0),
-        transform=np.identity(4)) -> Dict[object, Node]:
+        transform=np.identity(4)) -> PoseTree:
 
     if isinstance(transform, list):
         transform = np.array(transform)
 
-    state = bind(state)
+    state, set_node = _edit(state)
+    store = state._store
 
     if parent is not None:
-        state[parent] = state[parent].add(obj)
+        set_node(parent, state[parent].add(obj))
 
     assert obj not in state, 'object is already being tracked'
 
-    state[obj] = Node(
+    set_node(obj, Node(
         parent=parent,
         children=[],
         transform=transform.dot(inv(translate(point)))
-    )
+    ))
+
+    if parent is not None:
+        # The new object can only raise the highest point of its ancestors
+        for ancestor in ascend(state, parent):
+            if ancestor in store.max_z:
+                store.max_z[ancestor] = max(
+                    store.max_z[ancestor],
+                    change_base(state, src=obj, dst=ancestor)[2])
 
     return state
 
 
 def remove(state, obj):
-    state = state.copy()
+    state, set_node = _edit(state)
+    store = state._store
     nodes = descendants(state, obj) + [(obj, 0)]
+    for ancestor in ascend(state, obj)[1:] if obj in state else []:
+        store.max_z.pop(ancestor, None)
 
     # remove object references from their parent's children
     for child, *_ in nodes:
         parent = state[child].parent
         if parent in state:
-            state[parent] = state[parent].remove(child)
-        del state[child]
+            set_node(parent, state[parent].remove(child))
+        set_node(child, _MISSING)
+        store.frames.pop(child, None)
+        store.max_z.pop(child, None)
     return state
 
 
 def update(state, obj, point: Point, transform=np.identity(4)):
-    state = state.copy()
-    state[obj] = state[obj].update(
+    state, set_node = _edit(state)
+    set_node(obj, state[obj].update(
         transform.dot(inv(translate(point)))
-    )
+    ))
+    _forget(state, obj)
     return state
 
 
 def descendants(state, obj, level=0):
     """ Returns a flattened list tuples of DFS traversal of subtree
     from object that contains descendant object and it's depth """
-    return sum([
-        [(child, level)] + descendants(state, child, level + 1)
-        for child in state[obj].children
-    ], [])
+    res = []
+    stack = [(child, level) for child in reversed(state[obj].children)]
+    while stack:
+        child, depth = stack.pop()
+        res.append((child, depth))
+        stack.extend(
+            (grandchild, depth + 1)
+            for grandchild in reversed(state[child].children))
+    return res
 
 
 def has_children(state, obj):
-    return True if len(descendants(state, obj)) > 0 else False
+    return bool(state[obj].children)
 
 
 def ascend(state, start, finish=ROOT) -> List[Node]:
-    if start is finish:
-        return [finish]
-    return [start] + ascend(state, start=state[start].parent, finish=finish)
+    res = [start]
+    while start is not finish:
+        start = state[start].parent
+        res.append(start)
+    return res
+
+
+def _common_ancestor(state, src, dst):
+    if src is dst:
+        return src
+    if src is ROOT or dst is ROOT:
+        return ROOT
+    up = {id(obj) for obj in ascend(state, src)}
+    return next(obj for obj in ascend(state, dst) if id(obj) in up)
 
 
 def change_base(state, point=Point(0, 0, 0), src=ROOT, dst=ROOT):
@@ -133,29 +353,18 @@ def change_base(state, point=Point(0, 0, 0), src=ROOT, dst=ROOT):
     Transforms point from source coordinate system to destination.
     Point(0, 0, 0) means the origin of the source.
     """
-    def fold(objects):
-        return functools.reduce(
-            lambda a, b: a.dot(b),
-            [state[key].transform for key in objects],
-            np.identity(4)
-        )
-
-    up, down = ascend(state, src), list(reversed(ascend(state, dst)))
-
-    # Find common prefix. Last item is common root
-    root = [n1 for n1, n2 in zip(reversed(up), down) if n1 is n2].pop()
-
-    # Nodes up to root, EXCLUDING root
-    up = list(itertools.takewhile(lambda node: node is not root, up))
+    state = _tree(state)
 
-    # Nodes down from root, EXCLUDING root
-    down = list(itertools.dropwhile(lambda node: node is not root, down))[1:]
+    root = _common_ancestor(state, src, dst)
+    root_up, _, _, root_down_inv = _frames(state, root)
+    _, src_up_inv, _, _ = _frames(state, src)
+    _, _, dst_down, _ = _frames(state, dst)
 
     # Point in root's coordinate system
-    point_in_root = inv(fold(up)).dot((*point, 1))
+    point_in_root = root_up.dot(src_up_inv.dot((*point, 1)))
 
     # Return point in destination's coordinate system
-    return fold(down).dot(point_in_root)[:-1]
+    return root_down_inv.dot(dst_down.dot(point_in_root))[:-1]
 
 
 def absolute(state, obj):
@@ -166,14 +375,18 @@ def absolute(state, obj):
 
 
 def max_z(state, root):
-    test = [
-        (obj, Point(*change_base(state, src=obj, dst=root)).z)
-        for obj, _ in descendants(state, root)
-    ]
-
-    # from pprint import pprint
-    # pprint(test, indent=2)
-    m = max([i[1] for i in test])
+    """
+    Get the highest point of the objects below ``root``, in its coordinate
+    system
+    """
+    state = _tree(state)
+    store = state._reroot()
+    if root in store.max_z:
+        return store.max_z[root]
+    m = max(
+        change_base(state, src=obj, dst=root)[2]
+        for obj, _ in descendants(state, root))
+    store.max_z[root] = m
     return m
 
 
@@ -192,8 +405,5 @@ def stringify(state, root=None):
 
 
 def bind(state):
-    state = UserDict(state.copy())
-    # add syntax sugar for chaining add operations
-    state.add = functools.partial(add, state)
-
-    return state
+    # PoseTree has syntax sugar for chaining add operations
+    return _tree(state)
@@ -1,10 +1,11 @@
 """ opentrons.util.entrypoint_util: functions common to entrypoints
 """
 
+import json
 import logging
 from json import JSONDecodeError
 import pathlib
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Mapping
 
 from jsonschema import ValidationError  # type: ignore
 
@@ -60,3 +61,26 @@ def datafiles_from_paths(paths: List[str]) -> Dict[str, bytes]:
                 else:
                     log.info(f'ignoring {child} in data path')
     return datafiles
+
+
+def runlog_entry_to_ndjson(entry: Mapping[str, Any]) -> str:
+    """ Format a finished run log entry as one line of newline-delimited JSON
+
+    :param entry: A run log entry as built by
+                  :py:class:`opentrons.simulate.CommandScraper`
+    :returns: A JSON object with the entry's ``id``, ``level``, ``name``,
+              formatted ``text``, ``start`` and ``duration`` (both in
+              seconds) and formatted ``logs``, with no trailing newline
+    """
+    payload = entry['payload']
+    return json.dumps({
+        'id': entry.get('id'),
+        'level': entry['level'],
+        'name': entry.get('name'),
+        'text': payload.get('text', '').format(**payload),
+        'start': entry.get('start'),
+        'duration': entry.get('duration'),
+        'logs': [f'{record.levelname} ({record.module}): '
+                 f'{record.getMessage()}'
+                 for record in entry.get('logs', [])]
+    })
@@ -0,0 +1,323 @@
+""" Counters and latency histograms for the hot paths of the robot.
+
+Metrics are declared once, at import time, and updated from anywhere:
+
+.. code-block:: python
+
+    from opentrons.util import metrics
+
+    MOVES = metrics.histogram(
+        'opentrons_example_move_seconds', 'How long moves take', ['axis'])
+
+    @metrics.timed(MOVES, 'x')
+    async def move_x(): ...
+
+and :py:func:`render` formats all of them in the Prometheus text format,
+which is what the ``/metrics`` endpoints serve.
+
+Collection is off unless turned on with :py:func:`enable` (which the
+``enableMetrics`` advanced setting does). While it is off, instrumented code
+pays for one check of a module global per call and nothing else, so it is
+fine to instrument paths that run thousands of times a second.
+"""
+import asyncio
+import bisect
+import functools
+import threading
+import time
+from collections import OrderedDict
+from typing import (Callable, Dict, Iterator, Optional, Sequence, Tuple,
+                    TypeVar, cast)
+
+#: The default histogram buckets, in seconds: from the sub-millisecond
+#: serial round trips up to the longest moves
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_enabled = False
+
+
+def enable(enabled: bool = True):
+    """ Turn collection on or off. Values already collected are kept. """
+    global _enabled
+    _enabled = bool(enabled)
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"')\
+        .replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str],
+                   extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"'
+             for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _CounterChild:
+    __slots__ = ('_lock', 'value')
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        if not _enabled:
+            return
+        with self._lock:
+            self.value += amount
+
+
+class _HistogramChild:
+    __slots__ = ('_lock', '_bounds', 'counts', 'sum')
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self._lock = threading.Lock()
+        self._bounds = bounds
+        #: The number of observations in each bucket (not cumulative); the
+        #: last one is the +Inf bucket
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        if not _enabled:
+            return
+        index = bisect.bisect_left(self._bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str,
+                 labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _new_child(self) -> object:
+        raise NotImplementedError
+
+    def _get_child(self, values: Tuple[str, ...]) -> object:
+        try:
+            return self._children[values]
+        except KeyError:
+            pass
+        if len(values) != len(self.labelnames):
+            raise ValueError(
+                f'{self.name} has labels {self.labelnames}, got {values}')
+        with self._lock:
+            return self._children.setdefault(values, self._new_child())
+
+    def _samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f'# HELP {self.name} {self.documentation}',
+                 f'# TYPE {self.name} {self.kind}']
+        lines.extend(self._samples())
+        return '\n'.join(lines) + '\n'
+
+    def clear(self):
+        with self._lock:
+            self._children.clear()
+
+
+class Counter(_Metric):
+    """ A count of things that happened, like retries. Use :py:meth:`labels`
+    to get the count for some label values, or count directly with
+    :py:meth:`inc` if the counter has no labels. """
+    kind = 'counter'
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def labels(self, *values: str) -> _CounterChild:
+        return cast(_CounterChild, self._get_child(values))
+
+    def inc(self, amount: float = 1.0):
+        if _enabled:
+            self.labels().inc(amount)
+
+    def _samples(self) -> Iterator[str]:
+        for values, child in list(self._children.items()):
+            child = cast(_CounterChild, child)
+            labels = _format_labels(self.labelnames, values)
+            yield f'{self.name}{labels} {_format_value(child.value)}'
+
+
+class Histogram(_Metric):
+    """ A distribution of values, usually durations in seconds. Use
+    :py:meth:`labels` to get the histogram for some label values, or
+    observe directly with :py:meth:`observe` if it has no labels. """
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str,
+                 labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def labels(self, *values: str) -> _HistogramChild:
+        return cast(_HistogramChild, self._get_child(values))
+
+    def observe(self, value: float):
+        if _enabled:
+            self.labels().observe(value)
+
+    def _samples(self) -> Iterator[str]:
+        for values, child in list(self._children.items()):
+            child = cast(_HistogramChild, child)
+            counts = list(child.counts)
+            total = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                total += count
+                labels = _format_labels(
+                    self.labelnames, values,
+                    f'le="{_format_value(bound)}"')
+                yield f'{self.name}_bucket{labels} {total}'
+            labels = _format_labels(self.labelnames, values)
+            yield f'{self.name}_sum{labels} {_format_value(child.sum)}'
+            yield f'{self.name}_count{labels} {total}'
+
+
+class Registry:
+    """ All the metrics there are. Declaring a metric that already exists
+    returns the existing one, so modules can be reloaded. """
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is None:
+                self._metrics[metric.name] = metric
+                return metric
+        if type(existing) is not type(metric)\
+                or existing.labelnames != metric.labelnames:
+            raise ValueError(
+                f'{metric.name} is already registered differently')
+        return existing
+
+    def counter(self, name: str, documentation: str,
+                labelnames: Sequence[str] = ()) -> Counter:
+        return cast(Counter, self._register(
+            Counter(name, documentation, labelnames)))
+
+    def histogram(self, name: str, documentation: str,
+                  labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return cast(Histogram, self._register(
+            Histogram(name, documentation, labelnames, buckets)))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """ Format every metric in the Prometheus text format """
+        text = ''.join(metric.render()
+                       for metric in list(self._metrics.values()))
+        if not _enabled:
+            text = '# Metrics collection is disabled\n' + text
+        return text
+
+    def clear(self):
+        """ Forget every value collected so far """
+        for metric in list(self._metrics.values()):
+            metric.clear()
+
+
+REGISTRY = Registry()
+counter = REGISTRY.counter
+histogram = REGISTRY.histogram
+render = REGISTRY.render
+clear = REGISTRY.clear
+
+
+Func = TypeVar('Func', bound=Callable)
+
+
+def timed(metric: Histogram, *labels: str) -> Callable[[Func], Func]:
+    """ Decorate a function or coroutine function to observe how long each
+    call takes (whether it returns or raises) in ``metric`` with the label
+    values ``labels``. """
+    def _decorator(func: Func) -> Func:
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def _async_wrapper(*args, **kwargs):
+                if not _enabled:
+                    return await func(*args, **kwargs)
+                child = metric.labels(*labels)
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    child.observe(time.perf_counter() - start)
+            return cast(Func, _async_wrapper)
+
+        @functools.wraps(func)
+        def _wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            child = metric.labels(*labels)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                child.observe(time.perf_counter() - start)
+        return cast(Func, _wrapper)
+    return _decorator
+
+
+class Timer:
+    """ Time a block of code into a histogram child, if collection is on
+
+    .. code-block:: python
+
+        with metrics.Timer(COMMANDS.labels('G0')):
+            ...
+    """
+    __slots__ = ('_child', '_start')
+
+    def __init__(self, child: _HistogramChild) -> None:
+        self._child = child
+        self._start: Optional[float] = None
+
+    def __enter__(self) -> 'Timer':
+        if _enabled:
+            self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._start is not None:
+            self._child.observe(time.perf_counter() - self._start)
@@ -0,0 +1,44 @@
+from opentrons.api.command_log import CommandLog
+
+
+def test_append_and_drop():
+    log = CommandLog(max_entries=3)
+    assert log.last() is None
+    assert [log.append(t) for t in (10, 20, 30)] == [0, 1, 2]
+    assert log == {0: 10, 1: 20, 2: 30}
+
+    assert log.append(40) == 3
+    assert log == {1: 20, 2: 30, 3: 40}
+    assert log.first_id == 1
+    assert log.total == 4
+    assert log.last() == (3, 40)
+
+    log.clear()
+    assert log == {}
+    assert log.append(50) == 0
+
+
+def test_unbounded():
+    log = CommandLog(max_entries=0)
+    for t in range(100):
+        log.append(t)
+    assert len(log) == 100
+
+
+def test_page():
+    log = CommandLog(max_entries=5)
+    for t in range(10):
+        log.append(t * 10)
+    descriptions = [{'description': f'command {i}', 'level': 0}
+                    for i in range(10)]
+
+    page = log.page(start=0, count=2)
+    assert page == {
+        'entries': [{'id': 5, 'handledAt': 50}, {'id': 6, 'handledAt': 60}],
+        'firstAvailable': 5, 'total': 10, 'maxEntries': 5}
+
+    assert log.page(count=1, descriptions=descriptions)['entries'] == [
+        {'id': 9, 'handledAt': 90, 'description': 'command 9', 'level': 0}]
+    assert log.page(start=8, count=100)['entries'] == [
+        {'id': 8, 'handledAt': 80}, {'id': 9, 'handledAt': 90}]
+    assert log.page(start=20)['entries'] == []
@@ -7,6 +7,7 @@ from opentrons.api.session import (
     _accumulate, _dedupe)
 from tests.opentrons.conftest import state
 from functools import partial
+from opentrons.api import MainRouter
 from opentrons.protocols.types import APIVersion
 from opentrons.protocol_api import MAX_SUPPORTED_VERSION
 from opentrons.protocol_api.execute import ExceptionInProtocolError
@@ -401,3 +402,103 @@ robot.connect()
 
     with pytest.raises(RuntimeError, match='.*robot.connect.*'):
         main_router.session_manager.create('calls-connect', proto)
+
+
+@pytest.mark.parametrize('protocol_file', ['testosaur_v2.py'])
+def test_simulation_cache(session_manager, protocol, protocol_file):
+    first = session_manager.create(name='<blank>', contents=protocol.text)
+    assert session_manager.simulation_cache_metrics()['misses'] == 1
+    second = session_manager.create(name='<blank>', contents=protocol.text)
+    metrics = session_manager.simulation_cache_metrics()
+    assert metrics['hits'] == 1
+    assert metrics['entries'] == 1
+    assert second.commands == first.commands
+    assert [(c.name, c.type, c.slot) for c in second.containers]\
+        == [(c.name, c.type, c.slot) for c in first.containers]
+    assert [(i.name, i.mount, [c.type for c in i.containers])
+            for i in second.instruments]\
+        == [(i.name, i.mount, [c.type for c in i.containers])
+            for i in first.instruments]
+    assert [(m.model, m.slot) for m in second.modules]\
+        == [(m.model, m.slot) for m in first.modules]
+    # but every session has its own objects to calibrate and run with
+    assert second._simulating_ctx is not first._simulating_ctx
+    assert not {c.id for c in second.containers}\
+        & {c.id for c in first.containers}
+    assert not {i.id for i in second.instruments}\
+        & {i.id for i in first.instruments}
+
+    second.refresh()
+    assert session_manager.simulation_cache_metrics()['hits'] == 2
+
+    changed = protocol.text + '\n# a comment changes the key\n'
+    session_manager.create(name='<blank>', contents=changed)
+    assert session_manager.simulation_cache_metrics()['misses'] == 2
+
+
+def test_simulation_cache_restores_modules(session_manager):
+    proto = """
+metadata = {'apiLevel': '2.0'}
+
+def run(ctx):
+    tips = ctx.load_labware('opentrons_96_tiprack_300ul', 1, 'tips')
+    mod = ctx.load_module('tempdeck', 3)
+    plate = mod.load_labware('corning_96_wellplate_360ul_flat', 'samples')
+    pip = ctx.load_instrument('p300_single', 'right', tip_racks=[tips])
+    pip.pick_up_tip()
+    pip.aspirate(10, plate['A1'])
+    pip.dispense(10, plate['B1'])
+    pip.drop_tip()
+"""
+
+    def describe(session):
+        return ([(c.name, c.type, c.slot, c.position is not None)
+                 for c in session.containers],
+                [(i.name, i.mount, [c.name for c in i.containers],
+                  [c.name for c in i.tip_racks])
+                 for i in session.instruments],
+                [(m.name, m.model, m.slot) for m in session.modules])
+
+    first = session_manager.create(name='<blank>', contents=proto)
+    second = session_manager.create(name='<blank>', contents=proto)
+    assert session_manager.simulation_cache_metrics()['hits'] == 1
+    assert describe(second) == describe(first)
+    assert ('samples', 'corning_96_wellplate_360ul_flat', '3', True)\
+        in describe(second)[0]
+    ctx = second._simulating_ctx
+    assert ctx.loaded_modules[3].labware.name == 'samples'
+    assert ctx.loaded_instruments['right'].tip_racks[0].name == 'tips'
+
+
+@pytest.mark.parametrize('protocol_file', ['testosaur.py'])
+def test_simulation_cache_skips_v1(session_manager, protocol, protocol_file):
+    session_manager.create(name='<blank>', contents=protocol.text)
+    session_manager.create(name='<blank>', contents=protocol.text)
+    metrics = session_manager.simulation_cache_metrics()
+    assert metrics['hits'] == metrics['misses'] == metrics['entries'] == 0
+
+
+@pytest.mark.parametrize('protocol_file', ['testosaur_v2.py'])
+async def test_command_log_is_bounded(
+        loop, hardware, protocol, protocol_file):
+    router = MainRouter(hardware, loop, command_log_size=2)
+    manager = router.session_manager
+    assert manager.get_command_log() is None
+    session = manager.create(name='<blank>', contents=protocol.text)
+
+    await loop.run_in_executor(None, session.run)
+    total = session.command_log.total
+    assert total > 2
+    assert list(session.command_log.keys()) == list(range(total - 2, total))
+    assert session._snapshot()['payload']['lastCommand']['id'] == total - 1
+
+    page = manager.get_command_log(start=0, count=2)
+    assert page['firstAvailable'] == total - 2
+    assert page['total'] == total
+    assert [entry['id'] for entry in page['entries']]\
+        == [total - 2, total - 1]
+    assert page['entries'][0]['description']\
+        == session._command_list[total - 2]['description']
+
+    latest = manager.get_command_log(count=1)
+    assert [entry['id'] for entry in latest['entries']] == [total - 1]
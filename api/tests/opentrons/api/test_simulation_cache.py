@@ -0,0 +1,73 @@
+import json
+
+from opentrons.api import simulation_cache
+from opentrons.config import CONFIG
+from opentrons.protocol_api import ProtocolContext, labware
+from opentrons.protocols.parse import parse
+
+
+def _result(name):
+    return simulation_cache.SimulationResult(
+        commands=[name], loaded_modules=[], loaded_labware=[],
+        loaded_instruments=[], instruments=[], containers=[],
+        modules=[], interactions=[])
+
+
+def test_lru_eviction():
+    cache = simulation_cache.SimulationCache(max_entries=2)
+    cache.put('a', _result('a'))
+    cache.put('b', _result('b'))
+    assert cache.get('a').commands == ['a']
+    cache.put('c', _result('c'))
+    assert cache.get('b') is None
+    assert cache.get('a').commands == ['a']
+    assert cache.get('c').commands == ['c']
+    assert cache.metrics() == {
+        'hits': 3, 'misses': 1, 'evictions': 1,
+        'entries': 2, 'maxEntries': 2}
+
+
+def test_key_inputs(config_tempdir):
+    proto = parse("metadata = {'apiLevel': '2.0'}\ndef run(ctx): pass\n",
+                  'proto.py')
+    instrs = {'left': {'model': 'p300_single_v1', 'id': 'abc'}}
+    base = simulation_cache.key_for(proto, instrs, [])
+    assert base == simulation_cache.key_for(proto, instrs, [])
+    assert base != simulation_cache.key_for(
+        proto, {'right': {'model': 'p300_single_v1', 'id': 'abc'}}, [])
+    assert base != simulation_cache.key_for(
+        proto, instrs, ['magneticModuleV1'])
+    other = parse("metadata = {'apiLevel': '2.1'}\ndef run(ctx): pass\n",
+                  'proto.py')
+    assert base != simulation_cache.key_for(other, instrs, [])
+
+    with open(CONFIG['feature_flags_file'], 'w') as ff:
+        json.dump({'_version': 1, 'disableHomeOnBoot': True}, ff)
+    assert base != simulation_cache.key_for(proto, instrs, [])
+
+
+def test_describe_and_restore():
+    ctx = ProtocolContext()
+    mod = ctx.load_module('magdeck', 1)
+    plate = mod.load_labware('biorad_96_wellplate_200ul_pcr', 'plate')
+    tips = ctx.load_labware('opentrons_96_tiprack_10ul', 2)
+    pip = ctx.load_instrument('p10_single', 'left', tip_racks=[tips])
+    result = simulation_cache.describe(
+        [{'id': 0}], ctx, [pip], [plate, tips], [mod.geometry],
+        [(pip, plate)])
+    assert result.instruments == [0]
+    assert result.containers == [0, 1]
+
+    other = ProtocolContext()
+    instruments, containers, modules, interactions\
+        = simulation_cache.restore(result, other)
+    assert [lw.name for lw in containers] == ['plate', tips.name]
+    assert containers[0].parent is modules[0]
+    assert modules[0] is other.loaded_modules[1].geometry
+    assert instruments[0].tip_racks == [containers[1]]
+    assert interactions == [(instruments[0], containers[0])]
+
+    # Labware that was never loaded into the context can't be restored
+    loose = labware.load('opentrons_96_tiprack_10ul', ctx.deck.position_for(3))
+    assert simulation_cache.describe(
+        [], ctx, [pip], [loose], [], []) is None
@@ -1,4 +1,7 @@
+import asyncio
+
 from opentrons import commands
+from opentrons.broker import NotificationCoalescer
 from opentrons.commands import CommandPublisher
 
 
@@ -66,3 +69,68 @@ def test_add_listener():
     fake_obj.A(0, 2)
 
     assert calls == expected, 'No calls expected after unsubscribe()'
+
+
+async def test_coalesce_notifications(loop):
+    def snapshot(state, version):
+        return {'topic': 'session',
+                'payload': {'state': state, 'version': version}}
+
+    received = []
+    coalescer = NotificationCoalescer(received.append, window=0.5, loop=loop)
+
+    for version in range(10):
+        coalescer.submit(snapshot('running', version))
+    coalescer.submit('not a snapshot')
+    # The first update is sent right away, the rest wait for the window
+    assert received == [snapshot('running', 0), 'not a snapshot']
+
+    await asyncio.sleep(0.6)
+    # and are merged into the latest one
+    assert received[2:] == [snapshot('running', 9)]
+
+    # State changes skip the window
+    coalescer.submit(snapshot('running', 10))
+    coalescer.submit(snapshot('finished', 10))
+    assert received[3:] == [snapshot('finished', 10)]
+
+    coalescer.submit(snapshot('finished', 11))
+    coalescer.submit(snapshot('finished', 12))
+    assert received[4:] == [snapshot('finished', 11), snapshot('finished', 12)]
+    assert coalescer.metrics() == {
+        'received': 15, 'delivered': 6, 'coalesced': 9, 'immediate': 3,
+        'pending': 0, 'window': 0.5}
+
+
+async def test_coalesce_command_progress(loop):
+    def handled(command):
+        return {'id': command, 'handledAt': command * 10}
+
+    def progress(command, state='running'):
+        return {'topic': 'session',
+                'payload': {'state': state,
+                            'lastCommand': handled(command)}}
+
+    received = []
+    coalescer = NotificationCoalescer(received.append, window=0.5, loop=loop)
+    coalescer.submit(progress(0))
+    # A burst of updates within the window is sent once, with every
+    # command handled since the last one sent
+    for command in range(1, 6):
+        coalescer.submit(progress(command))
+    coalescer.submit(progress(5))
+    assert received == [progress(0)]
+    await asyncio.sleep(0.6)
+    assert len(received) == 2
+    assert received[1]['payload'] == {
+        'state': 'running', 'lastCommand': handled(5),
+        'handledCommands': [handled(c) for c in range(1, 6)]}
+
+    # A state change is still sent right away, with what was held
+    coalescer.submit(progress(6))
+    coalescer.submit(progress(7, 'paused'))
+    assert received[2:] == [{
+        'topic': 'session',
+        'payload': {'state': 'paused', 'lastCommand': handled(7),
+                    'handledCommands': [handled(6), handled(7)]}}]
+    assert coalescer.metrics()['pending'] == 0
@@ -1,3 +1,6 @@
+import json
+import os
+
 import pytest
 from unittest.mock import patch
 
@@ -21,7 +24,9 @@ def mock_read_settings_file(mock_settings_values, mock_settings_version):
             advanced_settings.SettingsData(
                 settings_map=mock_settings_values,
                 version=mock_settings_version)
+        advanced_settings.invalidate_cache()
         yield p
+    advanced_settings.invalidate_cache()
 
 
 @pytest.fixture
@@ -169,3 +174,67 @@ async def test_disable_log_integration_side_effect_error(loop):
             s = advanced_settings.DisableLogIntegrationSettingDefinition()
             with pytest.raises(advanced_settings.SettingException):
                 await s.on_change(True)
+
+
+def test_settings_are_cached(restore_restart_required):
+    with patch("opentrons.config.advanced_settings._read_settings_file",
+               wraps=advanced_settings._read_settings_file) as read:
+        assert advanced_settings.get_setting_with_env_overload(
+            'shortFixedTrash') is False
+        for _ in range(10):
+            advanced_settings.get_adv_setting('shortFixedTrash')
+            advanced_settings.get_setting_with_env_overload('useFastApi')
+        # Once to create the file, once more since creating it changed it
+        assert read.call_count <= 2
+        read.reset_mock()
+        for _ in range(10):
+            advanced_settings.get_all_adv_settings()
+        read.assert_not_called()
+
+
+async def test_set_adv_setting_updates_cache(loop):
+    with patch("opentrons.config.advanced_settings._read_settings_file",
+               wraps=advanced_settings._read_settings_file) as read:
+        await advanced_settings.set_adv_setting('shortFixedTrash', True)
+        read.reset_mock()
+        assert advanced_settings.get_setting_with_env_overload(
+            'shortFixedTrash') is True
+        assert advanced_settings.get_adv_setting(
+            'short-fixed-trash').value is True
+        read.assert_not_called()
+        await advanced_settings.set_adv_setting('shortFixedTrash', None)
+    assert advanced_settings.get_setting_with_env_overload(
+        'shortFixedTrash') is False
+
+
+def test_settings_file_changes_invalidate_cache():
+    assert advanced_settings.get_setting_with_env_overload(
+        'disableHomeOnBoot') is False
+    settings_file = CONFIG['feature_flags_file']
+    with open(settings_file, 'w') as f:
+        # Not the same size as what was there, so that this is noticed even
+        # if the file system's timestamps are coarse
+        json.dump({'_version': 4, 'disableHomeOnBoot': True,
+                   'padding': 'x' * 100}, f)
+    assert advanced_settings.get_setting_with_env_overload(
+        'disableHomeOnBoot') is True
+    # The environment still takes precedence
+    with patch("os.environ",
+               new={"OT_API_FF_disableHomeOnBoot": "false"}):
+        assert advanced_settings.get_setting_with_env_overload(
+            'disableHomeOnBoot') is False
+    os.remove(settings_file)
+    assert advanced_settings.get_setting_with_env_overload(
+        'disableHomeOnBoot') is False
+
+
+@pytest.mark.parametrize('value', [True, False, None])
+async def test_enable_metrics_side_effect(loop, value):
+    from opentrons.util import metrics
+    metrics.enable(not value)
+    try:
+        await advanced_settings.EnableMetricsSettingDefinition()\
+            .on_change(value)
+        assert metrics.is_enabled() is bool(value)
+    finally:
+        metrics.enable(False)
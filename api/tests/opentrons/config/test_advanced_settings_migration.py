@@ -1,7 +1,7 @@
 from opentrons.config.advanced_settings import _migrate, _ensure
 
 
-good_file_version = 3
+good_file_version = 5
 good_file_settings = {
     'shortFixedTrash': None,
     'calibrateToBottom': None,
@@ -12,6 +12,8 @@ good_file_settings = {
     'enableApi1BackCompat': None,
     'useProtocolApi2': None,
     'useFastApi': None,
+    'useCameraCaptureWorker': None,
+    'enableMetrics': None,
 }
 
 
@@ -41,7 +43,9 @@ def test_migrates_versionless_new_config():
       'disableLogAggregation': None,
       'enableApi1BackCompat': None,
       'useProtocolApi2': None,
-      'useFastApi': None
+      'useFastApi': None,
+      'useCameraCaptureWorker': None,
+      'enableMetrics': None
     }
 
 
@@ -63,7 +67,9 @@ def test_migrates_versionless_old_config():
       'disableLogAggregation': None,
       'enableApi1BackCompat': None,
       'useProtocolApi2': None,
-      'useFastApi': None
+      'useFastApi': None,
+      'useCameraCaptureWorker': None,
+      'enableMetrics': None
     }
 
 
@@ -97,6 +103,8 @@ def test_migrates_v1_config():
         'disableLogAggregation': None,
         'useProtocolApi2': None,
         'enableApi1BackCompat': None,
+        'useCameraCaptureWorker': None,
+        'enableMetrics': None,
     }
 
 
@@ -123,6 +131,8 @@ def test_migrates_v2_config():
         'disableLogAggregation': False,
         'useProtocolApi2': None,
         'enableApi1BackCompat': None,
+        'useCameraCaptureWorker': None,
+        'enableMetrics': None,
     }
 
 
@@ -148,6 +158,36 @@ def test_migrates_v3_config():
         'disableLogAggregation': False,
         'useProtocolApi2': None,
         'enableApi1BackCompat': False,
+        'useCameraCaptureWorker': None,
+        'enableMetrics': None,
+    }
+
+
+def test_migrates_v4_config():
+    settings, version = _migrate({
+        '_version': 4,
+        'shortFixedTrash': True,
+        'calibrateToBottom': True,
+        'deckCalibrationDots': False,
+        'disableHomeOnBoot': True,
+        'useProtocolApi2': None,
+        'useOldAspirationFunctions': True,
+        'disableLogAggregation': False,
+        'enableApi1BackCompat': False,
+        'useCameraCaptureWorker': True
+    })
+    assert version == good_file_version
+    assert settings == {
+        'shortFixedTrash': True,
+        'calibrateToBottom': True,
+        'deckCalibrationDots': False,
+        'disableHomeOnBoot': True,
+        'useOldAspirationFunctions': True,
+        'disableLogAggregation': False,
+        'useProtocolApi2': None,
+        'enableApi1BackCompat': False,
+        'useCameraCaptureWorker': True,
+        'enableMetrics': None,
     }
 
 
@@ -165,5 +205,7 @@ def test_ensures_config():
              'useOldAspirationFunctions': None,
              'disableLogAggregation': True,
              'useProtocolApi2': None,
-             'useFastApi': None
+             'useFastApi': None,
+             'useCameraCaptureWorker': None,
+             'enableMetrics': None
          }
@@ -316,3 +316,50 @@ async def test_incorrect_modify_pipette_settings(attached_pipettes):
         # check over max fails
         pipette_config.override(pipette_id=attached_pipettes['left']['id'],
                                 fields=out_of_range)
+
+
+def test_specs_parsed_once():
+    assert pipette_config.model_config() is pipette_config.model_config()
+    assert pipette_config.name_config() is pipette_config.name_config()
+    with pytest.raises(TypeError):
+        pipette_config.configs['p300_single_v1']['name'] = 'p10_single'
+    assert pipette_config.configs['p300_single_v1']['name'] == 'p300_single'
+
+
+def test_load_cached_until_overrides_saved(config_tempdir):
+    pip_id = 'cachedpipette'
+    first = pipette_config.load('p300_single_v1.5', pip_id)
+    assert pipette_config.load('p300_single_v1.5', pip_id) is first
+    # Other pipettes of the same model are unaffected by overrides
+    other = pipette_config.load('p300_single_v1.5', 'otherpipette')
+
+    pipette_config.override(pip_id, {'pickUpCurrent': 0.2})
+    changed = pipette_config.load('p300_single_v1.5', pip_id)
+    assert changed.pick_up_current == 0.2
+    assert pipette_config.load('p300_single_v1.5', 'otherpipette') is other
+    assert other.pick_up_current == first.pick_up_current
+    assert pipette_config.configs['p300_single_v1.5']['pickUpCurrent'][
+        'value'] == first.pick_up_current
+
+
+@pytest.mark.parametrize('pipette_model', pipette_config.config_models)
+def test_volume_conversion(pipette_model):
+    for functions in pipette_config.configs[pipette_model]['ulPerMm']:
+        for action in ('aspirate', 'dispense'):
+            sequence = functions[action]
+            conversion = pipette_config.VolumeConversion(sequence)
+            max_volume = sequence[-1][0]
+            volumes = [piece[0] for piece in sequence]\
+                + [max_volume * i / 97 for i in range(1, 98)]
+            expected = [pipette_config.piecewise_volume_conversion(
+                volume, sequence) for volume in volumes]
+            assert [conversion.ul_per_mm(volume) for volume in volumes]\
+                == expected
+            assert list(conversion.ul_per_mm_array(volumes)) == expected
+            assert list(conversion.travel_mm(volumes))\
+                == pytest.approx([volume / ul_per_mm for volume, ul_per_mm
+                                  in zip(volumes, expected)])
+            with pytest.raises(IndexError):
+                conversion.ul_per_mm(max_volume + 1)
+            with pytest.raises(IndexError):
+                conversion.ul_per_mm_array([1, max_volume + 1])
@@ -1,5 +1,6 @@
 from math import pi
-from opentrons.legacy_api.containers.placeable import Deck, Slot
+from opentrons.legacy_api.containers.placeable import (
+    Deck, Slot, Well, WellSeries)
 
 from tests.opentrons import generate_plate
 # TODO: Revise to use new Labware and Well classes
@@ -25,3 +26,74 @@ def test_well_from_center():
     assert plate['B2'].from_center(r=1.0, theta=pi / 2, h=5.0) == (5, 10, 60)
     assert plate['B2'].top()[1] == (5, 5, 20)
     assert plate['B2'].bottom()[1] == (5, 5, 0)
+
+
+def test_coordinates_follow_moves():
+    deck = Deck()
+    slot = Slot()
+    plate = generate_plate(
+        wells=4,
+        cols=2,
+        spacing=(10, 10),
+        offset=(0, 0),
+        radius=5,
+        height=20
+    )
+    deck.add(slot, 'A1', (100, 0, 0))
+    slot.add(plate)
+    well = plate['B2']
+
+    assert well.coordinates() == (110, 10, 0)
+    assert well.coordinates(plate) == (10, 10, 0)
+    # Moving an ancestor moves the cached absolute position
+    slot._coordinates = slot._coordinates + (0, 50, 0)
+    assert well.coordinates() == (110, 60, 0)
+    assert well.coordinates(plate) == (10, 10, 0)
+    # So does moving to a new parent
+    other = Slot()
+    deck.add(other, 'A2', (200, 0, 0))
+    other.add(plate, 'moved')
+    assert well.coordinates() == (210, 10, 0)
+    assert well.center(reference=deck) == (215, 15, 10)
+
+
+def test_grid_from_added_wells():
+    plate = generate_plate(
+        wells=4,
+        cols=2,
+        spacing=(10, 10),
+        offset=(0, 0),
+        radius=5,
+        height=20
+    )
+    assert plate.cols['1']['B'] is plate['B1']
+    assert plate.rows['A']['2'] is plate['A2']
+    well = Well(properties={'radius': 5, 'height': 20})
+    plate.add(well, 'A3', (0, 20, 0))
+    plate.add(Well(), 'trash')
+    assert plate.cols['3']['A'] is well
+    assert list(plate.get_grid()) == ['1', '2', '3']
+
+
+def test_well_series_follows_offset():
+    deck = Deck()
+    slot = Slot()
+    plate = generate_plate(
+        wells=4,
+        cols=2,
+        spacing=(10, 10),
+        offset=(0, 0),
+        radius=5,
+        height=20
+    )
+    deck.add(slot, 'A1', (100, 0, 0))
+    slot.add(plate)
+    series = WellSeries([plate['A1'], plate['A2']])
+
+    assert series.coordinates() == (100, 0, 0)
+    series.set_offset(1)
+    assert series.coordinates() == (100, 10, 0)
+    assert series.coordinates(plate) == (0, 10, 0)
+    series.set_offset(0)
+    assert series.coordinates() == (100, 0, 0)
+    assert series.get_grid() == {}
@@ -60,3 +60,56 @@ def test_invalid_container_name(robot):
     error_type = ValueError
     with pytest.raises(error_type):
         database.load_container("fake_container")
+
+
+def test_shared_connection(config_tempdir):
+    with database._db() as first:
+        with database._db() as second:
+            assert first is second
+        assert first.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+
+
+def test_container_templates_cached(config_tempdir, monkeypatch):
+    plate = database.load_container('96-flat')
+    calls = []
+    monkeypatch.setattr(database.db_queries, 'get_container_by_name',
+                        lambda *args: calls.append(args))
+    again = database.load_container('96-flat')
+    assert not calls
+    # Every load gets its own containers to place
+    assert again is not plate
+    assert again[0] is not plate[0]
+    assert [well.properties for well in again]\
+        == [well.properties for well in plate]
+    assert [well._coordinates for well in again]\
+        == [well._coordinates for well in plate]
+
+
+def test_overwrite_and_delete_uncache(config_tempdir):
+    plate = database.load_container('96-flat')
+    plate._coordinates = Vector(1, 2, 3)
+    database.overwrite_container(plate)
+    assert database.load_container('96-flat')._coordinates == (1, 2, 3)
+    database.delete_container('96-flat')
+    with pytest.raises(ValueError):
+        database.load_container('96-flat')
+
+
+def test_save_new_container(config_tempdir):
+    plate = database.load_container('96-flat')
+    database.save_new_container(plate, 'my-96-flat')
+    assert 'my-96-flat' in database.list_all_containers()
+    mine = database.load_container('my-96-flat')
+    assert [(well.get_name(), well.properties) for well in mine]\
+        == [(well.get_name(), well.properties) for well in plate]
+    assert [c for well in mine for c in well._coordinates]\
+        == pytest.approx([c for well in plate for c in well._coordinates])
+
+
+def test_migrates_on_first_use(tmpdir, monkeypatch):
+    from opentrons import config
+    monkeypatch.setattr(database, '_migrated', False)
+    monkeypatch.setitem(config.CONFIG, 'labware_database_file',
+                        str(tmpdir.join('opentrons.db')))
+    assert 'fixed-trash' in database.list_all_containers()
+    assert database._migrated
@@ -0,0 +1,94 @@
+import asyncio
+import math
+import struct
+
+import pytest
+
+from opentrons import types
+from opentrons.drivers.smoothie_drivers import telemetry
+from opentrons.drivers.smoothie_drivers.telemetry import (
+    MotionEvent, MotionTelemetry, RECORD_DTYPE, RECORD_FORMAT)
+from opentrons.hardware_control import API
+
+
+def record(buffer, seq):
+    buffer.record(MotionEvent.MOVE, seq, seq + 0.25, seq + 1,
+                  {'X': seq, 'B': 2.5}, 400, {'X': 1.25})
+
+
+def test_record_layout():
+    assert struct.calcsize(RECORD_FORMAT) == RECORD_DTYPE.itemsize
+    buffer = MotionTelemetry(capacity=4)
+    record(buffer, 0)
+    buffer.record(MotionEvent.HOME, 1, 2, 3, {'Z': 218})
+    first, second = (
+        struct.unpack_from(RECORD_FORMAT, buffer.dump(), offset)
+        for offset in (0, RECORD_DTYPE.itemsize))
+    # sequence, event, start, acked, end, speed, target X, target Y
+    assert first[:7] == (0, MotionEvent.MOVE, 0, 0.25, 1, 400, 0)
+    assert [math.isnan(v) for v in first[7:12]]\
+        == [True, True, True, False, True]
+    assert first[10] == 2.5
+    assert first[12] == 1.25
+    assert all(math.isnan(v) for v in first[13:])
+    assert second[:5] == (1, MotionEvent.HOME, 1, 2, 3)
+    assert math.isnan(second[5])
+    assert second[8] == 218
+
+    records = buffer.records()
+    assert list(records['sequence']) == [0, 1]
+    assert list(records['event']) == [MotionEvent.MOVE, MotionEvent.HOME]
+
+
+def test_wraps_around():
+    buffer = MotionTelemetry(capacity=4)
+    assert buffer.dump() == b''
+    for seq in range(10):
+        record(buffer, seq)
+    assert buffer.sequence == 10
+    assert list(buffer.records()['sequence']) == [6, 7, 8, 9]
+    assert list(buffer.records(8)['sequence']) == [8, 9]
+    assert list(buffer.records(2)['sequence']) == [6, 7, 8, 9]
+    assert buffer.dump(10) == b''
+    assert list(buffer.records()['start']) == [6, 7, 8, 9]
+    record(buffer, 10)
+    assert list(buffer.records()['sequence']) == [7, 8, 9, 10]
+
+    buffer.clear()
+    assert buffer.dump() == b''
+    record(buffer, 11)
+    assert list(buffer.records()['sequence']) == [11]
+
+    with pytest.raises(ValueError):
+        MotionTelemetry(capacity=0)
+
+
+async def test_stream(loop):
+    buffer = MotionTelemetry(capacity=8)
+    record(buffer, 0)
+    events = telemetry.stream(buffer, interval=0.01)
+    next_events = loop.create_task(events.__anext__())
+    await asyncio.sleep(0.05)
+    # Events from before the stream started are not sent
+    assert not next_events.done()
+    record(buffer, 1)
+    record(buffer, 2)
+    assert await next_events == buffer.dump(1)
+    record(buffer, 3)
+    assert await events.__anext__() == buffer.dump(3)
+    await events.aclose()
+
+    events = telemetry.stream(buffer, since=2, interval=0.01)
+    assert await events.__anext__() == buffer.dump(2)
+    await events.aclose()
+
+
+async def test_simulator_records_motion(loop):
+    hardware = await API.build_hardware_simulator(loop=loop)
+    await hardware.home()
+    await hardware.move_to(types.Mount.RIGHT, types.Point(50, 50, 100),
+                           speed=100)
+    records = hardware.telemetry.records()
+    assert list(records['event'][:1]) == [MotionEvent.HOME]
+    assert records['event'][-1] == MotionEvent.MOVE
+    assert records['speed'][-1] == 100
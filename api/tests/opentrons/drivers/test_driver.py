@@ -4,14 +4,14 @@ from unittest.mock import Mock
 import pytest
 from time import sleep
 
-from numpy import isclose
+from numpy import isclose, isnan
 
 from opentrons.trackers import pose_tracker
 from tests.opentrons.conftest import fuzzy_assert
 from opentrons.config.robot_configs import (
     DEFAULT_GANTRY_STEPS_PER_MM, DEFAULT_PIPETTE_CONFIGS)
 from opentrons.drivers import serial_communication, utils, types
-from opentrons.drivers.smoothie_drivers import driver_3_0
+from opentrons.drivers.smoothie_drivers import driver_3_0, telemetry
 
 
 def position(x, y, z, a, b, c):
@@ -1143,3 +1143,32 @@ def test_per_move_speed(smoothie, robot, monkeypatch):
     smoothie.move({'Y': 100}, speed=100)
     assert command_log[0]\
         == 'G0F6000 M907 A0.1 B0.05 C0.05 X0.3 Y1.25 Z0.1 G4P0.005 G0Y100 G0F24000'  # noqa(E501)
+
+
+def test_move_telemetry(smoothie, monkeypatch):
+    smoothie.simulating = False
+    monkeypatch.setattr(smoothie, '_send_command',
+                        lambda command, **kwargs: None)
+    smoothie.configure_splits_for({'B': types.MoveSplit(
+        split_distance=1, split_current=1.5, split_speed=0.5, after_time=0,
+        fullstep=False)})
+    start = smoothie.telemetry.sequence
+    smoothie.move({'X': 100, 'B': 10}, speed=50)
+    split, move = smoothie.telemetry.records(start)
+    assert split['event'] == telemetry.MotionEvent.SPLIT
+    assert split['speed'] == 0.5
+    assert isnan(split['target'][0])
+    assert split['target'][4] == 1
+    assert split['current'][4] == 1.5
+    assert move['event'] == telemetry.MotionEvent.MOVE
+    assert move['speed'] == 50
+    assert list(move['target'][[0, 4]]) == [100, 10]
+    assert move['current'][4] == pytest.approx(smoothie.current['B'])
+    assert split['start'] <= split['end'] <= move['start'] <= move['end']
+
+    smoothie.simulating = True
+    start = smoothie.telemetry.sequence
+    smoothie.home('Z')
+    home, = smoothie.telemetry.records(start)
+    assert home['event'] == telemetry.MotionEvent.HOME
+    assert home['target'][2] == smoothie.homed_position['Z']
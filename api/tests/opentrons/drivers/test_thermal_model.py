@@ -0,0 +1,103 @@
+import pytest
+
+from opentrons.drivers.thermal_model import (
+    AMBIENT_TEMPERATURE, ThermalModel, ThermalProfile, VirtualClock)
+
+PROFILE = ThermalProfile(heating_rate=2.0, cooling_rate=1.0,
+                         time_constant=5.0, time_constant_per_ul=0.1,
+                         passive_time_constant=100.0, tolerance=0.5)
+
+
+@pytest.fixture
+def clock():
+    return VirtualClock()
+
+
+@pytest.fixture
+def model(clock):
+    return ThermalModel(PROFILE, clock)
+
+
+def test_clock(clock):
+    assert clock.time() == 0
+    clock.advance(2.5)
+    clock.advance(-1)
+    assert clock.time() == 2.5
+
+
+def test_idle(model, clock):
+    assert model.temperature == AMBIENT_TEMPERATURE
+    assert model.target is None
+    assert model.status == 'idle'
+    assert model.time_to_target() == 0
+    clock.advance(1000)
+    assert model.temperature == AMBIENT_TEMPERATURE
+
+
+def test_heat(model, clock):
+    model.set_target(95)
+    assert model.status == 'heating'
+    # Heating is limited by the ramp rate until the error is down to
+    # rate * time constant, and then approaches the target exponentially
+    clock.advance(10)
+    assert model.temperature == pytest.approx(45)
+    clock.advance(20)
+    assert model.temperature == pytest.approx(85)
+    clock.advance(5)
+    assert model.temperature == pytest.approx(95 - 10 / 2.718281828, 0.01)
+    assert model.status == 'heating'
+
+    wait = model.time_to_target()
+    assert wait == pytest.approx(5 * 2.995732 - 5, 0.001)
+    clock.advance(wait)
+    assert model.status == 'holding at target'
+    assert model.temperature == 95
+    assert model.time_to_target() == 0
+
+
+def test_cool_with_ramp_rate_and_volume(model, clock):
+    model.set_target(15, ramp_rate=0.5, volume=50)
+    assert model.status == 'cooling'
+    clock.advance(10)
+    assert model.temperature == pytest.approx(20)
+    # The ramp rate is below the profile's, and the samples slow the final
+    # approach: 10 s of ramp to 5 C away, then 10 s per e-fold
+    assert model.time_to_target() == pytest.approx(10 * 2.302585, 0.001)
+
+    slow = ThermalModel(PROFILE, clock)
+    slow.set_target(95, volume=100)
+    fast = ThermalModel(PROFILE, clock)
+    fast.set_target(95)
+    assert slow.time_to_target() > fast.time_to_target()
+
+
+def test_time_to_reach(model, clock):
+    model.set_target(95)
+    assert model.time_to_reach(45) == pytest.approx(10)
+    assert model.time_to_reach(25) == 0
+    assert model.time_to_reach(20) == 0
+    assert model.time_to_reach(96) is None
+    assert model.time_to_reach(94.8) == pytest.approx(
+        model.time_to_target())
+    clock.advance(12)
+    assert model.time_to_reach(45) == 0
+    assert model.time_to_reach(55) == pytest.approx(3)
+    model.deactivate()
+    assert model.time_to_reach(55) is None
+
+
+def test_retarget_and_deactivate(model, clock):
+    model.set_target(95)
+    clock.advance(10)
+    model.set_target(35)
+    assert model.temperature == pytest.approx(45)
+    assert model.status == 'cooling'
+    clock.advance(model.time_to_target())
+    assert model.temperature == 35
+
+    model.deactivate()
+    assert model.target is None
+    assert model.status == 'idle'
+    assert model.temperature == 35
+    clock.advance(100)
+    assert model.temperature == pytest.approx(25 + 10 / 2.718281828)
@@ -1,4 +1,6 @@
 import asyncio
+import pytest
+from opentrons.drivers.thermal_model import AMBIENT_TEMPERATURE
 from opentrons.hardware_control import modules, ExecutionManager
 from opentrons.hardware_control.modules import tempdeck
 
@@ -20,7 +22,7 @@ async def test_sim_state(loop):
                                interrupt_callback=lambda x: None,
                                loop=loop,
                                execution_manager=ExecutionManager(loop=loop))
-    assert temp.temperature == 0
+    assert temp.temperature == AMBIENT_TEMPERATURE
     assert temp.target is None
     assert temp.status == 'idle'
     assert temp.live_data['status'] == temp.status
@@ -45,11 +47,33 @@ async def test_sim_update(loop):
     assert temp.target == 10
     assert temp.status == 'holding at target'
     await temp.deactivate()
-    assert temp.temperature == 0
+    # The plate only drifts back to ambient as time passes
+    assert temp.temperature == 10
     assert temp.target is None
     assert temp.status == 'idle'
 
 
+async def test_sim_await_temperature(loop):
+    temp = await modules.build(port='/dev/ot_module_sim_tempdeck0',
+                               which='tempdeck',
+                               simulating=True,
+                               interrupt_callback=lambda x: None,
+                               loop=loop,
+                               execution_manager=ExecutionManager(loop=loop))
+    clock = temp._driver.clock
+    await temp.start_set_temperature(4)
+    assert temp.status == 'cooling'
+    assert clock.time() == 0
+    await asyncio.wait_for(temp.await_temperature(15), 0.2)
+    assert temp.temperature == pytest.approx(15)
+    assert temp.status == 'cooling'
+    partway = clock.time()
+    assert partway > 0
+    await asyncio.wait_for(temp.await_temperature(4), 0.2)
+    assert temp.status == 'holding at target'
+    assert clock.time() > partway
+
+
 async def test_poller(monkeypatch, loop):
     temp = modules.tempdeck.TempDeck(
             port='/dev/ot_module_sim_tempdeck0',
@@ -1,5 +1,6 @@
 import asyncio
 from unittest import mock
+from opentrons.drivers.thermal_model import AMBIENT_TEMPERATURE
 from opentrons.hardware_control import modules, ExecutionManager
 
 
@@ -45,7 +46,7 @@ async def test_sim_state(loop):
                                 loop=loop,
                                 execution_manager=ExecutionManager(loop=loop))
 
-    assert therm.temperature is None
+    assert therm.temperature == AMBIENT_TEMPERATURE
     assert therm.target is None
     assert therm.status == 'idle'
     assert therm.live_data['status'] == therm.status
@@ -74,7 +75,8 @@ async def test_sim_update(loop):
     assert therm.status == 'holding at target'
     await asyncio.wait_for(therm.wait_for_temp(), timeout=0.2)
     await therm.deactivate_block()
-    assert therm.temperature is None
+    # The block only drifts back to ambient as time passes
+    assert therm.temperature == 10
     assert therm.target is None
     assert therm.status == 'idle'
 
@@ -83,7 +85,7 @@ async def test_sim_update(loop):
     assert therm.lid_target == 80
     await asyncio.wait_for(therm.wait_for_lid_temp(), timeout=0.2)
     await therm.deactivate_lid()
-    assert therm.lid_temp is None
+    assert therm.lid_temp == 80
     assert therm.lid_target is None
 
     await therm.set_temperature(temperature=10, volume=60, hold_time_seconds=2)
@@ -95,13 +97,71 @@ async def test_sim_update(loop):
     assert therm.lid_temp == 70
     assert therm.lid_target == 70
     await therm.deactivate()
-    assert therm.temperature is None
+    assert therm.temperature == 10
     assert therm.target is None
     assert therm.status == 'idle'
-    assert therm.lid_temp is None
+    assert therm.lid_temp == 70
     assert therm.lid_target is None
 
 
+async def test_sim_timing(loop):
+    therm = await modules.build(port='/dev/ot_module_sim_thermocycler0',
+                                which='thermocycler',
+                                simulating=True,
+                                interrupt_callback=lambda x: None,
+                                loop=loop,
+                                execution_manager=ExecutionManager(loop=loop))
+    clock = therm._driver.clock
+
+    await therm._driver.set_lid_temperature(105)
+    assert therm.lid_temp == AMBIENT_TEMPERATURE
+    assert therm.lid_temp_status == 'heating'
+    await therm.wait_for_lid_temp()
+    assert therm.lid_temp == 105
+    lid_time = clock.time()
+    assert lid_time > 200
+
+    await therm._driver.set_temperature(95, hold_time=30)
+    assert therm.hold_time == 30
+    await therm.wait_for_temp()
+    assert therm.temperature == 95
+    assert therm.hold_time == 30
+    clock.advance(10)
+    assert therm.hold_time == 20
+    await therm.wait_for_hold()
+    assert therm.hold_time == 0
+
+    # Larger volumes take longer to settle
+    start = clock.time()
+    await therm._driver.set_temperature(4, volume=10)
+    await therm.wait_for_temp()
+    small = clock.time() - start
+    await therm._driver.set_temperature(95)
+    await therm.wait_for_temp()
+    start = clock.time()
+    await therm._driver.set_temperature(4, volume=100)
+    await therm.wait_for_temp()
+    assert clock.time() - start > small
+
+
+async def test_sim_cycles(loop):
+    therm = await modules.build(port='/dev/ot_module_sim_thermocycler0',
+                                which='thermocycler',
+                                simulating=True,
+                                interrupt_callback=lambda x: None,
+                                loop=loop,
+                                execution_manager=ExecutionManager(loop=loop))
+    steps = [{'temperature': 95, 'hold_time_seconds': 15},
+             {'temperature': 60, 'hold_time_seconds': 30},
+             {'temperature': 72, 'hold_time_seconds': 60}]
+    # 30 cycles of holds alone take 52.5 minutes, but the clock skips ahead
+    await asyncio.wait_for(
+        therm.cycle_temperatures(steps, repetitions=30, volume=25),
+        timeout=5)
+    assert therm.temperature == 72
+    assert therm._driver.clock.time() > 30 * 105
+
+
 async def test_set_temperature(monkeypatch, loop):
     hw_tc = await modules.build(port='/dev/ot_module_sim_thermocycler0',
                                 which='thermocycler',
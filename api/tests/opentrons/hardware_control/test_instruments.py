@@ -537,3 +537,15 @@ async def test_blowout_flow_rate(dummy_instruments, loop, monkeypatch):
         pip.config.blow_out,
         speed=15
     )
+
+
+async def test_plunger_positions(dummy_instruments, loop):
+    hw_api = await hc.API.build_hardware_simulator(
+        attached_instruments=dummy_instruments, loop=loop)
+    await hw_api.cache_instruments()
+    pip = hw_api._attached_instruments[types.Mount.LEFT]
+    volumes = [0.5, 1, 2.5, 5, pip.config.max_volume]
+    for action in ('aspirate', 'dispense'):
+        assert hw_api.plunger_positions(types.Mount.LEFT, volumes, action)\
+            == pytest.approx([hw_api._plunger_position(pip, volume, action)
+                              for volume in volumes])
@@ -243,3 +243,79 @@ def test_serializers(paramtype, native, serializable):
     serdes = sockserv._SERDES[paramtype]
     assert serdes.serializer(native) == serializable
     assert serdes.deserializer(serializable) == native
+
+
+def test_message_framer():
+    framer = sockserv.MessageFramer(max_size=100)
+    message = b'{"a": "}{\\"[", "b": [{}, []]}'
+    # Split everywhere, including inside escapes
+    received = []
+    for i in range(len(message)):
+        received.extend(framer.feed(message[i:i + 1]))
+    assert received == [(message, False)]
+    # Garbage between messages is skipped; length prefixes are used as is
+    assert framer.feed(b'garbage\n[1, 2]\n7:{"a": 1' + b'}\n') \
+        == [(b'[1, 2]', False), (b'{"a": 1', True)]
+    assert framer.feed(b'2:{}') == [(b'{}', True)]
+    with pytest.raises(sockserv.FramingError):
+        framer.feed(b'1000:')
+    with pytest.raises(sockserv.FramingError):
+        sockserv.MessageFramer(max_size=10).feed(b'{"too": "long"')
+
+
+async def test_length_prefixed_and_batch(hc_stream_server, loop,
+                                         monkeypatch):
+    sock, server = hc_stream_server
+    calls = []
+
+    async def fake_delay(obj, duration_s):
+        calls.append(('start', duration_s))
+        # The later, shorter calls would finish first if run concurrently
+        await asyncio.sleep(duration_s)
+        calls.append(('end', duration_s))
+        return duration_s
+
+    monkeypatch.setattr(
+        server._api, 'delay', MethodType(fake_delay, server._api))
+    server._methods = sockserv.build_jrpc_methods(server._api)
+    reader, writer = await asyncio.open_unix_connection(sock)
+
+    request = json.dumps([
+        {'jsonrpc': '2.0', 'method': 'delay',
+         'params': {'duration_s': 0.02}, 'id': 1},
+        {'jsonrpc': '2.0', 'method': 'delay',
+         'params': {'duration_s': 0.01}},
+        {'jsonrpc': '2.0', 'method': 'delay',
+         'params': {'duration_s': 0}, 'id': 2},
+    ]).encode()
+    writer.write(b'%d:' % len(request) + request)
+    length = await reader.readuntil(b':')
+    response = await reader.readexactly(int(length[:-1]))
+    # The notification gets no response
+    assert json.loads(response) == [
+        {'jsonrpc': '2.0', 'result': 0.02, 'id': 1},
+        {'jsonrpc': '2.0', 'result': 0, 'id': 2}]
+    assert calls == [('start', 0.02), ('end', 0.02),
+                     ('start', 0.01), ('end', 0.01),
+                     ('start', 0), ('end', 0)]
+
+    # Raw requests get newline-terminated responses
+    writer.write(json.dumps({'jsonrpc': '2.0', 'method': 'delay',
+                             'params': {'duration_s': 0}, 'id': 3}).encode())
+    assert json.loads(await reader.readline())\
+        == {'jsonrpc': '2.0', 'result': 0, 'id': 3}
+
+
+def test_serdes_plan_is_shared():
+    class Thing:
+        def move(self, mount: Mount, point: Point = Point(0, 0, 0)) -> Point:
+            return point
+
+    one = sockserv._build_serializable_method('move', Thing().move)
+    sockserv._build_serializable_method('move', Thing().move)
+    plan = sockserv._serdes_plan(Thing.move)
+    assert sockserv._serdes_plan.cache_info().hits >= 1
+    assert set(plan.deserializers) == {'mount', 'point'}
+    assert plan.defaults == {'point': Point(0, 0, 0)}
+    assert asyncio.get_event_loop().run_until_complete(
+        one(mount='left', point=[1, 2, 3])) == [1, 2, 3]
@@ -0,0 +1,534 @@
+"""
+Benchmarks of the hot paths of the Python Protocol API v2.
+
+Run every benchmark and compare the results against the stored baseline
+with::
+
+    make -C api bench
+
+or, from ``api/``::
+
+    python -m tests.opentrons.performance.benchmarks [options]
+
+Each benchmark is timed several times (``--repeat``), with its setup (making
+a protocol context, loading labware and so on) done fresh and untimed before
+every run. The results are written as JSON (``--output``, or stdout) and
+compared against a baseline (``--baseline``, by default ``baseline.json``
+next to this file). The process exits with status 1 if any benchmark is
+slower than its baseline by more than its tolerance.
+
+Absolute timings depend on the machine, so every result is also recorded
+relative to a fixed pure-python reference workload timed in the same run,
+and it is the relative timings that are compared. This is not perfect (the
+benchmarks do more than the reference, and do it differently), so the
+tolerances are generous; the point is to catch a path getting several times
+slower, not a few percent. To record a new baseline after an intended
+change, run with ``--update-baseline``.
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import platform
+import re
+import statistics
+import sys
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import (Any, Callable, Dict, Iterable, List, Mapping, Optional,
+                    Sequence)
+
+from opentrons.system.shared_data import load_shared_data
+
+#: Set up a benchmark and return the callable to time
+Setup = Callable[[], Callable[[], Any]]
+
+RESULTS_VERSION = 1
+BASELINE_PATH = Path(__file__).parent / 'baseline.json'
+#: How much slower than its baseline (as a fraction) a benchmark may be,
+#: unless the baseline says otherwise for it
+DEFAULT_TOLERANCE = 0.5
+DEFAULT_REPEAT = 3
+
+_BENCHMARKS: Dict[str, Setup] = OrderedDict()
+#: Called once all the benchmarks have run
+_cleanups: List[Callable[[], Any]] = []
+_rpc_hardware: List[Any] = []
+
+
+def benchmark(name: str) -> Callable[[Setup], Setup]:
+    """ Register a benchmark.
+
+    The decorated function does any setup that should not be timed and
+    returns a callable that runs the code being measured.
+    """
+    def _register(setup: Setup) -> Setup:
+        assert name not in _BENCHMARKS, f'Duplicate benchmark {name}'
+        _BENCHMARKS[name] = setup
+        return setup
+    return _register
+
+
+def benchmark_names() -> List[str]:
+    return list(_BENCHMARKS)
+
+
+def _context():
+    from opentrons.protocol_api import ProtocolContext
+    ctx = ProtocolContext()
+    ctx.home()
+    return ctx
+
+
+# Loading labware --------------------------------------------------------
+
+def _standard_labware() -> List[str]:
+    from opentrons.protocol_api.labware import STANDARD_DEFS_PATH
+    from opentrons.system.shared_data import get_shared_data_root
+    return sorted(entry.name
+                  for entry in os.scandir(
+                      get_shared_data_root() / STANDARD_DEFS_PATH)
+                  if entry.is_dir())
+
+
+@benchmark('load_labware.all_standard')
+def load_all_labware():
+    ctx = _context()
+    names = _standard_labware()
+
+    def run():
+        for load_name in names:
+            ctx.load_labware(load_name, '1')
+            del ctx.deck['1']
+    return run
+
+
+# Liquid handling --------------------------------------------------------
+
+_PLATES = {'96': 'corning_96_wellplate_360ul_flat',
+           '384': 'corning_384_wellplate_112ul_flat'}
+_PIPETTES = {'single': 'p300_single_gen2',
+             'multi': 'p300_multi_gen2'}
+
+
+def _liquid_handling(channels: str, plate: str):
+    ctx = _context()
+    tipracks = [ctx.load_labware('opentrons_96_tiprack_300ul', slot)
+                for slot in ('7', '8', '9', '10', '11')]
+    source = ctx.load_labware(_PLATES[plate], '1')
+    dest = ctx.load_labware(_PLATES[plate], '2')
+    reservoir = ctx.load_labware('nest_12_reservoir_15ml', '3')
+    pipette = ctx.load_instrument(
+        _PIPETTES[channels], 'right', tip_racks=tipracks)
+    if channels == 'single':
+        source_wells = source.wells()
+        dest_wells = dest.wells()
+    else:
+        # A multichannel reaches every well of a 96 well plate from row A,
+        # and every well of a 384 well plate from rows A and B
+        rows = 1 if plate == '96' else 2
+        source_wells = sum(source.rows()[:rows], [])
+        dest_wells = sum(dest.rows()[:rows], [])
+    return pipette, source_wells, dest_wells, reservoir.wells()[0]
+
+
+def _register_liquid_handling(channels: str, plate: str):
+    @benchmark(f'transfer.{channels}.{plate}')
+    def transfer():
+        pipette, source, dest, _ = _liquid_handling(channels, plate)
+        return lambda: pipette.transfer(
+            20, source, dest, new_tip='once', mix_after=(2, 10))
+
+    @benchmark(f'distribute.{channels}.{plate}')
+    def distribute():
+        pipette, _, dest, reservoir = _liquid_handling(channels, plate)
+        return lambda: pipette.distribute(
+            10, reservoir, dest, disposal_volume=10)
+
+    @benchmark(f'consolidate.{channels}.{plate}')
+    def consolidate():
+        pipette, source, _, reservoir = _liquid_handling(channels, plate)
+        return lambda: pipette.consolidate(10, source, reservoir)
+
+
+for _channels in _PIPETTES:
+    for _plate in _PLATES:
+        _register_liquid_handling(_channels, _plate)
+
+
+# Tip tracking -----------------------------------------------------------
+
+def _register_next_tip(channels: int):
+    @benchmark(f'next_tip.10_racks.{channels}_channel')
+    def next_tip():
+        from opentrons.protocol_api.labware import (
+            select_tiprack_from_list, OutOfTipsError)
+        ctx = _context()
+        tipracks = [ctx.load_labware('opentrons_96_tiprack_300ul', slot)
+                    for slot in range(1, 11)]
+
+        def run():
+            while True:
+                try:
+                    rack, well = select_tiprack_from_list(tipracks, channels)
+                except OutOfTipsError:
+                    return
+                rack.use_tips(well, channels)
+        return run
+
+
+for _tip_channels in (1, 8):
+    _register_next_tip(_tip_channels)
+
+
+# Motion planning --------------------------------------------------------
+
+@benchmark('plan_moves.full_deck')
+def plan_moves():
+    from opentrons.protocol_api.geometry import plan_moves as _plan
+    ctx = _context()
+    plates = [ctx.load_labware(_PLATES['96'], slot)
+              for slot in ('1', '2', '3', '4', '5', '6')]
+    tipracks = [ctx.load_labware('opentrons_96_tiprack_300ul', slot)
+                for slot in ('7', '8', '9', '10', '11')]
+    locations = [well.top()
+                 for labware in plates + tipracks
+                 for well in labware.wells()[::8]]
+    pairs = list(zip(locations, locations[1:] + locations[:1]))
+    deck = ctx.deck
+
+    def run():
+        for from_loc, to_loc in pairs:
+            _plan(from_loc, to_loc, deck, instr_max_height=150.0)
+    return run
+
+
+# Protocols --------------------------------------------------------------
+
+#: A python protocol of the sort people write: a serial dilution across a
+#: plate with a multichannel, then replicating the plate with a single
+#: channel
+SERIAL_DILUTION = '''
+metadata = {'apiLevel': '2.2'}
+
+
+def run(ctx):
+    tipracks = [ctx.load_labware('opentrons_96_tiprack_300ul', slot)
+                for slot in ('7', '8', '9', '10', '11')]
+    reservoir = ctx.load_labware('nest_12_reservoir_15ml', '2')
+    plate = ctx.load_labware('corning_96_wellplate_360ul_flat', '1')
+    replica = ctx.load_labware('corning_96_wellplate_360ul_flat', '3')
+    temp = ctx.load_module('tempdeck', '4')
+    samples = temp.load_labware(
+        'opentrons_96_aluminumblock_biorad_wellplate_200ul')
+    multi = ctx.load_instrument(
+        'p300_multi_gen2', 'left', tip_racks=tipracks[:2])
+    single = ctx.load_instrument(
+        'p300_single_gen2', 'right', tip_racks=tipracks[2:])
+
+    temp.set_temperature(4)
+    multi.distribute(100, reservoir['A1'], plate.rows()[0][1:])
+    single.transfer(200, samples.wells()[:8], plate.columns()[0],
+                    new_tip='always')
+    multi.pick_up_tip()
+    for source, dest in zip(plate.rows()[0][:10], plate.rows()[0][1:11]):
+        multi.transfer(100, source, dest, mix_after=(3, 50),
+                       new_tip='never')
+    multi.drop_tip()
+    single.transfer(50, plate.wells(), replica.wells(), new_tip='once',
+                    blow_out=True, touch_tip=True)
+'''
+
+
+def _json_fixture(version: int, name: str) -> str:
+    return load_shared_data(
+        f'protocol/fixtures/{version}/{name}.json').decode()
+
+
+def _register_json(version: int, name: str):
+    @benchmark(f'json_protocol.v{version}')
+    def json_protocol():
+        from opentrons.protocols.parse import parse
+        from opentrons.protocol_api.execute import run_protocol
+        protocol = parse(_json_fixture(version, name), f'{name}.json')
+        ctx = _context()
+        return lambda: run_protocol(protocol, ctx)
+
+
+_register_json(3, 'testAllAtomicSingleV3')
+_register_json(4, 'testModulesProtocol')
+
+
+@benchmark('simulate.python')
+def simulate_python():
+    from opentrons.simulate import simulate
+    return lambda: simulate(io.StringIO(SERIAL_DILUTION), 'dilution.py')
+
+
+@benchmark('simulate.json_v4')
+def simulate_json():
+    from opentrons.simulate import simulate
+    contents = _json_fixture(4, 'testModulesProtocol')
+    return lambda: simulate(io.StringIO(contents), 'modules.json')
+
+
+# RPC --------------------------------------------------------------------
+
+def _session_manager():
+    from opentrons.api.routers import MainRouter
+    from opentrons.hardware_control import API, ThreadManager
+    if not _rpc_hardware:
+        hardware = ThreadManager(API.build_hardware_simulator)
+        _rpc_hardware.append(hardware)
+        _cleanups.append(hardware.clean_up)
+    # A fresh router each time, so nothing is cached between runs
+    return MainRouter(_rpc_hardware[0]).session_manager
+
+
+@benchmark('rpc.session_create')
+def session_create():
+    manager = _session_manager()
+    return lambda: manager.create('dilution.py', SERIAL_DILUTION)
+
+
+@benchmark('rpc.session_serialize')
+def session_serialize():
+    from opentrons.server import serialize
+    session = _session_manager().create('dilution.py', SERIAL_DILUTION)
+
+    def run():
+        # As the RPC server does for the result of a call, then for the
+        # commands the app asks about
+        serialize.get_object_tree(session)
+        serialize.get_object_tree(session.commands, max_depth=1)
+    return run
+
+
+# Running ----------------------------------------------------------------
+
+def _reference_workload():
+    """ A fixed, pure-python workload that results are measured against """
+    total = 0
+    table: Dict[int, List[int]] = {}
+    for i in range(200000):
+        table.setdefault(i % 97, []).append(i)
+        total += len(str(i)) * (i & 7)
+    return total
+
+
+def measure(setup: Setup, repeat: int) -> List[float]:
+    """ Run a benchmark ``repeat`` times and return how long each run took,
+    in seconds """
+    timings = []
+    for _ in range(repeat):
+        func = setup()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run_benchmarks(names: Iterable[str] = None,
+                   repeat: int = DEFAULT_REPEAT,
+                   report: Callable[[str], None] = None) -> Dict[str, Any]:
+    """ Run benchmarks and return their results.
+
+    :param names: The benchmarks to run, or None for all of them
+    :param repeat: How many times to run each benchmark
+    :param report: Called with a line of progress after each benchmark
+    :returns: The results, as written by :py:func:`main`
+    """
+    names = list(names) if names is not None else benchmark_names()
+    unknown = [name for name in names if name not in _BENCHMARKS]
+    if unknown:
+        raise KeyError(f'Unknown benchmarks: {", ".join(unknown)}')
+
+    # The protocol API logs a lot while simulating, and formatting the logs
+    # would be measured along with everything else
+    logging.getLogger('opentrons').setLevel(logging.WARNING)
+    reference = min(measure(lambda: _reference_workload, 5))
+    results: Dict[str, Any] = OrderedDict()
+    try:
+        for name in names:
+            timings = measure(_BENCHMARKS[name], repeat)
+            results[name] = {'min': min(timings),
+                             'median': statistics.median(timings),
+                             'max': max(timings),
+                             'repeat': repeat,
+                             'relative': min(timings) / reference}
+            if report:
+                report(f'{name:<40} {min(timings) * 1000:10.1f}ms')
+    finally:
+        while _cleanups:
+            _cleanups.pop()()
+        _rpc_hardware.clear()
+
+    return {'version': RESULTS_VERSION,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'reference': reference,
+            'benchmarks': results}
+
+
+def compare(results: Mapping[str, Any],
+            baseline: Mapping[str, Any],
+            tolerance: float = None) -> Dict[str, Dict[str, Any]]:
+    """ Compare results against a baseline.
+
+    :param results: The output of :py:func:`run_benchmarks`
+    :param baseline: A previous output of :py:func:`run_benchmarks`. Any
+                     benchmark in it may have a ``tolerance`` key to
+                     override the default.
+    :param tolerance: Overrides every tolerance, if specified
+    :returns: For every benchmark in ``results``, the ratio of its relative
+              timing to the baseline's, the tolerance used, and a status:
+              ``'ok'``, ``'regressed'``, ``'improved'``, or ``'new'`` if it
+              is not in the baseline
+    """
+    base_benchmarks = baseline.get('benchmarks', {})
+    comparison: Dict[str, Dict[str, Any]] = OrderedDict()
+    for name, result in results['benchmarks'].items():
+        base = base_benchmarks.get(name)
+        if not base:
+            comparison[name] = {'status': 'new', 'ratio': None,
+                                'tolerance': None}
+            continue
+        limit = tolerance if tolerance is not None\
+            else base.get('tolerance', DEFAULT_TOLERANCE)
+        ratio = result['relative'] / base['relative']
+        if ratio > 1 + limit:
+            status = 'regressed'
+        elif ratio < 1 / (1 + limit):
+            status = 'improved'
+        else:
+            status = 'ok'
+        comparison[name] = {'status': status, 'ratio': ratio,
+                            'tolerance': limit}
+    return comparison
+
+
+def update_baseline(results: Mapping[str, Any],
+                    baseline: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+    """ Make a new baseline from results, keeping any tolerances set in the
+    old one """
+    old = (baseline or {}).get('benchmarks', {})
+    new = json.loads(json.dumps(results))
+    for name, result in new['benchmarks'].items():
+        if 'tolerance' in old.get(name, {}):
+            result['tolerance'] = old[name]['tolerance']
+    return new
+
+
+def _load(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads(path.read_text())
+    except FileNotFoundError:
+        return None
+
+
+def _report(line: str):
+    print(line, file=sys.stderr)
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='python -m tests.opentrons.performance.benchmarks',
+        description='Benchmark the Python Protocol API')
+    parser.add_argument(
+        '-k', '--filter', metavar='REGEX',
+        help='Only run benchmarks whose names match this')
+    parser.add_argument(
+        '-r', '--repeat', type=int, default=DEFAULT_REPEAT,
+        help='How many times to run each benchmark')
+    parser.add_argument(
+        '-o', '--output', type=Path,
+        help='Where to write the results as JSON; stdout if not specified')
+    parser.add_argument(
+        '-b', '--baseline', type=Path, default=BASELINE_PATH,
+        help='The results to compare against')
+    parser.add_argument(
+        '-t', '--tolerance', type=float,
+        help='How much slower than the baseline, as a fraction, any '
+        'benchmark may be; overrides the tolerances in the baseline')
+    parser.add_argument(
+        '--update-baseline', action='store_true',
+        help='Write the results to the baseline instead of comparing')
+    parser.add_argument(
+        '-l', '--list', action='store_true',
+        help='List the benchmarks and exit')
+    return parser
+
+
+def _write_baseline(path: Path,
+                    results: Mapping[str, Any],
+                    baseline: Optional[Mapping[str, Any]]):
+    path.write_text(
+        json.dumps(update_baseline(results, baseline), indent=2) + '\n')
+    _report(f'Wrote baseline to {path}')
+
+
+def _compare_to_baseline(results: Dict[str, Any],
+                         baseline: Mapping[str, Any],
+                         tolerance: Optional[float]) -> List[str]:
+    """ Report how results compare to the baseline and add the comparison
+    to them
+
+    :returns: The names of the benchmarks that regressed
+    """
+    regressed = []
+    comparison = compare(results, baseline, tolerance)
+    results['comparison'] = comparison
+    for name, compared in comparison.items():
+        if compared['status'] == 'new':
+            _report(f'{name:<40} new')
+        else:
+            _report(f'{name:<40} {compared["ratio"]:6.2f}x baseline '
+                    f'{compared["status"]}')
+        if compared['status'] == 'regressed':
+            regressed.append(name)
+    return regressed
+
+
+def _write_results(results: Mapping[str, Any], path: Optional[Path]):
+    output = json.dumps(results, indent=2)
+    if path:
+        path.write_text(output + '\n')
+    else:
+        print(output)
+
+
+def main(argv: Sequence[str] = None) -> int:
+    args = _parser().parse_args(argv)
+
+    names = benchmark_names()
+    if args.filter:
+        names = [name for name in names if re.search(args.filter, name)]
+    if args.list:
+        print('\n'.join(names))
+        return 0
+
+    results = run_benchmarks(names, args.repeat, _report)
+    baseline = _load(args.baseline)
+
+    if args.update_baseline:
+        _write_baseline(args.baseline, results, baseline)
+        return 0
+
+    regressed: List[str] = []
+    if baseline:
+        regressed = _compare_to_baseline(results, baseline, args.tolerance)
+    else:
+        _report(f'No baseline at {args.baseline}')
+
+    _write_results(results, args.output)
+
+    if regressed:
+        _report(f'Regressed: {", ".join(regressed)}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -67,3 +67,51 @@ class PerformanceTest(unittest.TestCase):
 
     def log(self, info):
         self.events.append(info)
+
+
+def test_benchmarks_run():
+    from . import benchmarks
+    results = benchmarks.run_benchmarks(
+        ['plan_moves.full_deck', 'json_protocol.v4'], repeat=1)
+    assert list(results['benchmarks']) == ['plan_moves.full_deck',
+                                           'json_protocol.v4']
+    for result in results['benchmarks'].values():
+        assert result['repeat'] == 1
+        assert result['min'] == result['max'] > 0
+        assert result['relative'] == result['min'] / results['reference']
+
+
+def test_benchmark_baseline_comparison():
+    from . import benchmarks
+
+    def results(**relative):
+        return {'benchmarks': {name: {'relative': value}
+                               for name, value in relative.items()}}
+
+    baseline = results(same=1.0, slower=1.0, faster=1.0, strict=1.0)
+    baseline['benchmarks']['strict']['tolerance'] = 0.1
+    compared = benchmarks.compare(
+        results(same=1.2, slower=2.0, faster=0.5, strict=1.2, added=1.0),
+        baseline)
+    assert {name: c['status'] for name, c in compared.items()} == {
+        'same': 'ok', 'slower': 'regressed', 'faster': 'improved',
+        'strict': 'regressed', 'added': 'new'}
+    assert compared['slower']['ratio'] == 2.0
+    assert compared['strict']['tolerance'] == 0.1
+
+    compared = benchmarks.compare(results(slower=2.0), baseline,
+                                  tolerance=1.5)
+    assert compared['slower']['status'] == 'ok'
+
+    updated = benchmarks.update_baseline(results(strict=3.0, same=1.0),
+                                         baseline)
+    assert updated['benchmarks'] == {'strict': {'relative': 3.0,
+                                                'tolerance': 0.1},
+                                     'same': {'relative': 1.0}}
+
+
+def test_stored_baseline_covers_benchmarks():
+    import json
+    from . import benchmarks
+    baseline = json.loads(benchmarks.BASELINE_PATH.read_text())
+    assert set(baseline['benchmarks']) == set(benchmarks.benchmark_names())
@@ -0,0 +1,110 @@
+import asyncio
+from unittest import mock
+
+import pytest
+
+from opentrons import server
+from opentrons.server import init
+from opentrons.system.boot import BootStatus
+
+
+async def test_serves_while_booting(
+        virtual_smoothie_env, loop, aiohttp_client, hardware):
+    booted = asyncio.Event()
+    boot = BootStatus(['hardware'])
+
+    async def build_hardware():
+        with boot.phase('hardware'):
+            await booted.wait()
+        boot.finish()
+        return hardware
+
+    cli = await aiohttp_client(
+        init(loop=loop, boot=boot, build_hardware=build_hardware))
+
+    resp = await cli.get('/health')
+    assert resp.status == 503
+    assert (await resp.json())['fw_version'] is None
+
+    resp = await cli.get('/server/boot')
+    assert resp.status == 200
+    body = await resp.json()
+    assert not body['ready']
+    assert body['phases'][0]['state'] == 'running'
+
+    resp = await cli.get('/motors/engaged')
+    assert resp.status == 503
+    assert (await resp.json())['message'] == 'The robot is still booting'
+    resp = await cli.get('/calibration/check/session')
+    assert resp.status == 503
+
+    # Routes that don't need the hardware answer as usual
+    resp = await cli.get('/settings')
+    assert resp.status == 200
+    resp = await cli.get('/settings/reset/options')
+    assert resp.status == 200
+
+    booted.set()
+    await cli.server.app['com.opentrons.boot_task']
+
+    resp = await cli.get('/health')
+    assert resp.status == 200
+    assert (await resp.json())['fw_version'] == 'Virtual Smoothie'
+    resp = await cli.get('/server/boot')
+    assert (await resp.json())['ready']
+    resp = await cli.get('/motors/engaged')
+    assert resp.status == 200
+
+
+async def test_boot_failure(virtual_smoothie_env, loop, aiohttp_client):
+    boot = BootStatus()
+
+    async def build_hardware():
+        try:
+            with boot.phase('hardware'):
+                raise RuntimeError('no smoothie')
+        finally:
+            boot.finish()
+
+    cli = await aiohttp_client(
+        init(loop=loop, boot=boot, build_hardware=build_hardware))
+    await cli.server.app['com.opentrons.boot_task']
+
+    resp = await cli.get('/motors/engaged')
+    assert resp.status == 503
+    body = await resp.json()
+    assert body['message'] == 'The robot failed to boot'
+    assert body['boot']['phases'][0]['error'] == 'no smoothie'
+    # The robot can still be diagnosed and reconfigured
+    resp = await cli.get('/settings')
+    assert resp.status == 200
+
+
+async def test_boot_failure_exits(
+        virtual_smoothie_env, loop, aiohttp_client):
+    failing = asyncio.Event()
+
+    async def build_hardware():
+        await failing.wait()
+        raise RuntimeError('no smoothie')
+
+    cli = await aiohttp_client(
+        init(loop=loop, build_hardware=build_hardware,
+             exit_on_boot_failure=True))
+    # The loop running the test must not actually stop
+    with mock.patch.object(loop, 'stop') as stop:
+        failing.set()
+        await cli.server.app['com.opentrons.boot_task']
+    assert cli.server.app['com.opentrons.boot_failed']
+    stop.assert_called_once_with()
+
+
+def test_run_exits_on_boot_failure(monkeypatch):
+    def fake_run_app(app, **kwargs):
+        app['com.opentrons.boot_failed'] = True
+
+    monkeypatch.setattr(server.web, 'run_app', fake_run_app)
+    with pytest.raises(SystemExit) as excinfo:
+        server.run(None, path='/tmp/fake.sock', boot=BootStatus(),
+                   build_hardware=mock.Mock())
+    assert excinfo.value.code == 'The robot failed to boot'
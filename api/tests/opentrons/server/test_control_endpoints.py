@@ -1,9 +1,12 @@
+import asyncio
 import json
+import struct
 
 import pytest
 from unittest import mock
 
 from opentrons import types
+from opentrons.drivers.smoothie_drivers.telemetry import MotionEvent
 from opentrons.legacy_api import modules as legacy_modules
 from opentrons.hardware_control import (
     API, ExecutionManager, types as hwtypes)
@@ -501,3 +504,80 @@ async def test_rail_lights(async_client):
     assert resp.status == 200
     data = await resp.json()
     assert not data['on']
+
+
+@pytest.fixture
+def capture_worker(monkeypatch, tmpdir, loop):
+    from opentrons.system import camera
+    frames = tmpdir.join('frames.mjpeg')
+    frames.write_binary(b'\xff\xd8first\xff\xd9\xff\xd8second\xff\xd9')
+    worker = camera.CaptureWorker(
+        camera.FileFrameSource(str(frames), fps=100), idle_timeout=0,
+        settle_time=0)
+    monkeypatch.setattr(camera, '_capture_worker', worker)
+    yield worker
+    loop.run_until_complete(worker.stop())
+
+
+async def test_take_picture_from_capture_worker(
+        async_server, async_client, capture_worker, monkeypatch):
+    monkeypatch.setenv('OT_API_FF_useCameraCaptureWorker', 'true')
+    resp = await async_client.post('/camera/picture')
+    assert resp.status == 200
+    assert resp.content_type == 'image/jpeg'
+    assert await resp.read() in (b'\xff\xd8first\xff\xd9',
+                                 b'\xff\xd8second\xff\xd9')
+
+
+async def test_stream_camera(
+        async_server, async_client, capture_worker, loop):
+    resp = await async_client.get('/camera/stream?fps=1000')
+    assert resp.status == 400
+
+    resp = await async_client.get('/camera/stream?fps=15')
+    assert resp.status == 200
+    assert resp.content_type == 'multipart/x-mixed-replace'
+    header = b'--frame\r\nContent-Type: image/jpeg\r\n'
+    assert await resp.content.readexactly(len(header)) == header
+    assert capture_worker.running
+    resp.close()
+    # The camera stops once the client is gone
+    for _ in range(100):
+        if not capture_worker.running:
+            break
+        await asyncio.sleep(0.01)
+    assert not capture_worker.running
+
+
+async def test_motion_telemetry(async_server, async_client):
+    hw = async_server['com.opentrons.hardware']
+    await hw.home()
+    res = await async_client.get('/robot/telemetry')
+    assert res.status == 200
+    assert res.headers['Content-Type'] == 'application/octet-stream'
+    sequence = int(res.headers['X-Telemetry-Sequence'])
+    record_format = res.headers['X-Telemetry-Format']
+    assert sequence > 0
+    body = await res.read()
+    assert body == hw.telemetry.dump()
+    first = struct.unpack_from(record_format, body)
+    assert first[1] == MotionEvent.HOME
+
+    res = await async_client.get(f'/robot/telemetry?since={sequence}')
+    assert await res.read() == b''
+    res = await async_client.get('/robot/telemetry?since=oops')
+    assert res.status == 400
+
+
+async def test_motion_telemetry_stream(async_server, async_client):
+    hw = async_server['com.opentrons.hardware']
+    await hw.home()
+    sequence = hw.telemetry.sequence
+    socket = await async_client.ws_connect(
+        f'/robot/telemetry/stream?since={sequence - 1}')
+    try:
+        assert await socket.receive_bytes() == hw.telemetry.dump(sequence - 1)
+        await hw.move_to(types.Mount.RIGHT, types.Point(50, 50, 100))
+        assert await socket.receive_bytes() == hw.telemetry.dump(sequence)
+    finally:
+        await socket.close()
@@ -34,3 +34,12 @@ async def test_openapi_spec_ok(async_client):
     req = await async_client.get('/openapi')
     spec = await req.json()
     openapi_spec_validator.validate_spec(spec)
+
+
+async def test_metrics(async_client):
+    from opentrons.util import metrics
+    resp = await async_client.get('/metrics')
+    assert resp.status == 200
+    assert resp.headers['Content-Type'] == metrics.CONTENT_TYPE
+    text = await resp.text()
+    assert '# TYPE opentrons_hardware_call_seconds histogram' in text
@@ -116,3 +116,42 @@ def test_ordered_dict():
                 'i': id(b),
                 't': type_id(b),
                 'v': {'b': 1}}}}
+
+
+def test_shared_reference():
+    class A:
+        pass
+    shared = A()
+    root = A()
+    root.first = shared
+    root.second = [shared]
+    tree, refs = serialize.get_object_tree(root)
+    assert tree['v']['first'] == {'i': id(shared), 't': type_id(shared),
+                                  'v': {}}
+    assert tree['v']['second'] == [
+        {'i': id(shared), 't': type_id(shared), 'v': None}]
+
+
+def test_prune_tree(instance):
+    root, a1, a2, a3 = instance
+    tree, refs = serialize.get_object_tree(root)
+    sent = {}
+    digests = serialize.digest_tree(tree, refs)
+    assert set(digests.keys()) == {id(root), id(a1), id(a2), id(a3)}
+    # nothing has been sent yet, so everything is sent
+    assert serialize.prune_tree(tree, digests, sent) == tree
+    # and then nothing needs to be sent again
+    assert serialize.prune_tree(tree, digests, sent) == {
+        'i': id(root), 't': type_id(root), 'v': None}
+
+    a2.a = 2
+    tree, refs = serialize.get_object_tree(root)
+    pruned = serialize.prune_tree(
+        tree, serialize.digest_tree(tree, refs), sent)
+    # the changed object and everything that refers to it is sent
+    assert pruned['v']['b'][0] == {
+        'i': id(a2), 't': type_id(a2), 'v': {0: 0, 'a': 2}}
+    # but nothing else is
+    assert pruned['v']['a'] == {'i': id(a1), 't': type_id(a1), 'v': None}
+    assert pruned['v']['c']['v']['b'][2] == {
+        'i': id(a3), 't': type_id(a3), 'v': None}
@@ -1,9 +1,10 @@
 import asyncio
+import msgpack  # type: ignore
 import pytest
 import sys
 import time
 
-from opentrons.server import rpc
+from opentrons.server import encoding, rpc
 from opentrons.protocol_api.execute import ExceptionInProtocolError
 from threading import Event
 
@@ -436,3 +437,81 @@ def message_key(message):
     meta = message['$']
     data = message.get('data', '')
     return str(meta.get('type')) + meta.get('token', '') + str(data)
+
+
+class Holder(object):
+    def __init__(self):
+        self.child = Foo(0)
+
+    def get_child(self):
+        return self.child
+
+    def bump(self):
+        self.child.value += 1
+        return self.child
+
+
+@pytest.mark.parametrize('root', [Holder()])
+async def test_object_deltas(session, root, aiohttp_client):
+    client = await aiohttp_client(session.server.app)
+    socket = await client.ws_connect('/?objectDeltas=true')
+    init = await socket.receive_json()
+    assert init['$']['objectDeltas'] is True
+    assert init['root']['v']['child']['v'] == {'value': 0}
+
+    async def call(name):
+        await socket.send_json({
+            '$': {'token': 'delta'}, 'id': id(root), 'name': name,
+            'args': []})
+        while True:
+            res = await socket.receive_json()
+            if res['$']['type'] == rpc.CALL_RESULT_MESSAGE\
+               and res['$']['token'] == 'delta':
+                return res['data']
+
+    # the child was sent in the init message and has not changed
+    assert await call('get_child') == {
+        'i': id(root.child), 't': type_id(root.child), 'v': None}
+    # so a change to it is sent in full
+    assert await call('bump') == {
+        'i': id(root.child), 't': type_id(root.child), 'v': {'value': 1}}
+    assert (await call('get_child'))['v'] is None
+
+    # clients that did not ask for deltas always get everything
+    await session.socket.receive_json()  # Skip init
+    received = []
+    while len(received) < 3:
+        res = await session.socket.receive_json()
+        if res['$']['type'] == rpc.CALL_RESULT_MESSAGE:
+            received.append(res['data'])
+    assert [r['v'] for r in received]\
+        == [{'value': 0}, {'value': 1}, {'value': 1}]
+    await socket.close()
+
+
+@pytest.mark.parametrize('root', [Foo(0)])
+async def test_binary_encoding(session, root, aiohttp_client):
+    client = await aiohttp_client(session.server.app)
+    socket = await client.ws_connect(
+        '/?encoding=msgpack&compression=deflate&keyTable=true')
+    decoder = encoding.MessageDecoder('msgpack', 'deflate', True)
+
+    init = decoder.decode(await socket.receive_bytes())
+    assert init['$'] == {
+        'type': rpc.CONTROL_MESSAGE, 'monitor': True,
+        'encoding': 'msgpack', 'compression': 'deflate', 'keyTable': True}
+    assert init['root'] == {
+        'i': id(root), 't': type_id(root), 'v': {'value': 0}}
+
+    # Requests can be sent as msgpack too
+    await socket.send_bytes(msgpack.packb({
+        '$': {'token': 'binary'}, 'id': id(root), 'name': 'add',
+        'args': [2]}))
+    ack = decoder.decode(await socket.receive_bytes())
+    assert ack == {'$': {'token': 'binary', 'type': rpc.CALL_ACK_MESSAGE}}
+    result = decoder.decode(await socket.receive_bytes())
+    assert result == {
+        '$': {'token': 'binary', 'status': 'success',
+              'type': rpc.CALL_RESULT_MESSAGE},
+        'data': 2}
+    await socket.close()
@@ -0,0 +1,23 @@
+import pytest
+
+
+@pytest.mark.parametrize('protocol_file', ['testosaur_v2.py'])
+async def test_get_command_log(
+        async_server, async_client, protocol, protocol_file, loop):
+    resp = await async_client.get('/session/commands')
+    assert resp.status == 404
+
+    session_manager = async_server['com.opentrons.rpc'].root.session_manager
+    session = session_manager.create(name='<blank>', contents=protocol.text)
+    await loop.run_in_executor(None, session.run)
+
+    resp = await async_client.get('/session/commands?start=1&count=2')
+    assert resp.status == 200
+    body = await resp.json()
+    assert [entry['id'] for entry in body['entries']] == [1, 2]
+    assert body['entries'][0]['description']\
+        == session._command_list[1]['description']
+    assert body['total'] == session.command_log.total
+
+    resp = await async_client.get('/session/commands?count=many')
+    assert resp.status == 400
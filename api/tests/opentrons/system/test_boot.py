@@ -0,0 +1,58 @@
+import pytest
+
+from opentrons.system.boot import BootStatus, PhaseState
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_phases():
+    clock = FakeClock()
+    boot = BootStatus(['config', 'firmware', 'home'], clock=clock)
+    assert not boot.finished
+    assert not boot.ready
+
+    clock.now += 1
+    with boot.phase('config') as phase:
+        assert phase.state == PhaseState.RUNNING
+        clock.now += 2
+    boot.skip('home')
+    clock.now += 1
+    with pytest.raises(RuntimeError):
+        with boot.phase('firmware'):
+            clock.now += 0.5
+            raise RuntimeError('no smoothie')
+    boot.finish()
+    clock.now += 10
+
+    assert boot.finished
+    assert boot.failed
+    assert not boot.ready
+    assert boot.duration == 4.5
+    assert boot.as_dict() == {
+        'ready': False,
+        'failed': True,
+        'duration': 4.5,
+        'phases': [
+            {'name': 'config', 'state': 'done',
+             'start': 1.0, 'duration': 2.0, 'error': None},
+            {'name': 'firmware', 'state': 'failed',
+             'start': 4.0, 'duration': 0.5, 'error': 'no smoothie'},
+            {'name': 'home', 'state': 'skipped',
+             'start': None, 'duration': None, 'error': None}]}
+
+
+def test_unlisted_phase():
+    boot = BootStatus(['config'])
+    with boot.phase('extra'):
+        pass
+    assert [p['name'] for p in boot.as_dict()['phases']]\
+        == ['config', 'extra']
+    assert not boot.ready
+    boot.finish()
+    assert boot.ready
@@ -0,0 +1,117 @@
+import asyncio
+import sys
+
+import pytest
+
+from opentrons.system import camera
+
+
+def _frame(content: bytes) -> bytes:
+    return b'\xff\xd8' + content + b'\xff\xd9'
+
+
+FRAMES = [_frame(b'one'), _frame(b'two'), _frame(b'three')]
+
+
+@pytest.fixture
+def frame_file(tmpdir):
+    path = tmpdir.join('frames.mjpeg')
+    path.write_binary(b''.join(FRAMES))
+    return str(path)
+
+
+def test_split_frames():
+    data = b''.join(FRAMES)
+    frames, rest = camera.split_frames(b'junk' + data[:-3])
+    assert frames == FRAMES[:2]
+    assert rest == FRAMES[2][:-3]
+    frames, rest = camera.split_frames(rest + data[-3:] + b'\xff')
+    assert frames == FRAMES[2:]
+    assert rest == b'\xff'
+
+
+def test_mjpeg_part():
+    assert camera.mjpeg_part(FRAMES[0]) ==\
+        b'--frame\r\nContent-Type: image/jpeg\r\nContent-Length: 7\r\n\r\n'\
+        + FRAMES[0] + b'\r\n'
+
+
+async def test_pipe_frame_source(loop):
+    # Frames split across writes, the way a pipe might deliver them
+    script = ('import sys, time\n'
+              f'data = {b"".join(FRAMES)!r}\n'
+              'for i in range(0, len(data), 4):\n'
+              '    sys.stdout.buffer.write(data[i:i + 4])\n'
+              '    sys.stdout.flush()\n'
+              '    time.sleep(0.001)\n'
+              'sys.stderr.write("no more frames")\n')
+    source = camera.PipeFrameSource([sys.executable, '-c', script])
+    frames = []
+    with pytest.raises(camera.CameraException, match='no more frames'):
+        async for frame in source.frames():
+            frames.append(frame)
+    assert frames == FRAMES
+
+
+async def test_file_frame_source(loop, frame_file):
+    source = camera.FileFrameSource(frame_file, fps=1000, repeat=False)
+    assert [frame async for frame in source.frames()] == FRAMES
+
+
+async def test_picture_starts_and_stops_camera(loop, frame_file):
+    worker = camera.CaptureWorker(
+        camera.FileFrameSource(frame_file, fps=100), idle_timeout=0.05,
+        settle_time=0)
+    assert not worker.running
+    assert await worker.picture() in FRAMES
+    assert worker.running
+    # The next picture is the latest frame, without waiting
+    assert await worker.picture() is worker.latest_frame
+    await asyncio.sleep(0.2)
+    assert not worker.running
+    assert worker.latest_frame is None
+
+
+async def test_picture_skips_frames_while_settling(loop, tmpdir):
+    frames = [_frame(b'%d' % i) for i in range(100)]
+    path = tmpdir.join('settling.mjpeg')
+    path.write_binary(b''.join(frames))
+    worker = camera.CaptureWorker(
+        camera.FileFrameSource(str(path), fps=100, repeat=False),
+        idle_timeout=0, settle_time=0.2)
+    start = loop.time()
+    picture = await worker.picture()
+    assert loop.time() - start >= 0.2
+    # About 20 frames were captured before the camera settled
+    assert frames.index(picture) >= 10
+
+
+async def test_stream(loop, frame_file):
+    worker = camera.CaptureWorker(
+        camera.FileFrameSource(frame_file, fps=200), idle_timeout=0,
+        settle_time=0)
+    frames = worker.stream(max_fps=20)
+    start = loop.time()
+    received = [await frames.__anext__() for _ in range(5)]
+    # Frames come in ten times faster than they are sent
+    assert loop.time() - start >= 4 / 20 * 0.9
+    assert all(frame in FRAMES for frame in received)
+    assert worker.clients == 1
+    await frames.aclose()
+    assert worker.clients == 0
+    await asyncio.sleep(0)
+    assert not worker.running
+
+
+async def test_camera_failure(loop, tmpdir):
+    empty = tmpdir.join('empty.mjpeg')
+    empty.write_binary(b'')
+    worker = camera.CaptureWorker(camera.FileFrameSource(str(empty)))
+    with pytest.raises(camera.CameraException, match='No frames'):
+        await worker.picture()
+    worker = camera.CaptureWorker(camera.PipeFrameSource(
+        [sys.executable, '-c', 'import time; time.sleep(5)']))
+    with pytest.raises(camera.CameraException, match='Timed out'):
+        await worker.picture(timeout=0.1)
+    await worker.stop()
+    assert not worker.running
@@ -0,0 +1,57 @@
+import asyncio
+import sys
+
+from opentrons.system import log_control
+
+
+def test_journalctl_args():
+    assert log_control._journalctl_args('opentrons-api', 10, 'json',
+                                        None, False)\
+        == ['journalctl', '--no-pager', '-t', 'opentrons-api',
+            '-o', 'json', '-a', '-n', '10']
+    args = log_control._journalctl_args('opentrons-api', None, 'short',
+                                        's=1234', True)
+    assert '-n' not in args
+    assert args[-4:] == ['--show-cursor', '--after-cursor', 's=1234',
+                         '--follow']
+    # Text clients that start without a cursor still get one to resume from
+    assert '--show-cursor' in log_control._journalctl_args(
+        'opentrons-api', 10, 'short', None, False)
+
+
+def _fake_journalctl(monkeypatch, script):
+    calls = []
+    real_exec = asyncio.create_subprocess_exec
+
+    async def fake_exec(*args, **kwargs):
+        proc = await real_exec(sys.executable, '-c', script, **kwargs)
+        calls.append((args, proc))
+        return proc
+
+    monkeypatch.setattr(asyncio, 'create_subprocess_exec', fake_exec)
+    return calls
+
+
+async def test_stream_records(loop, monkeypatch):
+    calls = _fake_journalctl(
+        monkeypatch, 'import sys; sys.stdout.write("a" * 100)')
+    chunks = [chunk async for chunk in log_control.stream_records(
+        'opentrons-api', 5, 'short', after_cursor='s=1', chunk_size=30)]
+    assert b''.join(chunks) == b'a' * 100
+    assert all(len(chunk) <= 30 for chunk in chunks)
+    assert calls[0][0] == tuple(log_control._journalctl_args(
+        'opentrons-api', 5, 'short', 's=1', False))
+
+
+async def test_stream_records_stops_journalctl(loop, monkeypatch):
+    calls = _fake_journalctl(
+        monkeypatch,
+        'import sys, time\n'
+        'while True:\n'
+        '    sys.stdout.write("record\\n"); sys.stdout.flush()\n'
+        '    time.sleep(0.01)\n')
+    records = log_control.stream_records('opentrons-api', follow=True)
+    assert (await records.__anext__()).startswith(b'record')
+    await records.aclose()
+    assert calls[0][0][-1] == '--follow'
+    assert calls[0][1].returncode is not None
@@ -1,5 +1,6 @@
 # coding=utf-8
 import io
+import json
 import os
 from pathlib import Path
 from unittest import mock
@@ -57,6 +58,29 @@ def test_execute_function_apiv2(protocol,
         ]
 
 
+@pytest.mark.parametrize('protocol_file', ['testosaur_v2.py'])
+def test_execute_ndjson_runlog(protocol,
+                               protocol_file,
+                               virtual_smoothie_env,
+                               mock_get_attached_instr,
+                               capsys):
+    mock_get_attached_instr.return_value[types.Mount.LEFT]\
+        = {'model': 'p10_single_v1.5', 'id': 'testid'}
+    mock_get_attached_instr.return_value[types.Mount.RIGHT]\
+        = {'model': 'p300_single_v1.5', 'id': 'testid2'}
+    execute.execute(protocol.filelike, 'testosaur_v2.py',
+                    emit_runlog=execute.make_runlog_cb(ndjson=True))
+    lines = [json.loads(line)
+             for line in capsys.readouterr().out.splitlines()
+             if line.startswith('{')]
+    assert [line['id'] for line in lines] == [0, 1, 2, 3]
+    assert [line['level'] for line in lines] == [0, 0, 0, 0]
+    assert lines[0]['text']\
+        == 'Picking up tip from A1 of Opentrons 96 Tip Rack 300 µL on 1'
+    for line in lines:
+        assert line['duration'] >= 0
+
+
 def test_execute_function_json_v3_apiv2(get_json_protocol_fixture,
                                         virtual_smoothie_env,
                                         mock_get_attached_instr):
@@ -0,0 +1,52 @@
+import subprocess
+import sys
+
+#: How long ``import opentrons`` may take. It should only need the config,
+#: so this is generous to leave room for slow machines
+IMPORT_TIME_BUDGET_US = 250000
+
+
+def _import_times(statement):
+    """ Run ``statement`` with ``-X importtime`` and return the cumulative
+    import time of each module in microseconds """
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+    times = {}
+    for line in proc.stderr.decode().splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_import_time_budget():
+    times = _import_times('import opentrons')
+    assert times['opentrons'] < IMPORT_TIME_BUDGET_US
+    heavy = [name for name in times
+             if name.split('.')[0] == 'numpy'
+             or name.startswith('opentrons.legacy_api')
+             or name.startswith('opentrons.protocol_api')
+             or name.startswith('opentrons.data_storage')]
+    assert not heavy
+
+
+def test_legacy_names_are_lazy():
+    subprocess.run([sys.executable, '-c', '''
+import sys
+import opentrons
+assert 'opentrons.legacy_api.api' not in sys.modules
+assert 'robot' in dir(opentrons)
+from opentrons import robot, labware
+from opentrons.legacy_api import api
+assert robot is api.robot and labware is api.labware
+assert opentrons.robot is robot
+try:
+    opentrons.not_a_name
+except AttributeError:
+    pass
+else:
+    raise AssertionError()
+'''], check=True)
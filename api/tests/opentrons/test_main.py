@@ -12,3 +12,24 @@ def test_find_smoothie_file(monkeypatch, tmpdir):
 
     monkeypatch.setattr(main, 'IS_ROBOT', True)
     assert main._find_smoothie_file() == (dummy_file, 'edge-2cac98asda')
+
+
+def test_initialize_virtual(monkeypatch):
+    from opentrons import main
+    from opentrons.system.boot import BootStatus
+
+    monkeypatch.setenv('ENABLE_VIRTUAL_SMOOTHIE', 'true')
+    boot = BootStatus(main.BOOT_PHASES)
+    hardware = main.initialize(boot=boot)
+    try:
+        assert boot.ready
+        states = {phase['name']: phase['state']
+                  for phase in boot.as_dict()['phases']}
+        assert states == {'config': 'done',
+                          'labware': 'done',
+                          'firmware': 'skipped',
+                          'hardware': 'done',
+                          'home': 'skipped',
+                          'hardware_server': 'skipped'}
+    finally:
+        hardware.clean_up()
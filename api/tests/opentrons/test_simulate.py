@@ -1,5 +1,6 @@
 # coding=utf-8
 import io
+import json
 import os
 from pathlib import Path
 
@@ -118,3 +119,95 @@ def test_simulate_extra_labware(protocol, protocol_file, monkeypatch):
     ctx = simulate.get_protocol_api('2.0')
     with pytest.raises(FileNotFoundError):
         ctx.load_labware("fixture_12_trough", 1, namespace='fixture')
+
+
+def test_simulate_streaming(get_bundle_fixture):
+    bundle = get_bundle_fixture('simple_bundle')
+    emitted = []
+    runlog, _ = simulate.simulate(
+        bundle['filelike'], 'simple_bundle.zip',
+        emit_runlog=emitted.append, keep_runlog=False)
+    assert runlog == []
+    # commands are emitted as they finish, so each transfer comes after
+    # the commands nested in it
+    assert [(e['id'], e['level']) for e in emitted[:5]]\
+        == [(1, 1), (2, 1), (3, 1), (4, 1), (0, 0)]
+    assert emitted[4]['payload']['text'].startswith('Transferring 1.0')
+    for entry in emitted:
+        assert entry['duration'] >= 0
+    assert emitted[4]['duration'] >= emitted[0]['duration']
+
+    line = json.loads(simulate.runlog_entry_to_ndjson(emitted[4]))
+    assert line['id'] == 0
+    assert line['level'] == 0
+    assert line['name'] == 'command.TRANSFER'
+    assert line['text'].startswith('Transferring 1.0 from A1')
+
+
+@pytest.mark.parametrize('protocol_file', ['testosaur_v2.py', 'testosaur.py'])
+def test_simulate_iter(protocol, protocol_file):
+    runlog, _ = simulate.simulate(protocol.filelike, protocol_file)
+    protocol.filelike.seek(0)
+    streamed = list(simulate.simulate_iter(protocol.filelike, protocol_file))
+    assert sorted(e['id'] for e in streamed) == list(range(len(runlog)))
+    assert [e['payload']['text'] for e in
+            sorted(streamed, key=lambda e: e['id'])]\
+        == [e['payload']['text'] for e in runlog]
+
+
+def test_simulate_iter_error():
+    filelike = io.StringIO(
+        "metadata = {'apiLevel': '2.0'}\n"
+        "def run(ctx):\n"
+        "    ctx.comment('hi')\n"
+        "    ctx.load_labware('not_a_real_labware', 1)\n")
+    seen = []
+    with pytest.raises(ExceptionInProtocolError):
+        for entry in simulate.simulate_iter(filelike, 'err.py'):
+            seen.append(entry)
+    assert [e['payload']['text'] for e in seen] == ['hi']
+
+
+def test_simulate_batch(tmpdir, get_json_protocol_fixture):
+    data = HERE / 'data'
+    tmpdir.join('testosaur_v2.py').write_binary(
+        (data / 'testosaur_v2.py').read_bytes())
+    tmpdir.join('simple.json').write(
+        get_json_protocol_fixture('3', 'simple', False))
+    tmpdir.mkdir('sub').join('broken.py').write(
+        "metadata = {'apiLevel': '2.0'}\n"
+        "def run(ctx):\n"
+        "    ctx.load_labware('not_a_real_labware', 1)\n")
+    fixturedir = HERE / '..' / '..' / '..' /\
+        'shared-data' / 'labware' / 'fixtures' / '2'
+    tmpdir.join('fixture_12_trough.json').write_binary(
+        (fixturedir / 'fixture_12_trough.json').read_bytes())
+
+    found = simulate.find_batch_protocols(str(tmpdir))
+    assert [p.name for p in found]\
+        == ['simple.json', 'broken.py', 'testosaur_v2.py']
+
+    reports = {
+        Path(r['protocol']).name: r
+        for r in simulate.simulate_batch(str(tmpdir), jobs=2)}
+    assert reports['testosaur_v2.py']['status'] == 'pass'
+    assert reports['testosaur_v2.py']['commandCount'] == 4
+    assert reports['simple.json']['status'] == 'pass'
+    assert reports['simple.json']['commandCount'] == 7
+    assert reports['broken.py']['status'] == 'fail'
+    assert reports['broken.py']['errorLine'] == 3
+    assert 'not_a_real_labware' in reports['broken.py']['error']
+    for report in reports.values():
+        assert report['duration'] > 0
+
+
+def test_simulate_one_timeout(tmpdir):
+    proto = tmpdir.join('slow.py')
+    proto.write(
+        "import time\n"
+        "metadata = {'apiLevel': '2.0'}\n"
+        "def run(ctx):\n"
+        "    time.sleep(10)\n")
+    report = simulate.simulate_one(str(proto), timeout=0.5)
+    assert report['status'] == 'timeout'
+    assert report['duration'] < 5
@@ -150,3 +150,59 @@ def test_change_base():
         .add('1-1', parent='1', point=Point(1, 0, 0))
 
     assert isclose(change_base(state, src='1-1'), (0.5, 0, 0)).all()
+
+
+def test_update_invalidates_subtree(state):
+    # Warm the cached transforms, then move a node and check that its
+    # subtree follows and the rest of the tree stays where it was
+    assert (change_base(state, src='1-1-1') == (12, 14, 16)).all()
+    assert (change_base(state, src='2-1') == (-12, -14, -16)).all()
+    moved = update(state, '1', Point(5, 5, 5))
+    assert (change_base(moved, src='1-1-1') == (16, 17, 18)).all()
+    assert (change_base(moved, src='1-2') == (26, 27, 28)).all()
+    assert (change_base(moved, src='2-1') == (-12, -14, -16)).all()
+    # The original tree is unchanged
+    assert (change_base(state, src='1-1-1') == (12, 14, 16)).all()
+
+
+def test_update_keeps_transform_order():
+    from math import pi
+    state = init() \
+        .add('1', transform=rotate(pi / 2.0)) \
+        .add('1-1', parent='1', point=Point(1, 0, 0)) \
+        .add('2', point=Point(1, 0, 0))
+    assert isclose(
+        change_base(state, src='2', dst='1-1'), (0.0, 0.0, 0)).all()
+    state = update(state, '1-1', Point(2, 0, 0))
+    assert isclose(
+        change_base(state, src='1-1', dst='2'), (-1.0, -2.0, 0)).all()
+
+
+def test_max_z_follows_changes(state):
+    assert max_z(state, ROOT) == 26.0
+    state = state.add('3', point=Point(0, 0, 50))
+    assert max_z(state, ROOT) == 50.0
+    assert max_z(state, '1') == 23.0
+    lowered = update(state, '3', Point(0, 0, 10))
+    assert max_z(lowered, ROOT) == 26.0
+    # Moving a node moves everything below it
+    raised = update(lowered, '1', Point(1, 2, 30))
+    assert max_z(raised, ROOT) == 53.0
+    assert max_z(raised, '1') == 23.0
+    assert max_z(remove(raised, '1'), ROOT) == 10.0
+    assert max_z(state, ROOT) == 50.0
+
+
+def test_versions_share_nodes(state):
+    moved = update(state, '1', Point(5, 5, 5))
+    assert moved._store is state._store
+    assert (change_base(moved, src='1-1-1') == (16, 17, 18)).all()
+    # Going back and forth between versions keeps each one's own view
+    removed = remove(state, '1')
+    assert '1' not in removed and '1' in moved
+    assert (change_base(moved, src='1-1-1') == (16, 17, 18)).all()
+    assert (change_base(state, src='1-1-1') == (12, 14, 16)).all()
+    assert max_z(removed, ROOT) == -3.0
+    assert max_z(moved, ROOT) == 28.0
+    assert max_z(state, ROOT) == 26.0
+    assert {*removed} == {ROOT, '2', '2-1', '2-2'}
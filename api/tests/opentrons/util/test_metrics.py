@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+
+from opentrons.util import metrics
+
+
+@pytest.fixture
+def registry():
+    metrics.enable(True)
+    yield metrics.Registry()
+    metrics.enable(False)
+
+
+def test_disabled_is_a_no_op(registry):
+    counter = registry.counter('test_total', 'A counter')
+    histogram = registry.histogram('test_seconds', 'A histogram', ['op'])
+
+    @metrics.timed(histogram, 'call')
+    def call():
+        return 5
+
+    metrics.enable(False)
+    counter.inc()
+    histogram.labels('direct').observe(1.0)
+    with metrics.Timer(histogram.labels('timer')):
+        pass
+    assert call() == 5
+    assert histogram.labels('call').count == 0
+    assert histogram.labels('timer').count == 0
+    assert histogram.labels('direct').count == 0
+    assert counter.labels().value == 0
+    assert registry.render().startswith('# Metrics collection is disabled\n')
+
+
+def test_render(registry):
+    counter = registry.counter('test_retries_total', 'Retries', ['module'])
+    histogram = registry.histogram('test_seconds', 'Durations', ['op'],
+                                   buckets=[0.1, 1.0])
+    counter.labels('tempdeck').inc()
+    counter.labels('tempdeck').inc(2)
+    counter.labels('mag"deck').inc()
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.labels('move').observe(value)
+
+    assert registry.render() == '\n'.join([
+        '# HELP test_retries_total Retries',
+        '# TYPE test_retries_total counter',
+        'test_retries_total{module="tempdeck"} 3',
+        'test_retries_total{module="mag\\"deck"} 1',
+        '# HELP test_seconds Durations',
+        '# TYPE test_seconds histogram',
+        'test_seconds_bucket{op="move",le="0.1"} 2',
+        'test_seconds_bucket{op="move",le="1"} 3',
+        'test_seconds_bucket{op="move",le="+Inf"} 4',
+        'test_seconds_sum{op="move"} 2.65',
+        'test_seconds_count{op="move"} 4',
+        ''])
+
+    registry.clear()
+    assert 'module="tempdeck"' not in registry.render()
+
+
+def test_registration(registry):
+    first = registry.histogram('test_seconds', 'Durations', ['op'])
+    assert registry.histogram('test_seconds', 'Durations', ['op']) is first
+    with pytest.raises(ValueError):
+        registry.counter('test_seconds', 'Durations', ['op'])
+    with pytest.raises(ValueError):
+        registry.histogram('test_seconds', 'Durations', ['other', 'labels'])
+    with pytest.raises(ValueError):
+        first.labels('too', 'many')
+
+
+async def test_timed(registry):
+    histogram = registry.histogram('test_seconds', 'Durations', ['op'])
+
+    @metrics.timed(histogram, 'sync')
+    def sync_call():
+        raise RuntimeError('oops')
+
+    @metrics.timed(histogram, 'async')
+    async def async_call():
+        await asyncio.sleep(0.01)
+        return 'done'
+
+    assert asyncio.iscoroutinefunction(async_call)
+    assert await async_call() == 'done'
+    with pytest.raises(RuntimeError):
+        sync_call()
+    assert histogram.labels('async').count == 1
+    assert histogram.labels('async').sum >= 0.01
+    assert histogram.labels('sync').count == 1
+
+
+def test_hardware_is_instrumented(registry):
+    from opentrons import types
+    from opentrons.broker import Broker, PUBLISHES
+    from opentrons.hardware_control import API, ThreadManager, api, adapters
+
+    metrics.clear()
+    hardware = ThreadManager(API.build_hardware_simulator)
+    try:
+        hardware.sync.home()
+        hardware.sync.move_to(types.Mount.RIGHT, types.Point(50, 50, 100))
+    finally:
+        hardware.clean_up()
+    Broker().publish('topic', {})
+
+    assert api.CALLS.labels('move_to').count == 1
+    assert api.CALLS.labels('_move').count >= 1
+    assert adapters.HOPS.labels('sync').count >= 2
+    assert PUBLISHES.labels('topic').count == 1
+    text = metrics.render()
+    assert 'opentrons_hardware_call_seconds_count{call="move_to"} 1' in text
+    metrics.clear()
@@ -469,6 +469,15 @@ export function client(dispatch) {
         handledAt: apiSession.lastCommand.handledAt,
       }
 
+      // updates merged by the API carry every command handled since the
+      // last one that was sent
+      if (apiSession.handledCommands) {
+        update.handledCommands = apiSession.handledCommands.map(c => ({
+          id: c.id,
+          handledAt: c.handledAt,
+        }))
+      }
+
       return dispatch(
         actions.sessionUpdate({ ...update, lastCommand }, Date.now())
       )
@@ -161,21 +161,25 @@ function handleSessionUpdate(
   action: SessionUpdateAction
 ): SessionState {
   const {
-    payload: { state: sessionStateUpdate, startTime, lastCommand },
+    payload: {
+      state: sessionStateUpdate,
+      startTime,
+      lastCommand,
+      handledCommands,
+    },
     meta: { now },
   } = action
   let { protocolCommandsById, remoteTimeCompensation } = state
-
-  if (lastCommand) {
-    const command = {
-      ...protocolCommandsById[lastCommand.id],
-      ...lastCommand,
-    }
-
-    protocolCommandsById = {
-      ...protocolCommandsById,
-      [lastCommand.id]: command,
-    }
+  const handled = handledCommands || (lastCommand ? [lastCommand] : [])
+
+  if (handled.length) {
+    protocolCommandsById = { ...protocolCommandsById }
+    handled.forEach(handledCommand => {
+      protocolCommandsById[handledCommand.id] = {
+        ...protocolCommandsById[handledCommand.id],
+        ...handledCommand,
+      }
+    })
   }
 
   // compensate for clock differences between the robot and app
@@ -693,6 +693,21 @@ describe('api client', () => {
         .then(() => sendNotification('session', update))
         .then(() => expect(dispatch).toHaveBeenCalledWith(expected))
     })
+
+    it('sends handled commands of merged session notifications', () => {
+      const lastCommand = { id: 2, handledAt: 4 }
+      const update = {
+        state: 'running',
+        startTime: 1,
+        lastCommand,
+        handledCommands: [{ id: 1, handledAt: 3 }, lastCommand],
+      }
+      const expected = actions.sessionUpdate(update, expect.any(Number))
+
+      return sendConnect()
+        .then(() => sendNotification('session', update))
+        .then(() => expect(dispatch).toHaveBeenCalledWith(expected))
+    })
   })
 
   describe('calibration', () => {
@@ -187,6 +187,47 @@ describe('robot reducer - session', () => {
     })
   })
 
+  it('handles SESSION_UPDATE action with merged commands', () => {
+    const state = {
+      session: {
+        state: 'running',
+        startTime: 1,
+        remoteTimeCompensation: 3,
+        protocolCommands: [0, 1, 2],
+        protocolCommandsById: {
+          0: { id: 0, handledAt: 2 },
+        },
+      },
+    }
+    const action = {
+      type: 'robot:SESSION_UPDATE',
+      payload: {
+        state: 'running',
+        startTime: 1,
+        lastCommand: { id: 2, handledAt: 4 },
+        handledCommands: [
+          { id: 1, handledAt: 3 },
+          { id: 2, handledAt: 4 },
+        ],
+      },
+      meta: {
+        now: 7,
+      },
+    }
+
+    expect(reducer(state, action).session).toEqual({
+      state: 'running',
+      remoteTimeCompensation: 3,
+      startTime: 1,
+      protocolCommands: [0, 1, 2],
+      protocolCommandsById: {
+        0: { id: 0, handledAt: 2 },
+        1: { id: 1, handledAt: 3 },
+        2: { id: 2, handledAt: 4 },
+      },
+    })
+  })
+
   it('handles RUN action', () => {
     const state = {
       session: {
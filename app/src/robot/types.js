@@ -164,6 +164,10 @@ export type SessionUpdate = {|
     id: number,
     handledAt: number,
   |},
+  handledCommands?: Array<{|
+    id: number,
+    handledAt: number,
+  |}>,
 |}
 
 export type TiprackByMountMap = {|
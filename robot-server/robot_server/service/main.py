@@ -9,7 +9,7 @@ from starlette.exceptions import HTTPException as StarletteHTTPException
 from starlette.status import HTTP_422_UNPROCESSABLE_ENTITY
 
 from .routers import health, networking, control, settings, deck_calibration, \
-    modules, pipettes, motors, camera, logs, rpc, item
+    modules, pipettes, motors, camera, logs, rpc, item, metrics
 from .models import V1BasicResponse
 from .exceptions import V1HandlerError
 from .dependencies import get_rpc_server
@@ -47,6 +47,8 @@ app.include_router(router=logs.router,
                    tags=["logs"])
 app.include_router(router=rpc.router,
                    tags=["rpc"])
+app.include_router(router=metrics.router,
+                   tags=["metrics"])
 # TODO(isk: 3/18/20): this is an example route, remove item route and model
 # once response work is implemented in new route handlers
 app.include_router(router=item.router,
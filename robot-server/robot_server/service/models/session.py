@@ -0,0 +1,37 @@
+import typing
+
+from pydantic import BaseModel, Field
+
+
+class CommandLogEntry(BaseModel):
+    """When a command of the run was handled"""
+    id: int = \
+        Field(...,
+              description="The command id, as in the session's command tree")
+    handledAt: int = \
+        Field(...,
+              description="When the command was handled, in milliseconds "
+                          "since the epoch")
+    description: typing.Optional[str] = \
+        Field(None,
+              description="The description of the command, from simulating "
+                          "the protocol")
+    level: typing.Optional[int] = \
+        Field(None,
+              description="How deeply the command is nested in other "
+                          "commands")
+
+
+class CommandLogPage(BaseModel):
+    """A page of the command log of the protocol session"""
+    entries: typing.List[CommandLogEntry]
+    firstAvailable: int = \
+        Field(...,
+              description="The id of the oldest command still in the log")
+    total: int = \
+        Field(...,
+              description="How many commands have been logged in this run")
+    maxEntries: int = \
+        Field(...,
+              description="How many commands the log keeps (0 for all of "
+                          "them)")
@@ -0,0 +1,26 @@
+import asyncio
+
+from starlette.responses import StreamingResponse
+
+
+class EndlessStreamingResponse(StreamingResponse):
+    """A streaming response that stops when the client disconnects, for
+    streams that would otherwise never end"""
+
+    async def __call__(self, scope, receive, send) -> None:
+        async def wait_for_disconnect():
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+
+        streaming = asyncio.ensure_future(
+            super().__call__(scope, receive, send))
+        disconnected = asyncio.ensure_future(wait_for_disconnect())
+        try:
+            await asyncio.wait([streaming, disconnected],
+                               return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in (streaming, disconnected):
+                task.cancel()
+            await self.body_iterator.aclose()
+        if streaming.done() and not streaming.cancelled():
+            streaming.result()
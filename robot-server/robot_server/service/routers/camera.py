@@ -2,14 +2,18 @@ import logging
 import os
 import io
 import tempfile
+import typing
 from pathlib import Path
 from http import HTTPStatus
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from starlette.background import BackgroundTask
-from starlette.responses import StreamingResponse
+from starlette.responses import Response, StreamingResponse
+from opentrons.config import feature_flags as ff
 from opentrons.system import camera
 
+from robot_server.service.responses import EndlessStreamingResponse
+
 
 log = logging.getLogger(__name__)
 
@@ -27,8 +31,19 @@ JPG = "image/jpg"
                      "description": "The image"
                  }
              })
-async def post_picture_capture() -> StreamingResponse:
+async def post_picture_capture() -> Response:
     """Take a picture"""
+    worker = camera.get_capture_worker()
+    if ff.use_camera_capture_worker() or worker.running:
+        # The camera is (or will be kept) running, so the picture is just
+        # its latest frame
+        try:
+            frame = await worker.picture()
+        except camera.CameraException as e:
+            raise HTTPException(
+                status_code=HTTPStatus.INTERNAL_SERVER_ERROR, detail=str(e))
+        return Response(frame, media_type=JPG)
+
     filename = Path(tempfile.mktemp(suffix=".jpg"))
 
     try:
@@ -47,6 +62,47 @@ async def post_picture_capture() -> StreamingResponse:
                             detail=str(e))
 
 
+@router.get("/camera/stream",
+            description="Stream MJPEG video from the OT-2's onboard camera "
+                        "for as long as the connection stays open. The "
+                        "camera starts when the first client connects and "
+                        "stops shortly after the last one disconnects.",
+            responses={
+                HTTPStatus.OK: {
+                    "content": {camera.MJPEG_CONTENT_TYPE: {}},
+                    "description": "The video"
+                }
+            })
+async def get_camera_stream(
+        fps: float = Query(camera.DEFAULT_STREAM_FPS,
+                           title="The most frames to send per second",
+                           gt=0, le=camera.CAPTURE_FPS)
+) -> StreamingResponse:
+    frames = camera.get_capture_worker().stream(fps)
+    try:
+        # Wait for the camera to start before committing to a response
+        frame = await frames.__anext__()
+    except camera.CameraException as e:
+        await frames.aclose()
+        raise HTTPException(status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
+                            detail=str(e))
+    return EndlessStreamingResponse(_mjpeg_parts(frame, frames),
+                                    media_type=camera.MJPEG_CONTENT_TYPE)
+
+
+async def _mjpeg_parts(first: bytes,
+                       frames: typing.AsyncGenerator[bytes, None]) \
+        -> typing.AsyncGenerator[bytes, None]:
+    try:
+        yield camera.mjpeg_part(first)
+        async for frame in frames:
+            yield camera.mjpeg_part(frame)
+    except camera.CameraException as e:
+        log.warning("Camera stream ended: %s", e)
+    finally:
+        await frames.aclose()
+
+
 def _cleanup(filename: Path, fd: io.IOBase) -> None:
     """Clean up after sending the response"""
     try:
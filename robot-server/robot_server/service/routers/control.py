@@ -1,9 +1,12 @@
 import asyncio
 
+from opentrons.drivers.smoothie_drivers import telemetry
 from opentrons.hardware_control import HardwareAPILike, ThreadedAsyncLock
 from opentrons.hardware_control.types import Axis, CriticalPoint
 from opentrons.types import Mount, Point
 from fastapi import APIRouter, Query, Depends
+from starlette.responses import Response
+from starlette.websockets import WebSocket
 
 from robot_server.service.dependencies import get_hardware, get_motion_lock
 from robot_server.service.exceptions import V1HandlerError
@@ -132,3 +135,65 @@ async def post_robot_light_state(
         -> control.RobotLightState:
     await hardware.set_lights(rails=robot_light_state.on)  # type: ignore
     return robot_light_state
+
+
+@router.get("/robot/telemetry",
+            description="Get the most recent moves and homes sent to the "
+                        "motion controller",
+            summary="Get the most recent motion events, oldest first, as "
+                    "packed binary records laid out as the Python struct "
+                    "format in the X-Telemetry-Format header: the sequence "
+                    "number, the event (1 for a move, 2 for a split move, "
+                    "3 for a home), the times the command was sent, "
+                    "acknowledged and done, the speed, and the target and "
+                    "current of each of the axes XYZABC. The "
+                    "X-Telemetry-Sequence header is the sequence number of "
+                    "the next event.",
+            responses={
+                200: {
+                    "content": {"application/octet-stream": {}},
+                    "description": "The events"
+                }
+            })
+async def get_motion_telemetry(
+        since: int = Query(
+            0, ge=0,
+            description="Only get events with sequence numbers of at least "
+                        "this"),
+        hardware: HardwareAPILike = Depends(get_hardware)) -> Response:
+    buffer = hardware.telemetry  # type: ignore
+    # Read the sequence first so that an event recorded while dumping is
+    # sent again next time rather than skipped
+    headers = {'X-Telemetry-Format': telemetry.RECORD_FORMAT,
+               'X-Telemetry-Sequence': str(buffer.sequence)}
+    return Response(
+        content=buffer.dump(since),
+        media_type='application/octet-stream',
+        headers=headers)
+
+
+@router.websocket("/robot/telemetry/stream")
+async def stream_motion_telemetry(
+        websocket: WebSocket,
+        since: int = Query(
+            None, ge=0,
+            description="The sequence number of the first event to send. "
+                        "If not specified, the stream starts with the next "
+                        "event"),
+        hardware: HardwareAPILike = Depends(get_hardware)):
+    """Send the motion events as they are recorded, packed as in
+    GET /robot/telemetry"""
+    await websocket.accept()
+
+    async def send():
+        async for packed in telemetry.stream(
+                hardware.telemetry, since):  # type: ignore
+            await websocket.send_bytes(packed)
+
+    sender = asyncio.get_event_loop().create_task(send())
+    try:
+        # Nothing is expected from the client; this returns once it closes
+        while (await websocket.receive())['type'] != 'websocket.disconnect':
+            pass
+    finally:
+        sender.cancel()
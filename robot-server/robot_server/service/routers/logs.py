@@ -1,13 +1,35 @@
-from fastapi import APIRouter, Query
+import typing
+import zlib
+
+from fastapi import APIRouter, Header, Query
+from starlette.responses import StreamingResponse
 
 from opentrons.system import log_control
 from robot_server.service.models.logs import LogIdentifier, \
     LogFormat
+from robot_server.service.responses import EndlessStreamingResponse
 
 router = APIRouter()
 
 
-@router.get("/logs/{log_identifier}", description="Get logs from the robot.")
+async def _gzip(chunks: typing.AsyncGenerator[bytes, None]) \
+        -> typing.AsyncGenerator[bytes, None]:
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    try:
+        async for chunk in chunks:
+            # Flush every chunk so that followed logs are not held back
+            yield compressor.compress(chunk)\
+                + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+    finally:
+        await chunks.aclose()
+
+
+@router.get("/logs/{log_identifier}",
+            description="Get logs from the robot. The logs are streamed as "
+                        "they are read, and gzipped if the client accepts "
+                        "it.",
+            response_class=StreamingResponse)
 async def get_logs(
     log_identifier: LogIdentifier,
     format: LogFormat = Query(LogFormat.text, title="Log format type"),
@@ -15,14 +37,31 @@ async def get_logs(
         log_control.DEFAULT_RECORDS, title="Number of records to retrieve",
         gt=0, le=log_control.MAX_RECORDS
     ),
-) -> str:
+    after_cursor: str = Query(
+        None, title="Only get the records after the one with this journald "
+                    "cursor",
+        description="In json format every record has its cursor in "
+                    "__CURSOR; in text format the cursor of the last record "
+                    "is sent on the last line, after '-- cursor:'"
+    ),
+    follow: bool = Query(
+        False, title="Keep sending new records as they are logged until "
+                     "the client disconnects"
+    ),
+    accept_encoding: str = Header(None),
+) -> StreamingResponse:
     identifier = 'opentrons-api-serial'
     if log_identifier == LogIdentifier.api:
         identifier = 'opentrons-api'
 
     modes = {LogFormat.json: "json", LogFormat.text: "short"}
     format_type = modes[format]
-    output = await log_control.get_records_dumb(
-        identifier, records, format_type
-    )
-    return output.decode("utf-8")
+    chunks = log_control.stream_records(
+        identifier, records, format_type,
+        after_cursor=after_cursor, follow=follow)
+    headers = {}
+    if accept_encoding and 'gzip' in accept_encoding:
+        chunks = _gzip(chunks)
+        headers['Content-Encoding'] = 'gzip'
+    response_class = EndlessStreamingResponse if follow else StreamingResponse
+    return response_class(chunks, media_type='text/plain', headers=headers)
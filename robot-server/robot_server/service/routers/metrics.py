@@ -0,0 +1,26 @@
+from http import HTTPStatus
+
+from fastapi import APIRouter
+from starlette.responses import Response
+from opentrons.util import metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics",
+            description="Retrieve performance metrics in the Prometheus "
+                        "text format",
+            summary="Counters and latency histograms for motion, "
+                    "pipetting, smoothie and module serial commands, calls "
+                    "into the hardware thread, and notifications. Values "
+                    "are only collected while the enableMetrics setting is "
+                    "on.",
+            responses={
+                HTTPStatus.OK: {
+                    "content": {"text/plain": {}},
+                    "description": "The metrics"
+                }
+            })
+async def get_metrics() -> Response:
+    return Response(content=metrics.render(),
+                    headers={'Content-Type': metrics.CONTENT_TYPE})
@@ -1,7 +1,14 @@
-from fastapi import Depends, APIRouter
+import typing
+
+from fastapi import Depends, APIRouter, Query
+from starlette import status
 from starlette.websockets import WebSocket
 
+from opentrons.api.command_log import DEFAULT_PAGE_SIZE
+
 from robot_server.service.dependencies import get_rpc_server
+from robot_server.service.exceptions import V1HandlerError
+from robot_server.service.models.session import CommandLogPage
 from robot_server.service.rpc.rpc import RPCServer
 
 
@@ -13,3 +20,35 @@ async def websocket_endpoint(websocket: WebSocket,
                              rpc_server: RPCServer = Depends(get_rpc_server)):
     await websocket.accept()
     await rpc_server.handle_new_connection(websocket)
+
+
+@router.get("/session/commands",
+            description="Get a page of the command log of the protocol "
+                        "session",
+            summary="Page through the times at which the commands of the "
+                    "current run of the protocol session (uploaded over RPC) "
+                    "were handled. Only the most recent commands are kept; "
+                    "commands before firstAvailable have been dropped.",
+            response_model=CommandLogPage,
+            responses={
+                status.HTTP_404_NOT_FOUND: {
+                    "description": "No protocol session is loaded"
+                }
+            })
+async def get_command_log(
+        start: typing.Optional[int] = Query(
+            None, ge=0,
+            description="The id of the first command to get. If not "
+                        "specified, the page ends with the latest command"),
+        count: int = Query(
+            DEFAULT_PAGE_SIZE, ge=0,
+            description="The maximum number of commands to get"),
+        rpc_server: RPCServer = Depends(get_rpc_server)) -> CommandLogPage:
+    session_manager = getattr(rpc_server.root, 'session_manager', None)
+    page = None
+    if session_manager:
+        page = session_manager.get_command_log(start, count)
+    if page is None:
+        raise V1HandlerError(status_code=status.HTTP_404_NOT_FOUND,
+                             message="No protocol session")
+    return CommandLogPage(**page)
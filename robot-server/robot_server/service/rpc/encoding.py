@@ -0,0 +1,177 @@
+""" opentrons.server.encoding: wire formats for the RPC websocket
+
+Messages are sent as JSON text frames unless the client asks for something
+else with query parameters when it connects:
+
+- ``encoding=msgpack``: send MessagePack instead of JSON.
+- ``compression=deflate``: compress messages with a raw deflate stream that
+  lasts as long as the connection, so that content repeated between messages
+  (attribute names, types, ids) costs almost nothing. Every message ends with
+  a sync flush and can be inflated as soon as it arrives.
+- ``keyTable=true`` (MessagePack only): replace dict keys with their index
+  in a table kept for the connection. Each message is then an array of the
+  keys added to the table by this message, followed by the message itself.
+
+Anything other than plain JSON is sent in binary frames. If a client asked
+for anything, the control message sent when it connects says what it got
+in ``$.encoding``, ``$.compression`` and ``$.keyTable``.
+
+Clients may send binary frames of MessagePack instead of JSON text at any
+time; see :py:meth:`decode_request`.
+"""
+import json
+import logging
+import zlib
+from typing import Any, Dict, List, Mapping, Union
+
+import msgpack  # type: ignore
+
+log = logging.getLogger(__name__)
+
+JSON = 'json'
+MSGPACK = 'msgpack'
+DEFLATE = 'deflate'
+
+#: Keys past this many are sent as strings rather than added to the table
+MAX_KEY_TABLE_SIZE = 4096
+
+_TRUE = ('1', 'true')
+
+# Clients may send integer keys, which msgpack refuses by default
+_UNPACK_OPTIONS: Dict[str, Any] = {'raw': False, 'strict_map_key': False}
+
+
+def _json_key(key) -> str:
+    # Keys as they would come out of json.dumps
+    if isinstance(key, str):
+        return key
+    return json.dumps(key)
+
+
+class MessageEncoder:
+    """ Encodes the messages sent to one client.
+
+    An encoder keeps state between messages (the compression stream and the
+    key table), so each connection needs its own and messages must be sent
+    in the order they were encoded.
+
+    :param encoding: ``'json'`` or ``'msgpack'``
+    :param compression: ``None`` or ``'deflate'``
+    :param key_table: Whether to replace keys with key table indices. Only
+                      used with MessagePack.
+    """
+
+    def __init__(self,
+                 encoding: str = JSON,
+                 compression: str = None,
+                 key_table: bool = False) -> None:
+        self.requested = (encoding != JSON) or bool(compression) or key_table
+        if encoding not in (JSON, MSGPACK):
+            log.warning(f'Unknown encoding {encoding}, using json')
+            encoding = JSON
+        if compression and compression != DEFLATE:
+            log.warning(f'Unknown compression {compression}, ignoring')
+            compression = None
+        self.encoding = encoding
+        self.compression = compression
+        self.key_table = key_table and encoding == MSGPACK
+        self.binary = encoding != JSON or compression is not None
+        self._keys: Dict[str, int] = {}
+        self._compressor = None
+        if compression:
+            self._compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+
+    @classmethod
+    def from_query(cls, query: Mapping[str, str]) -> 'MessageEncoder':
+        """ Build the encoder a client asked for in its query string """
+        return cls(
+            encoding=query.get('encoding', JSON).lower(),
+            compression=query.get('compression', '').lower() or None,
+            key_table=query.get('keyTable', '').lower() in _TRUE)
+
+    def describe(self) -> Dict[str, Any]:
+        """ What the client got, for the control message """
+        return {
+            'encoding': self.encoding,
+            'compression': self.compression,
+            'keyTable': self.key_table
+        }
+
+    def _replace_keys(self, obj, new_keys: List[str]):
+        if isinstance(obj, dict):
+            replaced = {}
+            for key, value in obj.items():
+                key = _json_key(key)
+                index = self._keys.get(key)
+                if index is None and len(self._keys) < MAX_KEY_TABLE_SIZE:
+                    index = len(self._keys)
+                    self._keys[key] = index
+                    new_keys.append(key)
+                replaced[key if index is None else index]\
+                    = self._replace_keys(value, new_keys)
+            return replaced
+        elif isinstance(obj, (list, tuple)):
+            return [self._replace_keys(value, new_keys) for value in obj]
+        return obj
+
+    def encode(self, message) -> Union[str, bytes]:
+        """ Encode a message. The result is bytes if :py:attr:`binary`. """
+        if self.encoding == MSGPACK:
+            if self.key_table:
+                new_keys: List[str] = []
+                body = self._replace_keys(message, new_keys)
+                message = [new_keys, body]
+            data = msgpack.packb(message, use_bin_type=True)
+        elif self._compressor:
+            data = json.dumps(message).encode()
+        else:
+            return json.dumps(message)
+        if self._compressor:
+            data = self._compressor.compress(data)\
+                + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        return data
+
+
+class MessageDecoder:
+    """ The client side of :py:class:`MessageEncoder` """
+
+    def __init__(self,
+                 encoding: str = JSON,
+                 compression: str = None,
+                 key_table: bool = False) -> None:
+        self.encoding = encoding
+        self.key_table = key_table
+        self._keys: List[str] = []
+        self._decompressor = None
+        if compression:
+            self._decompressor = zlib.decompressobj(wbits=-zlib.MAX_WBITS)
+
+    def _restore_keys(self, obj):
+        if isinstance(obj, dict):
+            return {(self._keys[k] if isinstance(k, int) else k):
+                    self._restore_keys(v) for k, v in obj.items()}
+        elif isinstance(obj, list):
+            return [self._restore_keys(v) for v in obj]
+        return obj
+
+    def decode(self, data: Union[str, bytes]):
+        if isinstance(data, str):
+            return json.loads(data)
+        if self._decompressor:
+            data = self._decompressor.decompress(data)
+        if self.encoding != MSGPACK:
+            return json.loads(data)
+        message = msgpack.unpackb(data, **_UNPACK_OPTIONS)
+        if self.key_table:
+            new_keys, body = message
+            self._keys.extend(new_keys)
+            message = self._restore_keys(body)
+        return message
+
+
+def decode_request(data: Union[str, bytes]) -> Any:
+    """ Decode a message received from a client: JSON if it came in a text
+    frame, MessagePack if it came in a binary one """
+    if isinstance(data, str):
+        return json.loads(data)
+    return msgpack.unpackb(data, **_UNPACK_OPTIONS)
@@ -4,10 +4,13 @@ import logging
 import traceback
 import typing
 
-from starlette.websockets import WebSocket, WebSocketState
+from starlette.websockets import (
+    WebSocket, WebSocketDisconnect, WebSocketState)
 from starlette.status import WS_1001_GOING_AWAY
 
-from . import serialize
+from . import encoding, serialize
+from opentrons.broker import (
+    DEFAULT_COALESCE_WINDOW, NotificationCoalescer)
 from opentrons.protocol_api.execute import ExceptionInProtocolError
 from concurrent.futures import ThreadPoolExecutor
 
@@ -30,14 +33,20 @@ class ClientWriterTask(typing.NamedTuple):
     socket: WebSocket
     queue: asyncio.Queue
     task: asyncio.Task
+    # Fingerprints of the objects sent to this client, if it asked for
+    # object deltas
+    sent: typing.Optional[typing.Dict[int, bytes]] = None
 
 
 class RPCServer(object):
-    def __init__(self, loop, root=None):
+    def __init__(self, loop, root=None,
+                 notification_window=DEFAULT_COALESCE_WINDOW):
         self.monitor_events_task = None
         self.loop = loop or asyncio.get_event_loop()
         self.objects = {}
         self.system = SystemCalls(self.objects)
+        self.notification_coalescer = NotificationCoalescer(
+            self.send_notification, notification_window, self.loop)
 
         self.root = root
 
@@ -63,6 +72,7 @@ class RPCServer(object):
         for writer in self.clients:
             writer.task.cancel()
         self.monitor_events_task.cancel()
+        self.notification_coalescer.clear()
 
     async def on_shutdown(self):
         """
@@ -75,15 +85,26 @@ class RPCServer(object):
 
         self.shutdown()
 
-    def send_worker(self, socket: WebSocket) -> ClientWriterTask:
+    def send_worker(self,
+                    socket: WebSocket,
+                    deltas: bool = False,
+                    encoder: encoding.MessageEncoder = None
+                    ) -> ClientWriterTask:
         """
         Create a send queue and task to read from said queue and send objects
         over socket.
 
         :param socket: Web socket
+        :param deltas: If set, objects the client has already been sent and
+                       that have not changed since are sent as light
+                       references (see :py:meth:`.serialize.prune_tree`)
+        :param encoder: How to encode messages. JSON if not specified.
         :return: The client object.
         """
         _id = id(socket)
+        encoder_ = encoder or encoding.MessageEncoder()
+        sent: typing.Optional[typing.Dict[int, bytes]] = \
+            {} if deltas else None
 
         def task_done(future):
             try:
@@ -93,34 +114,42 @@ class RPCServer(object):
 
         async def send_task(socket_: WebSocket, queue_: asyncio.Queue):
             while True:
-                payload = await queue_.get()
+                payload, digests = await queue_.get()
+                if sent is not None and digests is not None:
+                    payload = serialize.prune_tree(payload, digests, sent)
                 if socket_.client_state == WebSocketState.DISCONNECTED:
                     log.debug('Websocket %s closed', _id)
                     break
 
-                await socket_.send_json(payload)
+                await send_encoded(socket_, encoder_, payload)
 
         queue: asyncio.Queue = asyncio.Queue(loop=self.loop)
         task = self.loop.create_task(send_task(socket, queue))
         task.add_done_callback(task_done)
         log.debug('Send task for %s started', _id)
 
-        return ClientWriterTask(socket=socket, queue=queue, task=task)
+        return ClientWriterTask(
+            socket=socket, queue=queue, task=task, sent=sent)
 
     async def monitor_events(self, instance):
+        # Updates held back for the previous root are not relevant anymore
+        self.notification_coalescer.clear()
         async for event in instance.notifications:
-            try:
-                # Apply notification_max_depth to control object tree depth
-                # during serialization to avoid flooding comms
-                data = self.call_and_serialize(
-                    lambda: event)
-                self.send(
-                    {
-                        '$': {'type': NOTIFICATION_MESSAGE},
-                        'data': data
-                    })
-            except Exception:
-                log.exception('While processing event {0}:'.format(event))
+            self.notification_coalescer.submit(event)
+
+    def send_notification(self, event):
+        try:
+            # Apply notification_max_depth to control object tree depth
+            # during serialization to avoid flooding comms
+            data = self.call_and_serialize(
+                lambda: event)
+            self.send(
+                {
+                    '$': {'type': NOTIFICATION_MESSAGE},
+                    'data': data
+                })
+        except Exception:
+            log.exception('While processing event {0}:'.format(event))
 
     async def handle_new_connection(self, socket: WebSocket):
         """Handle a new client connection"""
@@ -136,24 +165,30 @@ class RPCServer(object):
                 )
 
         socket_id = id(socket)
+        deltas = socket.query_params.get(
+            'objectDeltas', '').lower() in ('1', 'true')
+        encoder = encoding.MessageEncoder.from_query(socket.query_params)
 
         log.info('Opening Websocket {0}'.format(id(socket)))
 
+        writer = self.send_worker(socket, deltas, encoder)
         try:
-            await socket.send_json({
-                '$': {'type': CONTROL_MESSAGE, 'monitor': True},
-                'root': self.call_and_serialize(lambda: self.root),
-                'type': self.call_and_serialize(lambda: type(self.root))
-            })
+            control = self._control_message(encoder, writer.sent)
+            await send_encoded(socket, encoder, control)
         except Exception:
             log.exception('While sending root info to {0}'.format(socket_id))
 
         try:
             # Add new client to list of clients
-            self.clients.append(self.send_worker(socket))
+            self.clients.append(writer)
             # Async receive client data until websocket is closed
             while socket.client_state != WebSocketState.DISCONNECTED:
-                msg = await socket.receive_json()
+                message = await socket.receive()
+                if message['type'] == 'websocket.disconnect':
+                    raise WebSocketDisconnect(message.get('code', 1000))
+                msg = encoding.decode_request(
+                    message['text'] if message.get('text') is not None
+                    else message['bytes'])
                 task = self.loop.create_task(self.process(msg))
                 task.add_done_callback(task_done)
                 self.tasks += [task]
@@ -167,6 +202,22 @@ class RPCServer(object):
 
         return socket
 
+    def _control_message(self, encoder, sent):
+        """ The first message sent to a client: the root object, and the
+        encoding and object deltas negotiated for the connection """
+        control = {
+            '$': {'type': CONTROL_MESSAGE, 'monitor': True},
+            'root': self.call_and_serialize(lambda: self.root),
+            'type': self.call_and_serialize(lambda: type(self.root))
+        }
+        if encoder.requested:
+            control['$'].update(encoder.describe())
+        if sent is not None:
+            control['$']['objectDeltas'] = True
+            control = serialize.prune_tree(
+                control, serialize.digest_tree(control, self.objects), sent)
+        return control
+
     def build_call(self, _id, name, args):
         if _id not in self.objects:
             raise ValueError(
@@ -321,13 +372,26 @@ class RPCServer(object):
         })
 
     def send(self, payload):
+        digests = None
+        if any(writer.sent is not None for writer in self.clients):
+            digests = serialize.digest_tree(payload, self.objects)
         for writer in self.clients:
             asyncio.run_coroutine_threadsafe(
-                writer.queue.put(payload),
+                writer.queue.put((payload, digests)),
                 self.loop
             )
 
 
+async def send_encoded(socket: WebSocket,
+                       encoder: encoding.MessageEncoder,
+                       message: typing.Any):
+    data = encoder.encode(message)
+    if encoder.binary:
+        await socket.send_bytes(typing.cast(bytes, data))
+    else:
+        await socket.send_text(typing.cast(str, data))
+
+
 class SystemCalls(object):
     def __init__(self, objects):
         self.objects = objects
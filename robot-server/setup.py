@@ -49,7 +49,7 @@ INSTALL_REQUIRES = [
     'aiohttp==3.4.4',
     'fastapi==0.49.0',
     'python-multipart==0.0.5',
-
+    'msgpack==1.0.0',
 ]
 
 
@@ -1,3 +1,4 @@
+import asyncio
 import os
 from unittest.mock import patch
 import pytest
@@ -42,3 +43,53 @@ def test_camera_success(mock_take_picture, api_client):
     assert res.content == b"test image"
     # Make sure the tempfile was deleted
     assert os.path.exists(state['filename']) is False
+
+
+@pytest.fixture
+def frame_file(tmpdir):
+    frames = tmpdir.join('frames.mjpeg')
+    frames.write_binary(b'\xff\xd8first\xff\xd9\xff\xd8second\xff\xd9')
+    return str(frames)
+
+
+@pytest.fixture
+def capture_worker():
+    workers = []
+
+    def use_worker(source):
+        worker = camera.CaptureWorker(source, idle_timeout=0, settle_time=0)
+        workers.append(worker)
+        camera._capture_worker = worker
+        return worker
+
+    yield use_worker
+    camera._capture_worker = None
+    for worker in workers:
+        asyncio.get_event_loop().run_until_complete(worker.stop())
+
+
+def test_camera_from_capture_worker(mock_take_picture, capture_worker,
+                                    frame_file, api_client, monkeypatch):
+    monkeypatch.setenv('OT_API_FF_useCameraCaptureWorker', 'true')
+    capture_worker(camera.FileFrameSource(frame_file, fps=100))
+    res = api_client.post("/camera/picture")
+    assert res.status_code == 200
+    assert res.content in (b'\xff\xd8first\xff\xd9',
+                           b'\xff\xd8second\xff\xd9')
+    mock_take_picture.assert_not_called()
+
+
+def test_camera_stream(capture_worker, frame_file, api_client):
+    # Play the frames once, so that the stream ends
+    worker = capture_worker(
+        camera.FileFrameSource(frame_file, fps=100, repeat=False))
+    res = api_client.get("/camera/stream?fps=100")
+    assert res.status_code == 422
+
+    res = api_client.get("/camera/stream?fps=15")
+    assert res.status_code == 200
+    assert res.headers['Content-Type'] == camera.MJPEG_CONTENT_TYPE
+    assert res.content.startswith(
+        b'--frame\r\nContent-Type: image/jpeg\r\nContent-Length: 9\r\n\r\n'
+        b'\xff\xd8first\xff\xd9\r\n')
+    assert worker.clients == 0
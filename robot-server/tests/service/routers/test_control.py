@@ -1,9 +1,14 @@
+import struct
 from unittest.mock import call
 
 import pytest
+from opentrons.drivers.smoothie_drivers.telemetry import (
+    MotionEvent, MotionTelemetry, RECORD_DTYPE)
 from opentrons.hardware_control.types import Axis, CriticalPoint
 from opentrons.types import Mount, Point
 
+from robot_server.service import HARDWARE_APP_KEY
+
 
 def test_robot_info(api_client):
     res = api_client.get('/robot/positions')
@@ -241,3 +246,59 @@ def test_identify(api_client, hardware):
     assert res.json() == {"message": "identifying"}
 
     hardware.identify.assert_called_once_with(100)
+
+
+@pytest.fixture
+def motion_telemetry(hardware):
+    hardware.telemetry = MotionTelemetry(capacity=4)
+    for x in range(6):
+        hardware.telemetry.record(
+            MotionEvent.MOVE, x, x + 0.1, x + 1, {'X': x}, 400)
+    return hardware.telemetry
+
+
+def test_motion_telemetry(api_client, motion_telemetry):
+    resp = api_client.get('/robot/telemetry')
+    assert resp.status_code == 200
+    assert resp.headers['Content-Type'] == 'application/octet-stream'
+    assert resp.headers['X-Telemetry-Sequence'] == '6'
+    records = [
+        struct.unpack_from(resp.headers['X-Telemetry-Format'],
+                           resp.content, offset)
+        for offset in range(0, len(resp.content), RECORD_DTYPE.itemsize)]
+    assert [record[:6] for record in records] == [
+        (x, MotionEvent.MOVE, x, x + 0.1, x + 1, 400) for x in range(2, 6)]
+
+    resp = api_client.get('/robot/telemetry?since=5')
+    assert resp.content == motion_telemetry.dump(5)
+    assert api_client.get('/robot/telemetry?since=-1').status_code == 422
+
+
+def test_motion_telemetry_sequence_before_dump(
+        api_client, motion_telemetry, monkeypatch):
+    dump = motion_telemetry.dump
+
+    def dump_during_move(since):
+        # As if the next event were recorded while the response is built
+        motion_telemetry.record(MotionEvent.HOME, 7, 7, 8, {'Y': 353})
+        return dump(since)
+
+    monkeypatch.setattr(motion_telemetry, 'dump', dump_during_move)
+    resp = api_client.get('/robot/telemetry?since=6')
+    assert resp.headers['X-Telemetry-Sequence'] == '6'
+
+
+@pytest.fixture
+def app_hardware(api_client, hardware):
+    # Dependency overrides do not apply to websocket routes
+    api_client.app.extra[HARDWARE_APP_KEY] = hardware
+    yield
+    del api_client.app.extra[HARDWARE_APP_KEY]
+
+
+def test_motion_telemetry_stream(api_client, motion_telemetry, app_hardware):
+    with api_client.websocket_connect('/robot/telemetry/stream?since=4') \
+            as socket:
+        assert socket.receive_bytes() == motion_telemetry.dump(4)
+        motion_telemetry.record(MotionEvent.HOME, 7, 7, 8, {'Y': 353})
+        assert socket.receive_bytes() == motion_telemetry.dump(6)
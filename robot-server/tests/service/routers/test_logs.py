@@ -9,17 +9,19 @@ def test_get_serial_log_with_defaults(api_client):
     res_bytes = logs.encode('utf-8')
     expected = res_bytes.decode('utf-8')
 
-    async def mock_get_records_dumb(identifier, records, format_type):
-        return res_bytes
+    async def mock_stream_records(identifier, records, format_type,
+                                  after_cursor, follow):
+        yield res_bytes
 
-    with patch("opentrons.system.log_control.get_records_dumb") as m:
-        m.side_effect = mock_get_records_dumb
+    with patch("opentrons.system.log_control.stream_records") as m:
+        m.side_effect = mock_stream_records
         response = api_client.get("/logs/serial.log")
-        body = response.json()
+        body = response.text
         assert response.status_code == 200
         assert body == expected
         m.assert_called_once_with(
-            "opentrons-api-serial", DEFAULT_RECORDS, "short"
+            "opentrons-api-serial", DEFAULT_RECORDS, "short",
+            after_cursor=None, follow=False
         )
 
 
@@ -39,19 +41,21 @@ def test_get_serial_log_with_params(
     res_bytes = logs.encode('utf-8')
     expected = res_bytes.decode('utf-8')
 
-    async def mock_get_records_dumb(identifier, records, mode):
-        return res_bytes
+    async def mock_stream_records(identifier, records, mode,
+                                  after_cursor, follow):
+        yield res_bytes
 
-    with patch("opentrons.system.log_control.get_records_dumb") as m:
-        m.side_effect = mock_get_records_dumb
+    with patch("opentrons.system.log_control.stream_records") as m:
+        m.side_effect = mock_stream_records
         response = api_client.get(
             f"/logs/serial.log?format={format_param}&records={records_param}"
         )
-        body = response.json()
+        body = response.text
         assert response.status_code == 200
         assert body == expected
         m.assert_called_once_with(
-            "opentrons-api-serial", records_param, mode_param
+            "opentrons-api-serial", records_param, mode_param,
+            after_cursor=None, follow=False
         )
 
 
@@ -69,11 +73,12 @@ def test_get_serial_log_with_invalid_params(
     logs = '{"serial": "serial logs"}'
     res_bytes = logs.encode('utf-8')
 
-    async def mock_get_records_dumb(identifier, records, format_type):
-        return res_bytes
+    async def mock_stream_records(identifier, records, format_type,
+                                  after_cursor, follow):
+        yield res_bytes
 
-    with patch("opentrons.system.log_control.get_records_dumb") as m:
-        m.side_effect = mock_get_records_dumb
+    with patch("opentrons.system.log_control.stream_records") as m:
+        m.side_effect = mock_stream_records
         response = api_client.get(
             f"/logs/serial.log?format={format_param}&records={records_param}"
         )
@@ -86,16 +91,19 @@ def test_get_api_log_with_defaults(api_client):
     res_bytes = logs.encode('utf-8')
     expected = res_bytes.decode('utf-8')
 
-    async def mock_get_records_dumb(identifier, records, format_type):
-        return res_bytes
+    async def mock_stream_records(identifier, records, format_type,
+                                  after_cursor, follow):
+        yield res_bytes
 
-    with patch("opentrons.system.log_control.get_records_dumb") as m:
-        m.side_effect = mock_get_records_dumb
+    with patch("opentrons.system.log_control.stream_records") as m:
+        m.side_effect = mock_stream_records
         response = api_client.get("/logs/api.log")
-        body = response.json()
+        body = response.text
         assert response.status_code == 200
         assert body == expected
-        m.assert_called_once_with("opentrons-api", DEFAULT_RECORDS, "short")
+        m.assert_called_once_with(
+            "opentrons-api", DEFAULT_RECORDS, "short",
+            after_cursor=None, follow=False)
 
 
 @pytest.mark.parametrize(
@@ -114,18 +122,21 @@ def test_get_api_log_with_params(
     res_bytes = logs.encode('utf-8')
     expected = res_bytes.decode('utf-8')
 
-    async def mock_get_records_dumb(identifier, records, format_type):
-        return res_bytes
+    async def mock_stream_records(identifier, records, format_type,
+                                  after_cursor, follow):
+        yield res_bytes
 
-    with patch("opentrons.system.log_control.get_records_dumb") as m:
-        m.side_effect = mock_get_records_dumb
+    with patch("opentrons.system.log_control.stream_records") as m:
+        m.side_effect = mock_stream_records
         response = api_client.get(
             f"/logs/api.log?format={format_param}&records={records_param}"
         )
-        body = response.json()
+        body = response.text
         assert response.status_code == 200
         assert body == expected
-        m.assert_called_once_with("opentrons-api", records_param, mode_param)
+        m.assert_called_once_with(
+            "opentrons-api", records_param, mode_param,
+            after_cursor=None, follow=False)
 
 
 @pytest.mark.parametrize(
@@ -142,13 +153,35 @@ def test_get_api_log_with_invalid_params(
     logs = '{"api": "application programing interface logs"}'
     res_bytes = logs.encode('utf-8')
 
-    async def mock_get_records_dumb(identifier, records, format_type):
-        return res_bytes
+    async def mock_stream_records(identifier, records, format_type,
+                                  after_cursor, follow):
+        yield res_bytes
 
-    with patch("opentrons.system.log_control.get_records_dumb") as m:
-        m.side_effect = mock_get_records_dumb
+    with patch("opentrons.system.log_control.stream_records") as m:
+        m.side_effect = mock_stream_records
         response = api_client.get(
             f"/logs/api.log?format={format_param}&records={records_param}"
         )
         assert response.status_code == 422
         m.assert_not_called()
+
+
+def test_get_log_after_cursor_streams_gzipped(api_client):
+    chunks = [b'first record\n', b'second record\n', b'-- cursor: s=abc\n']
+
+    async def mock_stream_records(identifier, records, mode,
+                                  after_cursor, follow):
+        for chunk in chunks:
+            yield chunk
+
+    with patch("opentrons.system.log_control.stream_records") as m:
+        m.side_effect = mock_stream_records
+        response = api_client.get(
+            "/logs/api.log?after_cursor=s%3Dabc&follow=true",
+            headers={'Accept-Encoding': 'gzip'})
+        assert response.status_code == 200
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert response.content == b''.join(chunks)
+        m.assert_called_once_with(
+            "opentrons-api", DEFAULT_RECORDS, "short",
+            after_cursor="s=abc", follow=True)
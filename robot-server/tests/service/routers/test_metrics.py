@@ -0,0 +1,8 @@
+from opentrons.util import metrics
+
+
+def test_metrics(api_client):
+    resp = api_client.get('/metrics')
+    assert resp.status_code == 200
+    assert resp.headers['Content-Type'] == metrics.CONTENT_TYPE
+    assert '# TYPE opentrons_hardware_call_seconds histogram' in resp.text
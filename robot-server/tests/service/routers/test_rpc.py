@@ -0,0 +1,43 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from robot_server.service.dependencies import get_rpc_server
+
+
+@pytest.fixture
+def session_manager(api_client):
+    rpc_server = MagicMock()
+
+    async def get_rpc_server_override():
+        return rpc_server
+
+    api_client.app.dependency_overrides[get_rpc_server] = \
+        get_rpc_server_override
+    yield rpc_server.root.session_manager
+    del api_client.app.dependency_overrides[get_rpc_server]
+
+
+def test_get_command_log(api_client, session_manager):
+    page = {
+        'entries': [{'id': 3, 'handledAt': 1000, 'description': 'Homing',
+                     'level': 0}],
+        'firstAvailable': 2, 'total': 10, 'maxEntries': 8}
+    session_manager.get_command_log.return_value = page
+
+    res = api_client.get('/session/commands?start=3&count=1')
+    assert res.status_code == 200
+    assert res.json() == page
+    session_manager.get_command_log.assert_called_once_with(3, 1)
+
+
+def test_get_command_log_no_session(api_client, session_manager):
+    session_manager.get_command_log.return_value = None
+    res = api_client.get('/session/commands')
+    assert res.status_code == 404
+    assert res.json() == {'message': 'No protocol session'}
+
+
+def test_get_command_log_bad_count(api_client, session_manager):
+    res = api_client.get('/session/commands?count=-1')
+    assert res.status_code == 422
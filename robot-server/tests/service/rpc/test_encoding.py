@@ -0,0 +1,86 @@
+import json
+
+import msgpack  # type: ignore
+import pytest
+
+from robot_server.service.rpc import encoding
+
+
+MESSAGES = [
+    {'$': {'type': 3, 'monitor': True},
+     'root': {'i': 1, 't': 2, 'v': {'name': 'session', 0: 'a', 1: None}}},
+    {'$': {'type': 2},
+     'data': {'i': 1, 't': 2, 'v': {'name': 'session', 'state': 'running'}}},
+    {'$': {'type': 0, 'token': 'abc', 'status': 'success'}, 'data': [1.5]},
+]
+
+
+def as_json(message):
+    return json.loads(json.dumps(message))
+
+
+def round_trip(**options):
+    encoder = encoding.MessageEncoder(**options)
+    decoder = encoding.MessageDecoder(
+        encoder.encoding, encoder.compression, encoder.key_table)
+    frames = [encoder.encode(message) for message in MESSAGES]
+    return encoder, frames, [decoder.decode(frame) for frame in frames]
+
+
+def test_json_is_the_default():
+    encoder, frames, decoded = round_trip()
+    assert not encoder.requested
+    assert not encoder.binary
+    assert frames == [json.dumps(message) for message in MESSAGES]
+    assert decoded == [as_json(message) for message in MESSAGES]
+
+
+def test_deflate_json():
+    encoder, frames, decoded = round_trip(compression='deflate')
+    assert encoder.binary
+    assert decoded == [as_json(message) for message in MESSAGES]
+    # The stream is shared between messages, so repeated content is cheap
+    assert len(frames[1]) < len(json.dumps(MESSAGES[1]))
+
+
+@pytest.mark.parametrize('options', [
+    {},
+    {'compression': 'deflate'},
+    {'key_table': True},
+    {'compression': 'deflate', 'key_table': True},
+])
+def test_msgpack(options):
+    encoder, frames, decoded = round_trip(encoding='msgpack', **options)
+    assert encoder.binary
+    assert encoder.describe() == {
+        'encoding': 'msgpack',
+        'compression': options.get('compression'),
+        'keyTable': options.get('key_table', False)}
+    if options.get('key_table'):
+        # Keys are the same as they would be in JSON
+        assert decoded == [as_json(message) for message in MESSAGES]
+    else:
+        assert decoded == MESSAGES
+
+
+def test_key_table_only_sends_new_keys():
+    encoder = encoding.MessageEncoder('msgpack', key_table=True)
+    first = encoder.encode(MESSAGES[1])
+    second = encoder.encode(MESSAGES[1])
+    assert b'state' in first
+    assert b'state' not in second
+
+
+def test_fallback():
+    encoder = encoding.MessageEncoder.from_query(
+        {'encoding': 'cbor', 'keyTable': 'true'})
+    assert encoder.requested
+    assert not encoder.binary
+    assert encoder.describe() == {
+        'encoding': 'json', 'compression': None, 'keyTable': False}
+    assert encoder.encode(MESSAGES[0]) == json.dumps(MESSAGES[0])
+
+
+def test_decode_request():
+    assert encoding.decode_request('{"a": 1}') == {'a': 1}
+    assert encoding.decode_request(msgpack.packb({'a': 1})) == {'a': 1}
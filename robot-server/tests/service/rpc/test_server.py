@@ -1,6 +1,7 @@
 import asyncio
 import typing
 
+import msgpack  # type: ignore
 import pytest
 import sys
 from threading import Event, Semaphore
@@ -13,7 +14,7 @@ from fastapi import FastAPI, APIRouter
 from opentrons.protocol_api.execute import ExceptionInProtocolError
 
 from robot_server.service.dependencies import get_rpc_server
-from robot_server.service.rpc import rpc
+from robot_server.service.rpc import encoding, rpc
 from robot_server.service.routers.rpc import router
 
 
@@ -591,3 +592,87 @@ def test_concurrent_call(session, root):
     assert r == {'$': {'status': 'success', 'token': session.token,
                        'type': rpc.CALL_RESULT_MESSAGE},
                  'data': 'Done!'}
+
+
+class Holder(object):
+    def __init__(self):
+        self.child = Foo(0)
+
+    def get_child(self):
+        return self.child
+
+    def bump(self):
+        self.child.value += 1
+        return self.child
+
+
+@pytest.mark.parametrize('root', [Holder()])
+def test_object_deltas(loop, rpc_client, root):
+    servers = []
+
+    async def get_server():
+        servers.append(rpc.RPCServer(None, root))
+        return servers[-1]
+
+    rpc_client.app.dependency_overrides[get_rpc_server] = get_server
+
+    with rpc_client.websocket_connect("/?objectDeltas=true") as socket:
+        init = socket.receive_json()
+        assert init['$']['objectDeltas'] is True
+        assert init['root']['v']['child']['v'] == {'value': 0}
+
+        def call(name):
+            socket.send_json({
+                '$': {'token': 'delta'}, 'id': id(root), 'name': name,
+                'args': []})
+            while True:
+                res = socket.receive_json()
+                if res['$']['type'] == rpc.CALL_RESULT_MESSAGE:
+                    return res['data']
+
+        # the child was sent in the init message and has not changed
+        assert call('get_child') == {
+            'i': id(root.child), 't': type_id(root.child), 'v': None}
+        # so a change to it is sent in full
+        assert call('bump') == {
+            'i': id(root.child), 't': type_id(root.child),
+            'v': {'value': 1}}
+        assert call('get_child')['v'] is None
+        servers[0].shutdown()
+
+
+@pytest.mark.parametrize('root', [Foo(0)])
+def test_binary_encoding(loop, rpc_client, root):
+    servers = []
+
+    async def get_server():
+        servers.append(rpc.RPCServer(None, root))
+        return servers[-1]
+
+    rpc_client.app.dependency_overrides[get_rpc_server] = get_server
+
+    with rpc_client.websocket_connect(
+            "/?encoding=msgpack&compression=deflate&keyTable=true") as socket:
+        decoder = encoding.MessageDecoder('msgpack', 'deflate', True)
+
+        init = decoder.decode(socket.receive_bytes())
+        assert init['$'] == {
+            'type': rpc.CONTROL_MESSAGE, 'monitor': True,
+            'encoding': 'msgpack', 'compression': 'deflate',
+            'keyTable': True}
+        assert init['root'] == {
+            'i': id(root), 't': type_id(root), 'v': {'value': 0}}
+
+        # Requests can be sent as msgpack too
+        socket.send_bytes(msgpack.packb({
+            '$': {'token': 'binary'}, 'id': id(root), 'name': 'add',
+            'args': [2]}))
+        ack = decoder.decode(socket.receive_bytes())
+        assert ack == {'$': {'token': 'binary',
+                             'type': rpc.CALL_ACK_MESSAGE}}
+        result = decoder.decode(socket.receive_bytes())
+        assert result == {
+            '$': {'token': 'binary', 'status': 'success',
+                  'type': rpc.CALL_RESULT_MESSAGE},
+            'data': 2}
+        servers[0].shutdown()
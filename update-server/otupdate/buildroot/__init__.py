@@ -77,6 +77,12 @@ def get_app(system_version_file: str = None,
         web.post('/server/update/cancel', update.cancel),
         web.get('/server/update/{session}/status', update.status),
         web.post('/server/update/{session}/file', update.file_upload),
+        web.post('/server/update/{session}/file/chunks',
+                 update.begin_chunked_upload),
+        web.get('/server/update/{session}/file/chunks',
+                update.chunked_upload_status),
+        web.put('/server/update/{session}/file/chunks/{n}',
+                update.chunk_upload),
         web.post('/server/update/{session}/commit', update.commit),
         web.post('/server/restart', control.restart),
         web.get('/server/ssh_keys', ssh_key_management.list_keys),
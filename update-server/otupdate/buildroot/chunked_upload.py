@@ -0,0 +1,216 @@
+"""
+otupdate.buildroot.chunked_upload: receiving an update file in pieces
+
+A system update is hundreds of megabytes, and sending it in one request means
+starting over whenever the connection drops. Instead, the client can declare
+the size of the file and send it in numbered, individually hashed chunks in
+any order; the server keeps track of which chunks it has, so after a
+reconnect the client asks what is missing and sends only that.
+"""
+
+import binascii
+import hashlib
+import logging
+import threading
+from typing import Dict, List, Mapping, Optional, Union
+
+LOG = logging.getLogger(__name__)
+
+#: The chunk size used if the client doesn't ask for one
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+#: The smallest and largest chunk sizes a client may ask for
+MIN_CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 16 * 1024 * 1024
+
+
+class ChunkError(ValueError):
+    """ A chunk was rejected. The upload is unaffected; the client can send
+    it again. """
+    short = 'bad-chunk'
+
+
+class ChunkHashMismatch(ChunkError):
+    short = 'chunk-hash-mismatch'
+
+
+class ChunkConflict(ChunkError):
+    short = 'chunk-conflict'
+
+
+class UploadHashMismatch(RuntimeError):
+    short = 'Upload Hash Mismatch'
+
+
+def sha256_hex(data: bytes) -> str:
+    return binascii.hexlify(hashlib.sha256(data).digest()).decode()
+
+
+class ChunkedUpload:
+    """ Assembles a file of known size from chunks.
+
+    Chunks are written straight to their place in the file, so they may come
+    in any order and more than one at a time. The whole file is hashed as it
+    arrives, as far as the chunks received so far are contiguous, so that
+    checking the hash of the file once the last chunk lands costs nothing.
+
+    The methods that touch the file block and should be called in an
+    executor.
+
+    :param path: Where to assemble the file
+    :param size: The size of the file in bytes
+    :param chunk_size: The size of every chunk but the last
+    :param sha256: The ascii hex sha256 of the whole file, if known
+    """
+
+    def __init__(self, path: str, size: int,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 sha256: Optional[str] = None) -> None:
+        if size <= 0:
+            raise ValueError('The file must not be empty')
+        if not MIN_CHUNK_SIZE <= chunk_size <= MAX_CHUNK_SIZE:
+            raise ValueError(
+                f'The chunk size must be between {MIN_CHUNK_SIZE} '
+                f'and {MAX_CHUNK_SIZE} bytes')
+        self._path = path
+        self._size = size
+        self._chunk_size = chunk_size
+        self._sha256 = sha256.lower() if sha256 else None
+        self._chunk_count = -(-size // chunk_size)
+        self._chunk_hashes: Dict[int, str] = {}
+        self._hasher = hashlib.sha256()
+        self._hashed_chunks = 0
+        self._lock = threading.Lock()
+        with open(path, 'wb') as f:
+            f.truncate(size)
+        LOG.info(f'Chunked upload: expecting {size}B in '
+                 f'{self._chunk_count} chunks of {chunk_size}B')
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def chunk_size(self) -> int:
+        return self._chunk_size
+
+    @property
+    def sha256(self) -> Optional[str]:
+        return self._sha256
+
+    @property
+    def chunk_count(self) -> int:
+        return self._chunk_count
+
+    @property
+    def complete(self) -> bool:
+        return len(self._chunk_hashes) == self._chunk_count
+
+    def chunk_length(self, index: int) -> int:
+        """ The number of bytes chunk ``index`` must have """
+        if not 0 <= index < self._chunk_count:
+            raise ChunkError(
+                f'Chunk {index} out of range: there are '
+                f'{self._chunk_count} chunks')
+        if index == self._chunk_count - 1:
+            return self._size - index * self._chunk_size
+        return self._chunk_size
+
+    def received_ranges(self) -> List[List[int]]:
+        """ The chunks received so far, as ``[first, last]`` ranges of chunk
+        indices (inclusive) """
+        ranges: List[List[int]] = []
+        for index in sorted(self._chunk_hashes):
+            if ranges and ranges[-1][1] == index - 1:
+                ranges[-1][1] = index
+            else:
+                ranges.append([index, index])
+        return ranges
+
+    def write_chunk(self, index: int, data: bytes, sha256: str) -> bool:
+        """ Check a chunk against its hash and write it to the file.
+
+        Sending a chunk that was already received is harmless as long as it
+        is the same chunk, so a client that lost the response can just send
+        it again.
+
+        :param index: Which chunk this is
+        :param data: The contents of the chunk
+        :param sha256: The ascii hex sha256 of ``data`` according to the
+                       client
+        :returns: ``True`` if the chunk was new
+        :raises ChunkError: If the chunk does not fit the upload
+        :raises ChunkHashMismatch: If ``data`` does not match ``sha256``
+        :raises ChunkConflict: If a different chunk was already received
+                               at ``index``
+        """
+        expected = self.chunk_length(index)
+        if len(data) != expected:
+            raise ChunkError(f'Chunk {index} must be {expected}B, '
+                             f'not {len(data)}B')
+        sha256 = sha256.lower()
+        actual = sha256_hex(data)
+        if actual != sha256:
+            raise ChunkHashMismatch(
+                f'Chunk {index} hashes to {actual}, not {sha256}')
+
+        with self._lock:
+            previous = self._chunk_hashes.get(index)
+        if previous:
+            if previous != actual:
+                raise ChunkConflict(
+                    f'A different chunk {index} was already received')
+            return False
+
+        with open(self._path, 'r+b') as f:
+            f.seek(index * self._chunk_size)
+            f.write(data)
+
+        with self._lock:
+            if index in self._chunk_hashes:
+                # Another copy of the same chunk beat us to it
+                return False
+            self._chunk_hashes[index] = actual
+            if index == self._hashed_chunks:
+                self._hasher.update(data)
+                self._hashed_chunks += 1
+                self._catch_up_hash()
+        return True
+
+    def _catch_up_hash(self):
+        """ Hash any chunks that arrived early and are now contiguous with
+        the hashed part of the file. Call with the lock held. """
+        if self._hashed_chunks not in self._chunk_hashes:
+            return
+        with open(self._path, 'rb') as f:
+            f.seek(self._hashed_chunks * self._chunk_size)
+            while self._hashed_chunks in self._chunk_hashes:
+                self._hasher.update(
+                    f.read(self.chunk_length(self._hashed_chunks)))
+                self._hashed_chunks += 1
+
+    def finish(self):
+        """ Check the whole file against its hash, if there is one. Call
+        once the upload is complete.
+
+        :raises UploadHashMismatch: If the file does not match
+        """
+        assert self.complete
+        if not self._sha256:
+            return
+        actual = binascii.hexlify(self._hasher.digest()).decode()
+        if actual != self._sha256:
+            raise UploadHashMismatch(
+                f'The uploaded file hashes to {actual}, '
+                f'not {self._sha256}')
+
+    @property
+    def state(self) -> Mapping[str, Union[int, bool, List[List[int]]]]:
+        return {'size': self._size,
+                'chunkSize': self._chunk_size,
+                'chunkCount': self._chunk_count,
+                'received': self.received_ranges(),
+                'complete': self.complete}
@@ -0,0 +1,201 @@
+"""
+otupdate.buildroot.delta: block level binary deltas between rootfs images
+
+Most updates change a small part of the rootfs, so rather than the whole
+image an update can carry a delta against the image the robot is running
+now. A delta is two files:
+
+- A manifest (json) that describes the target image block by block: each
+  block is either copied from some block of the base image, in which case
+  the manifest has the sha256 the base block must have, or is literal data
+  from the delta file.
+- The delta file itself, which is the literal blocks one after another.
+
+The base blocks are checked as they are copied, so a robot that is not
+running the base image the delta was made against finds out as soon as it
+reads a block that differs, and can fall back to a full image.
+"""
+
+import binascii
+import hashlib
+import json
+import logging
+from typing import (IO, Callable, Dict, List, NamedTuple, Optional,
+                    Tuple)
+
+LOG = logging.getLogger(__name__)
+
+DELTA_VERSION = 1
+DEFAULT_BLOCK_SIZE = 64 * 1024
+
+
+class BaseMismatch(ValueError):
+    def __init__(self, message):
+        self.message = message
+        self.short = 'Delta Base Mismatch'
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__}: {self.message}>'
+
+    def __str__(self):
+        return self.message
+
+
+class BadDelta(ValueError):
+    def __init__(self, message):
+        self.message = message
+        self.short = 'Bad Delta'
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__}: {self.message}>'
+
+    def __str__(self):
+        return self.message
+
+
+#: A block copied from the base image: its index there, and its sha256
+BaseBlock = Tuple[int, str]
+
+
+class Manifest(NamedTuple):
+    block_size: int
+    base_sha256: str
+    base_size: int
+    target_size: int
+    #: One entry per block of the target image; ``None`` for blocks that
+    #: come from the delta file
+    blocks: List[Optional[BaseBlock]]
+
+
+def _sha256_hex(data: bytes) -> str:
+    return binascii.hexlify(hashlib.sha256(data).digest()).decode()
+
+
+def dump_manifest(manifest: Manifest) -> bytes:
+    return json.dumps({'version': DELTA_VERSION,
+                       'blockSize': manifest.block_size,
+                       'baseSha256': manifest.base_sha256,
+                       'baseSize': manifest.base_size,
+                       'targetSize': manifest.target_size,
+                       'blocks': manifest.blocks}).encode()
+
+
+def load_manifest(data: bytes) -> Manifest:
+    """ Parse and check a manifest
+
+    :raises BadDelta: If the manifest is malformed
+    """
+    try:
+        obj = json.loads(data)
+        if obj['version'] != DELTA_VERSION:
+            raise BadDelta(f'Unknown delta version {obj["version"]}')
+        manifest = Manifest(
+            block_size=int(obj['blockSize']),
+            base_sha256=str(obj['baseSha256']),
+            base_size=int(obj['baseSize']),
+            target_size=int(obj['targetSize']),
+            blocks=[None if block is None else (int(block[0]), str(block[1]))
+                    for block in obj['blocks']])
+    except BadDelta:
+        raise
+    except (ValueError, KeyError, TypeError, IndexError) as e:
+        raise BadDelta(f'Malformed delta manifest: {e}')
+    if manifest.block_size <= 0\
+            or len(manifest.blocks)\
+            != -(-manifest.target_size // manifest.block_size):
+        raise BadDelta('Delta manifest blocks do not match the target size')
+    return manifest
+
+
+def make_delta(base: IO[bytes], target: IO[bytes], delta: IO[bytes],
+               block_size: int = DEFAULT_BLOCK_SIZE) -> Manifest:
+    """ Make a delta from one image to another.
+
+    Blocks of the target are copied from the same place in the base where
+    they are the same there, from anywhere else in the base where they can
+    be found, and otherwise written to ``delta``.
+
+    :param base: The image the delta will be applied to
+    :param target: The image the delta will produce
+    :param delta: Where to write the literal blocks
+    :param block_size: The size of the blocks to compare
+    :returns: The manifest for the delta
+    """
+    base_hasher = hashlib.sha256()
+    base_size = 0
+    base_blocks: List[str] = []
+    base_index: Dict[str, int] = {}
+    while True:
+        block = base.read(block_size)
+        if not block:
+            break
+        base_hasher.update(block)
+        base_size += len(block)
+        block_hash = _sha256_hex(block)
+        if len(block) == block_size:
+            base_index.setdefault(block_hash, len(base_blocks))
+        base_blocks.append(block_hash)
+
+    blocks: List[Optional[BaseBlock]] = []
+    target_size = 0
+    while True:
+        block = target.read(block_size)
+        if not block:
+            break
+        target_size += len(block)
+        block_hash = _sha256_hex(block)
+        index = len(blocks)
+        if index < len(base_blocks) and base_blocks[index] == block_hash:
+            blocks.append((index, block_hash))
+        elif block_hash in base_index and len(block) == block_size:
+            blocks.append((base_index[block_hash], block_hash))
+        else:
+            delta.write(block)
+            blocks.append(None)
+
+    literal = blocks.count(None)
+    LOG.info(f'Delta: {len(blocks) - literal} of {len(blocks)} blocks '
+             f'from the base image')
+    return Manifest(block_size=block_size,
+                    base_sha256=binascii.hexlify(
+                        base_hasher.digest()).decode(),
+                    base_size=base_size,
+                    target_size=target_size,
+                    blocks=blocks)
+
+
+def apply_delta(manifest: Manifest,
+                base: IO[bytes],
+                delta: IO[bytes],
+                write: Callable[[bytes], None],
+                progress_callback: Callable[[float], None]):
+    """ Rebuild the target image of a delta, one block at a time
+
+    :param manifest: The manifest of the delta
+    :param base: The base image, which must support ``seek``
+    :param delta: The literal blocks, read in order
+    :param write: Called with each block of the target image in order
+    :param progress_callback: Called with progress between 0 and 1.0 after
+                              each block
+    :raises BaseMismatch: If a block of ``base`` is not what the manifest
+                          expects
+    :raises BadDelta: If ``delta`` runs out early
+    """
+    block_size = manifest.block_size
+    count = len(manifest.blocks)
+    for index, block in enumerate(manifest.blocks):
+        length = min(block_size, manifest.target_size - index * block_size)
+        if block is None:
+            data = delta.read(length)
+            if len(data) != length:
+                raise BadDelta(f'Delta ended at block {index}')
+        else:
+            base_index, block_hash = block
+            base.seek(base_index * block_size)
+            data = base.read(length)
+            if len(data) != length or _sha256_hex(data) != block_hash:
+                raise BaseMismatch(
+                    f'Block {base_index} of the base image differs from '
+                    f'{manifest.base_sha256}')
+        write(data)
+        progress_callback((index + 1) / count)
@@ -6,25 +6,43 @@ for an update: unzipping update files, hashing rootfs, checking signatures,
 writing to root partitions
 """
 import binascii
+import concurrent.futures
 import contextlib
 import enum
 import hashlib
 import logging
 import os
+import queue
 import re
 import subprocess
 import tempfile
-from typing import (Callable, Dict, List, Mapping, NamedTuple,
+import threading
+from typing import (BinaryIO, Callable, Dict, Mapping, NamedTuple,
                     Optional, Sequence, Tuple)
 import zipfile
 
+from . import delta
+
 
 ROOTFS_SIG_NAME = 'rootfs.ext4.hash.sig'
 ROOTFS_HASH_NAME = 'rootfs.ext4.hash'
 ROOTFS_NAME = 'rootfs.ext4'
 UPDATE_FILES = [ROOTFS_NAME, ROOTFS_SIG_NAME, ROOTFS_HASH_NAME]
+#: A delta against the running rootfs (see :py:mod:`.delta`), which may
+#: stand in for ``rootfs.ext4``
+ROOTFS_DELTA_NAME = 'rootfs.ext4.delta'
+ROOTFS_DELTA_MANIFEST_NAME = 'rootfs.ext4.delta.json'
+DELTA_FILES = [ROOTFS_DELTA_NAME, ROOTFS_DELTA_MANIFEST_NAME]
 LOG = logging.getLogger(__name__)
 
+#: The size of the chunks the rootfs is decompressed, hashed and written to
+#: its partition in by :py:meth:`validate_and_write_update`. A multiple of
+#: the erase block size of the SD card, so that writes stay aligned.
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+#: How many chunks may be waiting to be written
+WRITE_QUEUE_DEPTH = 4
+
 
 class Partition(NamedTuple):
     number: int
@@ -72,129 +90,27 @@ class FileMissing(ValueError):
         return self.message
 
 
-def unzip_update(filepath: str,
-                 progress_callback: Callable[[float], None],
-                 acceptable_files: Sequence[str],
-                 mandatory_files: Sequence[str],
-                 chunk_size: int = 1024) -> Tuple[Mapping[str, Optional[str]],
-                                                  Mapping[str, int]]:
-    """ Unzip an update file
-
-    The update file must contain
-
-    - a file called rootfs.ext4
-    - a file called rootfs.ext4.hash
-
-    It may contain
-
-    - a file called rootfs.ext4.hash.sig
-
-    These will all be unzipped (discarding their leading directories) to
-    the same file as the zipfile.
-
-    This function is blocking and takes a while. It calls ``progress_callback``
-    to indicate update progress with a number between 0 and 1 indicating
-    overall archive unzip progress.
-
-    :param filepath: The path zipfile to unzip. The contents will be in its
-                     directory
-    :param progress_callback: A callable taking a number between 0 and 1 that
-                              will be called periodically to check progress.
-                              This is for user display; it may not reach 1.0
-                              exactly.
-    :param acceptable_files: A list of files to unzip if found. Others will be
-                             ignored.
-    :param mandatory_files: A list of files to raise an error about if they're
-                            not in the zip. Should probably be a subset of
-                            ``acceptable_files``.
-    :param chunk_size: If specified, the size of the chunk to read and write.
-                       If not specified, will default to 1024
-    :return: Two dictionaries, the first mapping file names to paths and the
-             second mapping file names to sizes
+def _find_update_files(
+        zf: zipfile.ZipFile,
+        acceptable_files: Sequence[str],
+        mandatory_files: Sequence[str]) -> Dict[str, zipfile.ZipInfo]:
+    """ Find the update files in a zip
 
+    :returns: The info of each acceptable file in the zip, by name
     :raises FileMissing: If a mandatory file is missing
     """
-    assert chunk_size
-    total_size = 0
-    written_size = 0
-    to_unzip: List[zipfile.ZipInfo] = []
-    file_paths: Dict[str, Optional[str]] = {fn: None
-                                            for fn in acceptable_files}
-    file_sizes: Dict[str, int] = {fn: 0 for fn in acceptable_files}
-    LOG.info(f"Unzipping {filepath}")
-    with zipfile.ZipFile(filepath, 'r') as zf:
-        files = zf.infolist()
-        remaining_filenames = [fn for fn in acceptable_files]
-        for fi in files:
-            if fi.filename in acceptable_files:
-                to_unzip.append(fi)
-                total_size += fi.file_size
-                remaining_filenames.remove(fi.filename)
-                LOG.debug(f"Found {fi.filename} ({fi.file_size}B)")
-            else:
-                LOG.debug(f"Ignoring {fi.filename}")
-
-        for name in remaining_filenames:
-            if name in mandatory_files:
-                raise FileMissing(f'File {name} missing from zip')
-
-        for fi in to_unzip:
-            uncomp_path = os.path.join(os.path.dirname(filepath), fi.filename)
-            with zf.open(fi) as zipped, open(uncomp_path, 'wb') as unzipped:
-                LOG.debug(f"Beginning unzip of {fi.filename} to {uncomp_path}")
-                while True:
-                    chunk = zipped.read(chunk_size)
-                    unzipped.write(chunk)
-                    written_size += len(chunk)
-                    progress_callback(written_size/total_size)
-                    if len(chunk) != chunk_size:
-                        break
-                file_paths[fi.filename] = uncomp_path
-                file_sizes[fi.filename] = fi.file_size
-                LOG.debug(f"Unzipped {fi.filename} to {uncomp_path}")
-    LOG.info(
-        f"Unzipped {filepath}, results: \n\t" + '\n\t'.join(
-            [f'{k}: {file_paths[k]} ({file_sizes[k]}B)'
-             for k in file_paths.keys()]))
-    return file_paths, file_sizes
-
-
-def hash_file(path: str,
-              progress_callback: Callable[[float], None],
-              chunk_size: int = 1024,
-              file_size: int = None,
-              algo: str = 'sha256') -> bytes:
-    """
-    Hash a file and return the hash, providing progress callbacks
-
-    :param path: The file to hash
-    :param progress_callback: The callback to call with progress between 0 and
-                              1. May not ever be precisely 1.0.
-    :param chunk_size: If specified, the size of the chunks to hash in one call
-                       If not specified, defaults to 1024
-    :param file_size: If specified, the size of the file to hash (used for
-                      progress callback generation). If not specified,
-                      calculated internally.
-    :param algo: The algorithm to use. Can be anything used by
-                 :py:mod:`hashlib`
-    :returns: The output has ascii hex
-    """
-    hasher = hashlib.new(algo)
-    have_read = 0
-    if not chunk_size:
-        chunk_size = 1024
-    with open(path, 'rb') as to_hash:
-        if not file_size:
-            file_size = to_hash.seek(0, 2)
-            to_hash.seek(0)
-        while True:
-            chunk = to_hash.read(chunk_size)
-            hasher.update(chunk)
-            have_read += len(chunk)
-            progress_callback(have_read/file_size)
-            if len(chunk) != chunk_size:
-                break
-    return binascii.hexlify(hasher.digest())
+    found: Dict[str, zipfile.ZipInfo] = {}
+    for fi in zf.infolist():
+        if fi.filename in acceptable_files:
+            found[fi.filename] = fi
+            LOG.debug(f"Found {fi.filename} ({fi.file_size}B)")
+        else:
+            LOG.debug(f"Ignoring {fi.filename}")
+
+    for name in mandatory_files:
+        if name not in found:
+            raise FileMissing(f'File {name} missing from zip')
+    return found
 
 
 def verify_signature(message_path: str,
@@ -233,57 +149,273 @@ def verify_signature(message_path: str,
         raise SignatureMismatch('Signature check failed')
 
 
-def validate_update(filepath: str,
-                    progress_callback: Callable[[float], None],
-                    cert_path: Optional[str]):
-    """ Worker for validation. Call in an executor (so it can return things)
+class _BackgroundWriter:
+    """ Writes chunks to a file from a thread, so that writing overlaps with
+    whatever makes the chunks (decompression and hashing release the GIL for
+    large buffers, as does writing) """
+
+    def __init__(self, fileobj: BinaryIO,
+                 depth: int = WRITE_QUEUE_DEPTH) -> None:
+        self._file = fileobj
+        self._queue: 'queue.Queue[Optional[bytes]]' = queue.Queue(depth)
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(
+            target=self._run, name='update-writer', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                return
+            if self._error:
+                # Keep draining so that write() never blocks forever
+                continue
+            try:
+                self._file.write(chunk)
+            except BaseException as e:
+                self._error = e
+
+    def write(self, chunk: bytes):
+        if self._error:
+            raise self._error
+        self._queue.put(chunk)
+
+    def close(self):
+        """ Wait for everything to be written """
+        self._queue.put(None)
+        self._thread.join()
+        if self._error:
+            raise self._error
+
+
+def _stream_to_partition(zf: zipfile.ZipFile,
+                         rootfs: zipfile.ZipInfo,
+                         part_path: str,
+                         progress_callback: Callable[[float], None],
+                         chunk_size: int,
+                         check_abort: Callable[[], None]) -> bytes:
+    """ Decompress, hash and write a rootfs in one pass
+
+    :returns: The hash as ascii hex
+    """
+    hasher = hashlib.sha256()
+    total_size = rootfs.file_size or 1
+    written_size = 0
+    LOG.info(f'Streaming {rootfs.filename} ({rootfs.file_size}B)'
+             f' to {part_path} in {chunk_size}B chunks')
+    with zf.open(rootfs) as zipped, open(part_path, 'wb') as part:
+        writer = _BackgroundWriter(part)
+        try:
+            while True:
+                chunk = zipped.read(chunk_size)
+                if not chunk:
+                    break
+                hasher.update(chunk)
+                writer.write(chunk)
+                written_size += len(chunk)
+                progress_callback(written_size / total_size)
+                check_abort()
+        finally:
+            writer.close()
+        part.flush()
+        os.fsync(part.fileno())
+    return binascii.hexlify(hasher.digest())
+
+
+def _stream_delta_to_partition(zf: zipfile.ZipFile,
+                               files: Mapping[str, zipfile.ZipInfo],
+                               part_path: str,
+                               progress_callback: Callable[[float], None],
+                               chunk_size: int,
+                               check_abort: Callable[[], None]) -> bytes:
+    """ Rebuild a rootfs from the running one and a delta, hashing and
+    writing it in one pass
+
+    :returns: The hash as ascii hex
+    :raises delta.BaseMismatch: If the running rootfs is not the base of the
+                                delta
+    """
+    manifest = delta.load_manifest(
+        zf.read(files[ROOTFS_DELTA_MANIFEST_NAME]))
+    base_path = _find_current_partition().value.path
+    hasher = hashlib.sha256()
+    pending = bytearray()
+    LOG.info(f'Applying delta against {manifest.base_sha256} from '
+             f'{base_path} to {part_path}: '
+             f'{manifest.blocks.count(None)} of {len(manifest.blocks)} '
+             f'blocks in the delta')
+    try:
+        base = open(base_path, 'rb')
+    except OSError as e:
+        raise delta.BaseMismatch(f'Could not read {base_path}: {e}')
+
+    with base, zf.open(files[ROOTFS_DELTA_NAME]) as literal,\
+            open(part_path, 'wb') as part:
+        writer = _BackgroundWriter(part)
+
+        def write(block: bytes):
+            # Blocks are smaller than chunks; batch them up for the writer
+            hasher.update(block)
+            pending.extend(block)
+            if len(pending) >= chunk_size:
+                writer.write(bytes(pending))
+                pending.clear()
+
+        def progress(value: float):
+            progress_callback(value)
+            check_abort()
+
+        try:
+            delta.apply_delta(manifest, base, literal, write, progress)
+            if pending:
+                writer.write(bytes(pending))
+        finally:
+            writer.close()
+        part.flush()
+        os.fsync(part.fileno())
+    return binascii.hexlify(hasher.digest())
+
+
+def _find_rootfs_files(
+        zf: zipfile.ZipFile,
+        cert_path: Optional[str]) -> Dict[str, zipfile.ZipInfo]:
+    """ Find the files of an update: the hash, the signature if it is to be
+    checked, and a full rootfs, a delta or both
+
+    :raises FileMissing: If a file is missing
+    """
+    required = [ROOTFS_HASH_NAME]
+    if cert_path:
+        required.append(ROOTFS_SIG_NAME)
+    files = _find_update_files(zf, UPDATE_FILES + DELTA_FILES, required)
+    if ROOTFS_NAME not in files\
+            and not all(name in files for name in DELTA_FILES):
+        raise FileMissing(f'File {ROOTFS_NAME} missing from zip')
+    return files
+
+
+def _start_hash_check(
+        zf: zipfile.ZipFile,
+        files: Mapping[str, zipfile.ZipInfo],
+        workdir: str,
+        pool: concurrent.futures.Executor,
+        cert_path: Optional[str])\
+        -> Tuple[bytes, Optional[concurrent.futures.Future]]:
+    """ Read the packaged hash and, if a certificate is given, start
+    checking its signature in ``pool``
+
+    :returns: The packaged hash as ascii hex, and the signature check
+    """
+    hashfile = zf.extract(files[ROOTFS_HASH_NAME], workdir)
+    with open(hashfile, 'rb') as hf:
+        packaged_hash = hf.read().strip()
+    if not cert_path:
+        return packaged_hash, None
+    sigfile = zf.extract(files[ROOTFS_SIG_NAME], workdir)
+    return packaged_hash, pool.submit(
+        verify_signature, hashfile, sigfile, cert_path)
+
+
+def _write_rootfs(zf: zipfile.ZipFile,
+                  files: Mapping[str, zipfile.ZipInfo],
+                  part_path: str,
+                  progress_callback: Callable[[float], None],
+                  chunk_size: int,
+                  check_abort: Callable[[], None]) -> bytes:
+    """ Write the rootfs of an update to a partition, from its delta if it
+    has one that applies and otherwise from the full rootfs
+
+    :returns: The hash of what was written as ascii hex
+    """
+    if all(name in files for name in DELTA_FILES):
+        try:
+            return _stream_delta_to_partition(
+                zf, files, part_path, progress_callback, chunk_size,
+                check_abort)
+        except delta.BaseMismatch as e:
+            if ROOTFS_NAME not in files:
+                raise
+            LOG.warning(f'{e}: falling back to the full rootfs')
+    return _stream_to_partition(
+        zf, files[ROOTFS_NAME], part_path, progress_callback, chunk_size,
+        check_abort)
+
+
+def validate_and_write_update(
+        filepath: str,
+        progress_callback: Callable[[float], None],
+        cert_path: Optional[str],
+        chunk_size: int = STREAM_CHUNK_SIZE,
+        writing_callback: Optional[Callable[[], None]] = None)\
+        -> RootPartitions:
+    """ Validate an update and write it to the unused root partition in one
+    pass. Call in an executor.
+
+    The rootfs is never unzipped to disk or read more than once: it is
+    decompressed, hashed and written to the partition a chunk at a time,
+    while the signature of the hash (which does not depend on the rootfs) is
+    checked in another thread.
+
+    Since the rootfs is written before its hash can be checked, the
+    partition only holds a valid update if this returns; if it raises, the
+    partition must not be committed.
+
+    If the update has a delta (see :py:mod:`.delta`), the rootfs is rebuilt
+    from the running one and the delta instead. If the running rootfs turns
+    out not to be the base of the delta, the full rootfs is used if the
+    update has one too, and otherwise :py:class:`.delta.BaseMismatch` is
+    raised so that the client can send a full update.
 
-    - Unzips filepath to its directory
-    - Hashes the rootfs inside
-    - If requested, checks the signature of the hash
     :param filepath: The path to the update zip file
     :param progress_callback: The function to call with progress between 0
                               and 1.0. May never reach precisely 1.0, best
                               only for user information
     :param cert_path: Path to an x.509 certificate to check the signature
                       against. If ``None``, signature checking is disabled
-    :returns str: Path to the rootfs file to update
-
-    Will also raise an exception if validation fails
+    :param chunk_size: The size of the chunks to stream in
+    :param writing_callback: If specified, called once the update files are
+                             found and the rootfs starts streaming to the
+                             partition. Progress callbacks after this are
+                             for the write.
+    :returns: The root partition that the rootfs image was written to, e.g.
+              ``RootPartitions.TWO`` or ``RootPartitions.THREE``.
+    :raises FileMissing: If a file is missing from the update
+    :raises HashMismatch: If the rootfs does not match its hash
+    :raises SignatureMismatch: If the hash does not match its signature
+    :raises delta.BaseMismatch: If the delta can't be applied and there is
+                                no full rootfs
+    :raises delta.BadDelta: If the delta is malformed
     """
+    with zipfile.ZipFile(filepath, 'r') as zf,\
+            tempfile.TemporaryDirectory(
+                dir=os.path.dirname(filepath)) as workdir,\
+            concurrent.futures.ThreadPoolExecutor(1) as pool:
+        files = _find_rootfs_files(zf, cert_path)
+        packaged_hash, signature_check = _start_hash_check(
+            zf, files, workdir, pool, cert_path)
+
+        def check_abort():
+            # Stop early rather than writing the rest of an update that
+            # can't be used
+            if signature_check and signature_check.done():
+                signature_check.result()
+
+        unused = _find_unused_partition()
+        if writing_callback:
+            writing_callback()
+        rootfs_hash = _write_rootfs(
+            zf, files, unused.value.path, progress_callback, chunk_size,
+            check_abort)
+        if signature_check:
+            signature_check.result()
 
-    def zip_callback(progress):
-        progress_callback(progress/2.0)
-
-    required = [ROOTFS_NAME, ROOTFS_HASH_NAME]
-    if cert_path:
-        required.append(ROOTFS_SIG_NAME)
-    files, sizes = unzip_update(filepath, zip_callback,
-                                UPDATE_FILES,
-                                required)
-
-    def hash_callback(progress):
-        progress_callback(progress/2.0 + 0.5)
-    rootfs = files.get(ROOTFS_NAME)
-    assert rootfs
-    rootfs_hash = hash_file(rootfs,
-                            hash_callback,
-                            file_size=sizes[ROOTFS_NAME])
-    hashfile = files.get(ROOTFS_HASH_NAME)
-    assert hashfile
-    packaged_hash = open(hashfile, 'rb').read().strip()
     if packaged_hash != rootfs_hash:
         msg = f"Hash mismatch: calculated {rootfs_hash!r} != "\
             f"packaged {packaged_hash!r}"
         LOG.error(msg)
         raise HashMismatch(msg)
-
-    if cert_path:
-        sigfile = files.get(ROOTFS_SIG_NAME)
-        assert sigfile
-        verify_signature(hashfile, sigfile, cert_path)
-
-    return rootfs
+    return unused
 
 
 def _find_unused_partition() -> RootPartitions:
@@ -293,66 +425,10 @@ def _find_unused_partition() -> RootPartitions:
             b'3': RootPartitions.THREE}[which]
 
 
-def write_file(infile: str,
-               outfile: str,
-               progress_callback: Callable[[float], None],
-               chunk_size: int = 1024,
-               file_size: int = None):
-    """ Write a file to another file with progress callbacks.
-
-    :param infile: The input filepath
-    :param outfile: The output filepath
-    :param progress_callback: The callback to call for progress
-    :param chunk_size: The size of file chunks to copy in between progress
-                       notifications
-    :param file_size: The total size of the update file (for generating
-                      progress percentage). If ``None``, generated with
-                      ``seek``/``tell``.
-    """
-    total_written = 0
-    with open(infile, 'rb') as img, open(outfile, 'wb') as part:
-        if None is file_size:
-            file_size = img.seek(0, 2)
-            img.seek(0)
-            LOG.info(f'write_file: file size calculated as {file_size}B')
-        LOG.info(f'write_file: writing {infile} ({file_size}B)'
-                 f' to {outfile} in {chunk_size}B chunks')
-        while True:
-            chunk = img.read(chunk_size)
-            part.write(chunk)
-            total_written += len(chunk)
-            progress_callback(total_written / file_size)
-            if len(chunk) != chunk_size:
-                break
-
-
-def write_update(rootfs_filepath: str,
-                 progress_callback: Callable[[float], None],
-                 chunk_size: int = 1024,
-                 file_size: int = None) -> RootPartitions:
-    """
-    Write the new rootfs to the next root partition
-
-    - Figure out, from the system, the correct root partition to write to
-    - Write the rootfs at ``rootfs_filepath`` there, with progress
-
-    :param rootfs_filepath: The path to a checked rootfs.ext4
-    :param progress_callback: A callback to call periodically with progress
-                              between 0 and 1.0. May never reach precisely
-                              1.0, best only for user information.
-    :param chunk_size: The size of file chunks to copy in between progress
-                       notifications
-    :param file_size: The total size of the update file (for generating
-                      progress percentage). If ``None``, generated with
-                      ``seek``/``tell``.
-    :returns: The root partition that the rootfs image was written to, e.g.
-              ``RootPartitions.TWO`` or ``RootPartitions.THREE``.
-    """
-    unused = _find_unused_partition()
-    part_path = unused.value.path
-    write_file(rootfs_filepath, part_path, progress_callback,
-               chunk_size, file_size)
-    return unused
+def _find_current_partition() -> RootPartitions:
+    """ Find the root partition that is running now """
+    return {2: RootPartitions.THREE,
+            3: RootPartitions.TWO}[_find_unused_partition().value.number]
 
 
 def _mountpoint_root():
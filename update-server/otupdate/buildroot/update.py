@@ -10,16 +10,21 @@ import logging
 import os
 from subprocess import CalledProcessError
 
-from typing import Optional
+from typing import Awaitable, Optional
 
 
 from aiohttp import web, BodyPartReader
 
 from .constants import APP_VARIABLE_PREFIX, RESTART_LOCK_NAME
-from . import config, file_actions
+from . import config, file_actions, chunked_upload
 from .update_session import UpdateSession, Stages
 
 SESSION_VARNAME = APP_VARIABLE_PREFIX + 'session'
+#: How much of an upload to read before writing it out
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+UPDATE_FILENAME = 'ot2-system.zip'
+#: The header holding the ascii hex sha256 of a chunk
+CHUNK_HASH_HEADER = 'X-Chunk-SHA256'
 LOG = logging.getLogger(__name__)
 
 
@@ -76,33 +81,21 @@ async def status(request: web.Request, session: UpdateSession) -> web.Response:
         status=200)
 
 
-async def _save_file(part: BodyPartReader, path: str):
+async def _save_file(part: BodyPartReader, path: str,
+                     chunk_size: int = UPLOAD_CHUNK_SIZE):
+    """ Save an uploaded file, writing it from an executor so that the event
+    loop is free to read the next chunk meanwhile """
+    loop = asyncio.get_event_loop()
     with open(os.path.join(path, part.name), 'wb') as write:
+        writing: Optional[Awaitable[int]] = None
         while not part.at_eof():
-            chunk = await part.read_chunk()
+            chunk = await part.read_chunk(chunk_size)
             decoded = part.decode(chunk)
-            write.write(decoded)
-
-
-def _begin_write(session: UpdateSession,
-                 loop: asyncio.AbstractEventLoop,
-                 rootfs_file_path: str):
-    """ Start the write process. """
-    session.set_progress(0)
-    session.set_stage(Stages.WRITING)
-    write_future = asyncio.ensure_future(loop.run_in_executor(
-        None, file_actions.write_update, rootfs_file_path,
-        session.set_progress))
-
-    def write_done(fut):
-        exc = fut.exception()
-        if exc:
-            session.set_error(getattr(exc, 'short', str(type(exc))),
-                              str(exc))
-        else:
-            session.set_stage(Stages.DONE)
-
-    write_future.add_done_callback(write_done)
+            if writing:
+                await writing
+            writing = loop.run_in_executor(None, write.write, decoded)
+        if writing:
+            await writing
 
 
 def _begin_validation(
@@ -111,15 +104,27 @@ def _begin_validation(
         loop: asyncio.AbstractEventLoop,
         downloaded_update_path: str)\
         -> asyncio.futures.Future:
-    """ Start the validation process. """
+    """ Start the validation process.
+
+    The update is validated and written to the unused partition in one
+    pass: the session moves to writing once the rootfs starts streaming to
+    the partition, and when this succeeds the session is ready to commit.
+    """
+    session.set_progress(0)
     session.set_stage(Stages.VALIDATING)
     cert_path = config.update_cert_path\
         if config.signature_required else None
 
+    def writing():
+        session.set_progress(0)
+        session.set_stage(Stages.WRITING)
+
     validation_future \
         = asyncio.ensure_future(loop.run_in_executor(
-            None, file_actions.validate_update,
-            downloaded_update_path, session.set_progress, cert_path))
+            None, functools.partial(
+                file_actions.validate_and_write_update,
+                downloaded_update_path, session.set_progress, cert_path,
+                writing_callback=writing)))
 
     def validation_done(fut):
         exc = fut.exception()
@@ -127,15 +132,18 @@ def _begin_validation(
             session.set_error(getattr(exc, 'short', str(type(exc))),
                               str(exc))
         else:
-            rootfs_file = fut.result()
-            loop.call_soon_threadsafe(_begin_write,
-                                      session,
-                                      loop,
-                                      rootfs_file)
+            session.set_stage(Stages.DONE)
     validation_future.add_done_callback(validation_done)
     return validation_future
 
 
+def _file_already_uploaded() -> web.Response:
+    return web.json_response(
+        data={'error': 'file-already-uploaded',
+              'message': 'A file has already been sent for this update'},
+        status=409)
+
+
 @require_session
 async def file_upload(
         request: web.Request, session: UpdateSession) -> web.Response:
@@ -144,14 +152,11 @@ async def file_upload(
     Requires multipart (encoding doesn't matter) with a file field in the
     body called 'ot2-system.zip'.
     """
-    if session.stage != Stages.AWAITING_FILE:
-        return web.json_response(
-            data={'error': 'file-already-uploaded',
-                  'message': 'A file has already been sent for this update'},
-            status=409)
+    if session.stage != Stages.AWAITING_FILE or session.chunked_upload:
+        return _file_already_uploaded()
     reader = await request.multipart()
     async for part in reader:
-        if part.name != 'ot2-system.zip':
+        if part.name != UPDATE_FILENAME:
             LOG.warning(
                 f"Unknown field name {part.name} in file_upload, ignoring")
             await part.release()
@@ -162,12 +167,174 @@ async def file_upload(
         session,
         config.config_from_request(request),
         asyncio.get_event_loop(),
-        os.path.join(session.download_path, 'ot2-system.zip'))
+        os.path.join(session.download_path, UPDATE_FILENAME))
 
     return web.json_response(data=session.state,
                              status=201)
 
 
+def _upload_state(session: UpdateSession) -> web.Response:
+    assert session.chunked_upload
+    return web.json_response(
+        data=dict(session.state, upload=session.chunked_upload.state),
+        status=200)
+
+
+@require_session
+async def begin_chunked_upload(
+        request: web.Request, session: UpdateSession) -> web.Response:
+    """ Serves POST /update/:session/file/chunks
+
+    Starts sending the update file in chunks, as an alternative to
+    /update/:session/file that can be resumed if the connection drops.
+    Requires a json body with
+
+    - ``size``: The size of the file in bytes
+    - ``chunkSize`` (optional): The size of every chunk but the last
+    - ``sha256`` (optional): The ascii hex sha256 of the whole file
+
+    Responds with the session state, and the state of the upload under
+    ``upload``. Starting an upload that already exists (as a client might
+    after a reconnect) responds with its state as it is.
+    """
+    try:
+        body = await request.json()
+        size = body['size']
+        chunk_size = body.get('chunkSize',
+                              chunked_upload.DEFAULT_CHUNK_SIZE)
+        sha256 = body.get('sha256')
+        if not isinstance(size, int) or not isinstance(chunk_size, int)\
+                or not isinstance(sha256, (str, type(None))):
+            raise TypeError('size and chunkSize must be integers and '
+                            'sha256 a string')
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        return web.json_response(
+            data={'error': 'bad-request',
+                  'message': f'Invalid chunked upload request: {e}'},
+            status=400)
+
+    # Creating the upload file blocks, and a retried request must not
+    # start a second upload in the meantime
+    async with session.upload_lock:
+        existing = session.chunked_upload
+        if existing:
+            if (existing.size, existing.chunk_size, existing.sha256)\
+                    != (size, chunk_size, sha256 and sha256.lower()):
+                return web.json_response(
+                    data={'error': 'upload-mismatch',
+                          'message': 'A different upload was already '
+                          'started for this update'},
+                    status=409)
+            return _upload_state(session)
+        if session.stage != Stages.AWAITING_FILE:
+            return _file_already_uploaded()
+
+        try:
+            upload = await asyncio.get_event_loop().run_in_executor(
+                None, functools.partial(
+                    session.begin_chunked_upload, UPDATE_FILENAME,
+                    size, chunk_size, sha256))
+        except ValueError as e:
+            return web.json_response(
+                data={'error': 'bad-request', 'message': str(e)},
+                status=400)
+    return web.json_response(
+        data=dict(session.state, upload=upload.state),
+        status=201)
+
+
+@require_session
+async def chunked_upload_status(
+        request: web.Request, session: UpdateSession) -> web.Response:
+    """ Serves GET /update/:session/file/chunks
+
+    Responds like POST /update/:session/file/chunks, so a client can see
+    which chunks still need sending after a reconnect.
+    """
+    if not session.chunked_upload:
+        return web.json_response(
+            data={'error': 'no-upload',
+                  'message': 'No chunked upload was started'},
+            status=404)
+    return _upload_state(session)
+
+
+async def _read_chunk(request: web.Request, max_length: int) -> bytes:
+    """ Read a request body of at most max_length bytes, which may be more
+    than the app allows request.read() """
+    data = bytearray()
+    async for piece in request.content.iter_chunked(UPLOAD_CHUNK_SIZE):
+        data.extend(piece)
+        if len(data) > max_length:
+            raise chunked_upload.ChunkError(
+                f'Chunk too long: expected at most {max_length}B')
+    return bytes(data)
+
+
+def _finish_chunked_upload(session: UpdateSession, conf: config.Config,
+                           loop: asyncio.AbstractEventLoop):
+    upload = session.chunked_upload
+    assert upload and upload.complete
+    try:
+        upload.finish()
+    except chunked_upload.UploadHashMismatch as e:
+        session.set_error(e.short, str(e))
+        return
+    _begin_validation(session, conf, loop, upload.path)
+
+
+@require_session
+async def chunk_upload(
+        request: web.Request, session: UpdateSession) -> web.Response:
+    """ Serves PUT /update/:session/file/chunks/:n
+
+    Requires the contents of chunk n (counting from 0) as the body, and its
+    ascii hex sha256 in the X-Chunk-SHA256 header. Chunks may be sent in any
+    order, and sending one again is harmless. Once the last one is in, the
+    update is validated as if it had been sent to /update/:session/file.
+
+    Responds like POST /update/:session/file/chunks.
+    """
+    upload = session.chunked_upload
+    if not upload:
+        return web.json_response(
+            data={'error': 'no-upload',
+                  'message': 'No chunked upload was started'},
+            status=404)
+    sha256 = request.headers.get(CHUNK_HASH_HEADER)
+    if not sha256:
+        return web.json_response(
+            data={'error': 'bad-chunk',
+                  'message': f'The {CHUNK_HASH_HEADER} header is required'},
+            status=400)
+    loop = asyncio.get_event_loop()
+    try:
+        index = int(request.match_info['n'])
+        data = await _read_chunk(request, upload.chunk_length(index))
+        await loop.run_in_executor(
+            None, upload.write_chunk, index, data, sha256)
+    except chunked_upload.ChunkConflict as e:
+        return web.json_response(
+            data={'error': e.short, 'message': str(e)},
+            status=409)
+    except chunked_upload.ChunkError as e:
+        return web.json_response(
+            data={'error': e.short, 'message': str(e)},
+            status=400)
+    except ValueError:
+        return web.json_response(
+            data={'error': 'bad-chunk',
+                  'message': f'Bad chunk number {request.match_info["n"]}'},
+            status=400)
+
+    # Several last chunks may finish at once, but only one of them will
+    # still find the session waiting
+    if upload.complete and session.stage == Stages.AWAITING_FILE:
+        _finish_chunked_upload(
+            session, config.config_from_request(request), loop)
+    return _upload_state(session)
+
+
 @require_session
 async def commit(
         request: web.Request, session: UpdateSession) -> web.Response:
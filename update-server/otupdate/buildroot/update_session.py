@@ -1,3 +1,4 @@
+import asyncio
 import base64
 from collections import namedtuple
 import enum
@@ -7,6 +8,8 @@ import shutil
 from typing import Mapping, Optional, Union
 import uuid
 
+from .chunked_upload import ChunkedUpload, DEFAULT_CHUNK_SIZE
+
 
 LOG = logging.getLogger(__name__)
 Value = namedtuple('Value', ('short', 'human'))
@@ -35,6 +38,9 @@ class UpdateSession:
         self._storage_path = storage_path
         self._setup_dl_area()
         self._rootfs_file: Optional[str] = None
+        self._chunked_upload: Optional[ChunkedUpload] = None
+        #: Held while a chunked upload is being started
+        self.upload_lock = asyncio.Lock()
         LOG.info(f"Update session: created {self._token}")
 
     def _setup_dl_area(self):
@@ -65,6 +71,23 @@ class UpdateSession:
     def set_progress(self, progress: float) -> None:
         self._progress = progress
 
+    def begin_chunked_upload(self, filename: str, size: int,
+                             chunk_size: int = DEFAULT_CHUNK_SIZE,
+                             sha256: Optional[str] = None) -> ChunkedUpload:
+        """ Start receiving the update file in chunks
+
+        :raises ValueError: If the size or chunk size are unacceptable
+        """
+        assert not self._chunked_upload
+        self._chunked_upload = ChunkedUpload(
+            os.path.join(self._storage_path, filename),
+            size, chunk_size, sha256)
+        return self._chunked_upload
+
+    @property
+    def chunked_upload(self) -> Optional[ChunkedUpload]:
+        return self._chunked_upload
+
     @property
     def download_path(self) -> str:
         return self._storage_path
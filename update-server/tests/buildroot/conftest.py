@@ -146,3 +146,15 @@ def testing_partition(monkeypatch, tmpdir):
     find_unused.return_value = FakeRootPartElem(
         'TWO', buildroot.file_actions.Partition(2, partfile))
     return partfile
+
+
+@pytest.fixture
+def running_partition(monkeypatch, tmpdir):
+    """ A fake root partition to run from, for applying deltas against """
+    partfile = os.path.join(tmpdir, 'fake-running-partition')
+    find_current = mock.Mock()
+    monkeypatch.setattr(buildroot.file_actions, '_find_current_partition',
+                        find_current)
+    find_current.return_value = FakeRootPartElem(
+        'THREE', buildroot.file_actions.Partition(3, partfile))
+    return partfile
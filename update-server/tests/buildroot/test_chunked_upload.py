@@ -0,0 +1,79 @@
+""" Tests for otupdate.buildroot.chunked_upload
+"""
+import hashlib
+import os
+
+import pytest
+
+from otupdate.buildroot import chunked_upload
+
+
+CHUNK = chunked_upload.MIN_CHUNK_SIZE
+DATA = os.urandom(CHUNK * 3 + 100)
+
+
+def _chunk(index):
+    return DATA[index * CHUNK:(index + 1) * CHUNK]
+
+
+@pytest.fixture
+def upload(tmpdir):
+    return chunked_upload.ChunkedUpload(
+        os.path.join(tmpdir, 'upload'), len(DATA), CHUNK,
+        hashlib.sha256(DATA).hexdigest())
+
+
+def _send(upload, index):
+    data = _chunk(index)
+    return upload.write_chunk(index, data, chunked_upload.sha256_hex(data))
+
+
+def test_out_of_order(upload):
+    assert upload.chunk_count == 4
+    assert upload.chunk_length(3) == 100
+    for index in (3, 1):
+        assert _send(upload, index)
+    assert upload.received_ranges() == [[1, 1], [3, 3]]
+    assert not upload.complete
+    # Resending is harmless
+    assert not _send(upload, 3)
+    for index in (0, 2):
+        _send(upload, index)
+    assert upload.received_ranges() == [[0, 3]]
+    assert upload.complete
+    assert upload.state['complete']
+    upload.finish()
+    assert open(upload.path, 'rb').read() == DATA
+
+
+def test_bad_chunks(upload):
+    data = _chunk(0)
+    with pytest.raises(chunked_upload.ChunkHashMismatch):
+        upload.write_chunk(0, data, chunked_upload.sha256_hex(b'other'))
+    with pytest.raises(chunked_upload.ChunkError):
+        upload.write_chunk(0, data[:-1], chunked_upload.sha256_hex(data))
+    with pytest.raises(chunked_upload.ChunkError):
+        upload.write_chunk(4, data, chunked_upload.sha256_hex(data))
+    assert upload.received_ranges() == []
+    _send(upload, 0)
+    other = bytes(CHUNK)
+    with pytest.raises(chunked_upload.ChunkConflict):
+        upload.write_chunk(0, other, chunked_upload.sha256_hex(other))
+
+
+def test_file_hash_mismatch(tmpdir):
+    upload = chunked_upload.ChunkedUpload(
+        os.path.join(tmpdir, 'upload'), len(DATA), CHUNK,
+        hashlib.sha256(b'something else').hexdigest())
+    for index in range(upload.chunk_count):
+        _send(upload, index)
+    with pytest.raises(chunked_upload.UploadHashMismatch):
+        upload.finish()
+
+
+def test_bad_sizes(tmpdir):
+    path = os.path.join(tmpdir, 'upload')
+    with pytest.raises(ValueError):
+        chunked_upload.ChunkedUpload(path, 0)
+    with pytest.raises(ValueError):
+        chunked_upload.ChunkedUpload(path, 100, chunk_size=100)
@@ -0,0 +1,69 @@
+""" Tests for otupdate.buildroot.delta
+"""
+import io
+import os
+
+import pytest
+
+from otupdate.buildroot import delta
+
+BLOCK = 1024
+
+
+def _make(base, target):
+    literal = io.BytesIO()
+    manifest = delta.make_delta(io.BytesIO(base), io.BytesIO(target),
+                                literal, BLOCK)
+    return delta.load_manifest(delta.dump_manifest(manifest)),\
+        literal.getvalue()
+
+
+def _apply(manifest, base, literal):
+    out = io.BytesIO()
+    progress = []
+    delta.apply_delta(manifest, io.BytesIO(base), io.BytesIO(literal),
+                      out.write, progress.append)
+    assert progress == sorted(progress)
+    assert progress[-1] == 1.0
+    return out.getvalue()
+
+
+def test_roundtrip():
+    base = os.urandom(BLOCK * 10)
+    # Change a block, move one, and grow by a partial block
+    target = bytearray(base)
+    target[BLOCK * 2:BLOCK * 3] = os.urandom(BLOCK)
+    target[BLOCK * 5:BLOCK * 6] = base[BLOCK * 8:BLOCK * 9]
+    target += os.urandom(100)
+    target = bytes(target)
+
+    manifest, literal = _make(base, target)
+    assert manifest.target_size == len(target)
+    assert manifest.base_size == len(base)
+    assert manifest.blocks[2] is None
+    assert manifest.blocks[5][0] == 8
+    assert manifest.blocks[10] is None
+    assert len(literal) == BLOCK + 100
+    assert _apply(manifest, base, literal) == target
+
+
+def test_base_mismatch():
+    base = os.urandom(BLOCK * 4)
+    target = base[:BLOCK * 3] + os.urandom(BLOCK)
+    manifest, literal = _make(base, target)
+    other = base[:BLOCK] + os.urandom(BLOCK) + base[BLOCK * 2:]
+    with pytest.raises(delta.BaseMismatch):
+        _apply(manifest, other, literal)
+    with pytest.raises(delta.BadDelta):
+        _apply(manifest, base, literal[:-1])
+
+
+def test_bad_manifest():
+    with pytest.raises(delta.BadDelta):
+        delta.load_manifest(b'{"version": 1}')
+    with pytest.raises(delta.BadDelta):
+        delta.load_manifest(b'{"version": 2}')
+    with pytest.raises(delta.BadDelta):
+        delta.load_manifest(delta.dump_manifest(delta.Manifest(
+            block_size=BLOCK, base_sha256='', base_size=0,
+            target_size=BLOCK * 2, blocks=[None])))
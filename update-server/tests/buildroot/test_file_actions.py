@@ -2,8 +2,7 @@
 
 Checks functionality and error cases for the update utility functions there
 """
-import binascii
-import hashlib
+import io
 import os
 import subprocess
 from unittest import mock
@@ -11,76 +10,7 @@ import zipfile
 
 import pytest
 
-from otupdate.buildroot import file_actions
-
-
-def test_unzip(downloaded_update_file):
-    cb = mock.Mock()
-    paths, sizes = file_actions.unzip_update(downloaded_update_file, cb,
-                                             file_actions.UPDATE_FILES,
-                                             file_actions.UPDATE_FILES)
-    assert sorted(list(paths.keys())) == sorted(file_actions.UPDATE_FILES)
-    for filename, path in paths.items():
-        assert os.path.dirname(path) == os.path.dirname(downloaded_update_file)
-    with zipfile.ZipFile(downloaded_update_file) as zf:
-        for filename, size in sizes.items():
-            assert zf.getinfo(filename).file_size == size
-        for filename, path in paths.items():
-            assert zf.read(filename) == open(path, 'rb').read()
-    # We should have callback calls for
-    # - every chunk (including the fractional one at the end) of rootfs
-    calls = sizes[file_actions.ROOTFS_NAME] // 1024
-    if calls * 1024 != sizes[file_actions.ROOTFS_NAME]:
-        calls += 1
-    # - the two files that are less than a chunk
-    calls += 2
-    assert cb.call_count == calls
-
-
-@pytest.mark.exclude_rootfs_ext4
-def test_unzip_requires_rootfs(downloaded_update_file):
-    cb = mock.Mock()
-    with pytest.raises(file_actions.FileMissing):
-        file_actions.unzip_update(downloaded_update_file, cb,
-                                  file_actions.UPDATE_FILES,
-                                  file_actions.UPDATE_FILES)
-
-
-@pytest.mark.exclude_rootfs_ext4_hash
-def test_unzip_requires_hash(downloaded_update_file):
-    cb = mock.Mock()
-    with pytest.raises(file_actions.FileMissing):
-        file_actions.unzip_update(downloaded_update_file, cb,
-                                  file_actions.UPDATE_FILES,
-                                  file_actions.UPDATE_FILES)
-
-
-@pytest.mark.exclude_rootfs_ext4_hash_sig
-def test_unzip_does_not_require_sig(downloaded_update_file):
-    cb = mock.Mock()
-    file_actions.unzip_update(downloaded_update_file, cb,
-                              file_actions.UPDATE_FILES,
-                              [file_actions.ROOTFS_NAME,
-                               file_actions.ROOTFS_HASH_NAME])
-
-
-@pytest.mark.exclude_rootfs_ext4_hash_sig
-def test_unzip_requires_sig(downloaded_update_file):
-    cb = mock.Mock()
-    with pytest.raises(file_actions.FileMissing):
-        file_actions.unzip_update(downloaded_update_file, cb,
-                                  file_actions.UPDATE_FILES,
-                                  file_actions.UPDATE_FILES)
-
-
-def test_hash(extracted_update_file):
-    cb = mock.Mock()
-    hash_output = file_actions.hash_file(
-        os.path.join(extracted_update_file, 'rootfs.ext4'),
-        cb)
-    assert hash_output == open(
-        os.path.join(extracted_update_file, 'rootfs.ext4.hash'), 'rb').read()
-    cb.assert_called()
+from otupdate.buildroot import delta, file_actions
 
 
 def test_verify_signature_ok(extracted_update_file, testing_cert):
@@ -102,102 +32,150 @@ def test_verify_signature_catches_bad_sig(
                                       testing_cert)
 
 
-@pytest.mark.exclude_rootfs_ext4_hash_sig
-def test_validate_hash_only(downloaded_update_file):
+def test_validate_and_write(downloaded_update_file, testing_cert,
+                            testing_partition):
     cb = mock.Mock()
-    assert file_actions.validate_update(downloaded_update_file,
-                                        cb,
-                                        cert_path=None)
-    # We should have a callback call for
-    # - the unzips (see test_unzip for calculation)
+    writing = mock.Mock(side_effect=lambda: cb.assert_not_called())
+    assert file_actions.validate_and_write_update(
+        downloaded_update_file, cb, testing_cert, chunk_size=4096,
+        writing_callback=writing).value.path == testing_partition
+    writing.assert_called_once_with()
     with zipfile.ZipFile(downloaded_update_file) as zf:
-        rootfs_size = zf.getinfo(file_actions.ROOTFS_NAME).file_size
-        rootfs_calls = rootfs_size // 1024
-        if rootfs_calls * 1024 != rootfs_size:
-            rootfs_calls += 1
-    # only adding 1 extra call because we don’t have a signature file
-    calls = rootfs_calls + 1
-
-    # - the hashes, one for each chunk, the same chunks as unzip
-    calls += rootfs_calls
-    assert cb.call_count == calls
+        rootfs = zf.read(file_actions.ROOTFS_NAME)
+    assert open(testing_partition, 'rb').read() == rootfs
+    # One callback per chunk, the rootfs only being read once
+    assert cb.call_count == -(-len(rootfs) // 4096)
+    progress = [c[0][0] for c in cb.call_args_list]
+    assert progress == sorted(progress)
+    assert progress[-1] == 1.0
 
 
-def test_validate(downloaded_update_file, testing_cert):
+@pytest.mark.exclude_rootfs_ext4_hash_sig
+def test_validate_and_write_hash_only(downloaded_update_file,
+                                      testing_partition):
     cb = mock.Mock()
-    assert file_actions.validate_update(downloaded_update_file,
-                                        cb,
-                                        cert_path=testing_cert)
-    # We should have a callback call for
-    # - the unzips (see test_unzip for calculation)
-    with zipfile.ZipFile(downloaded_update_file) as zf:
-        rootfs_size = zf.getinfo(file_actions.ROOTFS_NAME).file_size
-        rootfs_calls = rootfs_size // 1024
-        if rootfs_calls * 1024 != rootfs_size:
-            rootfs_calls += 1
-    calls = rootfs_calls + 2
-
-    # - the hashes, one for each chunk, the same chunks as unzip
-    calls += rootfs_calls
-    assert cb.call_count == calls
+    file_actions.validate_and_write_update(downloaded_update_file, cb, None)
+    # The whole image fits in one of the default chunks
+    assert cb.call_count == 1
 
 
 @pytest.mark.bad_hash
-def test_validate_catches_bad_hash(downloaded_update_file):
+def test_validate_and_write_catches_bad_hash(downloaded_update_file,
+                                             testing_partition):
     cb = mock.Mock()
     with pytest.raises(file_actions.HashMismatch):
-        file_actions.validate_update(downloaded_update_file, cb, None)
+        file_actions.validate_and_write_update(downloaded_update_file, cb,
+                                               None)
 
 
 @pytest.mark.bad_sig
-def test_validate_catches_bad_sig(downloaded_update_file, testing_cert):
+def test_validate_and_write_catches_bad_sig(downloaded_update_file,
+                                            testing_cert,
+                                            testing_partition):
     cb = mock.Mock()
     with pytest.raises(file_actions.SignatureMismatch):
-        file_actions.validate_update(downloaded_update_file, cb,
-                                     testing_cert)
+        file_actions.validate_and_write_update(downloaded_update_file, cb,
+                                               testing_cert, chunk_size=1024)
 
 
 @pytest.mark.exclude_rootfs_ext4_hash_sig
-def test_validate_catches_missing_sig(downloaded_update_file, testing_cert):
+def test_validate_and_write_catches_missing_sig(downloaded_update_file,
+                                                testing_cert,
+                                                testing_partition):
     cb = mock.Mock()
     with pytest.raises(file_actions.FileMissing):
-        file_actions.validate_update(downloaded_update_file, cb, testing_cert)
+        file_actions.validate_and_write_update(downloaded_update_file, cb,
+                                               testing_cert)
+    assert not os.path.exists(testing_partition)
 
 
 @pytest.mark.exclude_rootfs_ext4_hash
-def test_validate_catches_missing_hash(downloaded_update_file, testing_cert):
+def test_validate_and_write_catches_missing_hash(downloaded_update_file,
+                                                 testing_cert,
+                                                 testing_partition):
     cb = mock.Mock()
     with pytest.raises(file_actions.FileMissing):
-        file_actions.validate_update(downloaded_update_file, cb, testing_cert)
+        file_actions.validate_and_write_update(downloaded_update_file, cb,
+                                               testing_cert)
+    assert not os.path.exists(testing_partition)
 
 
 @pytest.mark.exclude_rootfs_ext4
-def test_validate_catches_missing_image(downloaded_update_file, testing_cert):
+def test_validate_and_write_catches_missing_image(downloaded_update_file,
+                                                  testing_cert,
+                                                  testing_partition):
     cb = mock.Mock()
     with pytest.raises(file_actions.FileMissing):
-        file_actions.validate_update(downloaded_update_file, cb, testing_cert)
+        file_actions.validate_and_write_update(downloaded_update_file, cb,
+                                               testing_cert)
+    assert not os.path.exists(testing_partition)
 
 
-def test_write_update(extracted_update_file, testing_partition):
-    img = os.path.join(extracted_update_file, 'rootfs.ext4')
+def test_validate_and_write_catches_write_failure(
+        downloaded_update_file, testing_cert, testing_partition):
+    os.mkdir(testing_partition)
     cb = mock.Mock()
-    file_actions.write_update(img, cb)
-
-    filesize = open(testing_partition).seek(0, 2)
-
-    call_count = filesize // 1024
-    if call_count * 1024 != filesize:
-        call_count += 1
-
-    assert cb.call_count == call_count
-
-    hasher = hashlib.sha256()
-    hasher.update(open(testing_partition, 'rb').read())
-    hash_val = binascii.hexlify(hasher.digest())
-    assert hash_val\
-        == open(
-            os.path.join(extracted_update_file, 'rootfs.ext4.hash'),
-            'rb').read().strip()
+    with pytest.raises(IsADirectoryError):
+        file_actions.validate_and_write_update(downloaded_update_file, cb,
+                                               testing_cert)
+
+
+def _delta_update(extracted_update_file, base, with_rootfs):
+    """ Zip up an update with a delta from base to the rootfs """
+    rootfs_path = os.path.join(extracted_update_file, 'rootfs.ext4')
+    zip_path = os.path.join(extracted_update_file, 'ot2-system-delta.zip')
+    literal = io.BytesIO()
+    with open(rootfs_path, 'rb') as rootfs:
+        manifest = delta.make_delta(io.BytesIO(base), rootfs, literal, 4096)
+    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(file_actions.ROOTFS_DELTA_NAME, literal.getvalue())
+        zf.writestr(file_actions.ROOTFS_DELTA_MANIFEST_NAME,
+                    delta.dump_manifest(manifest))
+        for name in (file_actions.ROOTFS_HASH_NAME,
+                     file_actions.ROOTFS_SIG_NAME):
+            zf.write(os.path.join(extracted_update_file, name), name)
+        if with_rootfs:
+            zf.write(rootfs_path, file_actions.ROOTFS_NAME)
+    return zip_path, open(rootfs_path, 'rb').read()
+
+
+def _running_image(rootfs):
+    """ An image the rootfs differs from in a couple of blocks """
+    base = bytearray(rootfs)
+    base[4096:8192] = os.urandom(4096)
+    base[-10:] = os.urandom(10)
+    return bytes(base)
+
+
+def test_validate_and_write_delta(extracted_update_file, testing_cert,
+                                  testing_partition, running_partition):
+    rootfs = open(os.path.join(extracted_update_file, 'rootfs.ext4'),
+                  'rb').read()
+    base = _running_image(rootfs)
+    open(running_partition, 'wb').write(base)
+    zip_path, rootfs = _delta_update(extracted_update_file, base, False)
+    cb = mock.Mock()
+    file_actions.validate_and_write_update(zip_path, cb, testing_cert)
+    assert open(testing_partition, 'rb').read() == rootfs
+    assert cb.call_args[0][0] == 1.0
+
+    # Running something else, the delta can't be applied
+    open(running_partition, 'wb').write(os.urandom(len(base)))
+    with pytest.raises(delta.BaseMismatch):
+        file_actions.validate_and_write_update(zip_path, cb, testing_cert)
+
+
+def test_validate_and_write_delta_falls_back(
+        extracted_update_file, testing_cert, testing_partition,
+        running_partition):
+    rootfs = open(os.path.join(extracted_update_file, 'rootfs.ext4'),
+                  'rb').read()
+    zip_path, rootfs = _delta_update(
+        extracted_update_file, _running_image(rootfs), True)
+    open(running_partition, 'wb').write(os.urandom(len(rootfs)))
+    cb = mock.Mock()
+    file_actions.validate_and_write_update(zip_path, cb, testing_cert)
+    assert open(testing_partition, 'rb').read() == rootfs
 
 
 def test_commit_update(monkeypatch):
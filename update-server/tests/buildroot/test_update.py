@@ -3,11 +3,13 @@
 import asyncio
 import binascii
 import hashlib
+import time
+from unittest import mock
 import zipfile
 
 import pytest
 
-from otupdate.buildroot import update, config, file_actions
+from otupdate.buildroot import update, config, file_actions, chunked_upload
 from otupdate.buildroot.update_session import UpdateSession, Stages
 
 
@@ -64,25 +66,28 @@ async def test_future_chain(otupdate_config, downloaded_update_file,
                             loop, testing_partition):
     conf = config.load_from_path(otupdate_config)
     session = UpdateSession(conf.download_storage_path)
+    set_stage = mock.Mock(wraps=session.set_stage)
+    session.set_stage = set_stage
     fut = update._begin_validation(session,
                                    conf,
                                    loop,
                                    downloaded_update_file)
-    assert session.stage == Stages.VALIDATING
+    assert session.stage in (Stages.VALIDATING, Stages.WRITING)
     last_progress = 0.0
     while session.stage == Stages.VALIDATING:
         assert session.state['progress'] >= last_progress
-        assert session.state['stage'] == 'validating'
-        assert session.stage == Stages.VALIDATING
         last_progress = session.state['progress']
         await asyncio.sleep(0.01)
-    assert fut.done()
     last_progress = 0.0
     while session.stage == Stages.WRITING:
+        assert session.state['stage'] == 'writing'
         assert session.state['progress'] >= last_progress
         last_progress = session.state['progress']
-        await asyncio.sleep(0.1)
+        await asyncio.sleep(0.01)
+    await fut
     assert session.stage == Stages.DONE, session.error
+    assert [c[0][0] for c in set_stage.call_args_list]\
+        == [Stages.VALIDATING, Stages.WRITING, Stages.DONE]
 
 
 @pytest.mark.exclude_rootfs_ext4
@@ -113,7 +118,7 @@ async def test_update_happypath(test_cli, update_session,
         data={'ot2-system.zip': open(downloaded_update_file, 'rb')})
     assert resp.status == 201
     body = await resp.json()
-    assert body['stage'] == 'validating'
+    assert body['stage'] in ('validating', 'writing')
     assert 'progress' in body
     # Wait through validation
     then = loop.time()
@@ -168,3 +173,152 @@ async def test_update_catches_validation_fail(test_cli, update_session,
         body = await resp.json()
     assert body['stage'] == 'error'
     assert body['error'] == 'File Missing'
+
+
+def _chunks(path, chunk_size):
+    data = open(path, 'rb').read()
+    return data, [data[i:i + chunk_size]
+                  for i in range(0, len(data), chunk_size)]
+
+
+async def _put_chunk(test_cli, token, index, chunk, sha256=None):
+    return await test_cli.put(
+        session_endpoint(token, f'file/chunks/{index}'),
+        data=chunk,
+        headers={update.CHUNK_HASH_HEADER:
+                 sha256 or hashlib.sha256(chunk).hexdigest()})
+
+
+async def test_chunked_upload_happypath(test_cli, update_session,
+                                        downloaded_update_file, loop,
+                                        testing_partition, monkeypatch):
+    monkeypatch.setattr(chunked_upload, 'MIN_CHUNK_SIZE', 256)
+    data, chunks = _chunks(downloaded_update_file, 256)
+    assert len(chunks) > 2
+    resp = await test_cli.post(
+        session_endpoint(update_session, 'file/chunks'),
+        json={'size': len(data), 'chunkSize': 256,
+              'sha256': hashlib.sha256(data).hexdigest()})
+    assert resp.status == 201
+    body = await resp.json()
+    assert body['stage'] == 'awaiting-file'
+    assert body['upload']['chunkCount'] == len(chunks)
+    assert body['upload']['received'] == []
+
+    # Send all but the first chunk, with one bad one along the way
+    resp = await _put_chunk(test_cli, update_session, 1, chunks[1],
+                            sha256='00' * 32)
+    assert resp.status == 400
+    assert (await resp.json())['error'] == 'chunk-hash-mismatch'
+    for index in range(len(chunks) - 1, 0, -1):
+        resp = await _put_chunk(test_cli, update_session, index,
+                                chunks[index])
+        assert resp.status == 200
+        await resp.release()
+
+    # As if reconnecting: starting again says what's missing
+    resp = await test_cli.post(
+        session_endpoint(update_session, 'file/chunks'),
+        json={'size': len(data), 'chunkSize': 256,
+              'sha256': hashlib.sha256(data).hexdigest()})
+    assert resp.status == 200
+    body = await resp.json()
+    assert body['upload']['received'] == [[1, len(chunks) - 1]]
+    resp = await test_cli.get(session_endpoint(update_session,
+                                               'file/chunks'))
+    assert (await resp.json())['upload'] == body['upload']
+
+    # The multipart upload is no longer an option
+    with open(downloaded_update_file, 'rb') as update_file:
+        resp = await test_cli.post(
+            session_endpoint(update_session, 'file'),
+            data={'ot2-system.zip': update_file})
+    assert resp.status == 409
+    await resp.release()
+
+    resp = await _put_chunk(test_cli, update_session, 0, chunks[0])
+    assert resp.status == 200
+    body = await resp.json()
+    assert body['upload']['complete']
+    assert body['stage'] in ('validating', 'writing')
+    # A resent chunk whose response got lost is fine
+    resp = await _put_chunk(test_cli, update_session, 0, chunks[0])
+    assert resp.status == 200
+    await resp.release()
+
+    then = loop.time()
+    while body['stage'] in ('validating', 'writing'):
+        resp = await test_cli.get(session_endpoint(update_session,
+                                                   'status'))
+        body = await resp.json()
+        assert loop.time() - then <= 300
+    assert body['stage'] == 'done'
+    with zipfile.ZipFile(downloaded_update_file, 'r') as zf:
+        assert open(testing_partition, 'rb').read()\
+            == zf.read('rootfs.ext4')
+
+
+async def test_chunked_upload_concurrent_begin(
+        test_cli, update_session, monkeypatch):
+    # As if a client retried before its first request was answered, while
+    # the upload file was still being created
+    session = test_cli.server.app.get(update.SESSION_VARNAME)
+    begin = session.begin_chunked_upload
+
+    def slow_begin(*args, **kwargs):
+        time.sleep(0.1)
+        return begin(*args, **kwargs)
+
+    monkeypatch.setattr(session, 'begin_chunked_upload', slow_begin)
+    request = {'size': 4096, 'chunkSize': chunked_upload.MIN_CHUNK_SIZE}
+    responses = await asyncio.gather(*[
+        test_cli.post(session_endpoint(update_session, 'file/chunks'),
+                      json=request)
+        for _ in range(3)])
+    assert sorted(resp.status for resp in responses) == [200, 200, 201]
+    for resp in responses:
+        assert (await resp.json())['upload']['size'] == 4096
+
+    resp = await test_cli.post(
+        session_endpoint(update_session, 'file/chunks'),
+        json=dict(request, size=8192))
+    assert resp.status == 409
+    await resp.release()
+
+
+async def test_chunked_upload_errors(test_cli, update_session,
+                                     downloaded_update_file):
+    resp = await _put_chunk(test_cli, update_session, 0, b'data')
+    assert resp.status == 404
+    resp = await test_cli.post(
+        session_endpoint(update_session, 'file/chunks'),
+        json={'chunkSize': 1})
+    assert resp.status == 400
+    resp = await test_cli.post(
+        session_endpoint(update_session, 'file/chunks'),
+        json={'size': 100, 'chunkSize': 1})
+    assert resp.status == 400
+
+    data = open(downloaded_update_file, 'rb').read()
+    resp = await test_cli.post(
+        session_endpoint(update_session, 'file/chunks'),
+        json={'size': len(data), 'sha256': '00' * 32})
+    assert resp.status == 201
+    resp = await test_cli.post(
+        session_endpoint(update_session, 'file/chunks'),
+        json={'size': len(data) + 1})
+    assert resp.status == 409
+    resp = await test_cli.put(
+        session_endpoint(update_session, 'file/chunks/0'), data=data)
+    assert resp.status == 400
+    resp = await _put_chunk(test_cli, update_session, 1, data)
+    assert resp.status == 400
+    resp = await _put_chunk(test_cli, update_session, 0, data + b'extra')
+    assert resp.status == 400
+
+    # The file doesn't match its hash
+    resp = await _put_chunk(test_cli, update_session, 0, data)
+    assert resp.status == 200
+    body = await resp.json()
+    assert body['stage'] == 'error'
+    assert body['error'] == 'Upload Hash Mismatch'